@@ -9,3 +9,10 @@ from asconnect.client import Client
 from asconnect.models import App
 from asconnect.models import Build
 from asconnect.models import Platform
+from asconnect.async_client import AsyncClient
+from asconnect.cache import MemoryCache, SqliteCache
+from asconnect.credentials import ApiKey
+from asconnect.deadline import deadline_scope
+from asconnect.metrics import MetricsAggregator, RequestEvent
+from asconnect.retry import RetryPolicy
+from asconnect.transport import Latency, RecordingAdapter, ReplayAdapter
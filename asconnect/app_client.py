@@ -4,10 +4,11 @@
 # Licensed under the MIT license.
 
 import logging
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator, Literal, overload
 
-from asconnect.httpclient import HttpClient
+from asconnect.httpclient import MAX_PAGE_SIZE, HttpClient
 from asconnect.models import App, AppStoreVersion, Platform, ReleaseType
+from asconnect.utilities import Fields
 
 
 class AppClient:
@@ -31,19 +32,67 @@ class AppClient:
         self.http_client = http_client
         self.log = log.getChild("app")
 
+    @overload
     def get_all(
         self,
         url: str | None = None,
-    ) -> Iterator[App]:
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[App]: ...
+
+    @overload
+    def get_all(
+        self,
+        url: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_all(
+        self,
+        url: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[App | dict[str, Any]]:
         """Get all apps.
 
         :param url: The URL to use (will be generated if not supplied)
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param prefetch: The number of pages to fetch ahead while iterating (0 to disable)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["appStoreVersions"]
 
         :returns: A list of apps
         """
         self.log.debug("Getting all apps...")
         url = self.http_client.generate_url("apps")
-        yield from self.http_client.get(url=url, data_type=list[App])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[App],
+            page_size=page_size,
+            prefetch=prefetch,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
 
     def get_from_bundle_id(self, bundle_id: str) -> App | None:
         """Get a particular app.
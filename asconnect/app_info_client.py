@@ -4,11 +4,11 @@
 # Licensed under the MIT license.
 
 import logging
-from typing import Iterator
+from typing import Any, Iterable, Iterator, Literal, overload
 
-from asconnect.httpclient import HttpClient
+from asconnect.httpclient import MAX_PAGE_SIZE, HttpClient
 from asconnect.models import AppInfoLocalization, AppInfo, AppStoreVersionLocalization, AppCategory
-from asconnect.utilities import update_query_parameters
+from asconnect.utilities import Fields, update_query_parameters
 
 
 class AppInfoClient:
@@ -32,26 +32,83 @@ class AppInfoClient:
         self.http_client = http_client
         self.log = log.getChild("appinfo")
 
-    def get_app_info(self, *, app_id: str) -> list[AppInfo]:
+    @overload
+    def get_app_info(
+        self,
+        *,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> list[AppInfo]: ...
+
+    @overload
+    def get_app_info(
+        self,
+        *,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> list[dict[str, Any]]: ...
+
+    def get_app_info(
+        self,
+        *,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> list[AppInfo] | list[dict[str, Any]]:
         """Get the app info for an app.
 
         If there are two, one will be marked as ready for sale, the other will
         be one that is being prepared.
 
         :param app_id: The app ID to get the info for
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Return the JSON dictionaries instead of models
+        :param lazy: Return models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["primaryCategory"]
 
         :returns: A list to AppInfoLocalization
         """
         self.log.debug(f"Getting app info for {app_id}")
         url = self.http_client.generate_url(f"apps/{app_id}/appInfos")
 
-        return list(self.http_client.get(url=url, data_type=list[AppInfo]))
+        return list(
+            self.http_client.get(
+                url=url,
+                data_type=list[AppInfo],
+                page_size=page_size,
+                raw=raw,
+                lazy=lazy,
+                fields=fields,
+                include=include,
+            )
+        )
 
-    def _get_category(self, *, app_info_id: str, category_id: str) -> AppCategory:
+    def _get_category(
+        self,
+        *,
+        app_info_id: str,
+        category_id: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AppCategory:
         """Get a specific app category.
 
         :param category_id: The ID of the category to get
         :param app_info_id: The app info ID to get the category for
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["subcategories"]
 
         :returns: The AppCategory object
         """
@@ -59,38 +116,96 @@ class AppInfoClient:
         self.log.debug(f"Getting category {category_id}")
         url = self.http_client.generate_url(f"appInfos/{app_info_id}/{category_id}Category")
 
-        return next(self.http_client.get(url=url, data_type=AppCategory))
+        return next(
+            self.http_client.get(url=url, data_type=AppCategory, fields=fields, include=include)
+        )
 
-    def get_primary_category(self, *, app_info_id: str) -> AppCategory:
+    def get_primary_category(
+        self,
+        *,
+        app_info_id: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AppCategory:
         """Get the primary category for an app info.
 
         :param app_info_id: The app info ID to get the primary category for
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["subcategories"]
 
         :returns: The primary category ID
         """
 
-        return self._get_category(app_info_id=app_info_id, category_id="primary")
+        return self._get_category(
+            app_info_id=app_info_id, category_id="primary", fields=fields, include=include
+        )
 
-    def get_secondary_category(self, *, app_info_id: str) -> AppCategory:
+    def get_secondary_category(
+        self,
+        *,
+        app_info_id: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AppCategory:
         """Get the primary category for an app info.
 
         :param app_info_id: The app info ID to get the primary category for
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["subcategories"]
 
         :returns: The primary category ID
         """
 
-        return self._get_category(app_info_id=app_info_id, category_id="secondary")
+        return self._get_category(
+            app_info_id=app_info_id, category_id="secondary", fields=fields, include=include
+        )
 
+    @overload
     def get_localizations(
         self,
         *,
         app_info_id: str,
         locale: str | None = None,
-    ) -> Iterator[AppInfoLocalization]:
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppInfoLocalization]: ...
+
+    @overload
+    def get_localizations(
+        self,
+        *,
+        app_info_id: str,
+        locale: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_localizations(
+        self,
+        *,
+        app_info_id: str,
+        locale: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppInfoLocalization | dict[str, Any]]:
         """Get the app info for an app.
 
         :param app_info_id: The app info ID to get the localized info for
         :param locale: The version to filter on (if any)
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["appInfo"]
 
         :returns: An iterator to AppInfoLocalization
         """
@@ -105,7 +220,15 @@ class AppInfoClient:
 
         url = update_query_parameters(url, query_parameters)
 
-        yield from self.http_client.get(url=url, data_type=list[AppInfoLocalization])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[AppInfoLocalization],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
 
     def set_localization_properties(
         self,
@@ -161,12 +284,48 @@ class AppInfoClient:
             data_type=AppInfoLocalization,
         )
 
+    @overload
     def get_localization_versions(
-        self, *, app_store_version_id: str
-    ) -> Iterator[AppStoreVersionLocalization]:
+        self,
+        *,
+        app_store_version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppStoreVersionLocalization]: ...
+
+    @overload
+    def get_localization_versions(
+        self,
+        *,
+        app_store_version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_localization_versions(
+        self,
+        *,
+        app_store_version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppStoreVersionLocalization | dict[str, Any]]:
         """Get the app store version localizations for an app.
 
         :param app_store_version_id: The ID of the app store version to get the localized info for
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["appScreenshotSets"]
 
         :returns: An iterator to AppStoreVersionLocalization
         """
@@ -176,7 +335,15 @@ class AppInfoClient:
             f"appStoreVersions/{app_store_version_id}/appStoreVersionLocalizations"
         )
 
-        yield from self.http_client.get(url=url, data_type=list[AppStoreVersionLocalization])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[AppStoreVersionLocalization],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
 
     def set_localization_version_properties(
         self,
@@ -0,0 +1,1102 @@
+"""Asynchronous wrapper around the Apple App Store Connect APIs.
+
+This is a thread-offload wrapper, not an async transport: no async HTTP
+library is a dependency of the package, so every call runs the synchronous
+client on a bounded pool of worker threads, and coroutines wait on those.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import asyncio
+import collections.abc
+import concurrent.futures
+import contextvars
+import functools
+import itertools
+import logging
+import threading
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Concatenate,
+    Coroutine,
+    Generic,
+    Iterable,
+    Iterator,
+    Literal,
+    ParamSpec,
+    Type,
+    TypeVar,
+    overload,
+)
+
+from asconnect.app_client import AppClient
+from asconnect.app_info_client import AppInfoClient
+from asconnect.beta_review_client import BetaReviewClient
+from asconnect.build_client import BuildClient
+from asconnect.client import Client
+from asconnect.httpclient import DEFAULT_POOL_MAXSIZE, MAX_PAGE_SIZE, HttpClient
+from asconnect.models import (
+    App,
+    AppInfo,
+    AppInfoLocalization,
+    AppScreenshot,
+    AppScreenshotSet,
+    AppStoreVersion,
+    AppStoreVersionLocalization,
+    BetaAppLocalization,
+    BetaBuildLocalization,
+    BetaGroup,
+    Build,
+    CustomerReview,
+    Platform,
+    User,
+)
+from asconnect.reviews_client import ReviewsClient
+from asconnect.screenshot_client import ScreenshotClient
+from asconnect.sorting import BuildsSort, CustomerReviewSort
+from asconnect.users_client import UsersClient
+from asconnect.utilities import Fields
+from asconnect.version_client import VersionClient
+
+# pylint: disable=too-many-lines
+
+DEFAULT_MAX_CONCURRENCY = 32
+
+# The number of items pulled from a synchronous iterator per trip to the
+# executor. Items are already decoded a page at a time, so this mostly saves
+# thread hops rather than requests.
+_ITERATION_BATCH_SIZE = 100
+
+SubClientType = TypeVar("SubClientType")  # pylint: disable=invalid-name
+ItemType = TypeVar("ItemType")  # pylint: disable=invalid-name
+ParamsType = ParamSpec("ParamsType")  # pylint: disable=invalid-name
+
+
+class AsyncHttpClient:
+    """Asynchronous HTTP client for the ASC API.
+
+    This wraps a synchronous `HttpClient`, so the pooled connections, token
+    cache and error handling are all shared with it. Each blocking call runs
+    on one of a bounded pool of worker threads, and holds it for the whole
+    call, including any retry backoff. The pool size caps the number of calls
+    running at any one time, regardless of how many coroutines are waiting.
+    """
+
+    http_client: HttpClient
+    _executor: concurrent.futures.ThreadPoolExecutor
+
+    def __init__(
+        self,
+        *,
+        http_client: HttpClient,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        """Construct a new client object.
+
+        :param http_client: The synchronous HTTP client to wrap
+        :param max_concurrency: The number of worker threads, which caps the calls running at once
+        """
+
+        self.http_client = http_client
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="asconnect"
+        )
+
+    async def run(self, function: Callable[..., ItemType], *args: Any, **kwargs: Any) -> ItemType:
+        """Run a blocking function on the worker pool.
+
+        The current context is copied over so that context variables are
+        visible to the function.
+
+        :param function: The function to run
+        :param args: The positional arguments to pass to the function
+        :param kwargs: The keyword arguments to pass to the function
+
+        :returns: The result of the function
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, function, *args, **kwargs)
+        )
+
+    async def iterate(self, iterator: Iterator[ItemType]) -> AsyncGenerator[ItemType, None]:
+        """Iterate a blocking iterator from the worker pool.
+
+        If the iterator is a generator, it is closed once this is, even if it
+        wasn't consumed to the end, so that any requests it has running are
+        cleaned up.
+
+        :param iterator: The iterator to consume
+
+        :returns: An async iterator over the same items
+        """
+        # A batch can still be running on a worker if this was cancelled, and
+        # a generator can't be closed while it is running
+        lock = threading.Lock()
+
+        def next_batch() -> list[ItemType]:
+            """Pull the next batch of items.
+
+            :returns: The items
+            """
+            with lock:
+                return list(itertools.islice(iterator, _ITERATION_BATCH_SIZE))
+
+        def close(generator: collections.abc.Generator) -> None:
+            """Close a generator.
+
+            :param generator: The generator to close
+            """
+            with lock:
+                generator.close()
+
+        try:
+            while True:
+                batch = await self.run(next_batch)
+
+                for item in batch:
+                    yield item
+
+                if len(batch) < _ITERATION_BATCH_SIZE:
+                    return
+        finally:
+            if isinstance(iterator, collections.abc.Generator):
+                await self.run(close, iterator)
+
+    # pylint:disable=too-many-arguments
+    async def get(
+        self,
+        *,
+        data_type: Type,
+        endpoint: str | None = None,
+        url: str | None = None,
+        log_response: bool = False,
+        attempts: int | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[Any, None]:
+        """Perform a GET to the endpoint specified, following any pagination.
+
+        Either endpoint or url must be specified. url will take precedence if
+        both are specified.
+
+        :param data_type: The class to deserialize the data of the response to
+        :param endpoint: The endpoint to perform the GET on
+        :param url: The full URL to perform the GET on
+        :param log_response: A flag indicates whether to log the response
+        :param attempts: Number of attempts to try each page (defaults to the retry policy)
+        :param page_size: The number of items to fetch per page of a listing
+        :param max_page_size: The largest page size the endpoint accepts
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, which depend on the endpoint
+
+        :raises ValueError: If neither url or endpoint are specified, both raw and lazy are set, or the page size is out of range
+
+        :returns: An async iterator over the deserialized items
+        """
+        next_url: str | None = self.http_client.listing_url(
+            data_type=data_type,
+            endpoint=endpoint,
+            url=url,
+            page_size=page_size,
+            max_page_size=max_page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
+
+        while next_url is not None:
+            items, next_url = await self.run(
+                self.http_client.get_page,
+                data_type=data_type,
+                url=next_url,
+                log_response=log_response,
+                attempts=attempts,
+                raw=raw,
+                lazy=lazy,
+                partial=bool(fields),
+            )
+
+            for item in items:
+                yield item
+
+    # pylint:enable=too-many-arguments
+
+    async def get_related(self, **kwargs: Any) -> Any:
+        """Get the resource a relationship points at. See `HttpClient.get_related` for the parameters.
+
+        :param kwargs: The arguments to pass to `HttpClient.get_related`
+
+        :returns: The related resource
+        """
+        return await self.run(self.http_client.get_related, **kwargs)
+
+    async def patch(self, **kwargs: Any) -> Any:
+        """Perform a PATCH. See `HttpClient.patch` for the parameters.
+
+        :param kwargs: The arguments to pass to `HttpClient.patch`
+
+        :returns: The deserialized response
+        """
+        return await self.run(self.http_client.patch, **kwargs)
+
+    async def post(self, **kwargs: Any) -> Any:
+        """Perform a POST. See `HttpClient.post` for the parameters.
+
+        :param kwargs: The arguments to pass to `HttpClient.post`
+
+        :returns: The deserialized response
+        """
+        return await self.run(self.http_client.post, **kwargs)
+
+    async def delete(self, **kwargs: Any) -> Any:
+        """Perform a DELETE. See `HttpClient.delete` for the parameters.
+
+        :param kwargs: The arguments to pass to `HttpClient.delete`
+
+        :returns: The raw response
+        """
+        return await self.run(self.http_client.delete, **kwargs)
+
+    async def put_chunk(self, **kwargs: Any) -> Any:
+        """Perform a chunk PUT. See `HttpClient.put_chunk` for the parameters.
+
+        :param kwargs: The arguments to pass to `HttpClient.put_chunk`
+
+        :returns: The raw response
+        """
+        return await self.run(self.http_client.put_chunk, **kwargs)
+
+    def close(self) -> None:
+        """Shut down the worker pool, waiting for any running requests."""
+        self._executor.shutdown(wait=True)
+
+
+class AsyncSubClient(Generic[SubClientType]):
+    """Exposes the methods of a synchronous sub-client as coroutines.
+
+    Each subclass declares the methods of the client it wraps, with the same
+    signatures. Methods that return a single value become coroutines, and
+    methods that yield values become async iterators.
+    """
+
+    client: SubClientType
+    http_client: AsyncHttpClient
+
+    def __init__(self, *, client: SubClientType, http_client: AsyncHttpClient) -> None:
+        """Construct a new client object.
+
+        :param client: The synchronous sub-client to wrap
+        :param http_client: The async HTTP client to run requests through
+        """
+
+        self.client = client
+        self.http_client = http_client
+
+
+class AsyncMethod(Generic[SubClientType, ParamsType, ItemType]):
+    """A sub-client method which runs on the worker pool.
+
+    Declared on an `AsyncSubClient`, this takes the same arguments as the
+    method it wraps, and returns a coroutine for its result.
+    """
+
+    name: str
+
+    def __init__(self, method: Callable[Concatenate[SubClientType, ParamsType], ItemType]) -> None:
+        """Wrap a method.
+
+        :param method: The method of the synchronous sub-client
+        """
+        self.name = method.__name__
+        self.__doc__ = method.__doc__
+
+    @overload
+    def __get__(
+        self, instance: None, owner: type
+    ) -> "AsyncMethod[SubClientType, ParamsType, ItemType]": ...
+
+    @overload
+    def __get__(
+        self, instance: AsyncSubClient[SubClientType], owner: type
+    ) -> Callable[ParamsType, Coroutine[Any, Any, ItemType]]: ...
+
+    def __get__(self, instance: AsyncSubClient[SubClientType] | None, owner: type) -> Any:
+        """Get the method bound to a client.
+
+        :param instance: The client the method was looked up on (None if it was the class)
+        :param owner: The class of the client
+
+        :returns: The bound method
+        """
+        if instance is None:
+            return self
+
+        method = getattr(instance.client, self.name)
+
+        @functools.wraps(method)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            """Call the wrapped method on the worker pool.
+
+            :param args: The positional arguments to pass on
+            :param kwargs: The keyword arguments to pass on
+
+            :returns: The result of the wrapped method
+            """
+            return await instance.http_client.run(method, *args, **kwargs)
+
+        return call
+
+
+class AsyncListing(Generic[SubClientType, ParamsType, ItemType]):
+    """A sub-client generator method, iterated from the worker pool.
+
+    Declared on an `AsyncSubClient`, this takes the same arguments as the
+    method it wraps, and returns an async iterator over the same items.
+    """
+
+    name: str
+
+    def __init__(
+        self, method: Callable[Concatenate[SubClientType, ParamsType], Iterator[ItemType]]
+    ) -> None:
+        """Wrap a generator method.
+
+        :param method: The generator method of the synchronous sub-client
+        """
+        self.name = method.__name__
+        self.__doc__ = method.__doc__
+
+    @overload
+    def __get__(
+        self, instance: None, owner: type
+    ) -> "AsyncListing[SubClientType, ParamsType, ItemType]": ...
+
+    @overload
+    def __get__(
+        self, instance: AsyncSubClient[SubClientType], owner: type
+    ) -> Callable[ParamsType, AsyncGenerator[ItemType, None]]: ...
+
+    def __get__(self, instance: AsyncSubClient[SubClientType] | None, owner: type) -> Any:
+        """Get the generator method bound to a client.
+
+        :param instance: The client the method was looked up on (None if it was the class)
+        :param owner: The class of the client
+
+        :returns: The bound method
+        """
+        if instance is None:
+            return self
+
+        method = getattr(instance.client, self.name)
+
+        @functools.wraps(method)
+        def iterate(*args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+            """Iterate the wrapped generator asynchronously.
+
+            :param args: The positional arguments to pass on
+            :param kwargs: The keyword arguments to pass on
+
+            :returns: An async iterator over the generated items
+            """
+            return instance.http_client.iterate(method(*args, **kwargs))
+
+        return iterate
+
+
+# pylint:disable=too-many-arguments
+
+
+class AsyncAppClient(AsyncSubClient[AppClient]):
+    """Async counterpart of `AppClient`."""
+
+    @overload
+    def get_all(
+        self,
+        url: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[App, None]: ...
+
+    @overload
+    def get_all(
+        self,
+        url: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_all(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `AppClient.get_all` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_all(*args, **kwargs))
+
+    get_from_bundle_id = AsyncMethod(AppClient.get_from_bundle_id)
+    create_new_version = AsyncMethod(AppClient.create_new_version)
+
+
+class AsyncAppInfoClient(AsyncSubClient[AppInfoClient]):
+    """Async counterpart of `AppInfoClient`."""
+
+    @overload
+    async def get_app_info(
+        self,
+        *,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> list[AppInfo]: ...
+
+    @overload
+    async def get_app_info(
+        self,
+        *,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> list[dict[str, Any]]: ...
+
+    async def get_app_info(self, *args: Any, **kwargs: Any) -> Any:
+        """Call `AppInfoClient.get_app_info` on the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: The result of the call
+        """
+        return await self.http_client.run(self.client.get_app_info, *args, **kwargs)
+
+    get_primary_category = AsyncMethod(AppInfoClient.get_primary_category)
+    get_secondary_category = AsyncMethod(AppInfoClient.get_secondary_category)
+
+    @overload
+    def get_localizations(
+        self,
+        *,
+        app_info_id: str,
+        locale: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[AppInfoLocalization, None]: ...
+
+    @overload
+    def get_localizations(
+        self,
+        *,
+        app_info_id: str,
+        locale: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_localizations(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `AppInfoClient.get_localizations` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_localizations(*args, **kwargs))
+
+    set_localization_properties = AsyncMethod(AppInfoClient.set_localization_properties)
+
+    @overload
+    def get_localization_versions(
+        self,
+        *,
+        app_store_version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[AppStoreVersionLocalization, None]: ...
+
+    @overload
+    def get_localization_versions(
+        self,
+        *,
+        app_store_version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_localization_versions(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `AppInfoClient.get_localization_versions` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_localization_versions(*args, **kwargs))
+
+    set_localization_version_properties = AsyncMethod(
+        AppInfoClient.set_localization_version_properties
+    )
+
+
+class AsyncBetaReviewClient(AsyncSubClient[BetaReviewClient]):
+    """Async counterpart of `BetaReviewClient`."""
+
+    set_beta_app_review_details = AsyncMethod(BetaReviewClient.set_beta_app_review_details)
+
+    @overload
+    def get_beta_app_localizations(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[BetaAppLocalization, None]: ...
+
+    @overload
+    def get_beta_app_localizations(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_beta_app_localizations(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `BetaReviewClient.get_beta_app_localizations` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_beta_app_localizations(*args, **kwargs))
+
+    @overload
+    def get_beta_build_localizations(
+        self,
+        build_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[BetaBuildLocalization, None]: ...
+
+    @overload
+    def get_beta_build_localizations(
+        self,
+        build_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_beta_build_localizations(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `BetaReviewClient.get_beta_build_localizations` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_beta_build_localizations(*args, **kwargs))
+
+    set_beta_app_localizations = AsyncMethod(BetaReviewClient.set_beta_app_localizations)
+    set_whats_new_for_build = AsyncMethod(BetaReviewClient.set_whats_new_for_build)
+
+    @overload
+    def get_beta_groups(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[BetaGroup, None]: ...
+
+    @overload
+    def get_beta_groups(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_beta_groups(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `BetaReviewClient.get_beta_groups` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_beta_groups(*args, **kwargs))
+
+    set_beta_groups_on_build = AsyncMethod(BetaReviewClient.set_beta_groups_on_build)
+    submit_for_beta_review = AsyncMethod(BetaReviewClient.submit_for_beta_review)
+
+
+class AsyncBuildClient(AsyncSubClient[BuildClient]):
+    """Async counterpart of `BuildClient`."""
+
+    @overload
+    def get_builds(
+        self,
+        *,
+        url: str | None = None,
+        sort: BuildsSort | None = None,
+        build_number: str | None = None,
+        version: str | None = None,
+        app_id: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[Build, None]: ...
+
+    @overload
+    def get_builds(
+        self,
+        *,
+        url: str | None = None,
+        sort: BuildsSort | None = None,
+        build_number: str | None = None,
+        version: str | None = None,
+        app_id: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_builds(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `BuildClient.get_builds` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_builds(*args, **kwargs))
+
+    get_build_from_identifier = AsyncMethod(BuildClient.get_build_from_identifier)
+    get_from_build_number = AsyncMethod(BuildClient.get_from_build_number)
+    wait_for_build_to_process = AsyncMethod(BuildClient.wait_for_build_to_process)
+    get_beta_detail = AsyncMethod(BuildClient.get_beta_detail)
+    upload = AsyncMethod(BuildClient.upload)
+
+
+class AsyncReviewsClient(AsyncSubClient[ReviewsClient]):
+    """Async counterpart of `ReviewsClient`."""
+
+    @overload
+    def get_reviews(
+        self,
+        app_id: str,
+        sort_order: CustomerReviewSort | None = None,
+        territory_filter: list[str] | None = None,
+        published_response: bool | None = None,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[CustomerReview, None]: ...
+
+    @overload
+    def get_reviews(
+        self,
+        app_id: str,
+        sort_order: CustomerReviewSort | None = None,
+        territory_filter: list[str] | None = None,
+        published_response: bool | None = None,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_reviews(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `ReviewsClient.get_reviews` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_reviews(*args, **kwargs))
+
+
+class AsyncScreenshotClient(AsyncSubClient[ScreenshotClient]):
+    """Async counterpart of `ScreenshotClient`."""
+
+    @overload
+    def get_sets(
+        self,
+        *,
+        localization_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[AppScreenshotSet, None]: ...
+
+    @overload
+    def get_sets(
+        self,
+        *,
+        localization_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_sets(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `ScreenshotClient.get_sets` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_sets(*args, **kwargs))
+
+    delete_set = AsyncMethod(ScreenshotClient.delete_set)
+
+    @overload
+    def get_screenshots(
+        self,
+        *,
+        screenshot_set_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[AppScreenshot, None]: ...
+
+    @overload
+    def get_screenshots(
+        self,
+        *,
+        screenshot_set_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_screenshots(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `ScreenshotClient.get_screenshots` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_screenshots(*args, **kwargs))
+
+    delete_screenshot = AsyncMethod(ScreenshotClient.delete_screenshot)
+    delete_screenshots_in_set = AsyncMethod(ScreenshotClient.delete_screenshots_in_set)
+    delete_all_sets_in_localization = AsyncMethod(ScreenshotClient.delete_all_sets_in_localization)
+    create_set = AsyncMethod(ScreenshotClient.create_set)
+    upload_screenshot = AsyncMethod(ScreenshotClient.upload_screenshot)
+    reorder_screenshots = AsyncMethod(ScreenshotClient.reorder_screenshots)
+    sync_localization = AsyncMethod(ScreenshotClient.sync_localization)
+
+
+class AsyncUsersClient(AsyncSubClient[UsersClient]):
+    """Async counterpart of `UsersClient`."""
+
+    @overload
+    def get_users(
+        self,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[User, None]: ...
+
+    @overload
+    def get_users(
+        self,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_users(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `UsersClient.get_users` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_users(*args, **kwargs))
+
+
+class AsyncVersionClient(AsyncSubClient[VersionClient]):
+    """Async counterpart of `VersionClient`."""
+
+    get = AsyncMethod(VersionClient.get)
+
+    @overload
+    def get_all(
+        self,
+        *,
+        app_id: str,
+        version_string: str | None = None,
+        platform: Platform | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[AppStoreVersion, None]: ...
+
+    @overload
+    def get_all(
+        self,
+        *,
+        app_id: str,
+        version_string: str | None = None,
+        platform: Platform | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_all(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `VersionClient.get_all` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_all(*args, **kwargs))
+
+    get_version = AsyncMethod(VersionClient.get_version)
+    get_phased_release = AsyncMethod(VersionClient.get_phased_release)
+    create_phased_release = AsyncMethod(VersionClient.create_phased_release)
+    delete_phased_release = AsyncMethod(VersionClient.delete_phased_release)
+    patch_phased_release = AsyncMethod(VersionClient.patch_phased_release)
+
+    @overload
+    def get_localizations(
+        self,
+        *,
+        version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[AppStoreVersionLocalization, None]: ...
+
+    @overload
+    def get_localizations(
+        self,
+        *,
+        version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]: ...
+
+    def get_localizations(self, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """Iterate `VersionClient.get_localizations` from the worker pool.
+
+        :param args: The positional arguments to pass on
+        :param kwargs: The keyword arguments to pass on
+
+        :returns: An async iterator over the items
+        """
+        return self.http_client.iterate(self.client.get_localizations(*args, **kwargs))
+
+    get_attached_build = AsyncMethod(VersionClient.get_attached_build)
+    set_build = AsyncMethod(VersionClient.set_build)
+    get_app_review_details = AsyncMethod(VersionClient.get_app_review_details)
+    set_app_review_details = AsyncMethod(VersionClient.set_app_review_details)
+    get_idfa = AsyncMethod(VersionClient.get_idfa)
+    set_idfa = AsyncMethod(VersionClient.set_idfa)
+    set_attribute = AsyncMethod(VersionClient.set_attribute)
+    set_uses_idfa = AsyncMethod(VersionClient.set_uses_idfa)
+    set_version_string = AsyncMethod(VersionClient.set_version_string)
+    submit_for_review = AsyncMethod(VersionClient.submit_for_review)
+    release = AsyncMethod(VersionClient.release)
+
+
+# pylint:enable=too-many-arguments
+
+
+class AsyncClient:
+    """Asynchronous wrapper class around the ASC API.
+
+    This mirrors `Client`, but every method is a coroutine (or an async
+    iterator for listings). Any number of coroutines can be awaited together,
+    but at most `max_concurrency` calls run at once, each on a worker thread.
+
+    A call holds its worker until it finishes, so long operations such as
+    `build.wait_for_build_to_process` (which polls for minutes) or
+    `version.submit_for_review` take a worker each for all that time. Leave
+    room for them in `max_concurrency`, or other calls wait behind them.
+    """
+
+    log: logging.Logger
+    client: Client
+    http_client: AsyncHttpClient
+
+    app: AsyncAppClient
+    app_info: AsyncAppInfoClient
+    beta_review: AsyncBetaReviewClient
+    build: AsyncBuildClient
+    reviews: AsyncReviewsClient
+    screenshots: AsyncScreenshotClient
+    users: AsyncUsersClient
+    version: AsyncVersionClient
+
+    def __init__(
+        self,
+        *,
+        key_id: str,
+        key_contents: str,
+        issuer_id: str | None = None,
+        log: logging.Logger | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        **client_options: Any,
+    ) -> None:
+        """Construct a new client object.
+
+        :param key_id: The ID of your key (can be found in app store connect)
+        :param key_contents: The contents of your key
+        :param issuer_id: The issuer ID for team keys. Omit for individual keys (can be found in app store connect)
+        :param log: Any base logger to be used (one will be created if not supplied)
+        :param max_concurrency: The number of worker threads, which caps the calls running at once
+        :param client_options: Any further options to pass on to `Client`
+        """
+
+        client_options.setdefault("pool_maxsize", max(max_concurrency, DEFAULT_POOL_MAXSIZE))
+
+        self.client = Client(
+            key_id=key_id,
+            key_contents=key_contents,
+            issuer_id=issuer_id,
+            log=log,
+            **client_options,
+        )
+        self.log = self.client.log
+
+        self.http_client = AsyncHttpClient(
+            http_client=self.client.http_client, max_concurrency=max_concurrency
+        )
+
+        self.app = AsyncAppClient(client=self.client.app, http_client=self.http_client)
+        self.app_info = AsyncAppInfoClient(
+            client=self.client.app_info, http_client=self.http_client
+        )
+        self.beta_review = AsyncBetaReviewClient(
+            client=self.client.beta_review, http_client=self.http_client
+        )
+        self.build = AsyncBuildClient(client=self.client.build, http_client=self.http_client)
+        self.reviews = AsyncReviewsClient(client=self.client.reviews, http_client=self.http_client)
+        self.screenshots = AsyncScreenshotClient(
+            client=self.client.screenshots, http_client=self.http_client
+        )
+        self.users = AsyncUsersClient(client=self.client.users, http_client=self.http_client)
+        self.version = AsyncVersionClient(client=self.client.version, http_client=self.http_client)
+
+    async def close(self) -> None:
+        """Wait for any running requests and close the pooled connections."""
+        await asyncio.get_running_loop().run_in_executor(None, self.http_client.close)
+        self.client.close()
+
+    async def __aenter__(self) -> "AsyncClient":
+        """Enter the async context manager.
+
+        :returns: This client
+        """
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        """Exit the async context manager, closing the client."""
+        await self.close()
@@ -4,9 +4,9 @@
 # Licensed under the MIT license.
 
 import logging
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator, Literal, overload
 
-from asconnect.httpclient import HttpClient
+from asconnect.httpclient import MAX_PAGE_SIZE, HttpClient
 
 from asconnect.models import (
     BetaAppLocalization,
@@ -14,6 +14,7 @@ from asconnect.models import (
     BetaBuildLocalization,
     BetaGroup,
 )
+from asconnect.utilities import Fields
 
 
 class BetaReviewClient:
@@ -105,27 +106,119 @@ class BetaReviewClient:
 
     # pylint:enable=too-many-arguments
 
-    def get_beta_app_localizations(self, app_id: str) -> Iterator[BetaAppLocalization]:
+    @overload
+    def get_beta_app_localizations(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[BetaAppLocalization]: ...
+
+    @overload
+    def get_beta_app_localizations(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_beta_app_localizations(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[BetaAppLocalization | dict[str, Any]]:
         """Get the beta app localizations.
 
         :param app_id: The apple identifier for the app to get the localizations for
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["app"]
 
         :returns: An iterator to the beta app localizations
         """
         self.log.debug(f"Getting beta app localizations for {app_id}")
         url = self.http_client.generate_url(f"apps/{app_id}/betaAppLocalizations")
-        yield from self.http_client.get(url=url, data_type=list[BetaAppLocalization])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[BetaAppLocalization],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
+
+    @overload
+    def get_beta_build_localizations(
+        self,
+        build_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[BetaBuildLocalization]: ...
+
+    @overload
+    def get_beta_build_localizations(
+        self,
+        build_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
 
-    def get_beta_build_localizations(self, build_id: str) -> Iterator[BetaBuildLocalization]:
+    def get_beta_build_localizations(
+        self,
+        build_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[BetaBuildLocalization | dict[str, Any]]:
         """Get the beta app localizations.
 
         :param build_id: The identifier for the build to get the localizations for
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["build"]
 
         :returns: An iterator to the beta app localizations
         """
         self.log.debug(f"Getting beta build localizations for {build_id}")
         url = self.http_client.generate_url(f"betaBuildLocalizations?filter[build]={build_id}")
-        yield from self.http_client.get(url=url, data_type=list[BetaBuildLocalization])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[BetaBuildLocalization],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
 
     def set_beta_app_localizations(
         self, app_id: str, localizations: dict[str, dict[str, str]]
@@ -236,16 +329,62 @@ class BetaReviewClient:
                     },
                 )
 
-    def get_beta_groups(self, app_id: str) -> Iterator[BetaGroup]:
+    @overload
+    def get_beta_groups(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[BetaGroup]: ...
+
+    @overload
+    def get_beta_groups(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_beta_groups(
+        self,
+        app_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        *,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[BetaGroup | dict[str, Any]]:
         """Get the beta groups
 
         :param app_id: The ID of the app to filter on
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["betaTesters"]
 
         :returns: An iterator to the beta groups
         """
         self.log.debug(f"Getting beta groups for {app_id}")
         url = self.http_client.generate_url(f"betaGroups?filter[app]={app_id}")
-        yield from self.http_client.get(url=url, data_type=list[BetaGroup])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[BetaGroup],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
 
     def set_beta_groups_on_build(self, build_id: str, beta_groups: list[BetaGroup]) -> None:
         """Set the Beta groups on a build.
@@ -5,15 +5,15 @@
 
 import logging
 import os
-import time
-from typing import Iterator, TypeGuard
+from typing import Any, Iterable, Iterator, Literal, TypeGuard, overload
 
-from asconnect.httpclient import HttpClient
+from asconnect.deadline import deadline_scope, sleep_within_deadline
+from asconnect.httpclient import MAX_PAGE_SIZE, HttpClient
 
 from asconnect.altool import upload, Platform
 from asconnect.models import App, Build, BuildBetaDetail
 from asconnect.sorting import BuildsSort
-from asconnect.utilities import update_query_parameters, next_or_none, write_key
+from asconnect.utilities import Fields, next_or_none, update_query_parameters, write_key
 
 
 def _has_issuer_id(issuer_id: str | None) -> TypeGuard[str]:
@@ -46,6 +46,8 @@ class BuildClient:
         self.http_client = http_client
         self.log = log.getChild("build")
 
+    # pylint:disable=too-many-arguments
+    @overload
     def get_builds(
         self,
         *,
@@ -54,7 +56,46 @@ class BuildClient:
         build_number: str | None = None,
         version: str | None = None,
         app_id: str | None = None,
-    ) -> Iterator[Build]:
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[Build]: ...
+
+    @overload
+    def get_builds(
+        self,
+        *,
+        url: str | None = None,
+        sort: BuildsSort | None = None,
+        build_number: str | None = None,
+        version: str | None = None,
+        app_id: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_builds(
+        self,
+        *,
+        url: str | None = None,
+        sort: BuildsSort | None = None,
+        build_number: str | None = None,
+        version: str | None = None,
+        app_id: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[Build | dict[str, Any]]:
         """Get all builds.
 
         :param url: The URL to use (will be generated if not supplied)
@@ -62,6 +103,12 @@ class BuildClient:
         :param build_number: Filter to just this build number
         :param version: Filter to just this version
         :param app_id: Filter to just this app
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param prefetch: The number of pages to fetch ahead while iterating (0 to disable)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["preReleaseVersion"]
 
         :returns: A list of builds
         """
@@ -87,12 +134,31 @@ class BuildClient:
 
         url = update_query_parameters(url, query_parameters)
 
-        yield from self.http_client.get(url=url, data_type=list[Build])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[Build],
+            page_size=page_size,
+            prefetch=prefetch,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
+
+    # pylint:enable=too-many-arguments
 
-    def get_build_from_identifier(self, identifier: str) -> Build | None:
+    def get_build_from_identifier(
+        self,
+        identifier: str,
+        *,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Build | None:
         """Get a build from its identifier
 
         :param identifier: The unique identifier for the build (_not_ the build number)
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["buildBetaDetail"]
 
         :returns: A build if found, None otherwise
         """
@@ -101,7 +167,9 @@ class BuildClient:
 
         url = self.http_client.generate_url(f"builds/{identifier}")
 
-        return next_or_none(self.http_client.get(url=url, data_type=Build))
+        return next_or_none(
+            self.http_client.get(url=url, data_type=Build, fields=fields, include=include)
+        )
 
     def get_from_build_number(self, bundle_id: str, build_number: str) -> Build | None:
         """Get a build from its build number.
@@ -114,14 +182,10 @@ class BuildClient:
 
         self.log.info(f"Getting build from build number {build_number} for bundle {bundle_id}")
 
-        for build in self.get_builds(build_number=build_number):
+        for build in self.get_builds(build_number=build_number, include=["app"]):
             self.log.debug(f"Checking build {build}")
 
-            # TODO use app id directly for this
-            assert build.relationships is not None
-            related_link = build.relationships["app"].links.related
-            assert related_link is not None
-            app = next_or_none(self.http_client.get(url=related_link, data_type=App))
+            app = self.http_client.get_related(resource=build, relationship="app", data_type=App)
 
             if not app:
                 break
@@ -132,51 +196,67 @@ class BuildClient:
         return None
 
     def wait_for_build_to_process(
-        self, bundle_id: str, build_number: str, wait_time: int = 30
+        self,
+        bundle_id: str,
+        build_number: str,
+        wait_time: int = 30,
+        *,
+        deadline: float | None = None,
     ) -> Build:
         """Wait for a build to finish processing.
 
         :param bundle_id: The ID of the app
         :param build_number: The build number for the build to wait for
         :param wait_time: The time to wait between checks for processing completion in seconds
+        :param deadline: The most seconds to wait in total, including every request (no limit if None)
+
+        :raises DeadlineExceededError: If the build hasn't finished processing before the deadline
 
         :returns: The build when finished processing
         """
         build = None
 
-        while True:
-            self.log.info("Waiting for build to appear...")
-            build = self.get_from_build_number(bundle_id, build_number)
-            if build is not None:
-                break
-            time.sleep(wait_time)
-
-        if build.attributes.processing_state != "PROCESSING":
-            return build
-
-        while True:
-            build = self.get_build_from_identifier(build.identifier)
-            assert build is not None
+        with deadline_scope(deadline):
+            while True:
+                self.log.info("Waiting for build to appear...")
+                build = self.get_from_build_number(bundle_id, build_number)
+                if build is not None:
+                    break
+                sleep_within_deadline(wait_time, f"waiting for build {build_number} to appear")
 
             if build.attributes.processing_state != "PROCESSING":
                 return build
 
-            self.log.info(
-                f"Build {build_number} has not finished processing. Will check again in {wait_time} seconds..."
-            )
-            time.sleep(wait_time)
+            while True:
+                build = self.get_build_from_identifier(build.identifier)
+                assert build is not None
+
+                if build.attributes.processing_state != "PROCESSING":
+                    return build
 
-    def get_beta_detail(self, build: Build) -> BuildBetaDetail | None:
+                self.log.info(
+                    f"Build {build_number} has not finished processing. Will check again in {wait_time} seconds..."
+                )
+                sleep_within_deadline(wait_time, f"waiting for build {build_number} to process")
+
+    def get_beta_detail(
+        self,
+        build: Build,
+        *,
+        fields: Fields | None = None,
+    ) -> BuildBetaDetail | None:
         """Get the build beta details.
 
         :param build: The build to get the beta details for
+        :param fields: The fields to return for each resource type (all of them if not set)
 
-        :returns: An iterator to the beta app localizations
+        :returns: The beta details (taken from the build if it was fetched with
+            `include=["buildBetaDetail"]`)
         """
         self.log.debug(f"Get beta detail for build {build}")
-        assert build.relationships is not None
-        url = build.relationships["buildBetaDetail"].links.related
-        return next_or_none(self.http_client.get(url=url, data_type=BuildBetaDetail))
+        return self.http_client.get_related(
+            resource=build, relationship="buildBetaDetail", data_type=BuildBetaDetail, fields=fields
+        )
 
     def upload(self, ipa_path: str, platform: Platform, max_attempts: int = 3) -> None:
         """Upload a build to App Store Connect.
@@ -0,0 +1,834 @@
+"""Caching of API responses between requests."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import abc
+import collections
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, Mapping, NamedTuple
+import urllib.parse
+
+from asconnect.utilities import DEFAULT_API_PATH, api_path_segments
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 300.0
+
+# How long to wait for another process to finish writing to a SQLite cache
+DEFAULT_BUSY_TIMEOUT_SECONDS = 30.0
+
+# How often a SQLite cache records that a response was read again, since
+# each record is a write
+DEFAULT_TOUCH_INTERVAL_SECONDS = 60.0
+
+
+def canonical_url(url: str) -> str:
+    """Get the canonical form of a URL, so that equivalent URLs share a cache entry.
+
+    The scheme and host are lower cased, the query parameters are sorted and
+    any fragment is dropped.
+
+    :param url: The URL
+
+    :returns: The canonical URL
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(
+        sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)), safe="[],"
+    )
+    return urllib.parse.urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, query, "")
+    )
+
+
+def cache_key(url: str, scope: str = "") -> str:
+    """Get the key a response is stored under.
+
+    :param url: The canonical URL of the request
+    :param scope: The credentials the response was fetched with (see `ResponseCache`)
+
+    :returns: The key
+    """
+    return f"{scope} {url}" if scope else url
+
+
+def _url_types(url: str, api_prefix: str) -> set[str]:
+    """Get the resource types and relationships named in the path of an API URL.
+
+    Names and IDs alternate in the path (`apps/123/builds`), except for
+    relationship URLs (`apps/123/relationships/builds`). The relationship
+    names are kept too, since they are usually the type they point at.
+
+    :param url: The URL
+    :param api_prefix: The path of the base URL, from `utilities.api_path`
+
+    :returns: The resource types and relationship names
+    """
+    segments = [
+        segment
+        for segment in api_path_segments(url, api_prefix) or []
+        if segment != "relationships"
+    ]
+    return set(segments[::2])
+
+
+def _linkage_types(resource: Mapping[str, Any]) -> set[str]:
+    """Get the types of the resources that a resource's relationships point at.
+
+    :param resource: The JSON of the resource
+
+    :returns: The resource types
+    """
+    types = set()
+
+    for relationship in (resource.get("relationships") or {}).values():
+        linkage = (relationship or {}).get("data")
+
+        if isinstance(linkage, dict):
+            linkage = [linkage]
+
+        for item in linkage or []:
+            if isinstance(item, dict) and item.get("type"):
+                types.add(item["type"])
+
+    return types
+
+
+def _resources(response_data: Mapping[str, Any]) -> list[Mapping[str, Any]]:
+    """Get every resource in a response, including the included ones.
+
+    :param response_data: The JSON of the response
+
+    :returns: The resources
+    """
+    data = response_data.get("data")
+
+    if isinstance(data, dict):
+        resources = [data]
+    else:
+        resources = list(data or [])
+
+    resources.extend(response_data.get("included") or [])
+
+    return [resource for resource in resources if isinstance(resource, dict)]
+
+
+def _single_resource(url: str, api_prefix: str) -> tuple[str, str] | None:
+    """Get the type and ID of the resource a URL fetches, if it fetches a single resource.
+
+    :param url: The canonical URL
+    :param api_prefix: The path of the base URL, from `utilities.api_path`
+
+    :returns: The type and ID of the resource, or None if the URL is for anything else
+    """
+    segments = api_path_segments(url, api_prefix)
+
+    if segments is None or len(segments) != 2 or urllib.parse.urlsplit(url).query:
+        return None
+
+    return segments[0], segments[1]
+
+
+def write_types(url: str, data: Any = None, *, api_prefix: str = DEFAULT_API_PATH) -> set[str]:
+    """Get the resource types which a write may have changed.
+
+    These are the types named in the URL, the type of the resource sent, and
+    the types of the resources it is related to (since their relationships
+    may have changed too).
+
+    :param url: The URL written to
+    :param data: The JSON sent (if any)
+    :param api_prefix: The path of the base URL, from `utilities.api_path`
+
+    :returns: The resource types
+    """
+    types = _url_types(url, api_prefix)
+
+    if isinstance(data, dict):
+        for resource in _resources(data):
+            if resource.get("type"):
+                types.add(resource["type"])
+            types |= _linkage_types(resource)
+
+    return types
+
+
+class _Prepared(NamedTuple):
+    """What a cache needs to store a response."""
+
+    key: str
+    types: set[str]
+    ttl: float
+    resources: dict[tuple[str, str, str], Mapping[str, Any]]
+
+
+class ResponseCache(abc.ABC):
+    """The base class of the caches that `HttpClient` can serve reads from.
+
+    Responses are stored by their canonical URL and the scope of the
+    credentials they were fetched with (the issuer and key IDs), so clients
+    with different keys sharing a cache never see each other's responses.
+    Each resource in a response is also indexed by its type and ID, so that
+    fetching a single resource which was seen in a listing is served from
+    the listing. Resources from sparse fieldsets are not indexed since they
+    are incomplete.
+
+    Entries expire after the TTL for the types of resource they contain (the
+    shortest one if there are several). Once the cache holds more than
+    `max_bytes` of responses, the least recently used are evicted.
+
+    Writes through the client invalidate every entry containing, or fetched
+    through, a type of resource that the write may have changed. This is
+    deliberately coarse, so that reads never see data from before the
+    client's own writes. Changes made by anybody else are only seen once the
+    entries expire.
+    """
+
+    max_bytes: int
+    default_ttl: float
+    ttls: dict[str, float]
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: float = DEFAULT_TTL_SECONDS,
+        ttls: Mapping[str, float] | None = None,
+    ) -> None:
+        """Create a new cache.
+
+        :param max_bytes: The maximum size of the cached responses in bytes
+        :param default_ttl: The number of seconds to keep a response for
+        :param ttls: The number of seconds to keep responses containing each type of resource
+                     for, e.g. {"apps": 3600}. Types not listed use `default_ttl`.
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Get the number of cached responses.
+
+        :returns: The number of cached responses
+        """
+
+    @property
+    @abc.abstractmethod
+    def size(self) -> int:
+        """Get the size of the cached responses.
+
+        :returns: The size of the cached responses in bytes
+        """
+
+    @abc.abstractmethod
+    def get(self, url: str, *, scope: str = "", api_prefix: str = DEFAULT_API_PATH) -> Any | None:
+        """Get the cached response for a URL.
+
+        A URL for a single resource without any query is also served from the
+        resource index.
+
+        :param url: The URL of the request
+        :param scope: The credentials the request is sent with, e.g. "<issuer ID>/<key ID>"
+        :param api_prefix: The path of the client's base URL, from `utilities.api_path`
+
+        :returns: The JSON of the response, or None if it isn't cached
+        """
+
+    @abc.abstractmethod
+    def put(
+        self,
+        url: str,
+        response_data: Any,
+        *,
+        size: int,
+        scope: str = "",
+        api_prefix: str = DEFAULT_API_PATH,
+    ) -> None:
+        """Cache the response for a URL.
+
+        :param url: The URL of the request
+        :param response_data: The JSON of the response
+        :param size: The size of the response in bytes
+        :param scope: The credentials the request was sent with, e.g. "<issuer ID>/<key ID>"
+        :param api_prefix: The path of the client's base URL, from `utilities.api_path`
+        """
+
+    @abc.abstractmethod
+    def invalidate(self, types: Iterable[str]) -> None:
+        """Remove every cached response containing, or fetched through, some types of resource.
+
+        :param types: The resource types, e.g. ["apps"]
+        """
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove every cached response."""
+
+    def invalidate_write(
+        self, url: str, data: Any = None, *, api_prefix: str = DEFAULT_API_PATH
+    ) -> None:
+        """Remove every cached response which a write may have changed.
+
+        :param url: The URL written to
+        :param data: The JSON sent (if any)
+        :param api_prefix: The path of the client's base URL, from `utilities.api_path`
+        """
+        self.invalidate(write_types(url, data, api_prefix=api_prefix))
+
+    def _prepare(
+        self, url: str, response_data: Any, size: int, *, scope: str, api_prefix: str
+    ) -> _Prepared | None:
+        """Work out how to store a response.
+
+        :param url: The URL of the request
+        :param response_data: The JSON of the response
+        :param size: The size of the response in bytes
+        :param scope: The credentials the request was sent with
+        :param api_prefix: The path of the base URL, from `utilities.api_path`
+
+        :returns: How to store the response, or None if it shouldn't be stored
+        """
+        if size > self.max_bytes or not isinstance(response_data, dict):
+            return None
+
+        url = canonical_url(url)
+        resources = _resources(response_data)
+        types = _url_types(url, api_prefix) | {
+            resource["type"] for resource in resources if resource.get("type")
+        }
+
+        ttl = min((self.ttls.get(name, self.default_ttl) for name in types), default=None)
+
+        if ttl is None:
+            ttl = self.default_ttl
+
+        if ttl <= 0:
+            return None
+
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+        indexed: dict[tuple[str, str, str], Mapping[str, Any]] = {}
+
+        if not any(name.startswith("fields[") for name in query):
+            indexed = {
+                (scope, resource["type"], resource["id"]): resource
+                for resource in resources
+                if resource.get("type") and resource.get("id")
+            }
+
+        return _Prepared(key=cache_key(url, scope), types=types, ttl=ttl, resources=indexed)
+
+
+class _Entry:
+    """A cached response."""
+
+    __slots__ = ("body", "size", "expires", "types", "resource_keys")
+
+    body: str
+    size: int
+    expires: float
+    types: set[str]
+    resource_keys: list[tuple[str, str, str]]
+
+    def __init__(
+        self,
+        *,
+        body: str,
+        size: int,
+        expires: float,
+        types: set[str],
+        resource_keys: list[tuple[str, str, str]],
+    ) -> None:
+        """Create a new entry.
+
+        :param body: The JSON of the response, serialized
+        :param size: The size of the response in bytes
+        :param expires: The clock time the entry expires at
+        :param types: The resource types the response contains or was fetched through
+        :param resource_keys: The scope, type and ID of the resources indexed from the response
+        """
+        self.body = body
+        self.size = size
+        self.expires = expires
+        self.types = types
+        self.resource_keys = resource_keys
+
+
+class MemoryCache(ResponseCache):
+    """A cache of API responses held in memory.
+
+    Responses are held serialized, like `SqliteCache` holds them, so each
+    read gets its own copy which the caller is free to modify.
+
+    This class is thread safe.
+    """
+
+    _entries: collections.OrderedDict[str, _Entry]
+    _resources: dict[tuple[str, str, str], str]
+    _size: int
+    _lock: threading.Lock
+    _clock: Callable[[], float]
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: float = DEFAULT_TTL_SECONDS,
+        ttls: Mapping[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a new cache.
+
+        :param max_bytes: The maximum size of the cached responses in bytes
+        :param default_ttl: The number of seconds to keep a response for
+        :param ttls: The number of seconds to keep responses containing each type of resource
+                     for, e.g. {"apps": 3600}. Types not listed use `default_ttl`.
+        :param clock: The monotonic clock to use
+        """
+        super().__init__(max_bytes=max_bytes, default_ttl=default_ttl, ttls=ttls)
+        self._entries = collections.OrderedDict()
+        self._resources = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def __len__(self) -> int:
+        """Get the number of cached responses.
+
+        :returns: The number of cached responses
+        """
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Get the size of the cached responses.
+
+        :returns: The size of the cached responses in bytes
+        """
+        with self._lock:
+            return self._size
+
+    def get(self, url: str, *, scope: str = "", api_prefix: str = DEFAULT_API_PATH) -> Any | None:
+        """Get the cached response for a URL.
+
+        :param url: The URL of the request
+        :param scope: The credentials the request is sent with, e.g. "<issuer ID>/<key ID>"
+        :param api_prefix: The path of the client's base URL, from `utilities.api_path`
+
+        :returns: The JSON of the response, or None if it isn't cached
+        """
+        url = canonical_url(url)
+        key = cache_key(url, scope)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                if entry.expires > self._clock():
+                    self._entries.move_to_end(key)
+                    return json.loads(entry.body)
+                self._remove(key)
+
+            resource_key = _single_resource(url, api_prefix)
+
+            if resource_key is None or (scope, *resource_key) not in self._resources:
+                return None
+
+            source = self._resources[(scope, *resource_key)]
+            source_entry = self._entries.get(source)
+
+            if source_entry is None or source_entry.expires <= self._clock():
+                return None
+
+            self._entries.move_to_end(source)
+            body = source_entry.body
+
+        for resource in _resources(json.loads(body)):
+            if (resource.get("type"), resource.get("id")) == resource_key:
+                return {"data": resource}
+
+        return None
+
+    def put(
+        self,
+        url: str,
+        response_data: Any,
+        *,
+        size: int,
+        scope: str = "",
+        api_prefix: str = DEFAULT_API_PATH,
+    ) -> None:
+        """Cache the response for a URL.
+
+        :param url: The URL of the request
+        :param response_data: The JSON of the response
+        :param size: The size of the response in bytes
+        :param scope: The credentials the request was sent with, e.g. "<issuer ID>/<key ID>"
+        :param api_prefix: The path of the client's base URL, from `utilities.api_path`
+        """
+        prepared = self._prepare(url, response_data, size, scope=scope, api_prefix=api_prefix)
+
+        if prepared is None:
+            return
+
+        body = json.dumps(response_data, separators=(",", ":"))
+
+        with self._lock:
+            if prepared.key in self._entries:
+                self._remove(prepared.key)
+
+            self._entries[prepared.key] = _Entry(
+                body=body,
+                size=size,
+                expires=self._clock() + prepared.ttl,
+                types=prepared.types,
+                resource_keys=list(prepared.resources),
+            )
+            self._size += size
+
+            for resource_key in prepared.resources:
+                self._resources[resource_key] = prepared.key
+
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, types: Iterable[str]) -> None:
+        """Remove every cached response containing, or fetched through, some types of resource.
+
+        :param types: The resource types, e.g. ["apps"]
+        """
+        types = set(types)
+
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.types & types]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._entries.clear()
+            self._resources.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry. The lock must be held.
+
+        :param key: The canonical URL of the entry
+        """
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+        for resource_key in entry.resource_keys:
+            if self._resources.get(resource_key) == key:
+                del self._resources[resource_key]
+
+
+# Bumped whenever the tables change. Databases with any other version are
+# emptied and recreated, since they only hold a cache.
+_SQLITE_SCHEMA_VERSION = 1
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE TABLE IF NOT EXISTS response_types (
+    type TEXT NOT NULL,
+    url TEXT NOT NULL REFERENCES responses (url) ON DELETE CASCADE,
+    PRIMARY KEY (type, url)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS response_types_url ON response_types (url);
+CREATE TABLE IF NOT EXISTS resources (
+    scope TEXT NOT NULL,
+    type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    url TEXT NOT NULL REFERENCES responses (url) ON DELETE CASCADE,
+    PRIMARY KEY (scope, type, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resources_url ON resources (url);
+"""
+
+
+class SqliteCache(ResponseCache):
+    """A cache of API responses kept in a SQLite database.
+
+    The cache survives the process, so consecutive runs (e.g. CI jobs on the
+    same runner) reuse each other's recent reads. Any number of processes
+    can share one database file. It is opened in WAL mode so that readers
+    don't block the writer, and each write is a single transaction which
+    waits up to `busy_timeout` seconds for other processes to finish theirs.
+
+    Since expiry is shared between processes, it is measured with the wall
+    clock.
+
+    Reads only take the write lock to record when a response was last used
+    if that was more than `touch_interval` seconds ago, so repeated reads
+    of the same responses don't queue up behind each other. Eviction is
+    least recently used to within that interval.
+
+    This class is thread safe.
+    """
+
+    path: str
+    touch_interval: float
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+    _clock: Callable[[], float]
+
+    # pylint:disable=too-many-arguments
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: float = DEFAULT_TTL_SECONDS,
+        ttls: Mapping[str, float] | None = None,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT_SECONDS,
+        touch_interval: float = DEFAULT_TOUCH_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Open (or create) a cache.
+
+        :param path: The path to the database file
+        :param max_bytes: The maximum size of the cached responses in bytes
+        :param default_ttl: The number of seconds to keep a response for
+        :param ttls: The number of seconds to keep responses containing each type of resource
+                     for, e.g. {"apps": 3600}. Types not listed use `default_ttl`.
+        :param busy_timeout: The number of seconds to wait for other processes to finish writing
+        :param touch_interval: The number of seconds between updates of when a response was last
+                               read
+        :param clock: The wall clock to use
+        """
+        super().__init__(max_bytes=max_bytes, default_ttl=default_ttl, ttls=ttls)
+        self.path = path
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._clock = clock
+
+        # Transactions are started explicitly, so that writes can take the
+        # write lock up front rather than deadlocking on an upgrade
+        self._connection = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+
+        with self._write() as cursor:
+            if cursor.execute("PRAGMA user_version").fetchone()[0] != _SQLITE_SCHEMA_VERSION:
+                for table in ("resources", "response_types", "responses"):
+                    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(f"PRAGMA user_version = {_SQLITE_SCHEMA_VERSION}")
+
+            for statement in _SQLITE_SCHEMA.split(";"):
+                if statement.strip():
+                    cursor.execute(statement)
+
+    # pylint:enable=too-many-arguments
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "SqliteCache":
+        """Enter the context manager.
+
+        :returns: This cache
+        """
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Exit the context manager, closing the database."""
+        self.close()
+
+    @contextlib.contextmanager
+    def _write(self) -> Iterator[sqlite3.Cursor]:
+        """Run a write transaction.
+
+        :returns: A context manager which yields a cursor inside the transaction
+        """
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+    def _read(self, sql: str, parameters: Iterable[Any] = ()) -> list[Any]:
+        """Run a query.
+
+        :param sql: The query
+        :param parameters: The parameters of the query
+
+        :returns: The rows
+        """
+        with self._lock:
+            return self._connection.execute(sql, tuple(parameters)).fetchall()
+
+    def __len__(self) -> int:
+        """Get the number of cached responses.
+
+        :returns: The number of cached responses
+        """
+        return self._read("SELECT COUNT(*) FROM responses")[0][0]
+
+    @property
+    def size(self) -> int:
+        """Get the size of the cached responses.
+
+        :returns: The size of the cached responses in bytes
+        """
+        return self._read("SELECT COALESCE(SUM(size), 0) FROM responses")[0][0]
+
+    def get(self, url: str, *, scope: str = "", api_prefix: str = DEFAULT_API_PATH) -> Any | None:
+        """Get the cached response for a URL.
+
+        :param url: The URL of the request
+        :param scope: The credentials the request is sent with, e.g. "<issuer ID>/<key ID>"
+        :param api_prefix: The path of the client's base URL, from `utilities.api_path`
+
+        :returns: The JSON of the response, or None if it isn't cached
+        """
+        url = canonical_url(url)
+        key = cache_key(url, scope)
+        now = self._clock()
+
+        rows = self._read(
+            "SELECT body, accessed FROM responses WHERE url = ? AND expires > ?", (key, now)
+        )
+        resource_key = _single_resource(url, api_prefix)
+
+        if rows:
+            body, accessed = rows[0]
+            self._touch(key, accessed, now)
+            return json.loads(body)
+
+        if resource_key is None:
+            return None
+
+        rows = self._read(
+            "SELECT responses.url, responses.body, responses.accessed FROM resources "
+            "JOIN responses ON responses.url = resources.url "
+            "WHERE resources.scope = ? AND resources.type = ? AND resources.id = ? "
+            "AND responses.expires > ?",
+            (scope, *resource_key, now),
+        )
+
+        if not rows:
+            return None
+
+        source, body, accessed = rows[0]
+
+        for resource in _resources(json.loads(body)):
+            if (resource.get("type"), resource.get("id")) == resource_key:
+                self._touch(source, accessed, now)
+                return {"data": resource}
+
+        return None
+
+    def _touch(self, key: str, accessed: float, now: float) -> None:
+        """Mark a response as recently used, unless it was marked recently enough already.
+
+        :param key: The key of the response
+        :param accessed: The clock time the response was last marked as used
+        :param now: The current clock time
+        """
+        if now - accessed < self.touch_interval:
+            return
+
+        with self._write() as cursor:
+            cursor.execute("UPDATE responses SET accessed = ? WHERE url = ?", (now, key))
+
+    def put(
+        self,
+        url: str,
+        response_data: Any,
+        *,
+        size: int,
+        scope: str = "",
+        api_prefix: str = DEFAULT_API_PATH,
+    ) -> None:
+        """Cache the response for a URL.
+
+        :param url: The URL of the request
+        :param response_data: The JSON of the response
+        :param size: The size of the response in bytes
+        :param scope: The credentials the request was sent with, e.g. "<issuer ID>/<key ID>"
+        :param api_prefix: The path of the client's base URL, from `utilities.api_path`
+        """
+        prepared = self._prepare(url, response_data, size, scope=scope, api_prefix=api_prefix)
+
+        if prepared is None:
+            return
+
+        body = json.dumps(response_data, separators=(",", ":"))
+        now = self._clock()
+
+        with self._write() as cursor:
+            cursor.execute(
+                "DELETE FROM responses WHERE url = ? OR expires <= ?", (prepared.key, now)
+            )
+            cursor.execute(
+                "INSERT INTO responses (url, body, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (prepared.key, body, size, now + prepared.ttl, now),
+            )
+            cursor.executemany(
+                "INSERT INTO response_types (type, url) VALUES (?, ?)",
+                [(name, prepared.key) for name in prepared.types],
+            )
+            cursor.executemany(
+                "INSERT OR REPLACE INTO resources (scope, type, id, url) VALUES (?, ?, ?, ?)",
+                [(*resource_key, prepared.key) for resource_key in prepared.resources],
+            )
+
+            total = cursor.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+            if total <= self.max_bytes:
+                return
+
+            evicted = []
+
+            for key, entry_size in cursor.execute(
+                "SELECT url, size FROM responses ORDER BY accessed"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                total -= entry_size
+
+            cursor.executemany("DELETE FROM responses WHERE url = ?", evicted)
+
+    def invalidate(self, types: Iterable[str]) -> None:
+        """Remove every cached response containing, or fetched through, some types of resource.
+
+        :param types: The resource types, e.g. ["apps"]
+        """
+        types = list(set(types))
+
+        if not types:
+            return
+
+        with self._write() as cursor:
+            cursor.execute(
+                "DELETE FROM responses WHERE url IN "
+                f"(SELECT url FROM response_types WHERE type IN ({', '.join('?' * len(types))}))",
+                types,
+            )
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._write() as cursor:
+            cursor.execute("DELETE FROM responses")
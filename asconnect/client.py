@@ -4,9 +4,24 @@
 # Licensed under the MIT license.
 
 import logging
+from typing import Any, Iterable
 
+import requests.adapters
 
-from asconnect.httpclient import HttpClient
+from asconnect.httpclient import (
+    DEFAULT_BASE_URL,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_CONNECTION_RETRIES,
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_READ_TIMEOUT,
+    HttpClient,
+)
+from asconnect.cache import ResponseCache
+from asconnect.credentials import ApiKey
+from asconnect.metrics import Observer
+from asconnect.rate_limiter import RateLimiter
+from asconnect.retry import RetryPolicy
 from asconnect.app_client import AppClient
 from asconnect.app_info_client import AppInfoClient
 from asconnect.beta_review_client import BetaReviewClient
@@ -20,7 +35,16 @@ from asconnect.version_client import VersionClient
 
 
 class Client:
-    """Wrapper class around the ASC API."""
+    """Wrapper class around the ASC API.
+
+    Every sub-client shares the same `HttpClient`, and with it the same pool of
+    keep-alive connections. Call `close()` (or use the client as a context
+    manager) when finished with it.
+
+    One client can be shared by any number of threads (see `HttpClient` for
+    the details). Set `pool_maxsize` to at least the number of threads so
+    that they don't queue for connections.
+    """
 
     log: logging.Logger
     http_client: HttpClient
@@ -34,6 +58,7 @@ class Client:
     users: UsersClient
     version: VersionClient
 
+    # pylint:disable=too-many-arguments,too-many-locals
     def __init__(
         self,
         *,
@@ -41,6 +66,20 @@ class Client:
         key_contents: str,
         issuer_id: str | None = None,
         log: logging.Logger | None = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        connection_retries: int = DEFAULT_CONNECTION_RETRIES,
+        keep_alive: bool = True,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        cache: ResponseCache | None = None,
+        additional_keys: Iterable[ApiKey] = (),
+        coalesce_requests: bool = True,
+        observers: Iterable[Observer] = (),
+        transport: requests.adapters.BaseAdapter | None = None,
+        base_url: str = DEFAULT_BASE_URL,
+        connect_timeout: float | None = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float | None = DEFAULT_READ_TIMEOUT,
     ) -> None:
         """Construct a new client object.
 
@@ -48,6 +87,21 @@ class Client:
         :param key_contents: The contents of your key
         :param issuer_id: The issuer ID for team keys. Omit for individual keys (can be found in app store connect)
         :param log: Any base logger to be used (one will be created if not supplied)
+        :param pool_connections: The number of per-host connection pools to cache
+        :param pool_maxsize: The maximum number of connections to keep open to a single host
+        :param connection_retries: The number of times to retry establishing a connection
+        :param keep_alive: Set to False to close the connection after every request
+        :param rate_limiter: The rate limiter to pace requests with. Share one between clients
+                             using the same key (one will be created if not supplied)
+        :param retry_policy: The policy for retrying failed requests (the default policy is used if not supplied)
+        :param cache: The cache to serve repeated reads from (nothing is cached if not supplied)
+        :param additional_keys: Further keys to spread requests across, to scale beyond the quota of one key
+        :param coalesce_requests: Set to False to send every GET, even when an identical one is in flight
+        :param observers: Functions to call with the metrics of each request, e.g. a `MetricsAggregator`
+        :param transport: The adapter to send requests with, e.g. a `RecordingAdapter` or `ReplayAdapter`
+        :param base_url: The base URL of the API, e.g. the `url` of an `asconnect.stub_server.StubServer`
+        :param connect_timeout: The longest to wait for a connection, in seconds (None for no limit)
+        :param read_timeout: The longest to wait for the server to send data, in seconds (None for no limit)
         """
 
         if log is None:
@@ -56,7 +110,24 @@ class Client:
             self.log = log.getChild("asconnect")
 
         self.http_client = HttpClient(
-            key_id=key_id, key_contents=key_contents, issuer_id=issuer_id, log=self.log
+            key_id=key_id,
+            key_contents=key_contents,
+            issuer_id=issuer_id,
+            log=self.log,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            connection_retries=connection_retries,
+            keep_alive=keep_alive,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            cache=cache,
+            additional_keys=additional_keys,
+            coalesce_requests=coalesce_requests,
+            observers=observers,
+            transport=transport,
+            base_url=base_url,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
         )
 
         self.app = AppClient(http_client=self.http_client, log=self.log)
@@ -67,3 +138,20 @@ class Client:
         self.screenshots = ScreenshotClient(http_client=self.http_client, log=self.log)
         self.users = UsersClient(http_client=self.http_client, log=self.log)
         self.version = VersionClient(http_client=self.http_client, log=self.log)
+
+    # pylint:enable=too-many-arguments,too-many-locals
+
+    def close(self) -> None:
+        """Close any pooled connections held by the client."""
+        self.http_client.close()
+
+    def __enter__(self) -> "Client":
+        """Enter the context manager.
+
+        :returns: This client
+        """
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Exit the context manager, closing any pooled connections."""
+        self.close()
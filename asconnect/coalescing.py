@@ -0,0 +1,121 @@
+"""Sharing the results of identical calls made at the same time."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import threading
+from typing import Any, Callable, Hashable
+
+from asconnect.deadline import check_deadline, wait_for
+from asconnect.exceptions import DeadlineExceededError
+
+
+class _Call:
+    """A call which is in flight."""
+
+    __slots__ = ("done", "result", "error")
+
+    done: threading.Event
+    result: Any
+    error: BaseException | None
+
+    def __init__(self) -> None:
+        """Create a new call."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """Make a new exception like one a shared call raised, for a waiter to raise.
+
+    The copy has the same type, arguments and attributes, so it can be handled
+    like the original. Its constructor isn't run again, since it may not take
+    the arguments it passed to its base class.
+
+    :param error: The exception the call raised
+
+    :returns: The copy
+    """
+    copied = type(error).__new__(type(error), *error.args)
+    copied.args = error.args
+    copied.__dict__.update(vars(error))
+
+    # These are slots rather than attributes in the dictionary, and are only set
+    # on OSErrors constructed with them
+    for name in ("errno", "strerror", "filename", "filename2"):
+        if isinstance(error, OSError) and getattr(error, name) is not None:
+            setattr(copied, name, getattr(error, name))
+
+    return copied
+
+
+class SingleFlight:
+    """Shares the result of a call between everyone who makes it while it is in flight.
+
+    The first caller for a key makes the call. Anyone else asking for the same
+    key before it finishes waits for it and gets the same result. If the call
+    fails, each of them raises its own copy of the exception, chained from the
+    one the call raised, so that they don't share a traceback. Once the call has finished, the next caller makes it again, so
+    nothing is cached.
+
+    The one exception is a call which ran out of the leader's time: each
+    caller can have its own deadline, so anyone else with time left makes
+    the call again rather than failing with it.
+
+    This class is thread safe.
+    """
+
+    _calls: dict[Hashable, _Call]
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        """Create a new group of calls."""
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def call(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """Make a call, or wait for the identical one already in flight.
+
+        :param key: Identifies the call. Calls with equal keys must be interchangeable.
+        :param function: Makes the call
+
+        :raises BaseException: Whatever the call raised (or a copy of it), or `DeadlineExceededError` if the
+                               current deadline passes while waiting for another caller's call
+
+        :returns: The result of the call
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+
+                if call is None:
+                    call = _Call()
+                    self._calls[key] = call
+
+            if leader:
+                break
+
+            wait_for(call.done, "waiting for an identical request in flight")
+
+            if isinstance(call.error, DeadlineExceededError):
+                check_deadline("waiting for an identical request in flight")
+                continue
+
+            if call.error is not None:
+                raise _copy_error(call.error) from call.error
+
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
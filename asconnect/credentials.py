@@ -0,0 +1,441 @@
+"""Signing keys for the API and the tokens signed with them."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import datetime
+import logging
+import threading
+from typing import Callable, Iterable, NamedTuple
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+import jwt
+
+NEW_TOKEN_AGE_IN_MINUTES = 15
+MINIMUM_TOKEN_AGE = 5
+
+# How long before a token becomes too old to use that a new one is signed in
+# the background
+REFRESH_AHEAD_MINUTES = 3
+
+
+class ApiKey(NamedTuple):
+    """The details of an API key."""
+
+    key_id: str
+    key_contents: str
+    issuer_id: str | None = None
+
+
+def _utc_now() -> datetime.datetime:
+    """Get the current time.
+
+    :returns: The current time in UTC
+    """
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class Credentials:
+    """An API key and the token signed with it.
+
+    The private key is parsed once, the first time a token is needed, and
+    the token is reused until it is close to expiring. Apple state that
+    performance is improved by reusing a token instead of generating a new
+    one each time.
+
+    Once a token is getting old, a new one is signed on a background thread
+    while the old one is still handed out, so requests don't wait on the
+    signing. If a token is needed and there is no usable one, only one
+    thread signs it and any others wait for that one.
+
+    Changing any part of the key discards the parsed key and the token.
+
+    `verified` is set once the API has accepted a token for the key, and
+    `disabled` once it has rejected the key for good (e.g. it was revoked).
+
+    This class is thread safe.
+    """
+
+    _key_id: str
+    _key_contents: str
+    _issuer_id: str | None
+    _private_key: ec.EllipticCurvePrivateKey | None
+    _token_info: tuple[str, datetime.datetime] | None
+    _generation: int
+    _refreshing: bool
+    _lock: threading.Lock
+    _sign_lock: threading.Lock
+    _clock: Callable[[], datetime.datetime]
+    _suspect_token: bool
+    verified: bool
+    disabled: bool
+    log: logging.Logger
+
+    def __init__(
+        self,
+        *,
+        key_id: str,
+        key_contents: str,
+        issuer_id: str | None = None,
+        log: logging.Logger,
+        clock: Callable[[], datetime.datetime] = _utc_now,
+    ) -> None:
+        """Create new credentials.
+
+        :param key_id: The ID of your key (can be found in app store connect)
+        :param key_contents: The contents of your key
+        :param issuer_id: The issuer ID for team keys. Omit for individual keys (can be found in app store connect)
+        :param log: The logger to use
+        :param clock: The function to get the current time (in UTC) with
+        """
+        self._key_id = key_id
+        self._key_contents = key_contents
+        self._issuer_id = issuer_id
+        self._private_key = None
+        self._token_info = None
+        self._generation = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._sign_lock = threading.Lock()
+        self._clock = clock
+        self._suspect_token = False
+        self.verified = False
+        self.disabled = False
+        self.log = log
+
+    def _reset(self) -> None:
+        """Discard the parsed key and the token. The lock must be held."""
+        self._private_key = None
+        self._token_info = None
+        self._generation += 1
+        self._suspect_token = False
+        self.verified = False
+        self.disabled = False
+
+    def mark_verified(self) -> None:
+        """Record that the API accepted a token for the key."""
+        with self._lock:
+            self.verified = True
+            self._suspect_token = False
+
+    def report_unauthorized(self) -> bool:
+        """Record that the API rejected a token for the key.
+
+        If the key has worked before, the token is assumed to have gone stale
+        the first time and is discarded. Otherwise (or if a new token is
+        rejected too) the key is disabled.
+
+        :returns: True if a request should be retried with a new token, False if the key is disabled
+        """
+        with self._lock:
+            if self.verified and not self._suspect_token:
+                self._suspect_token = True
+                self._token_info = None
+                return True
+
+            self.disabled = True
+            return False
+
+    @property
+    def key_contents(self) -> str:
+        """Get key contents.
+
+        :returns: Key contents
+        """
+        return self._key_contents
+
+    @key_contents.setter
+    def key_contents(self, value: str) -> None:
+        """Set key contents.
+
+        :param value: The new value to set to
+        """
+        with self._lock:
+            self._key_contents = value
+            self._reset()
+
+    @property
+    def key_id(self) -> str:
+        """Get key ID.
+
+        :returns: Key ID
+        """
+        return self._key_id
+
+    @key_id.setter
+    def key_id(self, value: str) -> None:
+        """Set key ID.
+
+        :param value: The new value to set to
+        """
+        with self._lock:
+            self._key_id = value
+            self._reset()
+
+    @property
+    def issuer_id(self) -> str | None:
+        """Get issuer ID.
+
+        :returns: Issuer ID
+        """
+        return self._issuer_id
+
+    @issuer_id.setter
+    def issuer_id(self, value: str | None) -> None:
+        """Set issuer ID.
+
+        :param value: The new value to set to
+        """
+        with self._lock:
+            self._issuer_id = value
+            self._reset()
+
+    @property
+    def is_individual_key(self) -> bool:
+        """Check if this is an individual API key.
+
+        :returns: True if using an individual key, False if using a team key
+        """
+        return self._issuer_id is None
+
+    def token(self) -> str:
+        """Get a token to authenticate a request with.
+
+        :returns: The JWT token as a string
+        """
+        with self._lock:
+            token = self._usable_token()
+
+            if token is not None:
+                return token
+
+        with self._sign_lock:
+            # Another thread may have signed a token while this one waited
+            with self._lock:
+                token = self._usable_token()
+
+                if token is not None:
+                    return token
+
+                generation = self._generation
+
+            token, _ = self._sign(generation)
+            return token
+
+    def invalidate_token(self) -> None:
+        """Discard the current token, so that the next request signs a new one."""
+        with self._lock:
+            self._token_info = None
+
+    def _usable_token(self) -> str | None:
+        """Get the current token if it can still be used. The lock must be held.
+
+        If the token is getting old, a new one is signed in the background.
+
+        :returns: The token, or None if there isn't one which can be used
+        """
+        if self._token_info is None:
+            return None
+
+        token, expiration = self._token_info
+        remaining = expiration - self._clock()
+
+        if remaining <= datetime.timedelta(minutes=MINIMUM_TOKEN_AGE):
+            self._token_info = None
+            return None
+
+        refresh_at = datetime.timedelta(minutes=MINIMUM_TOKEN_AGE + REFRESH_AHEAD_MINUTES)
+
+        if remaining <= refresh_at and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(
+                target=self._refresh,
+                args=(self._generation,),
+                name="asconnect-token-refresh",
+                daemon=True,
+            ).start()
+
+        return token
+
+    def _refresh(self, generation: int) -> None:
+        """Sign a new token ahead of the current one getting too old.
+
+        :param generation: The generation of the key when the refresh was started
+        """
+        try:
+            with self._sign_lock:
+                self._sign(generation)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            # The next request will sign a token itself and raise the error
+            self.log.warning(f"Failed to refresh the token in the background: {ex}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _sign(self, generation: int) -> tuple[str, datetime.datetime]:
+        """Sign a new token. The signing lock must be held.
+
+        The token is only stored if the key hasn't changed since `generation`.
+
+        :param generation: The generation of the key to sign with
+
+        :raises ValueError: If the key isn't an elliptic curve private key in PEM format
+
+        :returns: The token and its expiration time
+        """
+        with self._lock:
+            if self._private_key is None:
+                private_key = serialization.load_pem_private_key(
+                    self._key_contents.encode("utf-8"), password=None
+                )
+
+                if not isinstance(private_key, ec.EllipticCurvePrivateKey):
+                    raise ValueError("The key must be an elliptic curve (ES256) private key")
+
+                self._private_key = private_key
+
+            private_key = self._private_key
+            key_id = self._key_id
+            issuer_id = self._issuer_id
+
+        # Tokens more than 20 minutes in the future are invalid, so our new one is less than that
+        now = self._clock()
+        expiration = now + datetime.timedelta(minutes=NEW_TOKEN_AGE_IN_MINUTES)
+
+        # Details at https://developer.apple.com/documentation/appstoreconnectapi/generating_tokens_for_api_requests
+        # Team keys use "iss" claim with issuer_id
+        # Individual keys use "sub" claim with subject (always "user")
+        payload = {
+            "iat": int(now.timestamp()),
+            "exp": int(expiration.timestamp()),
+            "aud": "appstoreconnect-v1",
+        }
+
+        if issuer_id is None:
+            # Individual key - sub is always "user" per Apple's documentation
+            payload["sub"] = "user"
+        else:
+            # Team key
+            payload["iss"] = issuer_id
+
+        token = jwt.encode(
+            payload,
+            private_key,
+            algorithm="ES256",
+            headers={"kid": key_id, "typ": "JWT"},
+        )
+
+        self.log.debug(f"Generated new token. Expiration: {expiration}")
+
+        with self._lock:
+            if self._generation == generation:
+                self._token_info = (token, expiration)
+
+        return token, expiration
+
+
+class CredentialPool:
+    """Spreads requests across several API keys.
+
+    Each request goes out with the key that has the most of its hourly
+    quota remaining (keys which haven't been used yet come first), so that
+    the throughput scales with the number of keys. Each key keeps its own
+    token.
+
+    Keys which the API rejects for good are skipped until they are changed.
+    If every key has been rejected, they are all used again so that the API
+    reports the error.
+
+    This class is thread safe.
+    """
+
+    credentials: list[Credentials]
+    _remaining: Callable[[str], int | None]
+    _next: int
+    _lock: threading.Lock
+    log: logging.Logger
+
+    def __init__(
+        self,
+        credentials: Iterable[Credentials],
+        *,
+        remaining: Callable[[str], int | None],
+        log: logging.Logger,
+    ) -> None:
+        """Create a new pool.
+
+        :param credentials: The credentials for each key
+        :param remaining: Gets the remaining quota for a key ID (None if it isn't known)
+        :param log: The logger to use
+
+        :raises ValueError: If there are no credentials
+        """
+        self.credentials = list(credentials)
+
+        if not self.credentials:
+            raise ValueError("At least one key is required")
+
+        self._remaining = remaining
+        self._next = 0
+        self._lock = threading.Lock()
+        self.log = log
+
+    def __len__(self) -> int:
+        """Get the number of keys in the pool.
+
+        :returns: The number of keys
+        """
+        return len(self.credentials)
+
+    def choose(self) -> Credentials:
+        """Choose the key to send the next request with.
+
+        Ties are broken in turn, so keys with the same remaining quota are
+        used evenly.
+
+        :returns: The credentials for the key
+        """
+        if len(self.credentials) == 1:
+            return self.credentials[0]
+
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.credentials)
+
+        candidates = [credentials for credentials in self.credentials if not credentials.disabled]
+
+        if not candidates:
+            candidates = self.credentials
+
+        best = None
+        best_remaining = -1.0
+
+        for offset in range(len(candidates)):
+            credentials = candidates[(start + offset) % len(candidates)]
+            remaining = self._remaining(credentials.key_id)
+            score = float("inf") if remaining is None else float(remaining)
+
+            if best is None or score > best_remaining:
+                best = credentials
+                best_remaining = score
+
+        assert best is not None
+        return best
+
+    def report_unauthorized(self, credentials: Credentials) -> bool:
+        """Record that the API rejected a token, and decide whether to try again.
+
+        :param credentials: The credentials the token was signed with
+
+        :returns: True if the request should be retried, with a new token or another key
+        """
+        if credentials.report_unauthorized():
+            self.log.info(f"Token for key {credentials.key_id} was rejected. Using a new token.")
+            return True
+
+        if any(not other.disabled for other in self.credentials):
+            self.log.warning(f"Key {credentials.key_id} was rejected. Failing over to another key.")
+            return True
+
+        return False
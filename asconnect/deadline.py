@@ -0,0 +1,206 @@
+"""Time budgets for operations, which every request made on their behalf respects."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Callable, Iterator
+
+from asconnect.exceptions import DeadlineExceededError
+
+
+class Deadline:
+    """A point in time by which an operation must have finished."""
+
+    __slots__ = ("budget", "expires_at", "_clock")
+
+    budget: float
+    expires_at: float
+    _clock: Callable[[], float]
+
+    def __init__(self, budget: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        """Create a new deadline, starting now.
+
+        :param budget: The number of seconds the operation has
+        :param clock: The monotonic clock to use
+        """
+        self.budget = budget
+        self.expires_at = clock() + budget
+        self._clock = clock
+
+    def remaining(self) -> float:
+        """Get the time left.
+
+        :returns: The number of seconds until the deadline, or 0 if it has passed
+        """
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        """Check if the deadline has passed.
+
+        :returns: True if there is no time left, False otherwise
+        """
+        return self.remaining() <= 0
+
+    def __repr__(self) -> str:
+        """Get a description of the deadline.
+
+        :returns: The budget and the time left
+        """
+        return f"Deadline(budget={self.budget:g}s, remaining={self.remaining():.2f}s)"
+
+
+_current: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar(
+    "asconnect_deadline", default=None
+)
+
+
+def current_deadline() -> Deadline | None:
+    """Get the deadline of the operation being run.
+
+    :returns: The deadline, or None if there isn't one
+    """
+    return _current.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(
+    budget: float | None, *, clock: Callable[[], float] = time.monotonic
+) -> Iterator[Deadline | None]:
+    """Give the requests made in a block a total time budget.
+
+    Every request, retry and wait made in the block (including on worker
+    threads started from it) is cut short or refused once the budget runs
+    out, raising `DeadlineExceededError`. A budget inside another can only
+    shorten it, never extend it.
+
+    :param budget: The number of seconds the block has. If None, the block
+                   keeps the budget of any enclosing block.
+    :param clock: The monotonic clock to use
+
+    :returns: The deadline which applies in the block (if any)
+    """
+    current = _current.get()
+
+    if budget is None:
+        yield current
+        return
+
+    deadline = Deadline(budget, clock=clock)
+
+    if current is not None and current.expires_at <= deadline.expires_at:
+        yield current
+        return
+
+    token = _current.set(deadline)
+
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def remaining_time() -> float | None:
+    """Get the time left before the current deadline.
+
+    :returns: The number of seconds left, or None if there is no deadline
+    """
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def check_deadline(operation: str) -> None:
+    """Make sure there is time left before starting something.
+
+    :param operation: What is about to start, for the error, e.g. "before GET <url>"
+
+    :raises DeadlineExceededError: If the current deadline has passed
+    """
+    deadline = _current.get()
+
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceededError(operation, deadline.budget)
+
+
+def ensure_time_for(seconds: float, operation: str) -> None:
+    """Make sure a wait would end before the current deadline.
+
+    Waiting until after the deadline could only end in failure, so callers
+    fail straight away instead.
+
+    :param seconds: The number of seconds the caller wants to wait
+    :param operation: What the wait is for, for the error, e.g. "by waiting 4.0s to retry"
+
+    :raises DeadlineExceededError: If waiting would run past the current deadline
+    """
+    deadline = _current.get()
+
+    if deadline is not None and seconds >= deadline.remaining():
+        raise DeadlineExceededError(operation, deadline.budget)
+
+
+def sleep_within_deadline(seconds: float, operation: str) -> None:
+    """Wait, unless that would run past the current deadline.
+
+    :param seconds: The number of seconds to wait
+    :param operation: What the wait is for, for the error
+
+    :raises DeadlineExceededError: If waiting would run past the current deadline
+    """
+    ensure_time_for(seconds, operation)
+    time.sleep(seconds)
+
+
+def wait_for(event: threading.Event, operation: str) -> None:
+    """Wait for an event, for no longer than the time left.
+
+    :param event: The event to wait for
+    :param operation: What the wait is for, for the error
+
+    :raises DeadlineExceededError: If the deadline passes before the event is set
+    """
+    deadline = _current.get()
+
+    if deadline is None:
+        event.wait()
+        return
+
+    if not event.wait(deadline.remaining()):
+        raise DeadlineExceededError(operation, deadline.budget)
+
+
+def request_timeout(
+    connect_timeout: float | None,
+    read_timeout: float | None,
+    operation: str = "before sending a request",
+) -> tuple[float | None, float | None]:
+    """Get the timeouts for a single request, cut short to fit the current deadline.
+
+    :param connect_timeout: The longest to wait for a connection, in seconds (no limit if None)
+    :param read_timeout: The longest to wait for each read from the server, in seconds (no limit if None)
+    :param operation: What the request is, for the error, e.g. "before GET <url>"
+
+    :raises DeadlineExceededError: If the current deadline has passed, which would leave no time for the request
+
+    :returns: The connect and read timeouts to send the request with
+    """
+    deadline = _current.get()
+
+    if deadline is None:
+        return connect_timeout, read_timeout
+
+    # The deadline can pass after it was last checked, and a timeout of zero
+    # or less would be rejected by urllib3 with a confusing error
+    remaining = deadline.remaining()
+
+    if remaining <= 0:
+        raise DeadlineExceededError(operation, deadline.budget)
+
+    return (
+        remaining if connect_timeout is None else min(connect_timeout, remaining),
+        remaining if read_timeout is None else min(read_timeout, remaining),
+    )
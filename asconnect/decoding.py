@@ -0,0 +1,681 @@
+"""Fast decoding of API responses into the model classes.
+
+`deserialize.deserialize` works out how to decode a class from its type hints
+and decorators every time it sees an object. Pages of hundreds of resources
+repeat that work for every item, so instead a decoder is compiled once per
+type and cached. The compiled decoders follow the same rules as `deserialize`
+for the features the models use (key mapping, `auto_snake`, parsers,
+defaults, ignored fields, optional fields and enums). Anything else falls back
+to `deserialize` itself, which decodes everything up front and can't leave
+fields out, so partial decoding isn't available for those types.
+
+Lazy decoders go further for callers which only read a few fields: they wrap
+the data without decoding anything, and each field is decoded the first time
+it is accessed.
+
+Partial decoders are for sparse fieldsets, where the API leaves out every
+field that wasn't asked for: missing fields are set to None instead of
+raising.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import enum
+import threading
+import types
+import typing
+from typing import Any, Callable, NamedTuple
+
+import deserialize
+from deserialize.conversions import camel_case, pascal_case
+
+Decoder = Callable[[Any], Any]
+
+
+class _Mode(NamedTuple):
+    """How to decode: lazily (each field on first access) and/or partially (missing fields are None)."""
+
+    lazy: bool
+    partial: bool
+
+
+_decoders: dict[tuple[Any, _Mode], Decoder] = {}
+_decoders_lock = threading.Lock()
+
+# The decoders being compiled by each thread, which are only added to
+# `_decoders` once they (and any forwarding decoders they use) are complete
+_compiling = threading.local()
+
+
+class _UnsupportedType(Exception):
+    """Raised when a type can't be compiled, so `deserialize` must be used."""
+
+
+def _identity(value: Any) -> Any:
+    """Return the value unchanged.
+
+    :param value: The value
+
+    :returns: The same value
+    """
+    return value
+
+
+def _type_name(data_type: Any) -> str:
+    """Get a readable name for a type.
+
+    :param data_type: The type
+
+    :returns: The name of the type
+    """
+    return getattr(data_type, "__name__", str(data_type))
+
+
+def _compile_none() -> Decoder:
+    """Compile a decoder that only accepts None.
+
+    :returns: The decoder
+    """
+
+    def decode_none(data: Any) -> Any:
+        """Decode a None value.
+
+        :param data: The value to decode
+
+        :raises DeserializeException: If the value is not None
+
+        :returns: None
+        """
+        if data is not None:
+            raise deserialize.DeserializeException(f"Cannot deserialize '{type(data)}' to None")
+        return data
+
+    return decode_none
+
+
+def _compile_union(data_type: Any, mode: _Mode) -> Decoder:
+    """Compile a decoder for a union, trying each member in turn.
+
+    :param data_type: The union type
+    :param mode: How to decode models
+
+    :returns: The decoder
+    """
+    members = typing.get_args(data_type)
+    optional = type(None) in members and Any not in members
+    member_decoders = [
+        _compile_decoder(member, mode) for member in members if member is not type(None)
+    ]
+
+    def decode_union(data: Any) -> Any:
+        """Decode a value to the first union member that accepts it.
+
+        :param data: The value to decode
+
+        :raises DeserializeException: If no member accepts the value
+
+        :returns: The decoded value
+        """
+        if data is None and optional:
+            return None
+
+        errors = []
+
+        for member_decoder in member_decoders:
+            try:
+                return member_decoder(data)
+            except deserialize.DeserializeException as ex:
+                errors.append(str(ex))
+
+        raise deserialize.DeserializeException(
+            f"Cannot deserialize '{type(data)}' to '{data_type}': {'; '.join(errors)}"
+        )
+
+    return decode_union
+
+
+def _compile_enum(data_type: type[enum.Enum]) -> Decoder:
+    """Compile a decoder for an enum.
+
+    :param data_type: The enum type
+
+    :returns: The decoder
+    """
+
+    def decode_enum(data: Any) -> Any:
+        """Decode an enum value.
+
+        :param data: The value to decode
+
+        :raises DeserializeException: If the value isn't a member of the enum
+
+        :returns: The enum member
+        """
+        try:
+            return data_type(data)
+        except ValueError as ex:
+            raise deserialize.DeserializeException(
+                f"Cannot deserialize '{data}' to '{data_type}'"
+            ) from ex
+
+    return decode_enum
+
+
+def _compile_list(data_type: Any, mode: _Mode) -> Decoder:
+    """Compile a decoder for a list.
+
+    :param data_type: The list type
+    :param mode: How to decode models
+
+    :returns: The decoder
+    """
+    arguments = typing.get_args(data_type)
+    item_decoder = _compile_decoder(arguments[0], mode) if arguments else _identity
+
+    def decode_list(data: Any) -> list[Any]:
+        """Decode a list.
+
+        :param data: The value to decode
+
+        :raises DeserializeException: If the value isn't a list
+
+        :returns: The decoded list
+        """
+        if not isinstance(data, list):
+            raise deserialize.DeserializeException(
+                f"Cannot deserialize '{type(data)}' as a list for '{data_type}'"
+            )
+        return [item_decoder(item) for item in data]
+
+    return decode_list
+
+
+def _compile_dict(data_type: Any, mode: _Mode) -> Decoder:
+    """Compile a decoder for a dictionary.
+
+    :param data_type: The dictionary type
+    :param mode: How to decode models
+
+    :returns: The decoder
+    """
+    arguments = typing.get_args(data_type)
+
+    key_type: Any = Any
+    value_decoder: Decoder = _identity
+
+    if arguments:
+        key_type = arguments[0]
+        value_decoder = _compile_decoder(arguments[1], mode)
+
+    def decode_dict(data: Any) -> dict[Any, Any]:
+        """Decode a dictionary.
+
+        :param data: The value to decode
+
+        :raises DeserializeException: If the value isn't a dictionary with the right key types
+
+        :returns: The decoded dictionary
+        """
+        if not isinstance(data, dict):
+            raise deserialize.DeserializeException(
+                f"Cannot deserialize '{type(data)}' as a dict for '{data_type}'"
+            )
+
+        if key_type is not Any:
+            for key in data:
+                if not isinstance(key, key_type):
+                    raise deserialize.DeserializeException(
+                        f"Could not deserialize key {key} to type {key_type}"
+                    )
+
+        return {key: value_decoder(value) for key, value in data.items()}
+
+    return decode_dict
+
+
+def _compile_instance_check(data_type: type) -> Decoder:
+    """Compile a decoder for a plain type (e.g. str or datetime) which is used as is.
+
+    :param data_type: The type
+
+    :returns: The decoder
+    """
+
+    def decode_instance(data: Any) -> Any:
+        """Check a value is already of the right type.
+
+        :param data: The value to decode
+
+        :raises DeserializeException: If the value is of the wrong type
+
+        :returns: The value
+        """
+        if isinstance(data, data_type):
+            return data
+        raise deserialize.DeserializeException(
+            f"Cannot deserialize '{type(data)}' to '{_type_name(data_type)}'"
+        )
+
+    return decode_instance
+
+
+# What to do when a field is missing from the data
+_MISSING_RAISES = 0
+_MISSING_IS_NONE = 1
+_MISSING_USES_DEFAULT = 2
+_MISSING_OMITTED = 3
+
+# name, keys, parser, decoder, missing behaviour, default
+_Field = tuple[str, tuple[str, ...], Callable[[Any], Any] | None, Decoder, int, Any]
+
+
+def _compile_field(data_type: type, name: str, hint: Any, mode: _Mode) -> _Field | None:
+    """Work out how to fill in an attribute, following the rules `deserialize` uses.
+
+    :param data_type: The model class
+    :param name: The name of the attribute
+    :param hint: The type hint of the attribute
+    :param mode: How to decode models
+
+    :raises _UnsupportedType: If the attribute uses a feature we don't compile
+
+    :returns: The field, or None if the attribute is skipped
+    """
+    if getattr(data_type, "__deserialize_ignore_map__", {}).get(name, False):
+        return None
+
+    if typing.get_origin(hint) is typing.ClassVar:
+        raise _UnsupportedType(f"{_type_name(data_type)}.{name} is a ClassVar")
+
+    auto_snake = getattr(data_type, "__deserialize_auto_snake__", False)
+
+    if auto_snake and name.lower() != name:
+        raise _UnsupportedType(f"{_type_name(data_type)}.{name} is not snake cased")
+
+    key = getattr(data_type, "__deserialize_key_map__", {}).get(name, name)
+    keys = (key, camel_case(key), pascal_case(key)) if auto_snake else (key,)
+    parser = getattr(data_type, "__deserialize_parser_map__", {}).get(key)
+    defaults = getattr(data_type, "__deserialize_defaults_map__", {})
+
+    if name in defaults:
+        missing = _MISSING_USES_DEFAULT
+    elif _is_union(hint) and type(None) in typing.get_args(hint):
+        missing = _MISSING_IS_NONE
+    elif mode.partial:
+        missing = _MISSING_OMITTED
+    else:
+        missing = _MISSING_RAISES
+
+    return (name, keys, parser, _compile_decoder(hint, mode), missing, defaults.get(name))
+
+
+def _check_instance(data: Any, data_type: type) -> Any:
+    """Check that data which isn't a dictionary is already an instance of a model.
+
+    :param data: The data
+    :param data_type: The model class
+
+    :raises DeserializeException: If the data is not an instance of the model
+
+    :returns: The data
+    """
+    if isinstance(data, data_type):
+        return data
+
+    raise deserialize.DeserializeException(
+        f"Cannot deserialize '{type(data)}' to '{_type_name(data_type)}'"
+    )
+
+
+def _check_missing(class_name: str, name: str, missing: int) -> None:
+    """Check that a field without a default can be missing from the data.
+
+    :param class_name: The name of the model class
+    :param name: The name of the field
+    :param missing: What to do when the field is missing
+
+    :raises DeserializeException: If the field is required
+    """
+    if missing == _MISSING_RAISES:
+        raise deserialize.DeserializeException(f"Unexpected missing value for: {class_name}.{name}")
+
+
+def _decode_field(class_name: str, field: _Field, data: dict[str, Any]) -> Any:
+    """Decode a single field of a model from its data.
+
+    :param class_name: The name of the model class
+    :param field: The field to decode
+    :param data: The data of the model
+
+    :returns: The decoded value of the field
+    """
+    name, keys, parser, decoder, missing, default = field
+
+    for key in keys:
+        if key in data:
+            value = data[key]
+            break
+    else:
+        if missing == _MISSING_USES_DEFAULT:
+            return default
+
+        if missing == _MISSING_OMITTED:
+            return None
+
+        _check_missing(class_name, name, missing)
+        value = None
+
+    if parser is not None:
+        value = parser(value)
+
+    return decoder(value)
+
+
+def _compile_fields(data_type: type, hints: dict[str, Any], mode: _Mode) -> list[_Field]:
+    """Compile the fields of a model class.
+
+    :param data_type: The model class
+    :param hints: The type hints of the class
+    :param mode: How to decode models
+
+    :raises _UnsupportedType: If the class uses a feature we don't compile
+
+    :returns: The fields
+    """
+    if getattr(data_type, "__deserialize_downcast_field__", None):
+        raise _UnsupportedType(f"{_type_name(data_type)} uses downcasting")
+
+    fields = []
+
+    for name, hint in hints.items():
+        field = _compile_field(data_type, name, hint, mode)
+        if field is not None:
+            fields.append(field)
+
+    return fields
+
+
+def _compile_model(data_type: type, hints: dict[str, Any], mode: _Mode) -> Decoder:
+    """Compile a decoder for a model class.
+
+    :param data_type: The model class
+    :param hints: The type hints of the class
+    :param mode: How to decode nested models
+
+    :raises _UnsupportedType: If the class uses a feature we don't compile
+
+    :returns: The decoder
+    """
+    fields = _compile_fields(data_type, hints, mode)
+    constructed = getattr(data_type, "__deserialize_constructed__", None)
+    create = typing.cast(Any, data_type).__new__
+    class_name = _type_name(data_type)
+
+    def decode_model(data: Any) -> Any:
+        """Decode a model.
+
+        :param data: The value to decode
+
+        :returns: The model instance
+        """
+        if not isinstance(data, dict):
+            return _check_instance(data, data_type)
+
+        instance = create(data_type)
+
+        for field in fields:
+            setattr(instance, field[0], _decode_field(class_name, field, data))
+
+        if constructed is not None:
+            constructed(instance)
+
+        return instance
+
+    return decode_model
+
+
+def _compile_lazy_model(data_type: type, hints: dict[str, Any], mode: _Mode) -> Decoder:
+    """Compile a decoder for a model class which decodes each field on first access.
+
+    The decoded objects are instances of a subclass of the model, so they can
+    be used anywhere the model can. Invalid data is only reported when the
+    field holding it is accessed.
+
+    :param data_type: The model class
+    :param hints: The type hints of the class
+    :param mode: How to decode nested models
+
+    :raises _UnsupportedType: If the class uses a feature we don't compile
+
+    :returns: The decoder
+    """
+    if getattr(data_type, "__deserialize_constructed__", None) is not None:
+        # The hook expects a fully populated instance
+        return _compile_model(data_type, hints, mode._replace(lazy=False))
+
+    fields = {field[0]: field for field in _compile_fields(data_type, hints, mode)}
+    class_name = _type_name(data_type)
+
+    def decode_attribute(self: Any, name: str) -> Any:
+        """Decode a field the first time it is accessed.
+
+        :param self: The model instance
+        :param name: The name of the attribute
+
+        :raises AttributeError: If the attribute is not a field of the model
+
+        :returns: The decoded value
+        """
+        field = fields.get(name)
+
+        if field is None:
+            raise AttributeError(f"'{class_name}' object has no attribute '{name}'")
+
+        data = self._lazy_data  # pylint: disable=protected-access
+        value = _decode_field(class_name, field, data)
+        setattr(self, name, value)
+        return value
+
+    lazy_type = type(
+        f"Lazy{class_name}",
+        (data_type,),
+        {
+            "__doc__": data_type.__doc__,
+            "__module__": data_type.__module__,
+            "__slots__": ("_lazy_data",),
+            "__getattr__": decode_attribute,
+        },
+    )
+    create = typing.cast(Any, lazy_type).__new__
+
+    def decode_lazy_model(data: Any) -> Any:
+        """Wrap the data of a model without decoding it.
+
+        :param data: The value to decode
+
+        :returns: The model instance
+        """
+        if not isinstance(data, dict):
+            return _check_instance(data, data_type)
+
+        instance = create(lazy_type)
+        instance._lazy_data = data  # pylint: disable=protected-access
+        return instance
+
+    return decode_lazy_model
+
+
+def _is_union(data_type: Any) -> bool:
+    """Check if a type is a union (including optionals).
+
+    :param data_type: The type to check
+
+    :returns: True if the type is a union, False otherwise
+    """
+    return typing.get_origin(data_type) in (typing.Union, types.UnionType)
+
+
+def _compile(data_type: Any, mode: _Mode) -> Decoder:
+    """Compile a decoder for a type.
+
+    :param data_type: The type to compile the decoder for
+    :param mode: How to decode models
+
+    :raises _UnsupportedType: If the type can't be compiled
+
+    :returns: The decoder
+    """
+    # pylint: disable=too-many-return-statements
+    if data_type is Any:
+        return _identity
+
+    if data_type is type(None):
+        return _compile_none()
+
+    if _is_union(data_type):
+        return _compile_union(data_type, mode)
+
+    origin = typing.get_origin(data_type)
+
+    if data_type is list or origin is list:
+        return _compile_list(data_type, mode)
+
+    if data_type is dict or origin is dict:
+        return _compile_dict(data_type, mode)
+
+    if origin is not None or not isinstance(data_type, type):
+        raise _UnsupportedType(f"Unsupported type: {data_type}")
+
+    if issubclass(data_type, enum.Enum):
+        return _compile_enum(data_type)
+
+    # Only classes with type hints can be built from a dictionary. Anything
+    # else (str, datetime, etc.) has to be the right type already.
+    try:
+        hints = typing.get_type_hints(data_type)
+    except (NameError, TypeError):
+        hints = {}
+
+    if not hints:
+        return _compile_instance_check(data_type)
+
+    if mode.lazy:
+        return _compile_lazy_model(data_type, hints, mode)
+
+    return _compile_model(data_type, hints, mode)
+
+
+def _compile_decoder(data_type: Any, mode: _Mode) -> Decoder:
+    """Get the decoder for a type, compiling it on first use.
+
+    :param data_type: The type to get the decoder for
+    :param mode: How to decode models
+
+    :raises _UnsupportedType: If the type can't be compiled
+
+    :returns: The decoder
+    """
+    cache_key = (data_type, mode)
+    decoder = _decoders.get(cache_key)
+
+    if decoder is not None:
+        return decoder
+
+    pending: dict[tuple[Any, _Mode], Decoder] | None = getattr(_compiling, "decoders", None)
+
+    if pending is None:
+        # This is the first type this thread needs, so compile it (and
+        # everything it refers to) under the lock, and only share the
+        # decoders once they are all complete
+        with _decoders_lock:
+            decoder = _decoders.get(cache_key)
+
+            if decoder is not None:
+                return decoder
+
+            _compiling.decoders = {}
+
+            try:
+                decoder = _compile_decoder(data_type, mode)
+                _decoders.update(_compiling.decoders)
+            finally:
+                # If a type failed, drop everything compiled along the way,
+                # since some of it may refer to its forwarding decoder
+                del _compiling.decoders
+
+            return decoder
+
+    decoder = pending.get(cache_key)
+
+    if decoder is not None:
+        return decoder
+
+    # Models can refer to themselves, so register a forwarding decoder while
+    # this one is being compiled. Only this thread can see it.
+    compiled: list[Decoder] = []
+
+    def forward(data: Any) -> Any:
+        """Call the decoder once it has been compiled.
+
+        :param data: The value to decode
+
+        :returns: The decoded value
+        """
+        return compiled[0](data)
+
+    pending[cache_key] = forward
+    decoder = _compile(data_type, mode)
+    compiled.append(decoder)
+    pending[cache_key] = decoder
+
+    return decoder
+
+
+def compile_decoder(data_type: Any, *, lazy: bool = False, partial: bool = False) -> Decoder:
+    """Get the decoder for a type, compiling it on first use.
+
+    :param data_type: The type to get the decoder for
+    :param lazy: Whether models should only decode each field when it is first accessed
+    :param partial: Whether fields missing from the data should be set to None rather than raising (e.g. for sparse fieldsets)
+
+    :raises ValueError: If partial is set but the type can't be compiled, since `deserialize` can't leave fields out
+
+    :returns: The decoder. For types which can't be compiled, this is `deserialize` itself, which decodes everything up front even if lazy is set.
+    """
+    mode = _Mode(lazy=lazy, partial=partial)
+
+    try:
+        return _compile_decoder(data_type, mode)
+    except _UnsupportedType as ex:
+        if partial:
+            raise ValueError(
+                f"Fields can't be left out of {_type_name(data_type)}, so it can't be "
+                f"requested with a sparse fieldset: {ex}"
+            ) from ex
+
+    def fallback(data: Any) -> Any:
+        """Decode with `deserialize`.
+
+        :param data: The value to decode
+
+        :returns: The decoded value
+        """
+        return deserialize.deserialize(data_type, data)
+
+    # Cached like a compiled decoder, so the type isn't compiled again for every page
+    with _decoders_lock:
+        return _decoders.setdefault((data_type, mode), fallback)
+
+
+def decode(data_type: Any, data: Any, *, lazy: bool = False, partial: bool = False) -> Any:
+    """Decode API data into a type, like `deserialize.deserialize`.
+
+    :param data_type: The type to decode to
+    :param data: The JSON data to decode
+    :param lazy: Whether models should only decode each field when it is first accessed
+    :param partial: Whether fields missing from the data should be set to None rather than raising (e.g. for sparse fieldsets)
+
+    :returns: The decoded data
+    """
+    return compile_decoder(data_type, lazy=lazy, partial=partial)(data)
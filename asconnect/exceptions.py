@@ -49,3 +49,55 @@ class AppStoreConnectError(Exception):
         self.source = data.get("source")
 
         super().__init__(f"[{self.status}] {self.title} ({self.code}): {self.detail}")
+
+
+class UnrecordedRequestError(Exception):
+    """A request which isn't in the cassette being replayed."""
+
+    method: str
+    url: str
+
+    def __init__(self, method: str, url: str):
+        """Create a new instance.
+
+        :param method: The HTTP verb of the request
+        :param url: The URL of the request
+        """
+        self.method = method
+        self.url = url
+        super().__init__(f"No recording of {method} {url} in the cassette")
+
+
+class DeadlineExceededError(TimeoutError):
+    """An operation ran out of its time budget."""
+
+    operation: str
+    budget: float
+
+    def __init__(self, operation: str, budget: float):
+        """Create a new instance.
+
+        :param operation: What was cut short, e.g. "before GET <url>"
+        :param budget: The number of seconds the operation had
+        """
+        self.operation = operation
+        self.budget = budget
+        super().__init__(f"Deadline of {budget:g}s exceeded {operation}")
+
+
+class UploadError(Exception):
+    """Parts of a file which failed to upload."""
+
+    file_path: str
+    failures: list[tuple[int, BaseException]]
+
+    def __init__(self, file_path: str, failures: list[tuple[int, BaseException]]):
+        """Create a new instance.
+
+        :param file_path: The path of the file being uploaded
+        :param failures: The offset of each part which failed and the error, in order of offset
+        """
+        self.file_path = file_path
+        self.failures = failures
+        details = "; ".join(f"at offset {offset}: {error}" for offset, error in failures)
+        super().__init__(f"Failed to upload {len(failures)} part(s) of {file_path}: {details}")
@@ -3,31 +3,108 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-import datetime
+import contextlib
 import logging
-from typing import Any, Iterator, Type
+import threading
+import time
+import typing
+from typing import Any, Iterable, Iterator, Type
+import urllib.parse
 
-import deserialize
-import jwt
 import requests
-
-from asconnect.exceptions import AppStoreConnectError
-
-NEW_TOKEN_AGE_IN_MINUTES = 15
-MINIMUM_TOKEN_AGE = 5
+import requests.adapters
+import urllib3.util
+
+from asconnect.cache import ResponseCache, canonical_url
+from asconnect.coalescing import SingleFlight
+from asconnect.credentials import ApiKey, CredentialPool, Credentials
+from asconnect.deadline import check_deadline, current_deadline, request_timeout
+from asconnect.decoding import decode
+from asconnect.exceptions import AppStoreConnectError, DeadlineExceededError
+from asconnect.metrics import (
+    Observer,
+    RequestEvent,
+    TimedHTTPAdapter,
+    record_attempt,
+    reset_connect_time,
+)
+from asconnect.models import RESOURCE_TYPES
+from asconnect.models.common import IdentityMap, Resource
+from asconnect.pagination import iterate_pages, prefetch_pages
+from asconnect.rate_limiter import (
+    RATE_LIMIT_HEADER,
+    RETRY_AFTER_HEADER,
+    RateLimiter,
+    parse_retry_after,
+)
+from asconnect.retry import RetryPolicy
+from asconnect.utilities import (
+    Fields,
+    api_path,
+    fields_query_parameters,
+    next_or_none,
+    update_query_parameters,
+)
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_CONNECTION_RETRIES = 3
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+
+DEFAULT_BASE_URL = "https://api.appstoreconnect.apple.com/v1"
+
+# The largest `limit` that the API accepts for most listings
+MAX_PAGE_SIZE = 200
+
+# pylint: disable=too-many-lines,too-many-public-methods
 
 
 class HttpClient:
-    """Base HTTP client for the ASC API."""
-
-    _key_id: str
-    _key_contents: str
-    _issuer_id: str | None
+    """Base HTTP client for the ASC API.
+
+    All requests are sent through a single pooled `requests.Session`, so TCP
+    and TLS connections are kept alive and reused across calls. Call `close()`
+    (or use the client as a context manager) to release the pooled
+    connections when finished.
+
+    This class is thread safe, as are the sub-clients built on it:
+
+    - Any number of threads can send requests through one client at once.
+      The connection pool, rate limiter, retry policy, cache and credentials
+      are shared and are each safe to use concurrently. The session's own
+      state (headers and adapters) is never changed after it is created.
+    - Only one thread signs a token at a time, and the others reuse it.
+    - Each listing iterator belongs to the thread iterating it. Separate
+      threads should start separate listings.
+    - Changing the key while requests are in flight is safe, but requests
+      already sent finish with the old key.
+    - Operations made of several requests (e.g. uploading a screenshot) are
+      not atomic. Running two on the same resource at once has the same
+      result as it would from two separate clients.
+    - `close()` must not be called while requests are in flight.
+
+    Every request has a connect and a read timeout. Within a
+    `deadline_scope` (or an operation given a `deadline`), the timeouts are
+    also cut short to fit the time left, and requests, retries and waits
+    which can't finish in time fail with `DeadlineExceededError`.
+    """
+
+    base_url: str
+    connect_timeout: float | None
+    read_timeout: float | None
+    credentials: Credentials
+    credential_pool: CredentialPool
+    _session: requests.Session
+    rate_limiter: RateLimiter
+    retry_policy: RetryPolicy
+    cache: ResponseCache | None
+    _in_flight: SingleFlight | None
+    _observers: tuple[Observer, ...]
+    _observers_lock: threading.Lock
     log: logging.Logger
 
-    _credentials_valid: bool
-    _cached_token_info: tuple[str, datetime.datetime] | None
-
+    # pylint:disable=too-many-arguments,too-many-locals
     def __init__(
         self,
         *,
@@ -35,6 +112,20 @@ class HttpClient:
         key_contents: str,
         issuer_id: str | None = None,
         log: logging.Logger,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        connection_retries: int = DEFAULT_CONNECTION_RETRIES,
+        keep_alive: bool = True,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        cache: ResponseCache | None = None,
+        additional_keys: Iterable[ApiKey] = (),
+        coalesce_requests: bool = True,
+        observers: Iterable[Observer] = (),
+        transport: requests.adapters.BaseAdapter | None = None,
+        base_url: str = DEFAULT_BASE_URL,
+        connect_timeout: float | None = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float | None = DEFAULT_READ_TIMEOUT,
     ) -> None:
         """Construct a new client object.
 
@@ -42,15 +133,155 @@ class HttpClient:
         :param key_contents: The contents of your key
         :param issuer_id: The issuer ID for team keys. Omit for individual keys (can be found in app store connect)
         :param log: Any base logger to be used (one will be created if not supplied)
+        :param pool_connections: The number of per-host connection pools to cache
+        :param pool_maxsize: The maximum number of connections to keep open to a single host
+        :param connection_retries: The number of times to retry establishing a connection
+        :param keep_alive: Set to False to close the connection after every request
+        :param rate_limiter: The rate limiter to pace requests with (one will be created if not supplied)
+        :param retry_policy: The policy for retrying failed requests (the default policy is used if not supplied)
+        :param cache: The cache to serve repeated reads from (nothing is cached if not supplied)
+        :param additional_keys: Further keys to spread requests across, to scale beyond the quota of one key
+        :param coalesce_requests: Set to False to send every GET, even when an identical one is in flight
+        :param observers: Functions to call with the metrics of each request (see `add_observer`)
+        :param transport: The adapter to send requests with, e.g. to record or replay them (a pooled
+                          connection to the network if not supplied, configured by the options above)
+        :param base_url: The base URL of the API, e.g. to use a stand-in server for testing
+        :param connect_timeout: The longest to wait for a connection, in seconds (None for no limit)
+        :param read_timeout: The longest to wait for the server to send data, in seconds (None for no limit)
         """
 
-        self._key_id = key_id
-        self._key_contents = key_contents
-        self._issuer_id = issuer_id
-        self._credentials_valid = False
         self.log = log.getChild("http")
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self.credentials = Credentials(
+            key_id=key_id, key_contents=key_contents, issuer_id=issuer_id, log=self.log
+        )
+
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.credential_pool = CredentialPool(
+            [self.credentials]
+            + [Credentials(**key._asdict(), log=self.log) for key in additional_keys],
+            remaining=self.rate_limiter.remaining,
+            log=self.log,
+        )
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.cache = cache
+        self._in_flight = SingleFlight() if coalesce_requests else None
+        self._observers = tuple(observers)
+        self._observers_lock = threading.Lock()
+
+        self._session = self._create_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            connection_retries=connection_retries,
+            keep_alive=keep_alive,
+            transport=transport,
+        )
+
+    # pylint:enable=too-many-arguments,too-many-locals
+
+    @staticmethod
+    def _create_session(
+        *,
+        pool_connections: int,
+        pool_maxsize: int,
+        connection_retries: int,
+        keep_alive: bool,
+        transport: requests.adapters.BaseAdapter | None,
+    ) -> requests.Session:
+        """Create the pooled session that all requests are sent through.
+
+        Only failures to connect are retried at this level. These are safe for
+        every verb since the request never reached the server. Anything else
+        is left to the callers, which know whether a request can be repeated.
+
+        :param pool_connections: The number of per-host connection pools to cache
+        :param pool_maxsize: The maximum number of connections to keep open to a single host
+        :param connection_retries: The number of times to retry establishing a connection
+        :param keep_alive: Set to False to close the connection after every request
+        :param transport: The adapter to use instead of the pooled one
+
+        :returns: The configured session
+        """
+        retries = urllib3.util.Retry(
+            total=connection_retries,
+            connect=connection_retries,
+            # Raise read timeouts as they are, rather than as a failure to connect
+            read=False,
+            status=0,
+            other=0,
+            redirect=False,
+            raise_on_status=False,
+        )
 
-        self._cached_token_info = None
+        adapter = transport
+
+        if adapter is None:
+            adapter = TimedHTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=retries,
+            )
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+
+        return session
+
+    def close(self) -> None:
+        """Close any pooled connections."""
+        self._session.close()
+
+    def __enter__(self) -> "HttpClient":
+        """Enter the context manager.
+
+        :returns: This client
+        """
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Exit the context manager, closing any pooled connections."""
+        self.close()
+
+    def add_observer(self, observer: Observer) -> None:
+        """Call a function with the metrics of every request from now on.
+
+        The function is called with a `RequestEvent` once each request has
+        finished (after any retries, and after decoding for pages). It is
+        called on the thread which sent the request, so it should be quick.
+        Exceptions it raises are logged and otherwise ignored.
+
+        When there are no observers, no metrics are collected at all.
+
+        :param observer: The function to call
+        """
+        with self._observers_lock:
+            self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer: Observer) -> None:
+        """Stop calling a function with the metrics of each request.
+
+        :param observer: The function to stop calling
+        """
+        with self._observers_lock:
+            self._observers = tuple(other for other in self._observers if other != observer)
+
+    def _notify(self, event: RequestEvent) -> None:
+        """Pass the metrics of a request to each observer.
+
+        :param event: The metrics of the request
+        """
+        for observer in self._observers:
+            try:
+                observer(event)
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                self.log.warning(f"Request observer {observer} failed: {ex}")
 
     @property
     def key_contents(self) -> str:
@@ -58,7 +289,7 @@ class HttpClient:
 
         :returns: Key contents
         """
-        return self._key_contents
+        return self.credentials.key_contents
 
     @key_contents.setter
     def key_contents(self, value: str) -> None:
@@ -66,8 +297,7 @@ class HttpClient:
 
         :param value: The new value to set to
         """
-        self._key_contents = value
-        self._credentials_valid = False
+        self.credentials.key_contents = value
 
     @property
     def key_id(self) -> str:
@@ -75,7 +305,7 @@ class HttpClient:
 
         :returns: Key ID
         """
-        return self._key_id
+        return self.credentials.key_id
 
     @key_id.setter
     def key_id(self, value: str) -> None:
@@ -83,8 +313,7 @@ class HttpClient:
 
         :param value: The new value to set to
         """
-        self._key_id = value
-        self._credentials_valid = False
+        self.credentials.key_id = value
 
     @property
     def issuer_id(self) -> str | None:
@@ -92,7 +321,7 @@ class HttpClient:
 
         :returns: Issuer ID
         """
-        return self._issuer_id
+        return self.credentials.issuer_id
 
     @issuer_id.setter
     def issuer_id(self, value: str | None) -> None:
@@ -100,8 +329,15 @@ class HttpClient:
 
         :param value: The new value to set to
         """
-        self._issuer_id = value
-        self._credentials_valid = False
+        self.credentials.issuer_id = value
+
+    @property
+    def rate_limit_remaining(self) -> int | None:
+        """Get the estimated number of requests that can be sent right now.
+
+        :returns: The remaining budget for the key, or None if it is not known yet
+        """
+        return self.rate_limiter.remaining(self.key_id)
 
     @property
     def is_individual_key(self) -> bool:
@@ -109,61 +345,41 @@ class HttpClient:
 
         :returns: True if using an individual key, False if using a team key
         """
-        return self._issuer_id is None
+        return self.credentials.is_individual_key
+
+    def generate_token(self, credentials: Credentials | None = None) -> str:
+        """Get a JWT token to authenticate a request with.
 
-    def generate_token(self) -> str:
-        """Generate a new JWT token.
+        :param credentials: The key to sign the token with (the first key if not set)
 
         :returns: The JWT token as a string
         """
+        if credentials is None:
+            credentials = self.credentials
 
-        # Apple state that performance is improved if we re-use the same token
-        # instead of generating a new one each time
-        if self._cached_token_info is not None:
-            cached_token, cached_expiration = self._cached_token_info
-            # Only return a token with time remaining on it
-            if cached_expiration - datetime.datetime.now() > datetime.timedelta(
-                minutes=MINIMUM_TOKEN_AGE
-            ):
-                self.log.debug(f"Using cached token. Expiration time: {cached_expiration}")
-                return cached_token
-
-            self._cached_token_info = None
-
-        # Tokens more than 20 minutes in the future are invalid, so our new one is less than that
-        now = datetime.datetime.now()
-        expiration = now + datetime.timedelta(minutes=NEW_TOKEN_AGE_IN_MINUTES)
-
-        # Details at https://developer.apple.com/documentation/appstoreconnectapi/generating_tokens_for_api_requests
-        # Team keys use "iss" claim with issuer_id
-        # Individual keys use "sub" claim with subject (always "user")
-        payload = {
-            "iat": int(now.timestamp()),
-            "exp": int(expiration.timestamp()),
-            "aud": "appstoreconnect-v1",
-        }
-
-        if self.is_individual_key:
-            # Individual key - sub is always "user" per Apple's documentation
-            payload["sub"] = "user"
-        else:
-            # Team key
-            payload["iss"] = self._issuer_id
-
-        token = jwt.encode(
-            payload,
-            self.key_contents,
-            algorithm="ES256",
-            headers={"kid": self.key_id, "typ": "JWT"},
-        )
+        return credentials.token()
+
+    @property
+    def auth_scope(self) -> str:
+        """Get the scope of the credentials requests are sent with.
+
+        Responses can differ between keys (e.g. by their access), so only
+        requests with the same scope share cached or in flight responses.
 
-        if not isinstance(token, str):
-            token = token.decode("utf-8")
+        :returns: The issuer and key ID of each key in the pool, e.g. "<issuer ID>/<key ID>"
+        """
+        return ",".join(
+            f"{credentials.issuer_id or ''}/{credentials.key_id}"
+            for credentials in self.credential_pool.credentials
+        )
 
-        self.log.debug(f"Generating new token. Expiration: {expiration}")
-        self._cached_token_info = (token, expiration)
+    @property
+    def api_prefix(self) -> str:
+        """Get the path that every URL for the API starts with.
 
-        return token
+        :returns: The path of the base URL, e.g. "/v1/"
+        """
+        return api_path(self.base_url)
 
     def generate_url(self, endpoint: str) -> str:
         """Generate a URL for an endpoint.
@@ -172,16 +388,255 @@ class HttpClient:
 
         :returns: An endpoint URL
         """
+        return f"{self.base_url}/{endpoint}"
+
+    def with_page_size(
+        self,
+        url: str,
+        *,
+        data_type: Type,
+        page_size: int,
+        max_page_size: int = MAX_PAGE_SIZE,
+    ) -> str:
+        """Add the page size to the URL for a listing.
+
+        Only listings (where `data_type` is a list) are paged, so other
+        requests are left alone, as are URLs which already set a `limit`.
+
+        :param url: The URL of the first page
+        :param data_type: The class the response will be deserialized to
+        :param page_size: The number of items to fetch per page
+        :param max_page_size: The largest page size the endpoint accepts
+
+        :raises ValueError: If the page size is out of range for the endpoint
+
+        :returns: The URL to fetch
+        """
         _ = self
-        return f"https://api.appstoreconnect.apple.com/v1/{endpoint}"
 
-    def verify_response(self, response: requests.Response) -> None:
-        """Perform some checks on the response.
+        if typing.get_origin(data_type) is not list:
+            return url
+
+        if not 1 <= page_size <= max_page_size:
+            raise ValueError(f"page_size must be between 1 and {max_page_size}, not {page_size}")
 
-        :param response: The response to check
+        if "limit" in urllib.parse.parse_qs(urllib.parse.urlparse(url).query):
+            return url
+
+        return update_query_parameters(url, {"limit": str(page_size)})
+
+    # pylint:disable=too-many-arguments
+    def listing_url(
+        self,
+        *,
+        data_type: Type,
+        endpoint: str | None = None,
+        url: str | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> str:
+        """Build the URL of the first page of a GET, and check its options.
+
+        :param data_type: The class to deserialize the data of the response to
+        :param endpoint: The endpoint to perform the GET on
+        :param url: The full URL to perform the GET on (takes precedence over endpoint)
+        :param page_size: The number of items to fetch per page of a listing
+        :param max_page_size: The largest page size the endpoint accepts
+        :param raw: Whether the JSON dictionaries will be returned instead of models
+        :param lazy: Whether models which decode each field when it is first accessed will be returned
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, which depend on the endpoint
+
+        :raises ValueError: If neither url or endpoint are specified, both raw and lazy are set, or the page size is out of range
+
+        :returns: The URL to fetch
         """
-        if response.status_code >= 200 and response.status_code < 300:
-            self._credentials_valid = True
+        if url is None:
+            if endpoint is None:
+                raise ValueError("Either `endpoint` or `url` must be set")
+            url = self.generate_url(endpoint)
+
+        if raw and lazy:
+            raise ValueError("Only one of `raw` and `lazy` can be set")
+
+        if fields:
+            url = update_query_parameters(url, fields_query_parameters(fields))
+
+        if include:
+            url = update_query_parameters(url, {"include": ",".join(include)})
+
+        return self.with_page_size(
+            url, data_type=data_type, page_size=page_size, max_page_size=max_page_size
+        )
+
+    # pylint:enable=too-many-arguments
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        event: RequestEvent | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request, passing its metrics to the observers.
+
+        :param method: The HTTP verb
+        :param url: The full URL
+        :param event: The event to record the metrics in. The caller notifies the observers of it.
+                      If not set, one is created and the observers notified here (if there are any).
+        :param kwargs: The other arguments for `_send`
+
+        :returns: The raw response of the final attempt
+        """
+        notify = event is None and bool(self._observers)
+
+        if notify:
+            event = RequestEvent(method=method, url=url, api_prefix=self.api_prefix)
+
+        if event is None:
+            return self._send(method, url, event=None, **kwargs)
+
+        start = time.perf_counter()
+
+        try:
+            return self._send(method, url, event=event, **kwargs)
+        finally:
+            event.total_time = time.perf_counter() - start
+
+            if notify:
+                self._notify(event)
+
+    # pylint:disable=too-many-arguments
+    def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        use_auth_header: bool = True,
+        rate_limited: bool = True,
+        idempotent: bool | None = None,
+        attempts: int | None = None,
+        event: RequestEvent | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request through the pooled session, retrying it according to the retry policy.
+
+        Requests to the API are paced to stay within the key's rate limit. If
+        the server still responds with a 429, the key is blocked for the
+        `Retry-After` period before the request is sent again.
+
+        A 401 is retried with a fresh token once the credentials are known to
+        be good, since that means the cached token went stale.
+
+        :param method: The HTTP verb
+        :param url: The full URL
+        :param headers: Any headers to send
+        :param use_auth_header: A flag indicates whether an auth header will be included in the request
+        :param rate_limited: Set to False for requests which don't count towards the API rate limit
+        :param idempotent: Whether the request is safe to send more than once. Defaults to True for every verb except POST.
+        :param attempts: Override the maximum number of attempts from the retry policy
+        :param event: The event to record the metrics of each attempt in (if any)
+        :param kwargs: Any other arguments to pass on to the session
+
+        :raises DeadlineExceededError: If the current deadline passes before a response arrives
+
+        :returns: The raw response of the final attempt
+        """
+        if idempotent is None:
+            idempotent = method != "POST"
+
+        # The key used by the latest attempt
+        used = self.credentials
+
+        def send() -> requests.Response:
+            """Send a single attempt.
+
+            :returns: The raw response
+            """
+            nonlocal used
+            check_deadline(f"before {method} {url}")
+            used = self.credential_pool.choose()
+            request_headers = dict(headers or {})
+
+            if use_auth_header and "Authorization" not in request_headers:
+                request_headers["Authorization"] = f"Bearer {self.generate_token(used)}"
+
+            if rate_limited:
+                waited = self.rate_limiter.acquire(used.key_id)
+                if waited > 0:
+                    self.log.debug(f"Waited {waited:.2f}s to stay within the rate limit")
+
+            reset_connect_time()
+            attempt_start = time.perf_counter()
+
+            response = self._send_once(method, url, headers=request_headers, **kwargs)
+            record_attempt(event, response, attempt_start)
+
+            if use_auth_header and 200 <= response.status_code < 300:
+                used.mark_verified()
+
+            if rate_limited:
+                self.rate_limiter.update(used.key_id, response.headers.get(RATE_LIMIT_HEADER))
+
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get(RETRY_AFTER_HEADER))
+                    self.log.info(f"Rate limited on {method} {url}. Retry after: {retry_after}")
+                    self.rate_limiter.block(used.key_id, retry_after)
+
+            return response
+
+        def should_retry(response: requests.Response) -> bool:
+            """Check if a response should be retried.
+
+            :param response: The response to check
+
+            :returns: True if the request should be sent again, False otherwise
+            """
+            if response.status_code == 401 and use_auth_header:
+                self.log.info(f"Unauthorized on {method} {url}.")
+                return self.credential_pool.report_unauthorized(used)
+
+            if not self.retry_policy.is_retryable(response.status_code, idempotent=idempotent):
+                return False
+
+            self.log.info(f"{method} {url} failed with {response.status_code}. Retrying.")
+            return True
+
+        return self.retry_policy.send(
+            send, should_retry=should_retry, idempotent=idempotent, max_attempts=attempts
+        )
+
+    # pylint:enable=too-many-arguments
+
+    def _send_once(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a single request through the pooled session, within the timeouts.
+
+        :param method: The HTTP verb
+        :param url: The full URL
+        :param kwargs: Any other arguments to pass on to the session
+
+        :raises DeadlineExceededError: If the current deadline passed before the request was sent, or cut it short
+        :raises requests.Timeout: If the server didn't respond within the timeouts
+
+        :returns: The raw response
+        """
+        deadline = current_deadline()
+        timeout = request_timeout(self.connect_timeout, self.read_timeout, f"before {method} {url}")
+
+        try:
+            return self._session.request(method, url, timeout=timeout, **kwargs)
+        except requests.Timeout as ex:
+            # The timeout was cut short to fit the deadline, so retrying won't help
+            if deadline is not None and timeout != (self.connect_timeout, self.read_timeout):
+                raise DeadlineExceededError(f"during {method} {url}", deadline.budget) from ex
+
+            raise
 
     def log_response(self, response: requests.Response) -> None:
         """Log the respose
@@ -190,6 +645,7 @@ class HttpClient:
         """
         self.log.debug(f"Response: {response.status_code}, {response.text}")
 
+    # pylint:disable=too-many-arguments,too-many-locals
     def get(
         self,
         *,
@@ -197,85 +653,271 @@ class HttpClient:
         endpoint: str | None = None,
         url: str | None = None,
         log_response: bool = False,
-        attempts: int = 3,
+        attempts: int | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
     ) -> Iterator[Any]:
         """Perform a GET to the endpoint specified.
 
         Either endpoint or url must be specified. url will take precedence if
         both are specified.
 
+        With `prefetch` set, following pages are fetched on a worker thread
+        while the current one is being consumed, so long listings are limited
+        by the network rather than network plus processing time.
+
+        Scans which only read a few fields can skip most of the decoding work:
+        `raw` yields the JSON dictionaries as they were returned, and `lazy`
+        yields models which only decode each field when it is first accessed.
+        `fields` asks the API for only some of the fields of each resource
+        type, and the fields left out are set to None on the models.
+        `include` asks for related resources to be returned with each page,
+        so that `get_related` can find them without another request.
+
         :param data_type: The class to deserialize the data of the response to
         :param endpoint: The endpoint to perform the GET on
         :param url: The full URL to perform the GET on
         :param log_response: A flag indicates whether to log the response
-        :param attempts: Number of attempts remaining to try this call
-
-        :raises ValueError: If neither url or endpoint are specified
+        :param attempts: Number of attempts to try each page (defaults to the retry policy)
+        :param page_size: The number of items to fetch per page of a listing
+        :param max_page_size: The largest page size the endpoint accepts
+        :param prefetch: The number of pages to fetch ahead of the consumer (0 to disable)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, which depend on the endpoint
+
+        :raises ValueError: If neither url or endpoint are specified, both raw and lazy are set, or the page size is out of range
         :raises AppStoreConnectError: If an error with the API occurs
 
         :returns: The raw response
         """
-        token = self.generate_token()
+        url = self.listing_url(
+            data_type=data_type,
+            endpoint=endpoint,
+            url=url,
+            page_size=page_size,
+            max_page_size=max_page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
 
-        if url is None:
-            if endpoint is None:
-                raise ValueError("Either `endpoint` or `url` must be set")
-            url = self.generate_url(endpoint)
+        page_number = 0
+
+        def fetch_page(page_url: str) -> tuple[list[Any], str | None]:
+            """Fetch a single page.
 
-        iterations = 0
+            :param page_url: The URL of the page
 
-        while True:
-            iterations += 1
+            :returns: The items on the page and the URL of the next page (if any)
+            """
+            nonlocal page_number
+            page_number += 1
 
-            raw_response = requests.get(
-                url,
-                headers={"Authorization": f"Bearer {token}"},
+            return self.get_page(
+                data_type=data_type,
+                url=page_url,
+                log_response=log_response,
+                attempts=attempts,
+                raw=raw,
+                lazy=lazy,
+                partial=bool(fields),
+                page=page_number,
             )
 
-            if log_response:
-                self.log_response(raw_response)
+        if prefetch > 0:
+            pages = prefetch_pages(fetch_page, url, depth=prefetch)
+        else:
+            pages = iterate_pages(fetch_page, url)
 
-            self.verify_response(raw_response)
+        with contextlib.closing(pages):
+            for items in pages:
+                yield from items
+
+    # pylint:enable=too-many-arguments,too-many-locals
+
+    # pylint:disable=too-many-arguments
+    def get_page(
+        self,
+        *,
+        data_type: Type,
+        url: str,
+        log_response: bool = False,
+        attempts: int | None = None,
+        raw: bool = False,
+        lazy: bool = False,
+        partial: bool = False,
+        page: int | None = None,
+    ) -> tuple[list[Any], str | None]:
+        """Perform a GET for a single page of results.
+
+        If another thread is already fetching the same page (with the same
+        keys and decoding options), this waits for it and returns the same
+        result rather than sending an identical request. If that request ran
+        out of the other thread's deadline, this sends it again as long as
+        its own deadline hasn't passed.
+
+        :param data_type: The class to deserialize the data of the response to
+        :param url: The full URL of the page
+        :param log_response: A flag indicates whether to log the response
+        :param attempts: Number of attempts to try this call (defaults to the retry policy)
+        :param raw: Return the JSON dictionaries instead of models
+        :param lazy: Return models which decode each field when it is first accessed
+        :param partial: Set fields missing from the response to None (for sparse fieldsets)
+        :param page: The number of the page in its listing (starting at 1), for metrics
+
+        :raises AppStoreConnectError: If an error with the API occurs
+
+        :returns: The deserialized items on the page and the URL of the next page (if any)
+        """
+
+        def fetch() -> tuple[list[Any], str | None]:
+            """Fetch the page.
+
+            :returns: The deserialized items on the page and the URL of the next page (if any)
+            """
+            return self._fetch_page(
+                data_type=data_type,
+                url=url,
+                log_response=log_response,
+                attempts=attempts,
+                raw=raw,
+                lazy=lazy,
+                partial=partial,
+                page=page,
+            )
+
+        if self._in_flight is None:
+            return fetch()
+
+        key = (canonical_url(url), self.auth_scope, data_type, raw, lazy, partial)
+
+        return self._in_flight.call(key, fetch)
+
+    def _fetch_page(
+        self,
+        *,
+        data_type: Type,
+        url: str,
+        log_response: bool,
+        attempts: int | None,
+        raw: bool,
+        lazy: bool,
+        partial: bool,
+        page: int | None,
+    ) -> tuple[list[Any], str | None]:
+        """Perform a GET for a single page of results.
+
+        :param data_type: The class to deserialize the data of the response to
+        :param url: The full URL of the page
+        :param log_response: A flag indicates whether to log the response
+        :param attempts: Number of attempts to try this call (defaults to the retry policy)
+        :param raw: Return the JSON dictionaries instead of models
+        :param lazy: Return models which decode each field when it is first accessed
+        :param partial: Set fields missing from the response to None (for sparse fieldsets)
+        :param page: The number of the page in its listing (starting at 1), for metrics
+
+        :raises AppStoreConnectError: If an error with the API occurs
+
+        :returns: The deserialized items on the page and the URL of the next page (if any)
+        """
+        api_prefix = self.api_prefix
+        event = (
+            RequestEvent(method="GET", url=url, page=page, api_prefix=api_prefix)
+            if self._observers
+            else None
+        )
+
+        try:
+            response_data = (
+                self.cache.get(url, scope=self.auth_scope, api_prefix=api_prefix)
+                if self.cache is not None
+                else None
+            )
+
+            if response_data is not None:
+                self.log.debug(f"Using cached response for {url}")
+
+                if event is not None:
+                    event.cached = True
+                    event.status_code = 200
+            else:
+                raw_response = self._request("GET", url, attempts=attempts, event=event)
+
+                if log_response:
+                    self.log_response(raw_response)
 
-            try:
                 response_data = self.extract_data(raw_response)
-            except AppStoreConnectError as ex:
-                if attempts > 1 and (
-                    ex.response.status_code >= 500
-                    or (ex.response.status_code == 401 and self._credentials_valid)
-                ):
-                    yield from self.get(
-                        data_type=data_type,
-                        endpoint=endpoint,
-                        url=url,
-                        log_response=log_response,
-                        attempts=attempts - 1,
+
+                if self.cache is not None:
+                    self.cache.put(
+                        url,
+                        response_data,
+                        size=len(raw_response.content),
+                        scope=self.auth_scope,
+                        api_prefix=api_prefix,
                     )
-                    return
 
-                raise
+            decode_start = time.perf_counter()
+            items = _decode_page(response_data, data_type, raw=raw, lazy=lazy, partial=partial)
 
-            if response_data["data"] is None:
-                yield from []
-            else:
-                deserialized_data = deserialize.deserialize(data_type, response_data["data"])
+            if event is not None:
+                event.decode_time = time.perf_counter() - decode_start
+        finally:
+            if event is not None:
+                self._notify(event)
+
+        return items, (response_data.get("links") or {}).get("next")
+
+    # pylint:enable=too-many-arguments
+
+    def get_related(
+        self,
+        *,
+        resource: Resource,
+        relationship: str,
+        data_type: Type,
+        fields: Fields | None = None,
+    ) -> Any:
+        """Get the resource a relationship points at.
+
+        If the resource was fetched with the relationship in `include`, the
+        related resource is taken from the response without another request.
+        Otherwise the related link is followed.
+
+        :param resource: The resource to get the related resource of
+        :param relationship: The name of the relationship (e.g. "app")
+        :param data_type: The class of the related resource (a list for a to-many relationship)
+        :param fields: The fields to return for each resource type when following the link
+
+        :raises ValueError: If the resource doesn't have the relationship
 
-                if isinstance(deserialized_data, list):
-                    yield from deserialized_data
-                else:
-                    yield deserialized_data
+        :returns: The related resource (a list for a to-many relationship), or None if there is none
+        """
+        related = resource.get_included(relationship)
+
+        if related is not None:
+            return related
 
-            if response_data.get("links") is None:
-                break
+        relationships = getattr(resource, "relationships", None) or {}
+        links = getattr(relationships.get(relationship), "links", None)
 
-            if response_data["links"].get("next") is None:
-                break
+        if links is None or links.related is None:
+            raise ValueError(f"{resource} does not have a link for the {relationship} relationship")
 
-            url = response_data["links"]["next"]
-            assert url is not None
+        results = self.get(url=links.related, data_type=data_type, fields=fields)
 
-        # This is only used for debugging, so we just assert so it isn't flagged as unused
-        assert iterations != 0
+        if typing.get_origin(data_type) is list:
+            return list(results)
+
+        return next_or_none(results)
 
     def patch(
         self,
@@ -302,24 +944,19 @@ class HttpClient:
 
         :returns: The raw response
         """
-        token = self.generate_token()
-
         if url is None:
             if endpoint is None:
                 raise ValueError("Either `endpoint` or `url` must be set")
             url = self.generate_url(endpoint)
 
-        raw_response = requests.patch(
-            url,
-            json=data,
-            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+        raw_response = self._request(
+            "PATCH", url, json=data, headers={"Content-Type": "application/json"}
         )
+        self._invalidate(url, data)
 
         if log_response:
             self.log_response(raw_response)
 
-        self.verify_response(raw_response)
-
         if raw_response.status_code == 204:
             return None
 
@@ -331,7 +968,7 @@ class HttpClient:
         if data_type is None:
             return None
 
-        return deserialize.deserialize(data_type, response_data["data"])
+        return decode(data_type, response_data["data"])
 
     def post(
         self,
@@ -341,41 +978,45 @@ class HttpClient:
         data: Any,
         data_type: Type | None = None,
         log_response: bool = False,
+        idempotent: bool = False,
     ) -> Any:
         """Perform a POST to the endpoint specified.
 
         Either endpoint or url must be specified. url will take precedence if
         both are specified.
 
+        Since a POST usually creates something, server errors are not retried
+        unless `idempotent` is set.
+
         :param endpoint: The endpoint to perform the GET on
         :param url: The full URL to perform the GET on
         :param data: Some JSON serializable data to send
         :param data_type: The data type to deserialize the response to
         :param log_response: A flag indicates whether to log the response
+        :param idempotent: Set to True if the request is safe to send more than once
 
         :raises ValueError: If neither url or endpoint are specified
         :raises AppStoreConnectError: If we get a failure response back from the API
 
         :returns: The raw response
         """
-        token = self.generate_token()
-
         if url is None:
             if endpoint is None:
                 raise ValueError("Either `endpoint` or `url` must be set")
             url = self.generate_url(endpoint)
 
-        raw_response = requests.post(
+        raw_response = self._request(
+            "POST",
             url,
             json=data,
-            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            headers={"Content-Type": "application/json"},
+            idempotent=idempotent,
         )
+        self._invalidate(url, data)
 
         if log_response:
             self.log_response(raw_response)
 
-        self.verify_response(raw_response)
-
         if raw_response.status_code == 201:
 
             if data_type is None:
@@ -383,7 +1024,7 @@ class HttpClient:
 
             response_data = self.extract_data(raw_response)
 
-            return deserialize.deserialize(data_type, response_data["data"])
+            return decode(data_type, response_data["data"])
 
         if raw_response.status_code >= 200 and raw_response.status_code < 300:
             return None
@@ -410,23 +1051,17 @@ class HttpClient:
 
         :returns: The raw response
         """
-        token = self.generate_token()
-
         if url is None:
             if endpoint is None:
                 raise ValueError("Either `endpoint` or `url` must be set")
             url = self.generate_url(endpoint)
 
-        raw_response = requests.delete(
-            url,
-            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
-        )
+        raw_response = self._request("DELETE", url, headers={"Content-Type": "application/json"})
+        self._invalidate(url)
 
         if log_response:
             self.log_response(raw_response)
 
-        self.verify_response(raw_response)
-
         return raw_response
 
     def put_chunk(
@@ -434,12 +1069,16 @@ class HttpClient:
         *,
         url: str,
         additional_headers: dict[str, str],
-        data: bytes,
+        data: bytes | bytearray | memoryview,
         use_auth_header: bool = True,
         log_response: bool = False,
     ) -> requests.Response:
         """Perform a PUT to the url specified
 
+        Any buffer can be uploaded, e.g. a `memoryview` of a memory mapped
+        file. It is sent as it is, without being copied, and can be sent
+        again if the request is retried.
+
         :param url: The full URL to perform the PUT on
         :param additional_headers: The additional headers to add
         :param data: The raw data to upload
@@ -448,25 +1087,39 @@ class HttpClient:
 
         :returns: The raw response
         """
-        token = self.generate_token()
-
-        headers = additional_headers
-
-        if use_auth_header and ("Authorization" not in headers):
-            headers["Authorization"] = f"Bearer {token}"
+        headers = dict(additional_headers)
 
         if "Content-Type" not in headers:
             headers["Content-Type"] = "application/json"
 
-        raw_response = requests.put(url=url, data=data, headers=headers)
+        # Uploads go to pre-signed asset URLs, which don't count towards the
+        # API rate limit
+        raw_response = self._request(
+            "PUT",
+            url,
+            data=data,
+            headers=headers,
+            use_auth_header=use_auth_header,
+            rate_limited=False,
+        )
 
         if log_response:
             self.log_response(raw_response)
 
-        self.verify_response(raw_response)
-
         return raw_response
 
+    def _invalidate(self, url: str, data: Any = None) -> None:
+        """Remove any cached responses which a write may have changed.
+
+        This is done whether or not the write succeeded, since a failed
+        request may still have been applied.
+
+        :param url: The URL written to
+        :param data: The JSON sent (if any)
+        """
+        if self.cache is not None:
+            self.cache.invalidate_write(url, data, api_prefix=self.api_prefix)
+
     def extract_data(self, response: requests.Response) -> Any:
         """Validate a response from the API and extract the data
 
@@ -482,3 +1135,74 @@ class HttpClient:
             raise AppStoreConnectError(response)
 
         return response.json()
+
+
+def _decode_page(
+    response_data: dict[str, Any], data_type: Type, *, raw: bool, lazy: bool, partial: bool
+) -> list[Any]:
+    """Decode the resources in a response.
+
+    :param response_data: The JSON of the response
+    :param data_type: The class to deserialize the data of the response to
+    :param raw: Return the JSON dictionaries instead of models
+    :param lazy: Return models which decode each field when it is first accessed
+    :param partial: Set fields missing from the response to None (for sparse fieldsets)
+
+    :returns: The deserialized items
+    """
+    if response_data["data"] is None:
+        return []
+
+    if raw:
+        deserialized_data = response_data["data"]
+    else:
+        deserialized_data = decode(data_type, response_data["data"], lazy=lazy, partial=partial)
+
+    if isinstance(deserialized_data, list):
+        items = deserialized_data
+    else:
+        items = [deserialized_data]
+
+    if response_data.get("included") and not raw:
+        _link_included(items, response_data["included"], lazy=lazy, partial=partial)
+
+    return items
+
+
+def _link_included(
+    items: list[Any], included: list[dict[str, Any]], *, lazy: bool, partial: bool
+) -> None:
+    """Give the resources on a page access to the resources included with them.
+
+    The included resources go into an identity map shared by every resource
+    on the page (including the included ones), and are decoded the first time
+    they are looked up.
+
+    :param items: The decoded resources on the page
+    :param included: The JSON of the included resources
+    :param lazy: Whether to decode each field of the included resources when it is first accessed
+    :param partial: Whether fields missing from the included resources should be set to None
+    """
+
+    def decode_included(data: dict[str, Any]) -> Any:
+        """Decode an included resource.
+
+        :param data: The JSON of the resource
+
+        :returns: The decoded resource, or the JSON if the type of resource isn't modelled
+        """
+        data_type = RESOURCE_TYPES.get(data.get("type", ""))
+
+        if data_type is None:
+            return data
+
+        resource = decode(data_type, data, lazy=lazy, partial=partial)
+        resource.included = identity_map
+        return resource
+
+    identity_map = IdentityMap(included, decode_included)
+
+    for item in items:
+        if isinstance(item, Resource):
+            identity_map.add(item)
+            item.included = identity_map
@@ -0,0 +1,407 @@
+"""Per-request metrics and the observers which receive them."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import collections
+import math
+import threading
+import time
+from typing import Any, Callable
+import urllib.parse
+
+import requests
+import requests.adapters
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from asconnect.rate_limiter import RATE_LIMIT_HEADER, parse_rate_limit_header
+from asconnect.utilities import DEFAULT_API_PATH, api_path_segments
+
+DEFAULT_MAX_SAMPLES = 10000
+
+# The time spent establishing connections on each thread, for the request in progress
+_connect_timing = threading.local()
+
+
+class RequestEvent:
+    """The metrics for one request, including any retries.
+
+    The timings are for the final attempt, except `total_time`, which covers
+    every attempt along with the time spent waiting between them and for the
+    rate limit.
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "endpoint",
+        "status_code",
+        "attempts",
+        "connect_time",
+        "ttfb",
+        "download_time",
+        "total_time",
+        "bytes_sent",
+        "bytes_received",
+        "rate_limit_remaining",
+        "page",
+        "decode_time",
+        "cached",
+    )
+
+    method: str
+    url: str
+    endpoint: str
+    status_code: int | None
+    attempts: int
+    connect_time: float
+    ttfb: float
+    download_time: float
+    total_time: float
+    bytes_sent: int
+    bytes_received: int
+    rate_limit_remaining: int | None
+    page: int | None
+    decode_time: float | None
+    cached: bool
+
+    def __init__(
+        self,
+        *,
+        method: str,
+        url: str,
+        page: int | None = None,
+        api_prefix: str = DEFAULT_API_PATH,
+    ) -> None:
+        """Create a new event.
+
+        :param method: The HTTP verb
+        :param url: The full URL
+        :param page: The number of the page of a listing (starting at 1), if it is one
+        :param api_prefix: The path of the client's base URL, from `utilities.api_path`
+        """
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint_template(url, api_prefix)
+        self.status_code = None
+        self.attempts = 0
+        self.connect_time = 0.0
+        self.ttfb = 0.0
+        self.download_time = 0.0
+        self.total_time = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.rate_limit_remaining = None
+        self.page = page
+        self.decode_time = None
+        self.cached = False
+
+    @property
+    def retries(self) -> int:
+        """Get the number of times the request was retried.
+
+        :returns: The number of retries
+        """
+        return max(0, self.attempts - 1)
+
+    def __repr__(self) -> str:
+        """Get a short description of the event.
+
+        :returns: The description
+        """
+        return (
+            f"RequestEvent({self.method} {self.endpoint} -> {self.status_code}, "
+            f"{self.total_time * 1000:.1f}ms, attempts={self.attempts})"
+        )
+
+
+Observer = Callable[[RequestEvent], None]
+
+
+def endpoint_template(url: str, api_prefix: str = DEFAULT_API_PATH) -> str:
+    """Get the endpoint a URL is for, with the IDs replaced.
+
+    For example `https://.../v1/apps/123/builds?limit=200` becomes
+    `apps/{id}/builds`, so that requests for different resources of the same
+    type are grouped together. URLs which aren't for the API (e.g. asset
+    uploads) are reduced to their host.
+
+    :param url: The URL
+    :param api_prefix: The path of the base URL, from `utilities.api_path`
+
+    :returns: The endpoint template
+    """
+    segments = api_path_segments(url, api_prefix)
+
+    if segments is None:
+        return urllib.parse.urlsplit(url).netloc
+
+    template = []
+    is_name = True
+
+    for segment in segments:
+        template.append(segment if is_name else "{id}")
+
+        # Relationship URLs look like `apps/{id}/relationships/builds`
+        is_name = not is_name or segment == "relationships"
+
+    return "/".join(template)
+
+
+def reset_connect_time() -> None:
+    """Start measuring the time spent connecting on this thread."""
+    _connect_timing.seconds = 0.0
+
+
+def connect_time() -> float:
+    """Get the time spent connecting on this thread since the last reset.
+
+    :returns: The time in seconds
+    """
+    return getattr(_connect_timing, "seconds", 0.0)
+
+
+def record_attempt(event: RequestEvent | None, response: requests.Response, start: float) -> None:
+    """Record the metrics of an attempt at a request.
+
+    Since the body of the response has been read, the time until the headers
+    arrived (`response.elapsed`) splits it into waiting and downloading.
+
+    :param event: The event to record the metrics in. Nothing is recorded if this isn't set.
+    :param response: The response to the attempt
+    :param start: The performance counter time the attempt started at
+    """
+    if event is None:
+        return
+
+    total = time.perf_counter() - start
+    elapsed = response.elapsed.total_seconds()
+    body = getattr(response.request, "body", None)
+    rate_limit = parse_rate_limit_header(response.headers.get(RATE_LIMIT_HEADER))
+
+    event.attempts += 1
+    event.status_code = response.status_code
+    event.connect_time = connect_time()
+    event.ttfb = max(0.0, elapsed - event.connect_time)
+    event.download_time = max(0.0, total - elapsed)
+    event.bytes_sent = len(body) if body is not None else 0
+    event.bytes_received = len(response.content or b"")
+    event.rate_limit_remaining = rate_limit[1] if rate_limit is not None else None
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    """An HTTP connection which records how long it takes to connect."""
+
+    def connect(self) -> None:
+        """Connect, recording the time taken."""
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.seconds = connect_time() + time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """An HTTPS connection which records how long it takes to connect (including TLS)."""
+
+    def connect(self) -> None:
+        """Connect, recording the time taken."""
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.seconds = connect_time() + time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    """A pool of timed HTTP connections."""
+
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """A pool of timed HTTPS connections."""
+
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(requests.adapters.HTTPAdapter):
+    """An adapter whose connections record how long they take to establish.
+
+    The time is only measured when a new connection is made, so reusing
+    pooled connections costs nothing.
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        """Create the pool manager, using timed connections.
+
+        :param args: The positional arguments for the pool manager
+        :param kwargs: The keyword arguments for the pool manager
+        """
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class EndpointSummary:
+    """The latency percentiles of the requests to an endpoint."""
+
+    __slots__ = ("method", "endpoint", "count", "errors", "p50", "p95", "p99")
+
+    method: str
+    endpoint: str
+    count: int
+    errors: int
+    p50: float
+    p95: float
+    p99: float
+
+    # pylint:disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        method: str,
+        endpoint: str,
+        count: int,
+        errors: int,
+        p50: float,
+        p95: float,
+        p99: float,
+    ) -> None:
+        """Create a new summary.
+
+        :param method: The HTTP verb
+        :param endpoint: The endpoint template
+        :param count: The number of requests
+        :param errors: The number of requests which failed
+        :param p50: The median latency in seconds
+        :param p95: The 95th percentile latency in seconds
+        :param p99: The 99th percentile latency in seconds
+        """
+        self.method = method
+        self.endpoint = endpoint
+        self.count = count
+        self.errors = errors
+        self.p50 = p50
+        self.p95 = p95
+        self.p99 = p99
+
+    # pylint:enable=too-many-arguments
+
+    def __repr__(self) -> str:
+        """Get a one line summary.
+
+        :returns: The summary
+        """
+        return (
+            f"{self.method} {self.endpoint}: {self.count} requests, {self.errors} errors, "
+            f"p50 {self.p50 * 1000:.1f}ms, p95 {self.p95 * 1000:.1f}ms, "
+            f"p99 {self.p99 * 1000:.1f}ms"
+        )
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """Get a percentile of some samples using the nearest rank.
+
+    :param ordered: The samples, in ascending order
+    :param percent: The percentile to get (e.g. 95)
+
+    :returns: The percentile
+    """
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class MetricsAggregator:
+    """An observer which collects the latency of the requests to each endpoint.
+
+    Register it with `HttpClient.add_observer` (or `observers=` on the
+    client) and call `summary()` or `report()` to see the slowest endpoints.
+    Only the latest `max_samples` requests to each endpoint are kept. Requests
+    served from the cache are ignored.
+
+    This class is thread safe.
+    """
+
+    max_samples: int
+    _samples: dict[tuple[str, str], collections.deque[float]]
+    _counts: collections.Counter[tuple[str, str]]
+    _errors: collections.Counter[tuple[str, str]]
+    _lock: threading.Lock
+
+    def __init__(self, *, max_samples: int = DEFAULT_MAX_SAMPLES) -> None:
+        """Create a new aggregator.
+
+        :param max_samples: The number of latencies to keep for each endpoint
+        """
+        self.max_samples = max_samples
+        self._samples = {}
+        self._counts = collections.Counter()
+        self._errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent) -> None:
+        """Record a request.
+
+        :param event: The event for the request
+        """
+        if event.cached:
+            return
+
+        key = (event.method, event.endpoint)
+
+        with self._lock:
+            samples = self._samples.get(key)
+
+            if samples is None:
+                samples = collections.deque(maxlen=self.max_samples)
+                self._samples[key] = samples
+
+            samples.append(event.total_time)
+            self._counts[key] += 1
+
+            if event.status_code is None or event.status_code >= 400:
+                self._errors[key] += 1
+
+    def summary(self) -> list[EndpointSummary]:
+        """Summarize the latency of each endpoint.
+
+        :returns: A summary for each endpoint, slowest (by p95) first
+        """
+        with self._lock:
+            snapshot = [
+                (key, sorted(samples), self._counts[key], self._errors[key])
+                for key, samples in self._samples.items()
+            ]
+
+        summaries = [
+            EndpointSummary(
+                method=method,
+                endpoint=endpoint,
+                count=count,
+                errors=errors,
+                p50=_percentile(ordered, 50),
+                p95=_percentile(ordered, 95),
+                p99=_percentile(ordered, 99),
+            )
+            for (method, endpoint), ordered, count, errors in snapshot
+        ]
+
+        return sorted(summaries, key=lambda summary: summary.p95, reverse=True)
+
+    def report(self) -> str:
+        """Describe the latency of each endpoint.
+
+        :returns: A line for each endpoint, slowest (by p95) first
+        """
+        return "\n".join(repr(summary) for summary in self.summary())
+
+    def reset(self) -> None:
+        """Forget every request recorded so far."""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._errors.clear()
@@ -14,3 +14,29 @@ from asconnect.models.review_submissions import *
 from asconnect.models.reviews import *
 from asconnect.models.screenshots import *
 from asconnect.models.users import *
+
+# The model for each resource type, used to decode the resources included in
+# compound documents
+RESOURCE_TYPES: dict[str, type[Resource]] = {
+    "apps": App,
+    "appCategories": AppCategory,
+    "appInfos": AppInfo,
+    "appInfoLocalizations": AppInfoLocalization,
+    "appScreenshots": AppScreenshot,
+    "appScreenshotSets": AppScreenshotSet,
+    "appStoreReviewDetails": AppStoreReviewDetails,
+    "appStoreVersions": AppStoreVersion,
+    "appStoreVersionLocalizations": AppStoreVersionLocalization,
+    "appStoreVersionPhasedReleases": AppStoreVersionPhasedRelease,
+    "betaAppLocalizations": BetaAppLocalization,
+    "betaAppReviewDetails": BetaAppReviewDetail,
+    "betaBuildLocalizations": BetaBuildLocalization,
+    "betaGroups": BetaGroup,
+    "buildBetaDetails": BuildBetaDetail,
+    "builds": Build,
+    "customerReviews": CustomerReview,
+    "idfaDeclarations": IdfaDeclaration,
+    "reviewSubmissionItems": ReviewSubmissionItem,
+    "reviewSubmissions": ReviewSubmission,
+    "users": User,
+}
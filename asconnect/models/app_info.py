@@ -12,11 +12,15 @@ from asconnect.models.app_store import AppStoreVersionState, Platform
 class AppInfoLocalization(Resource):
     """Represents a build."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("privacy_policy_text", "privacyPolicyText")
     @deserialize.key("privacy_policy_url", "privacyPolicyUrl")
     class Attributes(BaseAttributes):
         """Represents app info localization attributes."""
 
+        __slots__ = ("locale", "name", "privacy_policy_text", "privacy_policy_url", "subtitle")
+
         locale: str | None
         name: str | None
         privacy_policy_text: str | None
@@ -61,6 +65,8 @@ class KidsAgeBand(enum.Enum):
 class AppInfo(Resource):
     """Represents an apps info."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("app_store_age_rating", "appStoreAgeRating")
     @deserialize.key("app_store_state", "appStoreState")
     @deserialize.key("brazil_age_rating", "brazilAgeRating")
@@ -68,6 +74,13 @@ class AppInfo(Resource):
     class Attributes(BaseAttributes):
         """Represents app info localization attributes."""
 
+        __slots__ = (
+            "app_store_age_rating",
+            "app_store_state",
+            "brazil_age_rating",
+            "kids_age_band",
+        )
+
         app_store_age_rating: AppStoreAgeRating
         app_store_state: AppStoreVersionState
         brazil_age_rating: BrazilAgeRating | None
@@ -83,9 +96,13 @@ class AppInfo(Resource):
 class AppCategory(Resource):
     """Represents an app category."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     class Attributes(BaseAttributes):
         """Represents app category attributes."""
 
+        __slots__ = ("platforms",)
+
         platforms: list[Platform]
 
     identifier: str
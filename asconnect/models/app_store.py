@@ -65,6 +65,8 @@ class AppStoreVersionState(enum.Enum):
 class AppStoreVersion(Resource):
     """Represents an app store version."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("app_store_state", "appStoreState")
     @deserialize.key("earliest_release_date", "earliestReleaseDate")
     @deserialize.key("release_type", "releaseType")
@@ -74,6 +76,18 @@ class AppStoreVersion(Resource):
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = (
+            "platform",
+            "app_store_state",
+            "copyright",
+            "earliest_release_date",
+            "release_type",
+            "uses_idfa",
+            "version_string",
+            "created_date",
+            "downloadable",
+        )
+
         platform: Platform
         app_store_state: AppStoreVersionState
         copyright: str
@@ -94,6 +108,8 @@ class AppStoreVersion(Resource):
 class AppStoreVersionPhasedRelease(Resource):
     """Represents an app store phased release."""
 
+    __slots__ = ("identifier", "attributes", "links")
+
     @deserialize.key("current_day_number", "currentDayNumber")
     @deserialize.key("phased_release_state", "phasedReleaseState")
     @deserialize.key("start_date", "startDate")
@@ -101,6 +117,13 @@ class AppStoreVersionPhasedRelease(Resource):
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = (
+            "current_day_number",
+            "phased_release_state",
+            "start_date",
+            "total_pause_duration",
+        )
+
         current_day_number: int
         phased_release_state: PhasedReleaseState
         start_date: str | None
@@ -115,6 +138,8 @@ class AppStoreVersionPhasedRelease(Resource):
 class AppStoreReviewDetails(Resource):
     """Represents an app store review details."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("contact_email", "contactEmail")
     @deserialize.key("contact_first_name", "contactFirstName")
     @deserialize.key("contact_last_name", "contactLastName")
@@ -125,6 +150,17 @@ class AppStoreReviewDetails(Resource):
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = (
+            "contact_email",
+            "contact_first_name",
+            "contact_last_name",
+            "contact_phone",
+            "demo_account_name",
+            "demo_account_password",
+            "demo_account_required",
+            "notes",
+        )
+
         contact_email: str
         contact_first_name: str
         contact_last_name: str
@@ -9,6 +9,8 @@ from asconnect.models.common import BaseAttributes, Links, Relationship, Resourc
 class AppStoreVersionLocalization(Resource):
     """Represents an app store version localization."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("marketing_url", "marketingUrl")
     @deserialize.key("promotional_text", "promotionalText")
     @deserialize.key("support_url", "supportUrl")
@@ -16,6 +18,16 @@ class AppStoreVersionLocalization(Resource):
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = (
+            "description",
+            "keywords",
+            "locale",
+            "marketing_url",
+            "promotional_text",
+            "support_url",
+            "whats_new",
+        )
+
         description: str | None
         keywords: str | None
         locale: str
@@ -18,6 +18,21 @@ class ContentRightsDeclaration(enum.Enum):
 class AppAttributes(BaseAttributes):
     """Represents app attributes."""
 
+    __slots__ = (
+        "bundle_id",
+        "name",
+        "primary_locale",
+        "sku",
+        "available_in_new_territories",
+        "content_rights_declaration",
+        "is_or_ever_was_made_for_kids",
+        "subscription_status_url",
+        "subscription_status_url_version",
+        "subscription_status_url_for_sandbox",
+        "subscription_status_url_version_for_sandbox",
+        "streamlined_purchasing_enabled",
+    )
+
     bundle_id: str
     name: str
     primary_locale: str
@@ -36,6 +51,8 @@ class AppAttributes(BaseAttributes):
 class App(Resource):
     """Represents an app."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     identifier: str
     attributes: AppAttributes
     relationships: dict[str, Relationship] | None
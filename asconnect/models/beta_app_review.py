@@ -9,6 +9,8 @@ from asconnect.models.common import BaseAttributes, Resource, Links, Relationshi
 class BetaAppReviewDetail(Resource):
     """Represents a beta apps review details."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("contact_email", "contactEmail")
     @deserialize.key("contact_first_name", "contactFirstName")
     @deserialize.key("contact_last_name", "contactLastName")
@@ -19,6 +21,17 @@ class BetaAppReviewDetail(Resource):
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = (
+            "contact_email",
+            "contact_first_name",
+            "contact_last_name",
+            "contact_phone",
+            "demo_account_name",
+            "demo_account_password",
+            "demo_account_required",
+            "notes",
+        )
+
         contact_email: str
         contact_first_name: str
         contact_last_name: str
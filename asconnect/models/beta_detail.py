@@ -40,12 +40,16 @@ class InternalBetaState(enum.Enum):
 class BuildBetaDetail(Resource):
     """Represents a build localization."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("auto_notify_enabled", "autoNotifyEnabled")
     @deserialize.key("external_build_state", "externalBuildState")
     @deserialize.key("internal_build_state", "internalBuildState")
     class Attributes(BaseAttributes):
         """Represents beta build localization attributes."""
 
+        __slots__ = ("auto_notify_enabled", "external_build_state", "internal_build_state")
+
         auto_notify_enabled: bool
         external_build_state: ExternalBetaState
         internal_build_state: InternalBetaState
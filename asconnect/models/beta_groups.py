@@ -9,6 +9,8 @@ from asconnect.models.common import BaseAttributes, Links, Relationship, Resourc
 class BetaGroup(Resource):
     """Represents a beta group."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("is_internal_group", "isInternalGroup")
     @deserialize.key("public_link", "publicLink")
     @deserialize.key("public_link_enabled", "publicLinkEnabled")
@@ -20,6 +22,18 @@ class BetaGroup(Resource):
     class Attributes(BaseAttributes):
         """Represents beta group attributes."""
 
+        __slots__ = (
+            "is_internal_group",
+            "name",
+            "public_link",
+            "public_link_enabled",
+            "public_link_id",
+            "public_link_limit",
+            "public_link_limit_enabled",
+            "created_date",
+            "feedback_enabled",
+        )
+
         is_internal_group: bool
         name: str
         public_link: str | None
@@ -9,6 +9,8 @@ from asconnect.models.common import BaseAttributes, Links, Relationship, Reprabl
 class IconAssetToken(Reprable):
     """Represents an icon asset token item."""
 
+    __slots__ = ("template_url", "width", "height")
+
     template_url: str
     width: int
     height: int
@@ -23,6 +25,17 @@ class IconAssetToken(Reprable):
 class BuildAttributes(BaseAttributes):
     """Represents build attributes."""
 
+    __slots__ = (
+        "version",
+        "uploaded_date",
+        "expiration_date",
+        "expired",
+        "min_os_version",
+        "icon_asset_token",
+        "processing_state",
+        "uses_non_exempt_encryption",
+    )
+
     version: str
     uploaded_date: str
     expiration_date: str
@@ -37,6 +50,8 @@ class BuildAttributes(BaseAttributes):
 class Build(Resource):
     """Represents a build."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     identifier: str
     attributes: BuildAttributes
     relationships: dict[str, Relationship] | None
@@ -1,5 +1,8 @@
 """Models for the API"""
 
+import threading
+from typing import Any, Callable
+
 import deserialize
 
 
@@ -7,21 +10,48 @@ import deserialize
 class Links:
     """Represents item links."""
 
+    __slots__ = ("self_link", "first", "next", "related")
+
     self_link: str | None
     first: str | None
     next: str | None
     related: str | None
 
 
+@deserialize.key("resource_type", "type")
+@deserialize.key("identifier", "id")
+class ResourceLinkage:
+    """A JSON:API resource linkage.
+
+    This is the ``{"type": ..., "id": ...}`` pointer that appears in a
+    relationship's ``data`` member and identifies the related resource without
+    having to follow its link.
+    """
+
+    __slots__ = ("resource_type", "identifier")
+
+    resource_type: str
+    identifier: str
+
+
 class Relationship:
-    """Represents a relationship."""
+    """Represents a relationship.
+
+    ``data`` identifies the related resource (or resources), and is only
+    populated for relationships that were requested via ``include``.
+    """
+
+    __slots__ = ("links", "data")
 
     links: Links
+    data: ResourceLinkage | list[ResourceLinkage] | None
 
 
 class Paging:
     """Represents a paging data item in a REST response."""
 
+    __slots__ = ("total", "limit")
+
     total: int
     limit: int
 
@@ -29,31 +59,190 @@ class Paging:
 class Meta:
     """Represents a meta data item in a REST response."""
 
+    __slots__ = ("paging",)
+
     paging: Paging
 
 
+_repr_fields_cache: dict[type, tuple[str, ...]] = {}
+
+
+def _repr_fields(class_reference: type) -> tuple[str, ...]:
+    """Get the fields to show in the repr of a class, working them out on first use.
+
+    :param class_reference: The class to get the fields for
+
+    :returns: The names of the fields
+    """
+    fields = _repr_fields_cache.get(class_reference)
+
+    if fields is not None:
+        return fields
+
+    fields = getattr(class_reference, "__repr_fields__", None)
+
+    if fields is None:
+        names: dict[str, None] = {}
+        for base in reversed(class_reference.__mro__):
+            names.update(dict.fromkeys(vars(base).get("__annotations__", {})))
+        fields = tuple(names)
+
+    _repr_fields_cache[class_reference] = fields
+    return fields
+
+
 class Reprable:
-    """Something that can be automatically repr'd."""
+    """Something that can be automatically repr'd.
+
+    The repr shows the fields listed in `__repr_fields__`, or every annotated
+    field if that isn't set.
+    """
+
+    __slots__ = ()
 
     def __repr__(self) -> str:
         """Generate and return the repl representation of the object.
 
         :return: A repl representation of the object
         """
-        properties = {}
-        for attribute_name in dir(self):
-            if attribute_name.startswith("__"):
-                continue
-            properties[attribute_name] = getattr(self, attribute_name)
-        return str(properties)
+        values = ", ".join(
+            f"{name}={getattr(self, name, None)!r}" for name in _repr_fields(type(self))
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class IdentityMap:
+    """The resources of a compound document (a response using ``include``), keyed by (type, id).
+
+    Each resource is decoded the first time it is looked up, and the same
+    object is returned for every relationship which points at it.
+    """
+
+    __slots__ = ("_data", "_resources", "_decode", "_lock")
+
+    _data: dict[tuple[str, str], dict[str, Any]]
+    _resources: dict[tuple[str, str], Any]
+    _decode: Callable[[dict[str, Any]], Any]
+    _lock: threading.Lock
+
+    def __init__(
+        self, resources: list[dict[str, Any]], decode: Callable[[dict[str, Any]], Any]
+    ) -> None:
+        """Create a new identity map.
+
+        :param resources: The JSON of the resources
+        :param decode: Decodes the JSON of a resource
+        """
+        self._data = {(resource["type"], resource["id"]): resource for resource in resources}
+        self._resources = {}
+        self._decode = decode
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of resources in the map.
+
+        :returns: The number of resources
+        """
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        """Check if a resource is in the map.
+
+        :param key: The (type, id) of the resource
+
+        :returns: True if the resource is in the map, False otherwise
+        """
+        return key in self._data
+
+    def add(self, resource: "Resource") -> None:
+        """Add an already decoded resource to the map.
+
+        :param resource: The resource to add
+        """
+        key = (resource.resource_type, getattr(resource, "identifier"))
+
+        with self._lock:
+            self._data.setdefault(key, {})
+            self._resources[key] = resource
+
+    def get(self, resource_type: str, identifier: str) -> Any:
+        """Get a resource from the map.
+
+        :param resource_type: The type of the resource (e.g. "builds")
+        :param identifier: The ID of the resource
+
+        :returns: The resource, or None if it isn't in the map
+        """
+        key = (resource_type, identifier)
+
+        with self._lock:
+            resource = self._resources.get(key)
+
+            if resource is None and key in self._data:
+                resource = self._decode(self._data[key])
+                self._resources[key] = resource
+
+        return resource
+
+    def resolve(self, linkage: ResourceLinkage | list[ResourceLinkage] | None) -> Any:
+        """Get the resources a relationship points at.
+
+        :param linkage: The linkage (``data``) of the relationship
+
+        :returns: The resource, or a list of them for a to-many relationship. None if any
+                  of them are not in the map.
+        """
+        if linkage is None:
+            return None
+
+        if isinstance(linkage, ResourceLinkage):
+            return self.get(linkage.resource_type, linkage.identifier)
+
+        resources = [self.get(item.resource_type, item.identifier) for item in linkage]
+
+        if any(resource is None for resource in resources):
+            return None
+
+        return resources
 
 
 @deserialize.key("resource_type", "type")
+@deserialize.ignore("included")
 class Resource(Reprable):
-    """Represents a resource."""
+    """Represents a resource.
+
+    Resources are logged often, so only their identifier is shown in the repr.
+
+    ``included`` holds the other resources from the response this resource
+    came from, when the request used ``include``. It is not set otherwise.
+    """
+
+    __slots__ = ("resource_type", "included")
+
+    __repr_fields__ = ("identifier",)
 
     resource_type: str
+    included: IdentityMap | None
+
+    def get_included(self, relationship: str) -> Any:
+        """Get a related resource from the resources included with the response.
+
+        :param relationship: The name of the relationship (e.g. "app")
+
+        :returns: The related resource (or a list of them for a to-many relationship),
+                  or None if it wasn't included
+        """
+        included = getattr(self, "included", None)
+        relationships: dict[str, Any] = getattr(self, "relationships", None) or {}
+        related = relationships.get(relationship)
+
+        if included is None or related is None:
+            return None
+
+        return included.resolve(getattr(related, "data", None))
 
 
 class BaseAttributes(Reprable):
     """Represents base attributes."""
+
+    __slots__ = ()
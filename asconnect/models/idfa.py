@@ -9,6 +9,8 @@ from asconnect.models.common import BaseAttributes, Resource, Links, Relationshi
 class IdfaDeclaration(Resource):
     """Represents an IDFA declaration."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("attributes_action_with_previous_ad", "attributesActionWithPreviousAd")
     @deserialize.key(
         "attributes_app_installation_to_previous_ad", "attributesAppInstallationToPreviousAd"
@@ -18,6 +20,13 @@ class IdfaDeclaration(Resource):
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = (
+            "attributes_action_with_previous_ad",
+            "attributes_app_installation_to_previous_ad",
+            "honors_limited_ad_tracking",
+            "serves_ads",
+        )
+
         attributes_action_with_previous_ad: bool
         attributes_app_installation_to_previous_ad: bool
         honors_limited_ad_tracking: bool
@@ -9,6 +9,8 @@ from asconnect.models.common import BaseAttributes, Links, Relationship, Resourc
 class BetaAppLocalization(Resource):
     """Represents a build."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("feedback_email", "feedbackEmail")
     @deserialize.key("marketing_url", "marketingUrl")
     @deserialize.key("privacy_policy_url", "privacyPolicyUrl")
@@ -16,6 +18,15 @@ class BetaAppLocalization(Resource):
     class Attributes(BaseAttributes):
         """Represents beta app localization attributes."""
 
+        __slots__ = (
+            "description",
+            "feedback_email",
+            "locale",
+            "marketing_url",
+            "privacy_policy_url",
+            "tv_os_privacy_policy",
+        )
+
         description: str
         feedback_email: str
         locale: str
@@ -33,10 +44,14 @@ class BetaAppLocalization(Resource):
 class BetaBuildLocalization(Resource):
     """Represents a build localization."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("whats_new", "whatsNew")
     class Attributes(BaseAttributes):
         """Represents beta build localization attributes."""
 
+        __slots__ = ("locale", "whats_new")
+
         locale: str
         whats_new: str | None
 
@@ -5,7 +5,13 @@ import enum
 import deserialize
 
 from asconnect.models.app_store import Platform
-from asconnect.models.common import BaseAttributes, Links, Relationship, Resource
+from asconnect.models.common import (
+    BaseAttributes,
+    Links,
+    Relationship,
+    Resource,
+    ResourceLinkage,
+)
 
 
 class ReviewSubmissionState(enum.Enum):
@@ -42,9 +48,13 @@ class ReviewSubmission(Resource):
     non-``COMPLETE`` submission may exist per app at a time.
     """
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = ("platform", "state")
+
         platform: Platform
         state: ReviewSubmissionState
 
@@ -54,32 +64,18 @@ class ReviewSubmission(Resource):
     links: Links
 
 
-@deserialize.key("resource_type", "type")
-@deserialize.key("identifier", "id")
-class ResourceLinkage:
-    """A JSON:API resource linkage.
-
-    This is the ``{"type": ..., "id": ...}`` pointer that appears in a
-    relationship's ``data`` member and identifies the related resource without
-    having to follow its link.
-    """
-
-    resource_type: str
-    identifier: str
-
-
 class LinkageRelationship:
     """A relationship that may expose its resource linkage (``data``).
 
-    The shared :class:`~asconnect.models.common.Relationship` only models
-    ``links``, which is enough to *follow* a related URL but not to learn
-    *which* resource is on the other end. Review submission items need that
-    identity - to tell which app store version an item references - so this
-    variant also parses the optional ``data`` pointer. Both members are
-    optional because Apple only populates ``data`` for relationships that were
-    requested via ``include``.
+    Review submission items need the linkage to tell which app store version
+    an item references. Unlike the shared
+    :class:`~asconnect.models.common.Relationship`, both members are optional
+    here: Apple only populates ``data`` for relationships that were requested
+    via ``include``, and doesn't always return ``links`` with it.
     """
 
+    __slots__ = ("data", "links")
+
     data: ResourceLinkage | None
     links: Links | None
 
@@ -93,6 +89,8 @@ class ReviewSubmissionItem(Resource):
     attached version.
     """
 
+    __slots__ = ("identifier", "relationships", "links")
+
     identifier: str
     relationships: dict[str, LinkageRelationship] | None
     links: Links
@@ -12,6 +12,8 @@ from asconnect.models.common import BaseAttributes, Links, Relationship, Resourc
 class CustomerReviewAttributes(BaseAttributes):
     """Represents build attributes."""
 
+    __slots__ = ("body", "created_date", "rating", "reviewer_nickname", "title", "territory")
+
     body: str
     created_date: datetime.datetime
     rating: int
@@ -24,6 +26,8 @@ class CustomerReviewAttributes(BaseAttributes):
 class CustomerReview(Resource):
     """Represents a user."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     identifier: str
     attributes: CustomerReviewAttributes
     relationships: dict[str, Relationship] | None
@@ -58,10 +58,14 @@ class ScreenshotDisplayType(enum.Enum):
 class AppScreenshotSet(Resource):
     """Represents an app store screenshot set."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("screenshot_display_type", "screenshotDisplayType")
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = ("screenshot_display_type",)
+
         screenshot_display_type: ScreenshotDisplayType
 
     identifier: str
@@ -73,6 +77,8 @@ class AppScreenshotSet(Resource):
 class AppMediaStateError(Reprable):
     """An app media state error."""
 
+    __slots__ = ("code", "description")
+
     code: str
     description: str
 
@@ -89,6 +95,8 @@ class AppMediaAssetStateState(enum.Enum):
 class AppMediaAssetState(Reprable):
     """An app media asset state."""
 
+    __slots__ = ("errors", "state", "warnings")
+
     errors: list[AppMediaStateError]
     state: AppMediaAssetStateState
     warnings: list[AppMediaStateError] | None
@@ -98,6 +106,8 @@ class AppMediaAssetState(Reprable):
 class ImageAsset(Reprable):
     """An image asset."""
 
+    __slots__ = ("template_url", "height", "width")
+
     template_url: str
     height: int
     width: int
@@ -106,6 +116,8 @@ class ImageAsset(Reprable):
 class UploadOperationHeader(Reprable):
     """An upload operation header."""
 
+    __slots__ = ("name", "value")
+
     name: str
     value: str
 
@@ -114,6 +126,8 @@ class UploadOperationHeader(Reprable):
 class UploadOperation(Reprable):
     """An upload operation."""
 
+    __slots__ = ("length", "method", "offset", "request_headers", "url")
+
     length: int
     method: str
     offset: int
@@ -125,6 +139,8 @@ class UploadOperation(Reprable):
 class AppScreenshot(Resource):
     """Represents an app store screenshot."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     @deserialize.key("asset_delivery_state", "assetDeliveryState")
     @deserialize.key("asset_token", "assetToken")
     @deserialize.key("asset_type", "assetType")
@@ -136,6 +152,18 @@ class AppScreenshot(Resource):
     class Attributes(BaseAttributes):
         """Attributes."""
 
+        __slots__ = (
+            "asset_delivery_state",
+            "asset_token",
+            "asset_type",
+            "file_name",
+            "file_size",
+            "image_asset",
+            "source_file_checksum",
+            "uploaded",
+            "upload_operations",
+        )
+
         asset_delivery_state: AppMediaAssetState
         asset_token: str
         asset_type: str
@@ -32,6 +32,15 @@ class UserRole(enum.Enum):
 class UserAttributes(BaseAttributes):
     """Represents build attributes."""
 
+    __slots__ = (
+        "first_name",
+        "last_name",
+        "roles",
+        "provisioning_allowed",
+        "all_apps_visible",
+        "username",
+    )
+
     first_name: str
     last_name: str
     roles: list[UserRole]
@@ -44,6 +53,8 @@ class UserAttributes(BaseAttributes):
 class User(Resource):
     """Represents a user."""
 
+    __slots__ = ("identifier", "attributes", "relationships", "links")
+
     identifier: str
     attributes: UserAttributes
     relationships: dict[str, Relationship] | None
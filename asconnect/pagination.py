@@ -0,0 +1,145 @@
+"""Helpers for walking paginated listings."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import contextvars
+import queue
+import threading
+from typing import Any, Callable, Generator
+
+# How often a blocked worker checks whether the consumer has gone away
+_STOP_POLL_SECONDS = 0.1
+
+PageFetcher = Callable[[str], tuple[list[Any], str | None]]
+
+
+class _EndOfPages:
+    """Marks the end of the listing in the prefetch queue."""
+
+
+class _FetchError:
+    """Carries an exception from the worker to the consumer."""
+
+    exception: BaseException
+
+    def __init__(self, exception: BaseException) -> None:
+        """Create a new error marker.
+
+        :param exception: The exception raised while fetching
+        """
+        self.exception = exception
+
+
+def iterate_pages(fetch_page: PageFetcher, url: str) -> Generator[list[Any], None, None]:
+    """Fetch each page of a listing in turn, following the next links.
+
+    :param fetch_page: Fetches the page at a URL, returning its items and the next URL (if any)
+    :param url: The URL of the first page
+
+    :returns: An iterator over the items of each page
+    """
+    next_url: str | None = url
+
+    while next_url is not None:
+        items, next_url = fetch_page(next_url)
+        yield items
+
+
+class _Prefetcher:
+    """Fetches the pages of a listing on a worker thread into a bounded queue."""
+
+    fetch_page: PageFetcher
+    url: str
+    pages: queue.Queue
+    stopped: threading.Event
+
+    def __init__(self, fetch_page: PageFetcher, url: str, depth: int) -> None:
+        """Create a new prefetcher.
+
+        :param fetch_page: Fetches the page at a URL, returning its items and the next URL (if any)
+        :param url: The URL of the first page
+        :param depth: The maximum number of pages to buffer
+        """
+        self.fetch_page = fetch_page
+        self.url = url
+        self.pages = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+
+    def put(self, entry: Any) -> bool:
+        """Queue an entry, giving up if the consumer has stopped.
+
+        :param entry: The entry to queue
+
+        :returns: True if the entry was queued, False if the consumer has stopped
+        """
+        while not self.stopped.is_set():
+            try:
+                self.pages.put(entry, timeout=_STOP_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def work(self) -> None:
+        """Fetch pages until the listing ends, fails or the consumer stops."""
+        try:
+            for items in iterate_pages(self.fetch_page, self.url):
+                if not self.put(items):
+                    return
+        except BaseException as ex:  # pylint: disable=broad-exception-caught
+            self.put(_FetchError(ex))
+            return
+
+        self.put(_EndOfPages())
+
+    def start(self) -> None:
+        """Start fetching on a worker thread.
+
+        The worker runs in a copy of the current context so that context
+        variables set by the caller apply to the requests made on its behalf.
+        """
+        context = contextvars.copy_context()
+        worker = threading.Thread(
+            target=context.run, args=(self.work,), name="asconnect-prefetch", daemon=True
+        )
+        worker.start()
+
+
+def prefetch_pages(
+    fetch_page: PageFetcher, url: str, *, depth: int
+) -> Generator[list[Any], None, None]:
+    """Fetch the pages of a listing on a worker thread, ahead of the consumer.
+
+    Up to `depth` pages are buffered, so the next request is already in flight
+    while the current page is being processed. If fetching fails, the error is
+    raised from the iterator once the pages before it have been consumed. If
+    the consumer stops early, the worker stops too.
+
+    :param fetch_page: Fetches the page at a URL, returning its items and the next URL (if any)
+    :param url: The URL of the first page
+    :param depth: The maximum number of pages to buffer
+
+    :raises ValueError: If the depth is less than 1
+
+    :returns: An iterator over the items of each page
+    """
+    if depth < 1:
+        raise ValueError(f"Prefetch depth must be at least 1, not {depth}")
+
+    prefetcher = _Prefetcher(fetch_page, url, depth)
+    prefetcher.start()
+
+    try:
+        while True:
+            entry = prefetcher.pages.get()
+
+            if isinstance(entry, _EndOfPages):
+                return
+
+            if isinstance(entry, _FetchError):
+                raise entry.exception
+
+            yield entry
+    finally:
+        prefetcher.stopped.set()
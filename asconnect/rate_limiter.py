@@ -0,0 +1,266 @@
+"""Client side pacing of requests to stay within the API rate limit."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import email.utils
+import datetime
+import threading
+import time
+from typing import Callable
+
+from asconnect.deadline import ensure_time_for
+
+RATE_LIMIT_HEADER = "X-Rate-Limit"
+RETRY_AFTER_HEADER = "Retry-After"
+
+# Apple's quota is measured over a rolling hour
+DEFAULT_WINDOW_SECONDS = 3600.0
+
+
+def parse_rate_limit_header(value: str | None) -> tuple[int, int] | None:
+    """Parse the value of an `X-Rate-Limit` header.
+
+    The header looks like `user-hour-lim:3600;user-hour-rem:3599;`.
+
+    :param value: The header value
+
+    :returns: The limit and the remaining requests, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+
+    properties = {}
+
+    for part in value.split(";"):
+        name, _, number = part.partition(":")
+        if not number:
+            continue
+        try:
+            properties[name.strip()] = int(number.strip())
+        except ValueError:
+            continue
+
+    limit = properties.get("user-hour-lim")
+    remaining = properties.get("user-hour-rem")
+
+    if limit is None or remaining is None:
+        return None
+
+    return limit, remaining
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse the value of a `Retry-After` header.
+
+    :param value: The header value, either a number of seconds or an HTTP date
+
+    :returns: The number of seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=datetime.timezone.utc)
+
+    delta = retry_date - datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, delta.total_seconds())
+
+
+class _Bucket:
+    """The token bucket for a single key."""
+
+    __slots__ = ("limit", "tokens", "updated", "blocked_until")
+
+    limit: int
+    tokens: float
+    updated: float
+    blocked_until: float
+
+    def __init__(self, *, limit: int, remaining: int, now: float) -> None:
+        """Create a new bucket.
+
+        :param limit: The number of requests allowed per window
+        :param remaining: The number of requests remaining in the current window
+        :param now: The current clock time
+        """
+        self.limit = limit
+        self.tokens = float(remaining)
+        self.updated = now
+        self.blocked_until = now
+
+
+class RateLimiter:
+    """Paces requests so that each key stays within its rate limit.
+
+    A token bucket is kept per key. It starts off with whatever budget the
+    server reports as remaining and refills at the rate the limit allows. The
+    server's view is authoritative, so every response's `X-Rate-Limit` header
+    pulls the bucket back down if we have overestimated. Once a bucket is
+    empty, requests are spaced out evenly at the refill rate rather than
+    running into a lockout.
+
+    Until a key has seen its first response its limit is unknown and requests
+    are not delayed.
+
+    This class is thread safe.
+    """
+
+    window: float
+    _buckets: dict[str, _Bucket]
+    _lock: threading.Lock
+    _clock: Callable[[], float]
+    _sleep: Callable[[float], None]
+
+    def __init__(
+        self,
+        *,
+        window: float = DEFAULT_WINDOW_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Create a new rate limiter.
+
+        :param window: The length of the rate limit window in seconds
+        :param clock: The monotonic clock to use
+        :param sleep: The function to use to wait
+        """
+        self.window = window
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+
+    def _refill(self, bucket: _Bucket, now: float) -> None:
+        """Add the tokens accrued since the bucket was last updated.
+
+        :param bucket: The bucket to refill
+        :param now: The current clock time
+        """
+        elapsed = max(0.0, now - bucket.updated)
+        bucket.tokens = min(
+            float(bucket.limit), bucket.tokens + elapsed * bucket.limit / self.window
+        )
+        bucket.updated = now
+
+    def reserve(self, key: str) -> float:
+        """Take a token for the key without waiting.
+
+        If no token is available one is borrowed from the future, so the
+        caller must wait for the returned number of seconds before sending.
+
+        :param key: The key to take the token for
+
+        :returns: The number of seconds to wait before sending the request
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+
+            if bucket is None:
+                return 0.0
+
+            now = self._clock()
+            self._refill(bucket, now)
+            bucket.tokens -= 1
+
+            delay = max(0.0, bucket.blocked_until - now)
+
+            if bucket.tokens < 0 < bucket.limit:
+                delay = max(delay, -bucket.tokens * self.window / bucket.limit)
+
+            return delay
+
+    def acquire(self, key: str) -> float:
+        """Wait until the key can send a request.
+
+        :param key: The key that will send the request
+
+        :raises DeadlineExceededError: If the wait would run past the current deadline
+
+        :returns: The number of seconds waited
+        """
+        delay = self.reserve(key)
+
+        if delay > 0:
+            ensure_time_for(delay, f"by waiting {delay:.1f}s for the rate limit")
+            self._sleep(delay)
+
+        return delay
+
+    def update(self, key: str, header_value: str | None) -> None:
+        """Update the budget for a key from an `X-Rate-Limit` header.
+
+        :param key: The key the response was for
+        :param header_value: The value of the header (if any)
+        """
+        parsed = parse_rate_limit_header(header_value)
+
+        if parsed is None:
+            return
+
+        limit, remaining = parsed
+
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.get(key)
+
+            if bucket is None:
+                self._buckets[key] = _Bucket(limit=limit, remaining=remaining, now=now)
+                return
+
+            if bucket.limit == 0:
+                # The limit wasn't known yet (we were blocked before seeing a
+                # header), so there is no local estimate worth keeping
+                bucket.tokens = float(remaining)
+            else:
+                self._refill(bucket, now)
+                bucket.tokens = min(bucket.tokens, float(remaining))
+
+            bucket.limit = limit
+            bucket.updated = now
+
+    def block(self, key: str, seconds: float | None) -> None:
+        """Stop a key sending requests for a while, e.g. after a 429.
+
+        :param key: The key to block
+        :param seconds: The number of seconds to block for (e.g. from `Retry-After`). If
+                        None, the key waits for the bucket to refill instead.
+        """
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.get(key)
+
+            if bucket is None:
+                bucket = _Bucket(limit=0, remaining=0, now=now)
+                self._buckets[key] = bucket
+
+            bucket.tokens = min(bucket.tokens, 0.0)
+
+            if seconds is not None:
+                bucket.blocked_until = max(bucket.blocked_until, now + seconds)
+
+    def remaining(self, key: str) -> int | None:
+        """Get the estimated number of requests the key can still send right now.
+
+        :param key: The key to check
+
+        :returns: The remaining budget, or None if it is not known yet
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+
+            if bucket is None or bucket.limit == 0:
+                return None
+
+            self._refill(bucket, self._clock())
+            return max(0, int(bucket.tokens))
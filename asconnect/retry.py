@@ -0,0 +1,283 @@
+"""Retry policy for requests to the API."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import contextvars
+import logging
+import random
+import time
+from typing import Callable, Collection, TypeVar
+
+import requests
+import tenacity
+
+from asconnect.deadline import ensure_time_for
+from asconnect.exceptions import AppStoreConnectError
+from asconnect.rate_limiter import RETRY_AFTER_HEADER, parse_retry_after
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_JITTER = 1.0
+
+# Request timeout, too many requests, and the 5xx class
+DEFAULT_RETRY_STATUSES = frozenset({408, 429})
+DEFAULT_RETRY_STATUS_CLASSES = frozenset({5})
+
+# Statuses which guarantee the server did not act on the request, so even a
+# non-idempotent request can safely be sent again
+DEFAULT_UNPROCESSED_STATUSES = frozenset({429})
+
+ResultType = TypeVar("ResultType")  # pylint: disable=invalid-name
+
+# Set while `RetryPolicy.call` runs an operation. The operation is retried as
+# a whole, so the requests it makes are only sent once each, rather than the
+# two layers of retries multiplying.
+_in_retried_operation: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "asconnect_in_retried_operation", default=False
+)
+
+
+def _default_sleep(seconds: float) -> None:
+    """Sleep for a number of seconds.
+
+    :param seconds: The number of seconds to sleep for
+    """
+    time.sleep(seconds)
+
+
+class RetryPolicy:
+    """Decides which failed requests are retried, and how long to wait between attempts.
+
+    Delays grow exponentially from `base_delay` up to `max_delay`, with up to
+    `jitter` seconds of random jitter added so that concurrent callers don't
+    retry in lock step. A `Retry-After` header from the server takes
+    precedence when it asks for a longer wait.
+
+    Non-idempotent requests (POST) are only retried for statuses which mean
+    the server did not act on the request at all (e.g. 429), unless the caller
+    says the request is safe to repeat.
+
+    Within a `deadline_scope`, a retry which would have to wait past the
+    deadline fails straight away with `DeadlineExceededError` instead.
+    """
+
+    max_attempts: int
+    base_delay: float
+    max_delay: float
+    jitter: float
+    retry_statuses: frozenset[int]
+    retry_status_classes: frozenset[int]
+    unprocessed_statuses: frozenset[int]
+    _sleep: Callable[[float], None]
+
+    # pylint:disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        jitter: float = DEFAULT_JITTER,
+        retry_statuses: Collection[int] = DEFAULT_RETRY_STATUSES,
+        retry_status_classes: Collection[int] = DEFAULT_RETRY_STATUS_CLASSES,
+        unprocessed_statuses: Collection[int] = DEFAULT_UNPROCESSED_STATUSES,
+        sleep: Callable[[float], None] = _default_sleep,
+    ) -> None:
+        """Create a new retry policy.
+
+        :param max_attempts: The maximum number of times to send a request (including the first)
+        :param base_delay: The delay before the first retry in seconds
+        :param max_delay: The maximum delay between attempts in seconds
+        :param jitter: The maximum random jitter to add to each delay in seconds
+        :param retry_statuses: Individual status codes to retry (e.g. 429)
+        :param retry_status_classes: Classes of status codes to retry, by leading digit (e.g. 5 for 5xx)
+        :param unprocessed_statuses: Status codes which are safe to retry for non-idempotent requests
+        :param sleep: The function to use to wait between attempts
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_status_classes = frozenset(retry_status_classes)
+        self.unprocessed_statuses = frozenset(unprocessed_statuses)
+        self._sleep = sleep
+
+    # pylint:enable=too-many-arguments
+
+    def is_retryable(self, status_code: int, *, idempotent: bool) -> bool:
+        """Check if a response status should be retried.
+
+        :param status_code: The HTTP status code of the response
+        :param idempotent: Whether the request is safe to send more than once
+
+        :returns: True if the request should be retried, False otherwise
+        """
+        if status_code in self.unprocessed_statuses:
+            return True
+
+        if not idempotent:
+            return False
+
+        return status_code in self.retry_statuses or status_code // 100 in self.retry_status_classes
+
+    def compute_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Get the time to wait after a failed attempt.
+
+        :param attempt: The number of the attempt that failed, starting at 1
+        :param retry_after: The number of seconds the server asked us to wait (if any)
+
+        :returns: The number of seconds to wait before the next attempt
+        """
+        exponent = max(0, attempt - 1)
+        delay = min(self.max_delay, self.base_delay * 2**exponent + random.uniform(0, self.jitter))
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
+
+    def _wait(self, retry_state: tenacity.RetryCallState) -> float:
+        """Get the time to wait before the next attempt in a retry loop.
+
+        :param retry_state: The state of the retry loop
+
+        :returns: The number of seconds to wait
+        """
+        retry_after = None
+        outcome = retry_state.outcome
+
+        if outcome is not None and not outcome.failed:
+            headers = getattr(outcome.result(), "headers", None) or {}
+            retry_after = parse_retry_after(headers.get(RETRY_AFTER_HEADER))
+
+        return self.compute_delay(retry_state.attempt_number, retry_after)
+
+    def _pause(self, seconds: float) -> None:
+        """Wait between attempts, unless the next one would start after the deadline.
+
+        :param seconds: The number of seconds to wait
+        """
+        ensure_time_for(seconds, f"by waiting {seconds:.1f}s to retry")
+        self._sleep(seconds)
+
+    def send(
+        self,
+        send: Callable[[], requests.Response],
+        *,
+        should_retry: Callable[[requests.Response], bool],
+        idempotent: bool,
+        max_attempts: int | None = None,
+    ) -> requests.Response:
+        """Send a request, retrying it according to the policy.
+
+        Inside an operation run by `call`, the request is only sent once, and
+        the operation is retried as a whole instead.
+
+        :param send: The function which sends a single attempt
+        :param should_retry: Checks whether a response should be retried
+        :param idempotent: Whether the request is safe to send more than once. Dropped connections are only retried for idempotent requests.
+        :param max_attempts: Override the maximum number of attempts for this request
+
+        :returns: The final response. If every attempt failed, this is the last failure.
+        """
+        retry_condition: tenacity.retry_base = tenacity.retry_if_result(should_retry)
+
+        if idempotent:
+            retry_condition = retry_condition | tenacity.retry_if_exception_type(
+                (requests.ConnectionError, requests.Timeout)
+            )
+
+        retrying = tenacity.Retrying(
+            stop=tenacity.stop_after_attempt(
+                1 if _in_retried_operation.get() else max_attempts or self.max_attempts
+            ),
+            wait=self._wait,
+            retry=retry_condition,
+            sleep=self._pause,
+            retry_error_callback=lambda retry_state: retry_state.outcome.result(),  # type: ignore[union-attr]
+            reraise=True,
+        )
+
+        return retrying(send)
+
+    def call(
+        self,
+        function: Callable[[], ResultType],
+        *,
+        max_retries: int,
+        log: logging.Logger,
+        description: str,
+        idempotent: bool = True,
+    ) -> ResultType:
+        """Call an operation, retrying it as a whole on retryable errors.
+
+        This is for higher level operations made up of several requests. This
+        is the only retry layer for them: the requests the operation makes are
+        each sent once, so a failure is retried at most `max_retries` times.
+
+        An idempotent operation is written so that running it again picks up
+        where it left off (e.g. by checking for what an earlier attempt
+        created), so it is retried on server errors and dropped connections.
+        Any other operation is only retried when the server guarantees it did
+        not act on the request (e.g. 429).
+
+        :param function: The operation to run
+        :param max_retries: The maximum number of times to retry after the first attempt
+        :param log: The logger to report retries to
+        :param description: A description of the operation for the log
+        :param idempotent: Whether the operation is safe to run more than once
+
+        :returns: The result of the operation
+        """
+
+        def is_retryable_error(exception: BaseException) -> bool:
+            """Check if an error from the operation should be retried.
+
+            :param exception: The error raised by the operation
+
+            :returns: True if the operation should be retried, False otherwise
+            """
+            if isinstance(exception, (requests.ConnectionError, requests.Timeout)):
+                return idempotent
+
+            return isinstance(exception, AppStoreConnectError) and self.is_retryable(
+                exception.response.status_code, idempotent=idempotent
+            )
+
+        def attempt() -> ResultType:
+            """Run the operation once, without retrying the requests it makes.
+
+            :returns: The result of the operation
+            """
+            token = _in_retried_operation.set(True)
+
+            try:
+                return function()
+            finally:
+                _in_retried_operation.reset(token)
+
+        def log_retry(retry_state: tenacity.RetryCallState) -> None:
+            """Log that the operation is about to be retried.
+
+            :param retry_state: The state of the retry loop
+            """
+            delay = retry_state.next_action.sleep if retry_state.next_action else 0
+            log.info(
+                f"{description} failed due to server-side intermittent issue. Will sleep for "
+                f"{delay:.1f}s and try again, left attempt: "
+                f"{max_retries + 1 - retry_state.attempt_number}."
+            )
+
+        retrying = tenacity.Retrying(
+            stop=tenacity.stop_after_attempt(max(0, max_retries) + 1),
+            wait=self._wait,
+            retry=tenacity.retry_if_exception(is_retryable_error),
+            sleep=self._pause,
+            before_sleep=log_retry,
+            reraise=True,
+        )
+
+        return retrying(attempt)
@@ -4,13 +4,13 @@
 # Licensed under the MIT license.
 
 import logging
-from typing import Iterator
+from typing import Any, Iterable, Iterator, Literal, overload
 
-from asconnect.httpclient import HttpClient
+from asconnect.httpclient import MAX_PAGE_SIZE, HttpClient
 
 from asconnect.models import CustomerReview
 from asconnect.sorting import CustomerReviewSort
-from asconnect.utilities import update_query_parameters
+from asconnect.utilities import Fields, update_query_parameters
 
 
 class ReviewsClient:
@@ -34,13 +34,53 @@ class ReviewsClient:
         self.http_client = http_client
         self.log = log.getChild("reviews")
 
+    # pylint:disable=too-many-arguments
+    @overload
     def get_reviews(
         self,
         app_id: str,
         sort_order: CustomerReviewSort | None = None,
         territory_filter: list[str] | None = None,
         published_response: bool | None = None,
-    ) -> Iterator[CustomerReview]:
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[CustomerReview]: ...
+
+    @overload
+    def get_reviews(
+        self,
+        app_id: str,
+        sort_order: CustomerReviewSort | None = None,
+        territory_filter: list[str] | None = None,
+        published_response: bool | None = None,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_reviews(
+        self,
+        app_id: str,
+        sort_order: CustomerReviewSort | None = None,
+        territory_filter: list[str] | None = None,
+        published_response: bool | None = None,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: int = 0,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[CustomerReview | dict[str, Any]]:
         """Get customer reviews for an app.
 
         :param app_id: The app ID to get reviews for
@@ -49,6 +89,12 @@ class ReviewsClient:
         :param published_response: If set to True, only reviews with a published response will be
                                    returned. If set to False, only reviews without a published
                                    response will be returned. Defaults to None which returns all.
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param prefetch: The number of pages to fetch ahead while iterating (0 to disable)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["response"]
 
         :yields: An iterator of reviews
         """
@@ -72,4 +118,15 @@ class ReviewsClient:
 
         url = update_query_parameters(url, query_parameters)
 
-        yield from self.http_client.get(url=url, data_type=list[CustomerReview])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[CustomerReview],
+            page_size=page_size,
+            prefetch=prefetch,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
+
+    # pylint:enable=too-many-arguments
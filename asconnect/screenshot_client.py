@@ -3,14 +3,28 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import concurrent.futures
+import contextvars
+import hashlib
 import logging
+import mmap
 import os
-from typing import Iterator
+from typing import Any, Iterable, Iterator, Literal, Mapping, Sequence, overload
 
-from asconnect.exceptions import AppStoreConnectError
-from asconnect.httpclient import HttpClient
-from asconnect.models import AppScreenshotSet, AppScreenshot, ScreenshotDisplayType, UploadOperation
-from asconnect.utilities import md5_file
+from asconnect.deadline import deadline_scope
+from asconnect.exceptions import AppStoreConnectError, DeadlineExceededError, UploadError
+from asconnect.httpclient import MAX_PAGE_SIZE, HttpClient
+from asconnect.models import (
+    AppMediaAssetStateState,
+    AppScreenshot,
+    AppScreenshotSet,
+    ScreenshotDisplayType,
+    UploadOperation,
+)
+from asconnect.utilities import Fields, map_file, md5_files
+
+# The number of parts of a file to upload at once
+DEFAULT_UPLOAD_WORKERS = 4
 
 
 class ScreenshotClient:
@@ -34,14 +48,48 @@ class ScreenshotClient:
         self.http_client = http_client
         self.log = log.getChild("screenshot")
 
+    @overload
+    def get_sets(
+        self,
+        *,
+        localization_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppScreenshotSet]: ...
+
+    @overload
     def get_sets(
         self,
         *,
         localization_id: str,
-    ) -> Iterator[AppScreenshotSet]:
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_sets(
+        self,
+        *,
+        localization_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppScreenshotSet | dict[str, Any]]:
         """Get the screenshot sets for an app localization.
 
         :param localization_id: The localization ID to get the screenshot sets for
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["appScreenshots"]
 
         :returns: An iterator to ScreenshotSet
         """
@@ -49,7 +97,15 @@ class ScreenshotClient:
         url = self.http_client.generate_url(
             f"appStoreVersionLocalizations/{localization_id}/appScreenshotSets"
         )
-        yield from self.http_client.get(url=url, data_type=list[AppScreenshotSet])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[AppScreenshotSet],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
 
     def delete_set(self, *, screenshot_set_id: str, delete_all_screenshots: bool = True) -> None:
         """Delete a screenshot set.
@@ -71,20 +127,62 @@ class ScreenshotClient:
         if raw_response.status_code != 204:
             raise AppStoreConnectError(raw_response)
 
+    @overload
     def get_screenshots(
         self,
         *,
         screenshot_set_id: str,
-    ) -> Iterator[AppScreenshot]:
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppScreenshot]: ...
+
+    @overload
+    def get_screenshots(
+        self,
+        *,
+        screenshot_set_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_screenshots(
+        self,
+        *,
+        screenshot_set_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppScreenshot | dict[str, Any]]:
         """Get the screenshots for a set.
 
         :param screenshot_set_id: The screenshot set ID to get the screenshots for
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["appScreenshotSet"]
 
         :returns: An iterator to AppScreenshot
         """
         self.log.debug(f"Getting screenshots {screenshot_set_id}")
         url = self.http_client.generate_url(f"appScreenshotSets/{screenshot_set_id}/appScreenshots")
-        yield from self.http_client.get(url=url, data_type=list[AppScreenshot])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[AppScreenshot],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
 
     def delete_screenshot(self, *, screenshot_id: str) -> None:
         """Delete a screenshot.
@@ -200,28 +298,56 @@ class ScreenshotClient:
         )
 
     def _upload_screenshot_contents(
-        self, *, file_path: str, upload_operations: list[UploadOperation], use_auth_header: bool
-    ) -> None:
+        self,
+        *,
+        file_path: str,
+        upload_operations: list[UploadOperation],
+        use_auth_header: bool,
+        workers: int = DEFAULT_UPLOAD_WORKERS,
+        checksum: str | None = None,
+    ) -> str:
         """Upload a screenshots contents
 
+        The operations are independent, so up to `workers` of them are sent at
+        once. Each is retried on its own according to the client's retry
+        policy. Once one has failed for good, the ones which haven't started
+        yet are abandoned.
+
+        The file is memory mapped and each operation sends a view of its range,
+        so no part is copied into memory however large the file is. Unless the
+        checksum is already known, the file is hashed from the same mapping
+        while the parts are sent, so it is only read from disk once.
+
         :param file_path: The path to the screenshot to upload
         :param upload_operations: The upload operations for the screenshot
         :param use_auth_header: If this is true, an auth header will be included in the upload request
+        :param workers: The number of operations to send at once
+        :param checksum: The MD5 of the file, if it is already known
 
-        :raises AppStoreConnectError: On error when creating the set
+        :raises DeadlineExceededError: If the current deadline passed during the upload
+        :raises UploadError: If any of the operations failed, with the failures in order of offset
+
+        :returns: The MD5 of the file
         """
 
         self.log.debug(
             f"Uploading screenshot contents {file_path}: {upload_operations}, use auth header: {use_auth_header}"
         )
 
-        # Start by ordering the upload oeprations by offset (so we can just go in order)
+        # Start by ordering the upload operations by offset, so failures are reported in order
         upload_operations = sorted(upload_operations, key=lambda operation: operation.offset)
 
-        with open(file_path, "rb") as screenshot:
-            for operation in upload_operations:
-                data = screenshot.read(operation.length)
-                headers = {header.name: header.value for header in operation.request_headers}
+        def upload_part(contents: mmap.mmap | bytes, operation: UploadOperation) -> None:
+            """Upload a single part of the file.
+
+            :param contents: The contents of the file
+            :param operation: The upload operation for the part
+            """
+            start = operation.offset
+            headers = {header.name: header.value for header in operation.request_headers}
+
+            # The view must be released before the file can be unmapped
+            with memoryview(contents)[start : start + operation.length] as data:
                 raw_response = self.http_client.put_chunk(
                     url=operation.url,
                     additional_headers=headers,
@@ -229,8 +355,46 @@ class ScreenshotClient:
                     use_auth_header=use_auth_header,
                     log_response=True,
                 )
-                # TODO Check this
-                assert raw_response.ok
+
+            raw_response.raise_for_status()
+
+        with (
+            map_file(file_path) as contents,
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, min(workers, len(upload_operations))),
+                thread_name_prefix="asconnect-upload",
+            ) as executor,
+        ):
+            # Each part runs in its own copy of the context, so the deadline (if any) applies
+            futures = [
+                executor.submit(contextvars.copy_context().run, upload_part, contents, operation)
+                for operation in upload_operations
+            ]
+
+            # The hash releases the GIL, so this thread works it out while the
+            # parts are sent rather than taking a worker from them
+            if checksum is None:
+                checksum = hashlib.md5(contents).hexdigest()
+
+            concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_EXCEPTION)
+
+            for future in futures:
+                future.cancel()
+
+        failures = [
+            (operation.offset, error)
+            for operation, future in zip(upload_operations, futures)
+            if not future.cancelled() and (error := future.exception()) is not None
+        ]
+
+        if not failures:
+            return checksum
+
+        for _, error in failures:
+            if isinstance(error, DeadlineExceededError):
+                raise error
+
+        raise UploadError(file_path, failures) from failures[0][1]
 
     def _set_screenshot_uploaded(
         self, *, screenshot: AppScreenshot, file_hash: str
@@ -258,31 +422,228 @@ class ScreenshotClient:
         )
 
     def upload_screenshot(
-        self, *, file_path: str, screenshot_set_id: str, use_auth_header: bool = True
+        self,
+        *,
+        file_path: str,
+        screenshot_set_id: str,
+        use_auth_header: bool = True,
+        deadline: float | None = None,
+        upload_workers: int = DEFAULT_UPLOAD_WORKERS,
+        checksum: str | None = None,
     ) -> AppScreenshot:
         """Upload a screenshot
 
         :param file_path: The path to the screenshot to upload
         :param screenshot_set_id: The id for the screenshot set to upload to
         :param use_auth_header: If this is true, an auth header will be included in the upload request
+        :param deadline: The most seconds the whole upload may take, including every request and
+                         retry (no limit if None)
+        :param upload_workers: The number of parts of the file to upload at once
+        :param checksum: The MD5 of the file, if it is already known (e.g. from
+                         `asconnect.utilities.md5_files`). It is worked out during the upload otherwise.
+
+        :raises DeadlineExceededError: If the upload doesn't finish before the deadline
+        :raises UploadError: If any part of the file failed to upload
 
         :return: The screenshot
         """
 
         self.log.info(f"Uploading screenshot {file_path} to set {screenshot_set_id}")
 
-        checksum = md5_file(file_path)
+        with deadline_scope(deadline):
+            screenshot = self._create_screenshot_reservation(
+                file_path=file_path, screenshot_set_id=screenshot_set_id
+            )
 
-        screenshot = self._create_screenshot_reservation(
-            file_path=file_path, screenshot_set_id=screenshot_set_id
-        )
+            assert screenshot.attributes.upload_operations is not None
+
+            checksum = self._upload_screenshot_contents(
+                file_path=file_path,
+                upload_operations=screenshot.attributes.upload_operations,
+                use_auth_header=use_auth_header,
+                workers=upload_workers,
+                checksum=checksum,
+            )
+
+            return self._set_screenshot_uploaded(screenshot=screenshot, file_hash=checksum)
 
-        assert screenshot.attributes.upload_operations is not None
+    def reorder_screenshots(self, *, screenshot_set_id: str, screenshot_ids: list[str]) -> None:
+        """Set the order of the screenshots in a set.
 
-        self._upload_screenshot_contents(
-            file_path=file_path,
-            upload_operations=screenshot.attributes.upload_operations,
-            use_auth_header=use_auth_header,
+        :param screenshot_set_id: The ID of the screenshot set
+        :param screenshot_ids: The IDs of every screenshot in the set, in the order to show them
+        """
+
+        self.log.info(f"Reordering screenshots in set {screenshot_set_id}")
+
+        self.http_client.patch(
+            endpoint=f"appScreenshotSets/{screenshot_set_id}/relationships/appScreenshots",
+            data={
+                "data": [
+                    {"type": "appScreenshots", "id": screenshot_id}
+                    for screenshot_id in screenshot_ids
+                ]
+            },
+            data_type=None,
         )
 
-        return self._set_screenshot_uploaded(screenshot=screenshot, file_hash=checksum)
+    def sync_localization(
+        self,
+        *,
+        localization_id: str,
+        screenshots: Mapping[ScreenshotDisplayType, Sequence[str]],
+        delete_unmatched_sets: bool = False,
+        upload_workers: int = DEFAULT_UPLOAD_WORKERS,
+        deadline: float | None = None,
+    ) -> dict[ScreenshotDisplayType, list[AppScreenshot]]:
+        """Make the screenshots of a localization match a set of local files.
+
+        Unlike deleting every set and uploading everything again, only what
+        differs is changed. The existing sets and their screenshots are fetched
+        in one request, and a screenshot is kept if it has the same file name
+        and checksum as a local file and was processed successfully. The rest
+        are deleted, the missing files are uploaded, and the set is reordered
+        only if the order differs. A refresh where nothing changed only hashes
+        the local files (on a pool of threads) and makes that one request.
+
+        :param localization_id: The ID of the localization to sync
+        :param screenshots: The paths of the screenshots for each display type, in order
+        :param delete_unmatched_sets: Set to True to delete the sets for any other display types
+                                      (they are left alone otherwise)
+        :param upload_workers: The number of parts of each file to upload at once
+        :param deadline: The most seconds the whole sync may take, including every request and
+                         retry (no limit if None)
+
+        :raises DeadlineExceededError: If the sync doesn't finish before the deadline
+        :raises UploadError: If any part of a file failed to upload
+
+        :returns: The screenshots of each display type which was synced, in order
+        """
+
+        self.log.info(f"Syncing screenshots for localization {localization_id}")
+
+        with deadline_scope(deadline):
+            checksums = md5_files(path for paths in screenshots.values() for path in paths)
+            existing_sets = {
+                screenshot_set.attributes.screenshot_display_type: screenshot_set
+                for screenshot_set in self.get_sets(
+                    localization_id=localization_id, include=["appScreenshots"]
+                )
+            }
+
+            for display_type, screenshot_set in existing_sets.items():
+                if delete_unmatched_sets and display_type not in screenshots:
+                    self.delete_set(screenshot_set_id=screenshot_set.identifier)
+
+            synced = {}
+
+            for display_type, paths in screenshots.items():
+                existing_set = existing_sets.get(display_type)
+
+                if existing_set is None:
+                    screenshot_set = self.create_set(
+                        localization_id=localization_id, display_type=display_type
+                    )
+                    current = []
+                else:
+                    screenshot_set = existing_set
+                    current = self.http_client.get_related(
+                        resource=existing_set,
+                        relationship="appScreenshots",
+                        data_type=list[AppScreenshot],
+                    )
+
+                synced[display_type] = self._sync_set(
+                    screenshot_set_id=screenshot_set.identifier,
+                    current=current,
+                    paths=paths,
+                    checksums=checksums,
+                    upload_workers=upload_workers,
+                )
+
+            return synced
+
+    def _sync_set(
+        self,
+        *,
+        screenshot_set_id: str,
+        current: list[AppScreenshot],
+        paths: Sequence[str],
+        checksums: dict[str, str],
+        upload_workers: int,
+    ) -> list[AppScreenshot]:
+        """Make the screenshots in a set match a list of local files.
+
+        :param screenshot_set_id: The ID of the screenshot set
+        :param current: The screenshots in the set, in order
+        :param paths: The paths of the screenshots the set should have, in order
+        :param checksums: The MD5 of each of the files
+        :param upload_workers: The number of parts of each file to upload at once
+
+        :returns: The screenshots in the set, in order
+        """
+
+        wanted = _match_screenshots(current=current, paths=paths, checksums=checksums)
+        kept = {screenshot.identifier for screenshot in wanted if screenshot is not None}
+
+        # Delete first, since a set can only hold so many screenshots
+        for screenshot in current:
+            if screenshot.identifier not in kept:
+                self.log.info(f"Deleting screenshot {screenshot.attributes.file_name}")
+                self.delete_screenshot(screenshot_id=screenshot.identifier)
+
+        order = [screenshot.identifier for screenshot in current if screenshot.identifier in kept]
+        synced = []
+
+        for path, match in zip(paths, wanted):
+            if match is None:
+                match = self.upload_screenshot(
+                    file_path=path,
+                    screenshot_set_id=screenshot_set_id,
+                    upload_workers=upload_workers,
+                    checksum=checksums[path],
+                )
+                order.append(match.identifier)
+
+            synced.append(match)
+
+        if order != [screenshot.identifier for screenshot in synced]:
+            self.reorder_screenshots(
+                screenshot_set_id=screenshot_set_id,
+                screenshot_ids=[screenshot.identifier for screenshot in synced],
+            )
+
+        return synced
+
+
+def _match_screenshots(
+    *, current: list[AppScreenshot], paths: Sequence[str], checksums: dict[str, str]
+) -> list[AppScreenshot | None]:
+    """Find the existing screenshot which can be kept for each local file.
+
+    A screenshot matches a file if it has the same name and checksum, and
+    wasn't rejected when it was processed. Each screenshot matches at most one
+    file, so a file listed twice needs two screenshots.
+
+    :param current: The screenshots in the set, in order
+    :param paths: The paths of the screenshots the set should have, in order
+    :param checksums: The MD5 of each of the files
+
+    :returns: The screenshot to keep for each path, or None if it has to be uploaded
+    """
+
+    reusable: dict[tuple[str, str | None], list[AppScreenshot]] = {}
+
+    for screenshot in current:
+        state = screenshot.attributes.asset_delivery_state
+        if state is not None and state.state != AppMediaAssetStateState.FAILED:
+            key = (screenshot.attributes.file_name, screenshot.attributes.source_file_checksum)
+            reusable.setdefault(key, []).append(screenshot)
+
+    wanted: list[AppScreenshot | None] = []
+
+    for path in paths:
+        matches = reusable.get((os.path.basename(path), checksums[path]))
+        wanted.append(matches.pop(0) if matches else None)
+
+    return wanted
@@ -0,0 +1,621 @@
+"""A local stand-in for the App Store Connect API, for load and benchmark testing.
+
+The server keeps its resources in memory and serves them in the same JSON:API
+shapes as Apple, with paging, filters, sorting, sparse fieldsets and
+`include`. It covers the endpoints this library uses for apps, builds, app
+store versions, review submissions, screenshots (including their upload
+operations) and customer reviews, and accepts any other resource type
+generically.
+
+Latency, injected errors and the `X-Rate-Limit`/429 behaviour can all be
+configured, so concurrency, pacing, retries and pagination can be exercised
+without touching Apple.
+
+Use it in-process:
+
+    with StubServer(latency=0.05) as server:
+        server.store.populate(apps=1, builds=500)
+        client = asconnect.Client(..., base_url=server.url)
+
+or stand-alone with `python -m asconnect.stub_server --port 8080`.
+
+Any signed token is accepted. The rate limit is counted per key, using the
+key ID in the token's header.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import argparse
+import collections
+import http.server
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, Callable
+import urllib.parse
+
+import jwt
+
+from asconnect.metrics import endpoint_template
+from asconnect.stub_store import (
+    DEFAULT_UPLOAD_PART_SIZE,
+    UPLOAD_PATH,
+    Reference,
+    StubError,
+    StubStore,
+)
+from asconnect.utilities import update_query_parameters
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_RATE_LIMIT = 3600
+DEFAULT_RATE_LIMIT_WINDOW_SECONDS = 3600.0
+
+_API_PREFIX = "/v1/"
+
+
+class _Quota:
+    """The requests a key has made in the current rate limit window."""
+
+    __slots__ = ("window_start", "used")
+
+    window_start: float
+    used: int
+
+    def __init__(self, now: float) -> None:
+        """Start a new window.
+
+        :param now: The current time
+        """
+        self.window_start = now
+        self.used = 0
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """A local HTTP server which stands in for the App Store Connect API.
+
+    Point a client at `url` with `base_url=`. Use the server as a context
+    manager (or call `start()` and `stop()`) to run it on a background
+    thread. `requests` counts the requests received to each endpoint.
+
+    This class is thread safe.
+    """
+
+    daemon_threads = True
+
+    store: StubStore
+    latency: float
+    jitter: float
+    error_rate: float
+    error_status: int
+    rate_limit: int | None
+    rate_limit_window: float
+    default_page_size: int
+    requests: collections.Counter[tuple[str, str]]
+    _quotas: dict[str, _Quota]
+    _failures: list[tuple[int, str | None]]
+    _random: random.Random
+    _lock: threading.Lock
+    _thread: threading.Thread | None
+    _clock: Callable[[], float]
+
+    # pylint:disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        rate_limit: int | None = DEFAULT_RATE_LIMIT,
+        rate_limit_window: float = DEFAULT_RATE_LIMIT_WINDOW_SECONDS,
+        default_page_size: int = DEFAULT_PAGE_SIZE,
+        upload_part_size: int = DEFAULT_UPLOAD_PART_SIZE,
+        seed: int | None = None,
+    ) -> None:
+        """Create a new server, listening but not yet serving.
+
+        :param host: The address to listen on
+        :param port: The port to listen on (a free one if 0)
+        :param latency: The number of seconds to wait before answering each request
+        :param jitter: The most the latency varies by either way, at random
+        :param error_rate: The fraction of requests to fail with `error_status`, at random
+        :param error_status: The status code of the injected errors
+        :param rate_limit: The number of requests each key may make per window (unlimited if None)
+        :param rate_limit_window: The length of the rate limit window in seconds
+        :param default_page_size: The page size of listings which don't set a `limit`
+        :param upload_part_size: The size of each part of a screenshot upload
+        :param seed: The seed for the latency jitter and the injected errors
+        """
+        super().__init__((host, port), _StubHandler)
+        self.store = StubStore(
+            f"http://{host}:{self.server_address[1]}", upload_part_size=upload_part_size
+        )
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.default_page_size = default_page_size
+        self.requests = collections.Counter()
+        self._quotas = {}
+        self._failures = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._clock = time.monotonic
+
+    # pylint:enable=too-many-arguments
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the API, to pass as a client's `base_url`.
+
+        :returns: The base URL
+        """
+        return f"{self.store.base_url}/v1"
+
+    def fail_next(self, status: int = 500, count: int = 1, *, method: str | None = None) -> None:
+        """Fail the next requests.
+
+        :param status: The status code to fail them with
+        :param count: The number of requests to fail
+        :param method: Only fail requests with this HTTP verb, e.g. "PUT" for uploads (any if None)
+        """
+        with self._lock:
+            self._failures.extend([(status, method)] * count)
+
+    def start(self) -> "StubServer":
+        """Serve requests on a background thread.
+
+        :returns: The server
+        """
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="asconnect-stub-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving requests and close the socket."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self.server_close()
+
+    def __enter__(self) -> "StubServer":
+        """Start serving requests on a background thread.
+
+        :returns: The server
+        """
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop serving requests.
+
+        :param args: The exception details, if any
+        """
+        self.stop()
+
+    def admit(
+        self, method: str, path: str, key_id: str | None
+    ) -> tuple[int | None, dict[str, str]]:
+        """Decide whether to answer a request, and with which rate limit headers.
+
+        :param method: The HTTP verb
+        :param path: The path of the request
+        :param key_id: The key the request was signed with, or None for uploads
+
+        :returns: The status to fail the request with (None to answer it) and the headers to send
+        """
+        with self._lock:
+            self.requests[(method, endpoint_template(f"{self.store.base_url}{path}"))] += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failure = None
+
+            for index, (status, failing_method) in enumerate(self._failures):
+                if failing_method in (None, method):
+                    failure = status
+                    del self._failures[index]
+                    break
+
+            if failure is None and self.error_rate > 0 and self._random.random() < self.error_rate:
+                failure = self.error_status
+
+            headers = {}
+
+            if key_id is not None and self.rate_limit is not None:
+                now = self._clock()
+                quota = self._quotas.get(key_id)
+
+                if quota is None or now - quota.window_start >= self.rate_limit_window:
+                    quota = _Quota(now)
+                    self._quotas[key_id] = quota
+
+                if quota.used >= self.rate_limit:
+                    retry_after = quota.window_start + self.rate_limit_window - now
+                    headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                    failure = 429
+                elif failure is None:
+                    quota.used += 1
+
+                remaining = self.rate_limit - quota.used
+                headers["X-Rate-Limit"] = (
+                    f"user-hour-lim:{self.rate_limit};user-hour-rem:{remaining};"
+                )
+
+        if delay > 0:
+            time.sleep(delay)
+
+        return failure, headers
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    """Handles the requests to a stub server."""
+
+    protocol_version = "HTTP/1.1"
+    server: StubServer
+
+    def log_message(self, *_: Any) -> None:  # pylint: disable=arguments-differ,missing-param-doc
+        """Don't log the requests."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a GET."""
+        self._handle("GET")
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Handle a POST."""
+        self._handle("POST")
+
+    def do_PATCH(self) -> None:  # pylint: disable=invalid-name
+        """Handle a PATCH."""
+        self._handle("PATCH")
+
+    def do_DELETE(self) -> None:  # pylint: disable=invalid-name
+        """Handle a DELETE."""
+        self._handle("DELETE")
+
+    def do_PUT(self) -> None:  # pylint: disable=invalid-name
+        """Handle a PUT."""
+        self._handle("PUT")
+
+    def _respond(
+        self, status: int, body: Any = None, headers: dict[str, str] | None = None
+    ) -> None:
+        """Send a response.
+
+        :param status: The status code
+        :param body: The JSON to send, if any
+        :param headers: Any other headers to send
+        """
+        content = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _key_id(self) -> str:
+        """Get the key the request was signed with.
+
+        :raises StubError: If the request doesn't have a token
+
+        :returns: The key ID
+        """
+        authorization = self.headers.get("Authorization", "")
+
+        if not authorization.startswith("Bearer "):
+            raise StubError(
+                401, "NOT_AUTHORIZED", "Provide a properly configured and signed bearer token"
+            )
+
+        try:
+            header = jwt.get_unverified_header(authorization[len("Bearer ") :])
+        except jwt.InvalidTokenError as ex:
+            raise StubError(401, "NOT_AUTHORIZED", f"The token is malformed: {ex}") from ex
+
+        return str(header.get("kid", ""))
+
+    def _body(self) -> bytes:
+        """Read the body of the request.
+
+        :returns: The body
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _handle(self, method: str) -> None:
+        """Answer a request.
+
+        :param method: The HTTP verb
+        """
+        parts = urllib.parse.urlsplit(self.path)
+        headers: dict[str, str] = {}
+        body = self._body()
+
+        try:
+            is_upload = parts.path.startswith(UPLOAD_PATH)
+            key_id = None if is_upload else self._key_id()
+            failure, headers = self.server.admit(method, parts.path, key_id)
+
+            if failure is not None:
+                raise StubError(
+                    failure,
+                    "STUB_INJECTED_ERROR",
+                    f"The stub server failed the request with {failure}",
+                )
+
+            if is_upload:
+                identifier, part = parts.path[len(UPLOAD_PATH) :].split("/")
+                self.server.store.upload(identifier, int(part), body)
+                self._respond(200, None, headers)
+                return
+
+            if not parts.path.startswith(_API_PREFIX):
+                raise StubError(404, "NOT_FOUND", f"The path {parts.path} is not part of the API")
+
+            status, response = self._route(
+                method,
+                [segment for segment in parts.path[len(_API_PREFIX) :].split("/") if segment],
+                urllib.parse.parse_qs(parts.query, keep_blank_values=True),
+                json.loads(body) if body else None,
+            )
+            self._respond(status, response, headers)
+        except StubError as ex:
+            self._respond(ex.status, ex.body(), headers)
+        except (KeyError, ValueError, TypeError) as ex:
+            error = StubError(400, "PARAMETER_ERROR.INVALID", f"The request is invalid: {ex}")
+            self._respond(400, error.body(), headers)
+
+    # pylint:disable=too-many-return-statements
+    def _route(
+        self, method: str, segments: list[str], query: dict[str, list[str]], body: Any
+    ) -> tuple[int, Any]:
+        """Answer an API request.
+
+        :param method: The HTTP verb
+        :param segments: The segments of the path after `/v1/`
+        :param query: The parsed query string
+        :param body: The JSON body, if any
+
+        :raises StubError: If the request can't be answered
+
+        :returns: The status code and the JSON body (if any) of the response
+        """
+        store = self.server.store
+        url = f"{store.base_url}{self.path}"
+
+        if len(segments) == 1 and method == "GET":
+            return 200, self._listing(store.all(segments[0]), query, url)
+
+        if len(segments) == 1 and method == "POST":
+            data = body["data"]
+            relationships = {
+                name: value.get("data") for name, value in data.get("relationships", {}).items()
+            }
+            identifier = store.create(segments[0], data.get("attributes"), relationships)
+            return 201, {"data": store.render((segments[0], identifier)), "links": {"self": url}}
+
+        if len(segments) == 2 and method == "GET":
+            reference = (segments[0], segments[1])
+            return 200, self._document(reference, query, url)
+
+        if len(segments) == 2 and method == "PATCH":
+            data = body["data"]
+            relationships = {
+                name: value.get("data") for name, value in data.get("relationships", {}).items()
+            }
+            store.update(segments[0], segments[1], data.get("attributes"), relationships)
+            return 200, {"data": store.render((segments[0], segments[1])), "links": {"self": url}}
+
+        if len(segments) == 2 and method == "DELETE":
+            store.delete(segments[0], segments[1])
+            return 204, None
+
+        if len(segments) == 3 and method == "GET":
+            related = store.related(segments[0], segments[1], segments[2])
+
+            if isinstance(related, list):
+                return 200, self._listing(related, query, url)
+
+            if related is None:
+                return 200, {"data": None, "links": {"self": url}}
+
+            return 200, self._document(related, query, url)
+
+        if len(segments) == 4 and segments[2] == "relationships" and method == "PATCH":
+            store.set_linkage(segments[0], segments[1], segments[3], body["data"])
+            return 204, None
+
+        if len(segments) == 4 and segments[2] == "relationships" and method == "GET":
+            related = store.related(segments[0], segments[1], segments[3])
+
+            if isinstance(related, list):
+                linkage: Any = [{"type": item[0], "id": item[1]} for item in related]
+            else:
+                linkage = {"type": related[0], "id": related[1]} if related else None
+
+            return 200, {"data": linkage, "links": {"self": url}}
+
+        raise StubError(405, "METHOD_NOT_ALLOWED", f"{method} is not allowed on {self.path}")
+
+    # pylint:enable=too-many-return-statements
+
+    def _document(self, reference: Reference, query: dict[str, list[str]], url: str) -> Any:
+        """Build the response for a single resource.
+
+        :param reference: The resource
+        :param query: The parsed query string
+        :param url: The URL of the request
+
+        :returns: The JSON of the response
+        """
+        fields, include = _options(query)
+        document: dict[str, Any] = {
+            "data": self.server.store.render(reference, fields=fields, include=include),
+            "links": {"self": url},
+        }
+
+        if include:
+            document["included"] = _included(self.server.store, [reference], include, fields)
+
+        return document
+
+    def _listing(self, references: list[Reference], query: dict[str, list[str]], url: str) -> Any:
+        """Build the response for a page of a listing.
+
+        :param references: The resources in the listing
+        :param query: The parsed query string
+        :param url: The URL of the request
+
+        :raises StubError: If the page size is out of range
+
+        :returns: The JSON of the response
+        """
+        store = self.server.store
+        references = store.query(references, query)
+        limit = int(query.get("limit", [str(self.server.default_page_size)])[0])
+
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise StubError(400, "PARAMETER_ERROR.INVALID", f"'{limit}' is not a valid limit")
+
+        offset = int(query.get("cursor", ["0"])[0])
+        page = references[offset : offset + limit]
+        fields, include = _options(query)
+        links = {"self": url}
+
+        if offset + limit < len(references):
+            links["next"] = update_query_parameters(url, {"cursor": str(offset + limit)})
+
+        document: dict[str, Any] = {
+            "data": [store.render(reference, fields=fields, include=include) for reference in page],
+            "links": links,
+            "meta": {"paging": {"total": len(references), "limit": limit}},
+        }
+
+        if include:
+            document["included"] = _included(store, page, include, fields)
+
+        return document
+
+
+def _options(query: dict[str, list[str]]) -> tuple[dict[str, set[str]], list[str]]:
+    """Get the sparse fieldsets and the relationships to include from a query.
+
+    :param query: The parsed query string
+
+    :returns: The fields for each type, and the relationships to include
+    """
+    fields = {
+        name[len("fields[") : -1]: set(values[0].split(","))
+        for name, values in query.items()
+        if name.startswith("fields[") and name.endswith("]")
+    }
+    include = [name for name in query.get("include", [""])[0].split(",") if name]
+    return fields, include
+
+
+def _included(
+    store: StubStore, references: list[Reference], include: list[str], fields: dict[str, set[str]]
+) -> list[dict[str, Any]]:
+    """Render the resources included with a response.
+
+    :param store: The store of resources
+    :param references: The primary resources of the response
+    :param include: The relationships to include
+    :param fields: The fields for each type
+
+    :returns: The JSON of each related resource, once each
+    """
+    seen = set(references)
+    included = []
+
+    for reference in references:
+        for name in include:
+            related = store.related(reference[0], reference[1], name)
+            related_list = related if isinstance(related, list) else [related] if related else []
+
+            for item in related_list:
+                if item not in seen:
+                    seen.add(item)
+                    included.append(store.render(item, fields=fields))
+
+    return included
+
+
+def main() -> None:
+    """Run a stub server until interrupted."""
+    parser = argparse.ArgumentParser(
+        description="Run a local stand-in for the App Store Connect API."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="The address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="The port to listen on")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds to wait before each response"
+    )
+    parser.add_argument("--jitter", type=float, default=0.0, help="The most the latency varies by")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="The fraction of requests to fail"
+    )
+    parser.add_argument(
+        "--error-status", type=int, default=500, help="The status of injected errors"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=DEFAULT_RATE_LIMIT,
+        help="Requests per key per window (0 for none)",
+    )
+    parser.add_argument(
+        "--rate-limit-window",
+        type=float,
+        default=DEFAULT_RATE_LIMIT_WINDOW_SECONDS,
+        help="Window in seconds",
+    )
+    parser.add_argument("--apps", type=int, default=1, help="The number of apps to create")
+    parser.add_argument("--builds", type=int, default=0, help="The number of builds per app")
+    parser.add_argument(
+        "--reviews", type=int, default=0, help="The number of customer reviews per app"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="The seed for the jitter and errors")
+    args = parser.parse_args()
+
+    server = StubServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        rate_limit=args.rate_limit or None,
+        rate_limit_window=args.rate_limit_window,
+        seed=args.seed,
+    )
+    server.store.populate(apps=args.apps, builds=args.builds, reviews=args.reviews)
+
+    print(f"Serving a stand-in for the App Store Connect API at {server.url}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,735 @@
+"""The resources behind the stand-in App Store Connect server in `asconnect.stub_server`."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import collections
+import copy
+import datetime
+import functools
+import hashlib
+import json
+import math
+import threading
+from typing import Any
+
+
+DEFAULT_UPLOAD_PART_SIZE = 4 * 1024 * 1024
+
+# The path the parts of uploads are sent to
+UPLOAD_PATH = "/upload/"
+
+# Relationships whose names don't follow from the type of resource they point at
+_RELATIONSHIP_TYPES = {"items": "reviewSubmissionItems"}
+
+Reference = tuple[str, str]
+
+
+def _related_type(relationship: str) -> str:
+    """Get the type of resource a relationship points at.
+
+    :param relationship: The name of the relationship, e.g. "app" or "builds"
+
+    :returns: The type, e.g. "apps" or "builds"
+    """
+    if relationship in _RELATIONSHIP_TYPES:
+        return _RELATIONSHIP_TYPES[relationship]
+
+    return relationship if relationship.endswith("s") else f"{relationship}s"
+
+
+def _is_to_many(relationship: str) -> bool:
+    """Check if a relationship points at a list of resources.
+
+    :param relationship: The name of the relationship
+
+    :returns: True for to-many relationships (plural names), False for to-one
+    """
+    return relationship.endswith("s")
+
+
+def _timestamp(offset: datetime.timedelta = datetime.timedelta()) -> str:
+    """Format a time the way the API does.
+
+    :param offset: How far from now the time is
+
+    :returns: The time in ISO 8601 format
+    """
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    return (now + offset).isoformat()
+
+
+def _query_value(value: Any) -> str:
+    """Format an attribute the way it would appear in a filter.
+
+    :param value: The attribute value
+
+    :returns: The value as a string
+    """
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+class StubError(Exception):
+    """An error for the stub server to respond with."""
+
+    status: int
+    code: str
+    detail: str
+
+    def __init__(self, status: int, code: str, detail: str) -> None:
+        """Create a new error.
+
+        :param status: The HTTP status code
+        :param code: The API error code, e.g. "NOT_FOUND"
+        :param detail: A description of the error
+        """
+        self.status = status
+        self.code = code
+        self.detail = detail
+        super().__init__(f"[{status}] {code}: {detail}")
+
+    def body(self) -> dict[str, Any]:
+        """Get the JSON body of the error response.
+
+        :returns: The body
+        """
+        return {
+            "errors": [
+                {
+                    "id": str(id(self)),
+                    "status": str(self.status),
+                    "code": self.code,
+                    "title": self.code.replace("_", " ").title(),
+                    "detail": self.detail,
+                }
+            ]
+        }
+
+
+class StubStore:
+    """The resources served by a stub server.
+
+    Each resource is stored as its attributes and the linkage of any
+    relationships that were set on it. To-many relationships which weren't
+    set explicitly are found by looking for resources which point back at
+    the parent (e.g. the builds of an app are the builds whose `app` is it).
+
+    This class is thread safe.
+    """
+
+    base_url: str
+    upload_part_size: int
+    _resources: dict[str, dict[str, dict[str, Any]]]
+    _uploads: dict[str, dict[int, bytes]]
+    _next_id: int
+    _lock: threading.RLock
+
+    def __init__(self, base_url: str, *, upload_part_size: int = DEFAULT_UPLOAD_PART_SIZE) -> None:
+        """Create an empty store.
+
+        :param base_url: The base URL of the server, without the `/v1`
+        :param upload_part_size: The size of each part of an upload
+        """
+        self.base_url = base_url
+        self.upload_part_size = upload_part_size
+        self._resources = collections.defaultdict(dict)
+        self._uploads = {}
+        self._next_id = 1
+        self._lock = threading.RLock()
+
+    def all(self, resource_type: str) -> list[Reference]:
+        """Get every resource of a type.
+
+        :param resource_type: The type
+
+        :returns: The references to the resources, in the order they were created
+        """
+        with self._lock:
+            return [
+                (resource_type, identifier) for identifier in self._resources.get(resource_type, {})
+            ]
+
+    def count(self, resource_type: str) -> int:
+        """Get the number of resources of a type.
+
+        :param resource_type: The type
+
+        :returns: The number of resources
+        """
+        with self._lock:
+            return len(self._resources.get(resource_type, {}))
+
+    def get(self, resource_type: str, identifier: str) -> dict[str, Any]:
+        """Get a copy of a stored resource.
+
+        :param resource_type: The type of the resource
+        :param identifier: The ID of the resource
+
+        :raises StubError: If there is no such resource
+
+        :returns: The attributes and relationships of the resource
+        """
+        with self._lock:
+            resource = self._resources.get(resource_type, {}).get(identifier)
+
+            if resource is None:
+                raise StubError(
+                    404,
+                    "NOT_FOUND",
+                    f"There is no resource of type '{resource_type}' with id '{identifier}'",
+                )
+
+            return copy.deepcopy(resource)
+
+    def create(
+        self,
+        resource_type: str,
+        attributes: dict[str, Any] | None = None,
+        relationships: dict[str, Any] | None = None,
+    ) -> str:
+        """Create a resource.
+
+        :param resource_type: The type of the resource
+        :param attributes: The attributes of the resource. Defaults are filled in for known types.
+        :param relationships: The linkage of each relationship
+
+        :returns: The ID of the new resource
+        """
+        with self._lock:
+            identifier = str(self._next_id)
+            self._next_id += 1
+
+            resource = {
+                "attributes": dict(attributes or {}),
+                "relationships": dict(relationships or {}),
+            }
+
+            self._before_create(resource_type, identifier, resource)
+            self._resources[resource_type][identifier] = resource
+
+            # Keep explicitly ordered parents in step with their new children
+            for linkage in resource["relationships"].values():
+                if isinstance(linkage, dict):
+                    parent = self._resources.get(linkage["type"], {}).get(linkage["id"])
+                    ordered = (parent or {}).get("relationships", {}).get(resource_type)
+
+                    if isinstance(ordered, list):
+                        ordered.append({"type": resource_type, "id": identifier})
+
+            return identifier
+
+    def _before_create(self, resource_type: str, identifier: str, resource: dict[str, Any]) -> None:
+        """Apply the rules and defaults for a new resource. The lock must be held.
+
+        :param resource_type: The type of the resource
+        :param identifier: The ID the resource will have
+        :param resource: The attributes and relationships of the resource
+
+        :raises StubError: If the resource would conflict with an existing one
+        """
+        attributes = resource["attributes"]
+        app = resource["relationships"].get("app")
+
+        if resource_type == "reviewSubmissions":
+            for other in self._resources["reviewSubmissions"].values():
+                if (
+                    other["relationships"].get("app") == app
+                    and other["attributes"].get("platform") == attributes.get("platform")
+                    and other["attributes"].get("state") != "COMPLETE"
+                ):
+                    raise StubError(
+                        409, "ENTITY_ERROR", "There is already an open review submission"
+                    )
+
+            attributes.setdefault("state", "READY_FOR_REVIEW")
+
+        elif resource_type == "appStoreVersions":
+            for other in self._resources["appStoreVersions"].values():
+                if (
+                    other["relationships"].get("app") == app
+                    and other["attributes"].get("platform") == attributes.get("platform")
+                    and other["attributes"].get("versionString") == attributes.get("versionString")
+                ):
+                    raise StubError(409, "ENTITY_ERROR.DUPLICATE", "The version already exists")
+
+            for name, value in {
+                "platform": "IOS",
+                "appStoreState": "PREPARE_FOR_SUBMISSION",
+                "copyright": "2024 Example",
+                "earliestReleaseDate": None,
+                "releaseType": "MANUAL",
+                "usesIdfa": None,
+                "createdDate": _timestamp(),
+                "downloadable": False,
+            }.items():
+                attributes.setdefault(name, value)
+
+        elif resource_type == "appScreenshots":
+            file_size = int(attributes.get("fileSize") or 0)
+            part_count = max(1, math.ceil(file_size / self.upload_part_size))
+            attributes.update(
+                {
+                    "assetDeliveryState": {
+                        "errors": [],
+                        "state": "AWAITING_UPLOAD",
+                        "warnings": None,
+                    },
+                    "assetToken": f"stub/{identifier}",
+                    "assetType": "SCREENSHOT",
+                    "imageAsset": None,
+                    "sourceFileChecksum": None,
+                    "uploaded": False,
+                    "uploadOperations": [
+                        {
+                            "method": "PUT",
+                            "url": f"{self.base_url}{UPLOAD_PATH}{identifier}/{part}",
+                            "offset": part * self.upload_part_size,
+                            "length": min(
+                                self.upload_part_size, file_size - part * self.upload_part_size
+                            ),
+                            "requestHeaders": [{"name": "Content-Type", "value": "image/png"}],
+                        }
+                        for part in range(part_count)
+                    ],
+                }
+            )
+            self._uploads[identifier] = {}
+
+    def update(
+        self,
+        resource_type: str,
+        identifier: str,
+        attributes: dict[str, Any] | None = None,
+        relationships: dict[str, Any] | None = None,
+    ) -> None:
+        """Update a resource.
+
+        :param resource_type: The type of the resource
+        :param identifier: The ID of the resource
+        :param attributes: The attributes to change
+        :param relationships: The linkage of the relationships to change
+
+        :raises StubError: If there is no such resource
+        """
+        with self._lock:
+            resource = self._resources.get(resource_type, {}).get(identifier)
+
+            if resource is None:
+                raise StubError(404, "NOT_FOUND", f"There is no resource with id '{identifier}'")
+
+            resource["attributes"].update(attributes or {})
+            resource["relationships"].update(relationships or {})
+            self._after_update(resource_type, identifier, resource)
+
+    def _after_update(self, resource_type: str, identifier: str, resource: dict[str, Any]) -> None:
+        """Apply the state transitions caused by an update. The lock must be held.
+
+        :param resource_type: The type of the resource
+        :param identifier: The ID of the resource
+        :param resource: The attributes and relationships of the resource
+        """
+        attributes = resource["attributes"]
+
+        if resource_type == "reviewSubmissions":
+            if attributes.pop("submitted", False):
+                attributes["state"] = "WAITING_FOR_REVIEW"
+
+                for item in self._resources["reviewSubmissionItems"].values():
+                    if item["relationships"].get("reviewSubmission", {}).get("id") != identifier:
+                        continue
+
+                    version = item["relationships"].get("appStoreVersion")
+
+                    if version is not None and version["id"] in self._resources["appStoreVersions"]:
+                        version_attributes = self._resources["appStoreVersions"][version["id"]][
+                            "attributes"
+                        ]
+                        version_attributes["appStoreState"] = "WAITING_FOR_REVIEW"
+
+            if attributes.pop("canceled", False):
+                attributes["state"] = "COMPLETE"
+
+        elif resource_type == "appScreenshots" and attributes.get("uploaded"):
+            parts = self._uploads.get(identifier, {})
+            contents = b"".join(parts[part] for part in sorted(parts))
+            checksum = attributes.get("sourceFileChecksum")
+
+            if checksum is None or checksum == hashlib.md5(contents).hexdigest():
+                state: dict[str, Any] = {"errors": [], "state": "COMPLETE", "warnings": None}
+                attributes["imageAsset"] = {
+                    "templateUrl": f"{self.base_url}/assets/{identifier}/{{w}}x{{h}}bb.{{f}}",
+                    "width": 1242,
+                    "height": 2688,
+                }
+            else:
+                error = {
+                    "code": "IMAGE_INCORRECT_CHECKSUM",
+                    "description": "The checksum doesn't match",
+                }
+                state = {"errors": [error], "state": "FAILED", "warnings": None}
+
+            attributes["assetDeliveryState"] = state
+            attributes["uploadOperations"] = None
+
+    def delete(self, resource_type: str, identifier: str) -> None:
+        """Delete a resource, and remove it from any ordered relationships.
+
+        Deleting a screenshot set deletes its screenshots too.
+
+        :param resource_type: The type of the resource
+        :param identifier: The ID of the resource
+
+        :raises StubError: If there is no such resource
+        """
+        with self._lock:
+            if self._resources.get(resource_type, {}).pop(identifier, None) is None:
+                raise StubError(404, "NOT_FOUND", f"There is no resource with id '{identifier}'")
+
+            self._uploads.pop(identifier, None)
+            reference = {"type": resource_type, "id": identifier}
+
+            for resources in self._resources.values():
+                for resource in resources.values():
+                    for name, linkage in resource["relationships"].items():
+                        if isinstance(linkage, list) and reference in linkage:
+                            linkage.remove(reference)
+                        elif linkage == reference:
+                            resource["relationships"][name] = None
+
+            if resource_type == "appScreenshotSets":
+                for child in self._children(resource_type, identifier, "appScreenshots"):
+                    self._resources["appScreenshots"].pop(child[1], None)
+                    self._uploads.pop(child[1], None)
+
+    def upload(self, identifier: str, part: int, contents: bytes) -> None:
+        """Receive a part of an upload.
+
+        :param identifier: The ID of the screenshot the upload is for
+        :param part: The index of the upload operation
+        :param contents: The uploaded bytes
+
+        :raises StubError: If there is no such upload operation, or the length is wrong
+        """
+        with self._lock:
+            resource = self._resources["appScreenshots"].get(identifier)
+            operations = (resource or {}).get("attributes", {}).get("uploadOperations") or []
+
+            if part >= len(operations):
+                raise StubError(
+                    404, "NOT_FOUND", f"There is no upload operation {identifier}/{part}"
+                )
+
+            if len(contents) != operations[part]["length"]:
+                raise StubError(
+                    400, "UPLOAD_LENGTH_MISMATCH", f"Expected {operations[part]['length']} bytes"
+                )
+
+            self._uploads[identifier][part] = contents
+
+    def set_linkage(
+        self, resource_type: str, identifier: str, relationship: str, linkage: Any
+    ) -> None:
+        """Replace the linkage of a relationship, e.g. to reorder a to-many relationship.
+
+        :param resource_type: The type of the resource
+        :param identifier: The ID of the resource
+        :param relationship: The name of the relationship
+        :param linkage: The new linkage
+
+        :raises StubError: If there is no such resource, or a to-many relationship would gain or lose members
+        """
+        with self._lock:
+            self.get(resource_type, identifier)
+
+            if isinstance(linkage, list):
+                current = self._children(resource_type, identifier, relationship)
+
+                if sorted(current) != sorted((item["type"], item["id"]) for item in linkage):
+                    raise StubError(
+                        409, "ENTITY_ERROR.RELATIONSHIP.INVALID", "The members don't match"
+                    )
+
+            self._resources[resource_type][identifier]["relationships"][relationship] = linkage
+
+    def related(self, resource_type: str, identifier: str, relationship: str) -> Any:
+        """Get the resources a relationship points at.
+
+        :param resource_type: The type of the resource
+        :param identifier: The ID of the resource
+        :param relationship: The name of the relationship
+
+        :returns: A list of references for a to-many relationship, otherwise a reference or None
+        """
+        with self._lock:
+            if _is_to_many(relationship):
+                return self._children(resource_type, identifier, relationship)
+
+            linkage = self.get(resource_type, identifier)["relationships"].get(relationship)
+
+            if isinstance(linkage, dict) and linkage["id"] in self._resources[linkage["type"]]:
+                return (linkage["type"], linkage["id"])
+
+            # The child may point at the parent instead (e.g. a version's review details)
+            children = self._children(resource_type, identifier, relationship)
+            return children[0] if children else None
+
+    def _children(self, resource_type: str, identifier: str, relationship: str) -> list[Reference]:
+        """Get the resources a to-many relationship points at. The lock must be held.
+
+        :param resource_type: The type of the parent resource
+        :param identifier: The ID of the parent resource
+        :param relationship: The name of the relationship
+
+        :returns: The references to the related resources, in order
+        """
+        parent = self._resources.get(resource_type, {}).get(identifier)
+        explicit = (parent or {}).get("relationships", {}).get(relationship)
+
+        if isinstance(explicit, list):
+            return [(item["type"], item["id"]) for item in explicit]
+
+        target_type = _related_type(relationship)
+        reference = {"type": resource_type, "id": identifier}
+
+        return [
+            (target_type, child_id)
+            for child_id, child in self._resources.get(target_type, {}).items()
+            if reference in child["relationships"].values()
+        ]
+
+    def query(self, references: list[Reference], query: dict[str, list[str]]) -> list[Reference]:
+        """Filter and sort resources.
+
+        :param references: The resources to filter and sort
+        :param query: The parsed query string, with `filter[...]` and `sort` parameters
+
+        :returns: The matching resources, in order
+        """
+        with self._lock:
+            for name, values in query.items():
+                if name.startswith("filter[") and name.endswith("]"):
+                    accepted = {value for item in values for value in item.split(",")}
+                    references = [
+                        reference
+                        for reference in references
+                        if self._matches(reference, name[len("filter[") : -1], accepted)
+                    ]
+
+            sort_fields = query.get("sort", [""])[0].split(",")
+
+            for field in reversed([field for field in sort_fields if field]):
+                name = field.lstrip("-")
+                present = [
+                    reference
+                    for reference in references
+                    if self._value(reference, name) is not None
+                ]
+                missing = [
+                    reference for reference in references if self._value(reference, name) is None
+                ]
+                present.sort(
+                    key=functools.partial(self._value, path=name),
+                    reverse=field.startswith("-"),
+                )
+                references = present + missing
+
+            return references
+
+    def _value(self, reference: Reference, path: str) -> Any:
+        """Get an attribute of a resource, following to-one relationships. The lock must be held.
+
+        :param reference: The resource
+        :param path: The attribute, e.g. "version" or "preReleaseVersion.version"
+
+        :returns: The value, or None if there isn't one
+        """
+        resource = self._resources.get(reference[0], {}).get(reference[1])
+
+        if resource is None:
+            return None
+
+        if "." in path:
+            relationship, rest = path.split(".", 1)
+            target = self.related(reference[0], reference[1], relationship)
+            return self._value(target, rest) if isinstance(target, tuple) else None
+
+        return resource["attributes"].get(path)
+
+    def _matches(self, reference: Reference, name: str, accepted: set[str]) -> bool:
+        """Check if a resource matches a filter. The lock must be held.
+
+        :param reference: The resource
+        :param name: The name of the filter, e.g. "app", "version" or "preReleaseVersion.version"
+        :param accepted: The values the filter accepts
+
+        :returns: True if the resource matches, False otherwise
+        """
+        if name == "id":
+            return reference[1] in accepted
+
+        resource = self._resources[reference[0]][reference[1]]
+        linkage = resource["relationships"].get(name)
+
+        if isinstance(linkage, dict):
+            return linkage["id"] in accepted
+
+        if isinstance(linkage, list):
+            return any(item["id"] in accepted for item in linkage)
+
+        value = self._value(reference, name)
+        return value is not None and _query_value(value) in accepted
+
+    def render(
+        self,
+        reference: Reference,
+        *,
+        fields: dict[str, set[str]] | None = None,
+        include: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Render a resource as JSON:API.
+
+        :param reference: The resource
+        :param fields: The attributes to return for each type (all of them for types not listed)
+        :param include: The relationships whose linkage should be returned
+
+        :returns: The JSON of the resource
+        """
+        resource_type, identifier = reference
+        resource = self.get(resource_type, identifier)
+        wanted = (fields or {}).get(resource_type)
+        self_url = f"{self.base_url}/v1/{resource_type}/{identifier}"
+
+        attributes = {
+            name: value
+            for name, value in resource["attributes"].items()
+            if wanted is None or name in wanted
+        }
+
+        linkages = dict(resource["relationships"])
+
+        for name in include or []:
+            related = self.related(resource_type, identifier, name)
+
+            if isinstance(related, list):
+                linkages[name] = [{"type": item[0], "id": item[1]} for item in related]
+            else:
+                linkages[name] = {"type": related[0], "id": related[1]} if related else None
+
+        relationships = {
+            name: {
+                "links": {
+                    "self": f"{self_url}/relationships/{name}",
+                    "related": f"{self_url}/{name}",
+                },
+                "data": linkage,
+            }
+            for name, linkage in linkages.items()
+            if wanted is None or name in wanted
+        }
+
+        return {
+            "type": resource_type,
+            "id": identifier,
+            "attributes": attributes,
+            "relationships": relationships,
+            "links": {"self": self_url},
+        }
+
+    # pylint:disable=too-many-locals
+    def populate(
+        self, *, apps: int = 1, builds: int = 0, reviews: int = 0, locales: int = 1
+    ) -> None:
+        """Fill the store with apps and the resources which belong to them.
+
+        Each app gets a pre-release version, an app store version in
+        `PREPARE_FOR_SUBMISSION` and a localization of it for each locale,
+        along with the builds and customer reviews asked for.
+
+        :param apps: The number of apps to create
+        :param builds: The number of builds each app has, newest first
+        :param reviews: The number of customer reviews each app has
+        :param locales: The number of localizations each app store version has
+        """
+        for app_index in range(apps):
+            app = self.create(
+                "apps",
+                {
+                    "bundleId": f"com.example.app{app_index}",
+                    "name": f"App {app_index}",
+                    "primaryLocale": "en-US",
+                    "sku": f"APP{app_index}",
+                    "availableInNewTerritories": True,
+                    "contentRightsDeclaration": None,
+                    "isOrEverWasMadeForKids": False,
+                    "subscriptionStatusUrl": None,
+                    "subscriptionStatusUrlVersion": None,
+                    "subscriptionStatusUrlForSandbox": None,
+                    "subscriptionStatusUrlVersionForSandbox": None,
+                    "streamlinedPurchasingEnabled": None,
+                },
+            )
+            app_linkage = {"type": "apps", "id": app}
+            pre_release_version = self.create(
+                "preReleaseVersions",
+                {"version": "1.0", "platform": "IOS"},
+                {"app": app_linkage},
+            )
+            version = self.create(
+                "appStoreVersions",
+                {"versionString": "1.0", "platform": "IOS"},
+                {"app": app_linkage},
+            )
+
+            for locale_index in range(locales):
+                self.create(
+                    "appStoreVersionLocalizations",
+                    {
+                        "description": None,
+                        "keywords": None,
+                        "locale": "en-US" if locale_index == 0 else f"x-stub-{locale_index}",
+                        "marketingUrl": None,
+                        "promotionalText": None,
+                        "supportUrl": None,
+                        "whatsNew": None,
+                    },
+                    {"appStoreVersion": {"type": "appStoreVersions", "id": version}},
+                )
+
+            for build_index in range(builds):
+                age = datetime.timedelta(hours=build_index)
+                self.create(
+                    "builds",
+                    {
+                        "version": str(builds - build_index),
+                        "uploadedDate": _timestamp(-age),
+                        "expirationDate": _timestamp(datetime.timedelta(days=90) - age),
+                        "expired": False,
+                        "minOsVersion": "15.0",
+                        "iconAssetToken": None,
+                        "processingState": "VALID",
+                        "usesNonExemptEncryption": False,
+                    },
+                    {
+                        "app": app_linkage,
+                        "preReleaseVersion": {
+                            "type": "preReleaseVersions",
+                            "id": pre_release_version,
+                        },
+                    },
+                )
+
+            for review_index in range(reviews):
+                self.create(
+                    "customerReviews",
+                    {
+                        "body": f"Review {review_index}",
+                        "createdDate": _timestamp(-datetime.timedelta(minutes=review_index)),
+                        "rating": review_index % 5 + 1,
+                        "reviewerNickname": f"reviewer{review_index}",
+                        "title": f"Title {review_index}",
+                        "territory": "USA",
+                    },
+                    {"app": app_linkage},
+                )
+
+    # pylint:enable=too-many-locals
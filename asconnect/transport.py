@@ -0,0 +1,374 @@
+"""Transports which record the exchanges with the API and replay them offline."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import base64
+import datetime
+import enum
+import io
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from typing import Any
+
+import requests
+import requests.adapters
+import requests.structures
+import requests.utils
+
+from asconnect.cache import canonical_url
+from asconnect.exceptions import UnrecordedRequestError
+from asconnect.metrics import TimedHTTPAdapter, endpoint_template
+from asconnect.utilities import DEFAULT_API_PATH, api_path
+
+CASSETTE_VERSION = 1
+
+# Headers describing how the body was sent, which don't apply once it has been decoded
+_TRANSFER_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class Latency(enum.Enum):
+    """How long a replayed response takes to arrive."""
+
+    #: Immediately
+    NONE = "none"
+
+    #: As long as the recorded response took
+    RECORDED = "recorded"
+
+    #: A time drawn at random from the recorded responses from the same endpoint
+    SAMPLED = "sampled"
+
+
+def _encode_body(body: bytes) -> dict[str, str]:
+    """Encode the body of a response for a cassette.
+
+    :param body: The body
+
+    :returns: The body as text if it is UTF-8, otherwise in base 64
+    """
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(recorded: dict[str, Any]) -> bytes:
+    """Decode the body of a recorded response.
+
+    :param recorded: The recorded response
+
+    :returns: The body
+    """
+    if "body_base64" in recorded:
+        return base64.b64decode(recorded["body_base64"])
+
+    return recorded.get("body", "").encode("utf-8")
+
+
+def _without_query(url: str) -> str:
+    """Remove the query string from a URL.
+
+    :param url: The URL
+
+    :returns: The URL without its query string
+    """
+    return urllib.parse.urlsplit(url)._replace(query="").geturl()
+
+
+def _strip_upload_signatures(body: bytes, upload_urls: dict[str, str]) -> bytes:
+    """Remove the query strings (and so the signatures) from the upload URLs in a response.
+
+    :param body: The body of the response
+    :param upload_urls: The upload URLs seen so far, mapped to the URLs without their query
+                        strings. The ones in this response are added to it.
+
+    :returns: The body with the query strings removed from its upload URLs
+    """
+    try:
+        contents = json.loads(body)
+    except ValueError:
+        return body
+
+    if not isinstance(contents, dict):
+        return body
+
+    resources = contents.get("data")
+    resources = resources if isinstance(resources, list) else [resources]
+    resources += contents.get("included") or []
+    stripped = False
+
+    for resource in resources:
+        if not isinstance(resource, dict):
+            continue
+
+        for operation in (resource.get("attributes") or {}).get("uploadOperations") or []:
+            url = operation.get("url")
+
+            if url and urllib.parse.urlsplit(url).query:
+                upload_urls[url] = operation["url"] = _without_query(url)
+                stripped = True
+
+    return json.dumps(contents).encode("utf-8") if stripped else body
+
+
+class RecordingAdapter(requests.adapters.BaseAdapter):
+    """Sends requests over the network and records the exchanges to a cassette.
+
+    Pass it as the `transport` of a client, and close the client when done to
+    write the cassette. Replay it later with `ReplayAdapter`.
+
+    Only the method and URL of each request are recorded, so tokens aren't
+    written to the cassette. The responses are recorded in full, except that
+    the query strings of the upload URLs in them are removed (from the
+    responses and from the uploads to them) as they hold the signatures
+    which authorise the uploads. They are replayed without them.
+
+    This class is thread safe.
+    """
+
+    path: str
+    adapter: requests.adapters.BaseAdapter
+    _interactions: list[dict[str, Any]]
+    _upload_urls: dict[str, str]
+    _closed: bool
+    _lock: threading.Lock
+
+    def __init__(self, path: str, adapter: requests.adapters.BaseAdapter | None = None) -> None:
+        """Create a new recorder.
+
+        :param path: The path to write the cassette to. Any existing cassette there is replaced.
+        :param adapter: The adapter to send the requests with (a default pooled one if not supplied)
+        """
+        super().__init__()
+        self.path = path
+        self.adapter = adapter if adapter is not None else TimedHTTPAdapter()
+        self._interactions = []
+        self._upload_urls = {}
+        self._closed = False
+        self._lock = threading.Lock()
+
+    # pylint:disable=too-many-arguments,too-many-positional-arguments
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: bool | str = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        """Send a request and record the exchange.
+
+        :param request: The request to send
+        :param stream: Whether to stream the response content (it is read to record it regardless)
+        :param timeout: How long to wait for the server
+        :param verify: Whether to verify the TLS certificate, or the CA bundle to verify it with
+        :param cert: The client certificate to send
+        :param proxies: The proxies to connect through
+
+        :returns: The response
+        """
+        response = self.adapter.send(
+            request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies
+        )
+
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in _TRANSFER_HEADERS
+        }
+
+        with self._lock:
+            url = request.url or ""
+            body = _strip_upload_signatures(response.content, self._upload_urls)
+            self._interactions.append(
+                {
+                    "request": {"method": request.method, "url": self._upload_urls.get(url, url)},
+                    "response": {
+                        "status_code": response.status_code,
+                        "reason": response.reason,
+                        "headers": headers,
+                        "elapsed": response.elapsed.total_seconds(),
+                        **_encode_body(body),
+                    },
+                }
+            )
+
+        return response
+
+    # pylint:enable=too-many-arguments,too-many-positional-arguments
+
+    def save(self) -> None:
+        """Write the exchanges recorded so far to the cassette."""
+        with self._lock:
+            contents = {"version": CASSETTE_VERSION, "interactions": list(self._interactions)}
+
+        temporary_path = f"{self.path}.tmp"
+
+        with open(temporary_path, "w", encoding="utf-8") as cassette_file:
+            json.dump(contents, cassette_file, indent=2)
+
+        os.replace(temporary_path, self.path)
+
+    def close(self) -> None:
+        """Write the cassette and close the underlying adapter.
+
+        The adapter is mounted for more than one scheme, so this is called once
+        for each when the session closes. Only the first call does anything.
+        """
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+        self.save()
+        self.adapter.close()
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """Answers requests from a cassette written by `RecordingAdapter`, without the network.
+
+    Each request is answered with the next recorded response to the same
+    method and URL (ignoring the order of the query parameters), so flows
+    which fetch the same URL more than once see the responses in the order
+    they were recorded. Once they run out, they start again from the first
+    unless `repeat` is False.
+
+    The responses arrive immediately unless `latency` says otherwise. Set a
+    `seed` to draw the same sampled latencies on every run.
+
+    This class is thread safe.
+    """
+
+    latency: Latency
+    repeat: bool
+    _responses: dict[tuple[str, str], list[dict[str, Any]]]
+    _positions: dict[tuple[str, str], int]
+    _latencies: dict[str, list[float]]
+    _random: random.Random
+    _api_prefix: str
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        latency: Latency = Latency.NONE,
+        seed: int | None = None,
+        repeat: bool = True,
+        base_url: str | None = None,
+    ) -> None:
+        """Load a cassette to replay.
+
+        :param path: The path of the cassette
+        :param latency: How long each response takes to arrive
+        :param seed: The seed for sampling latencies (random if not set)
+        :param repeat: Set to False to fail once the recordings of a request run out
+        :param base_url: The base URL of the client the cassette was recorded with, if it wasn't
+                         the default, so that latencies are sampled by endpoint
+
+        :raises ValueError: If the cassette is from a newer version of this library
+        """
+        super().__init__()
+
+        with open(path, "r", encoding="utf-8") as cassette_file:
+            contents = json.load(cassette_file)
+
+        if contents.get("version", CASSETTE_VERSION) > CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {contents['version']}")
+
+        self.latency = latency
+        self.repeat = repeat
+        self._responses = {}
+        self._positions = {}
+        self._latencies = {}
+        self._random = random.Random(seed)
+        self._api_prefix = api_path(base_url) if base_url is not None else DEFAULT_API_PATH
+        self._lock = threading.Lock()
+
+        for interaction in contents["interactions"]:
+            method = interaction["request"]["method"]
+            url = interaction["request"]["url"]
+            recorded = interaction["response"]
+
+            self._responses.setdefault((method, canonical_url(url)), []).append(recorded)
+            self._latencies.setdefault(endpoint_template(url, self._api_prefix), []).append(
+                recorded["elapsed"]
+            )
+
+    # pylint:disable=too-many-arguments,too-many-positional-arguments
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: bool | str = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        """Answer a request with the recorded response.
+
+        :param request: The request to answer
+        :param stream: Unused
+        :param timeout: Unused
+        :param verify: Unused
+        :param cert: Unused
+        :param proxies: Unused
+
+        :raises UnrecordedRequestError: If there is no recorded response for the request
+
+        :returns: The recorded response
+        """
+        _ = stream, timeout, verify, cert, proxies
+
+        method = request.method or "GET"
+        url = request.url or ""
+        key = (method, canonical_url(url))
+
+        with self._lock:
+            responses = self._responses.get(key, [])
+            position = self._positions.get(key, 0)
+
+            if position >= len(responses) and self.repeat:
+                position = 0
+
+            if position >= len(responses):
+                raise UnrecordedRequestError(method, url)
+
+            self._positions[key] = position + 1
+            recorded = responses[position]
+
+            if self.latency == Latency.RECORDED:
+                delay = recorded["elapsed"]
+            elif self.latency == Latency.SAMPLED:
+                delay = self._random.choice(
+                    self._latencies[endpoint_template(url, self._api_prefix)]
+                )
+            else:
+                delay = 0.0
+
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.reason = recorded.get("reason", "")
+        response.headers = requests.structures.CaseInsensitiveDict(recorded.get("headers", {}))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(_decode_body(recorded))
+        response.url = url
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=delay)
+
+        return response
+
+    # pylint:enable=too-many-arguments,too-many-positional-arguments
+
+    def close(self) -> None:
+        """Nothing to close."""
@@ -4,12 +4,12 @@
 # Licensed under the MIT license.
 
 import logging
-from typing import Iterator
+from typing import Any, Iterable, Iterator, Literal, overload
 
-from asconnect.httpclient import HttpClient
+from asconnect.httpclient import MAX_PAGE_SIZE, HttpClient
 
 from asconnect.models import User
-from asconnect.utilities import update_query_parameters
+from asconnect.utilities import Fields
 
 
 class UsersClient:
@@ -33,9 +33,45 @@ class UsersClient:
         self.http_client = http_client
         self.log = log.getChild("users")
 
-    def get_users(self) -> Iterator[User]:
+    @overload
+    def get_users(
+        self,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[User]: ...
+
+    @overload
+    def get_users(
+        self,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_users(
+        self,
+        *,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[User | dict[str, Any]]:
         """Get all users.
 
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["visibleApps"]
+
         :returns: A list of users
         """
 
@@ -43,8 +79,12 @@ class UsersClient:
 
         url = self.http_client.generate_url("users")
 
-        query_parameters = {"limit": "200"}
-
-        url = update_query_parameters(url, query_parameters)
-
-        yield from self.http_client.get(url=url, data_type=list[User])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[User],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
@@ -1,12 +1,26 @@
 """Utilities for the library."""
 
+import concurrent.futures
+import contextlib
 import hashlib
+import mmap
 import os
-from typing import Iterator, TypeVar
+from typing import Iterable, Iterator, Mapping, TypeVar
 import urllib.parse
 
 IteratorType = TypeVar("IteratorType")  # pylint: disable=invalid-name
 
+# Sparse fieldsets: the fields to return for each resource type, using the
+# API names, e.g. {"builds": ["version", "processingState"]}
+Fields = Mapping[str, Iterable[str]]
+
+# The size of the reads when hashing a file. Large reads keep the number of
+# system calls down, and the hash releases the GIL for each one.
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# The path that every URL under the default base URL starts with
+DEFAULT_API_PATH = "/v1/"
+
 
 def next_or_none(iterator: Iterator[IteratorType]) -> IteratorType | None:
     """Get the next value from an iterator, or return None when it is exhausted.
@@ -40,6 +54,55 @@ def update_query_parameters(url: str, query_parameters: dict[str, str]) -> str:
     return urllib.parse.urlunparse(parsed_url)
 
 
+def api_path(base_url: str) -> str:
+    """Get the path that every URL under a base URL starts with.
+
+    :param base_url: The base URL of the API, e.g. "https://proxy.example/asc/v1"
+
+    :returns: The path, e.g. "/asc/v1/"
+    """
+    return urllib.parse.urlsplit(base_url).path.rstrip("/") + "/"
+
+
+def api_path_segments(url: str, api_prefix: str = DEFAULT_API_PATH) -> list[str] | None:
+    """Get the segments of the path of an API URL after the base URL.
+
+    :param url: The URL
+    :param api_prefix: The path of the base URL, from `api_path`
+
+    :returns: The segments of the path (e.g. ["apps", "123", "builds"]), or None if the URL
+              isn't under the base URL (e.g. for asset uploads)
+    """
+    path = urllib.parse.urlsplit(url).path
+
+    if not path.startswith(api_prefix):
+        return None
+
+    return [segment for segment in path[len(api_prefix) :].split("/") if segment]
+
+
+def fields_query_parameters(fields: Fields) -> dict[str, str]:
+    """Get the query parameters which request sparse fieldsets.
+
+    :param fields: The fields to return for each resource type
+
+    :raises ValueError: If no fields are given for a resource type
+
+    :returns: The query parameters, e.g. {"fields[builds]": "version,processingState"}
+    """
+    query_parameters = {}
+
+    for resource_type, names in fields.items():
+        joined_names = ",".join(names)
+
+        if not joined_names:
+            raise ValueError(f"No fields were given for {resource_type}")
+
+        query_parameters[f"fields[{resource_type}]"] = joined_names
+
+    return query_parameters
+
+
 def md5_file(file_path: str) -> str:
     """Generate the MD5 of a file.
 
@@ -48,12 +111,77 @@ def md5_file(file_path: str) -> str:
     :returns: The MD5 as a hex string
     """
     hasher = hashlib.md5()
-    with open(file_path, "rb") as file_handle:
-        for chunk in iter(lambda: file_handle.read(4096), b""):
-            hasher.update(chunk)
+    block = bytearray(HASH_BLOCK_SIZE)
+    view = memoryview(block)
+
+    with open(file_path, "rb", buffering=0) as file_handle:
+        while size := file_handle.readinto(block):
+            hasher.update(view[:size])
+
     return hasher.hexdigest()
 
 
+def md5_files(
+    file_paths: Iterable[str], *, max_workers: int | None = None, processes: bool = False
+) -> dict[str, str]:
+    """Generate the MD5s of a batch of files, several at a time.
+
+    This is for hashing many files ahead of uploading them, e.g. to pass to
+    `ScreenshotClient.upload_screenshot` as the `checksum`. Each file is
+    hashed as by `md5_file`, on a pool of threads by default (the hash
+    releases the GIL for each block it reads).
+
+    Set `processes` to hash on a pool of processes instead, which spreads
+    the work over every CPU. The caller's script must then be safe to import
+    in a child process, i.e. have an `if __name__ == "__main__":` guard
+    (the default on macOS and Windows is to start a fresh interpreter), and
+    shouldn't have other threads running when it is called (which forking
+    would copy in an unknown state).
+
+    :param file_paths: The files to generate the MD5s for
+    :param max_workers: The number of threads or processes to use (chosen from the number of
+                        CPUs if not set)
+    :param processes: Set to True to hash on a pool of processes rather than threads
+
+    :returns: The MD5 of each file as a hex string, keyed by its path
+    """
+    paths = list(dict.fromkeys(file_paths))
+
+    if len(paths) <= 1:
+        return {path: md5_file(path) for path in paths}
+
+    executor: concurrent.futures.Executor
+
+    if processes:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="asconnect-hash"
+        )
+
+    with executor:
+        return dict(zip(paths, executor.map(md5_file, paths)))
+
+
+@contextlib.contextmanager
+def map_file(file_path: str) -> Iterator[mmap.mmap | bytes]:
+    """Memory map a file for reading.
+
+    Any views of the contents must be released before leaving the block.
+
+    :param file_path: The file to map
+
+    :returns: The contents of the file (as empty bytes if it is empty, since those can't be mapped)
+    """
+    with open(file_path, "rb") as file_handle:
+        if os.fstat(file_handle.fileno()).st_size == 0:
+            yield b""
+            return
+
+        with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            yield contents
+
+
 def write_key(key_id: str, key_contents: str) -> str:
     """Write a key to the private key folder for altool.
 
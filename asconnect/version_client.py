@@ -4,11 +4,11 @@
 # Licensed under the MIT license.
 
 import logging
-import time
-from typing import Iterator
+from typing import Any, Iterable, Iterator, Literal, overload
 
+from asconnect.deadline import deadline_scope
 from asconnect.exceptions import AppStoreConnectError
-from asconnect.httpclient import HttpClient
+from asconnect.httpclient import MAX_PAGE_SIZE, HttpClient
 from asconnect.models import (
     AppStoreReviewDetails,
     AppStoreVersion,
@@ -22,7 +22,9 @@ from asconnect.models import (
     ReviewSubmissionItem,
     ReviewSubmissionState,
 )
-from asconnect.utilities import next_or_none, update_query_parameters
+from asconnect.utilities import Fields, next_or_none, update_query_parameters
+
+# pylint: disable=too-many-lines
 
 
 class VersionClient:
@@ -50,30 +52,78 @@ class VersionClient:
         self,
         *,
         version_id: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
     ) -> AppStoreVersion | None:
         """Get the version with the given ID
 
         :param version_id: The version ID to get
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["build"]
 
         :returns: An AppStoreVersion if found, None otherwise
         """
         self.log.debug(f"Getting version {version_id}")
         url = self.http_client.generate_url(f"appStoreVersions/{version_id}")
 
-        return next_or_none(self.http_client.get(url=url, data_type=AppStoreVersion))
+        return next_or_none(
+            self.http_client.get(
+                url=url, data_type=AppStoreVersion, fields=fields, include=include
+            )
+        )
+
+    # pylint:disable=too-many-arguments
 
+    @overload
     def get_all(
         self,
         *,
         app_id: str,
         version_string: str | None = None,
         platform: Platform | None = None,
-    ) -> Iterator[AppStoreVersion]:
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppStoreVersion]: ...
+
+    @overload
+    def get_all(
+        self,
+        *,
+        app_id: str,
+        version_string: str | None = None,
+        platform: Platform | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def get_all(
+        self,
+        *,
+        app_id: str,
+        version_string: str | None = None,
+        platform: Platform | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppStoreVersion | dict[str, Any]]:
         """Get the versions for an app.
 
         :param app_id: The app ID to get the versions for
         :param version_string: The version to filter on (if any)
         :param platform: The platform to filter on (if any)
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["build"]
 
         :returns: An iterator to AppStoreVersion
         """
@@ -93,29 +143,54 @@ class VersionClient:
 
         url = update_query_parameters(url, query_parameters)
 
-        yield from self.http_client.get(url=url, data_type=list[AppStoreVersion])
+        yield from self.http_client.get(
+            url=url,
+            data_type=list[AppStoreVersion],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
+        )
+
+    # pylint:enable=too-many-arguments
 
     def get_version(
-        self, *, app_id: str, version_string: str
+        self,
+        *,
+        app_id: str,
+        version_string: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
     ) -> AppStoreVersion | None:
         """Get the versions for an app.
 
         :param app_id: The app ID to get the version for
         :param version_string: The version string to get the version for
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["build"]
 
         :returns: An AppStoreVersion
         """
         self.log.info(f"Getting version {version_string} of {app_id}")
-        return next_or_none(self.get_all(app_id=app_id, version_string=version_string))
+        return next_or_none(
+            self.get_all(
+                app_id=app_id, version_string=version_string, fields=fields, include=include
+            )
+        )
 
     def get_phased_release(
         self,
         *,
         version_id: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
     ) -> AppStoreVersionPhasedRelease | None:
         """Get the phased release of given app version
 
         :param version_id: The version ID to query for phased releases
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include
 
         :returns: An AppStoreVersionPhasedRelease if found, None otherwise
         """
@@ -125,7 +200,12 @@ class VersionClient:
         )
 
         return next_or_none(
-            self.http_client.get(url=url, data_type=AppStoreVersionPhasedRelease)
+            self.http_client.get(
+                url=url,
+                data_type=AppStoreVersionPhasedRelease,
+                fields=fields,
+                include=include,
+            )
         )
 
     def create_phased_release(
@@ -207,12 +287,48 @@ class VersionClient:
             data_type=AppStoreVersionPhasedRelease,
         )
 
+    @overload
+    def get_localizations(
+        self,
+        *,
+        version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[False] = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppStoreVersionLocalization]: ...
+
+    @overload
+    def get_localizations(
+        self,
+        *,
+        version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: Literal[True],
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]: ...
+
     def get_localizations(
-        self, *, version_id: str
-    ) -> Iterator[AppStoreVersionLocalization]:
+        self,
+        *,
+        version_id: str,
+        page_size: int = MAX_PAGE_SIZE,
+        raw: bool = False,
+        lazy: bool = False,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Iterator[AppStoreVersionLocalization | dict[str, Any]]:
         """Get the version localizations for an app version.
 
         :param version_id: The version ID to get the localizations for
+        :param page_size: The number of items to fetch per request (1 to 200)
+        :param raw: Yield the JSON dictionaries instead of models
+        :param lazy: Yield models which decode each field when it is first accessed
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["appScreenshotSets"]
 
         :returns: An AppStoreVersion
         """
@@ -221,13 +337,27 @@ class VersionClient:
             f"appStoreVersions/{version_id}/appStoreVersionLocalizations"
         )
         yield from self.http_client.get(
-            url=url, data_type=list[AppStoreVersionLocalization]
+            url=url,
+            data_type=list[AppStoreVersionLocalization],
+            page_size=page_size,
+            raw=raw,
+            lazy=lazy,
+            fields=fields,
+            include=include,
         )
 
-    def get_attached_build(self, *, version_id: str) -> Build | None:
+    def get_attached_build(
+        self,
+        *,
+        version_id: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> Build | None:
         """Get the build that is attached to a specific App Store version.
 
         :param version_id: The version ID to get the build for
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["preReleaseVersion"]
 
         :returns: A Build
         """
@@ -235,7 +365,9 @@ class VersionClient:
 
         url = self.http_client.generate_url(f"appStoreVersions/{version_id}/build")
 
-        return next_or_none(self.http_client.get(url=url, data_type=Build))
+        return next_or_none(
+            self.http_client.get(url=url, data_type=Build, fields=fields, include=include)
+        )
 
     def set_build(self, *, version_id: str, build_id: str) -> None:
         """Set the build for a version
@@ -258,11 +390,17 @@ class VersionClient:
         )
 
     def get_app_review_details(
-        self, *, version_id: str
+        self,
+        *,
+        version_id: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
     ) -> AppStoreReviewDetails | None:
         """Get the app review details for the version.
 
         :param version_id: The version ID to get the app review details for
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["appStoreReviewAttachments"]
 
         :returns: The app review details if set, None otherwise
         """
@@ -271,6 +409,8 @@ class VersionClient:
             self.http_client.get(
                 endpoint=f"appStoreVersions/{version_id}/appStoreReviewDetail",
                 data_type=AppStoreReviewDetails,
+                fields=fields,
+                include=include,
             )
         )
 
@@ -351,10 +491,18 @@ class VersionClient:
 
     # pylint:enable=too-many-arguments
 
-    def get_idfa(self, *, version_id: str) -> IdfaDeclaration | None:
+    def get_idfa(
+        self,
+        *,
+        version_id: str,
+        fields: Fields | None = None,
+        include: Iterable[str] | None = None,
+    ) -> IdfaDeclaration | None:
         """Get the advertising ID declaration.
 
         :param version_id: The version to get the declaration for
+        :param fields: The fields to return for each resource type (all of them if not set)
+        :param include: The related resources to include, e.g. ["appStoreVersion"]
 
         :returns: The declaration if set, None otherwise
         """
@@ -363,6 +511,8 @@ class VersionClient:
             self.http_client.get(
                 endpoint=f"appStoreVersions/{version_id}/idfaDeclaration",
                 data_type=IdfaDeclaration,
+                fields=fields,
+                include=include,
             )
         )
 
@@ -512,6 +662,7 @@ class VersionClient:
         version_id: str,
         platform: Platform,
         max_attempts: int = 3,
+        deadline: float | None = None,
     ) -> ReviewSubmission:
         """Submit an app store version for review.
 
@@ -538,7 +689,11 @@ class VersionClient:
         :param app_id: The ID of the app to submit for review
         :param version_id: The ID of the app store version to submit
         :param platform: The platform to submit for review
-        :param max_attempts: The number of attempts allowed for transient (5xx) failures
+        :param max_attempts: The number of times the whole submission is retried after a transient
+                             (e.g. 5xx) failure. Its requests are not retried on their own, and the
+                             delay between attempts comes from the client's retry policy.
+        :param deadline: The most seconds the whole submission may take, including every request
+                         and retry (no limit if None)
 
         :returns: The review submission. When this call performs the submit, it
                   is the submission as returned by the submit PATCH (whose body
@@ -546,78 +701,88 @@ class VersionClient:
                   already existed, it is that submission.
         :raises ValueError: If a reused submission already holds different content
         :raises AppStoreConnectError: If it runs into an unretriable error or exceeds the retry count
+        :raises DeadlineExceededError: If the submission doesn't finish before the deadline
         """
 
-        try:
-            submission = self._find_or_create_review_submission(
-                app_id=app_id, platform=platform
+        with deadline_scope(deadline):
+            return self.http_client.retry_policy.call(
+                lambda: self._submit_for_review(
+                    app_id=app_id, version_id=version_id, platform=platform
+                ),
+                max_retries=max_attempts,
+                log=self.log,
+                description="Submit",
             )
 
-            if submission.attributes.state != ReviewSubmissionState.READY_FOR_REVIEW:
-                # The submission has already been submitted and is somewhere in
-                # Apple's pipeline (WAITING_FOR_REVIEW / IN_REVIEW /
-                # UNRESOLVED_ISSUES / CANCELING / COMPLETING). Treating this as
-                # success is only correct when the in-flight submission is the
-                # one for *our* version - then the submit already happened and a
-                # re-run is a genuine no-op. If a *different* version is in
-                # review, returning success here would be a silent lie: Apple
-                # allows only one open submission per app, so version_id was
-                # never submitted and cannot be until that submission clears.
-                # Refuse loudly rather than reporting a submit that did not
-                # happen.
-                if not self._submission_contains_version(
-                    submission_id=submission.identifier, version_id=version_id
-                ):
-                    raise ValueError(
-                        f"App {app_id} already has an in-flight review submission "
-                        f"{submission.identifier} (state "
-                        f"{submission.attributes.state.value}) that does not "
-                        f"contain version {version_id}. Apple allows only one "
-                        f"open submission per app, so version {version_id} "
-                        f"cannot be submitted until that submission completes or "
-                        f"is cancelled."
-                    )
-
-                self.log.info(
-                    f"App {app_id} already has review submission "
-                    f"{submission.identifier} containing version {version_id} in "
-                    f"state {submission.attributes.state.value}; nothing to submit"
-                )
-                return submission
+    def _submit_for_review(
+        self, *, app_id: str, version_id: str, platform: Platform
+    ) -> ReviewSubmission:
+        """Perform a single attempt at submitting a version for review.
 
-            self._ensure_version_attached(
-                submission_id=submission.identifier, version_id=version_id
-            )
+        See :meth:`submit_for_review` for details.
 
-            # The PATCH response is the authoritative post-submit state (it is
-            # read-your-write for this same request), so we trust it rather than
-            # issuing a separate GET. A follow-up GET can lag Apple's eventual
-            # consistency and momentarily still report READY_FOR_REVIEW, which
-            # would wrongly fail a submission that actually went through.
-            submitted = self._mark_review_submission_submitted(
-                submission_id=submission.identifier
-            )
+        :param app_id: The ID of the app to submit for review
+        :param version_id: The ID of the app store version to submit
+        :param platform: The platform to submit for review
+
+        :returns: The review submission
+        :raises ValueError: If a reused submission already holds different content
+        """
+
+        submission = self._find_or_create_review_submission(
+            app_id=app_id, platform=platform
+        )
+
+        if submission.attributes.state != ReviewSubmissionState.READY_FOR_REVIEW:
+            # The submission has already been submitted and is somewhere in
+            # Apple's pipeline (WAITING_FOR_REVIEW / IN_REVIEW /
+            # UNRESOLVED_ISSUES / CANCELING / COMPLETING). Treating this as
+            # success is only correct when the in-flight submission is the
+            # one for *our* version - then the submit already happened and a
+            # re-run is a genuine no-op. If a *different* version is in
+            # review, returning success here would be a silent lie: Apple
+            # allows only one open submission per app, so version_id was
+            # never submitted and cannot be until that submission clears.
+            # Refuse loudly rather than reporting a submit that did not
+            # happen.
+            if not self._submission_contains_version(
+                submission_id=submission.identifier, version_id=version_id
+            ):
+                raise ValueError(
+                    f"App {app_id} already has an in-flight review submission "
+                    f"{submission.identifier} (state "
+                    f"{submission.attributes.state.value}) that does not "
+                    f"contain version {version_id}. Apple allows only one "
+                    f"open submission per app, so version {version_id} "
+                    f"cannot be submitted until that submission completes or "
+                    f"is cancelled."
+                )
 
             self.log.info(
-                f"Submitted review submission {submitted.identifier} for review "
-                f"(state: {submitted.attributes.state.value})"
+                f"App {app_id} already has review submission "
+                f"{submission.identifier} containing version {version_id} in "
+                f"state {submission.attributes.state.value}; nothing to submit"
             )
-            return submitted
+            return submission
 
-        except AppStoreConnectError as ex:
-            if max_attempts > 0 and 500 <= ex.response.status_code < 600:
-                self.log.info(
-                    f"Submit failed due to server-side intermittent issue. Will sleep for 1 minute and try again, left attempt: {max_attempts - 1}."
-                )
-                time.sleep(60)
-                return self.submit_for_review(
-                    app_id=app_id,
-                    version_id=version_id,
-                    platform=platform,
-                    max_attempts=max_attempts - 1,
-                )
+        self._ensure_version_attached(
+            submission_id=submission.identifier, version_id=version_id
+        )
 
-            raise  # Re-raise the caught exception
+        # The PATCH response is the authoritative post-submit state (it is
+        # read-your-write for this same request), so we trust it rather than
+        # issuing a separate GET. A follow-up GET can lag Apple's eventual
+        # consistency and momentarily still report READY_FOR_REVIEW, which
+        # would wrongly fail a submission that actually went through.
+        submitted = self._mark_review_submission_submitted(
+            submission_id=submission.identifier
+        )
+
+        self.log.info(
+            f"Submitted review submission {submitted.identifier} for review "
+            f"(state: {submitted.attributes.state.value})"
+        )
+        return submitted
 
     def _get_open_review_submission(
         self, *, app_id: str, platform: Platform
@@ -926,15 +1091,17 @@ class VersionClient:
         """Release an approved version
 
         :param version_id: The ID of the version to release
-        :param max_attempts: The number of attempts allowed
+        :param max_attempts: The number of retries allowed when the server didn't act on the
+                             request (e.g. 429). A release request is not safe to send twice, so
+                             server (5xx) errors are not retried.
 
         :raises AppStoreConnectError: If runs into unretriable error or exceeds retry count
         """
 
-        try:
-            self.log.info(f"Releasing version {version_id}")
+        self.log.info(f"Releasing version {version_id}")
 
-            self.http_client.post(
+        self.http_client.retry_policy.call(
+            lambda: self.http_client.post(
                 endpoint="appStoreVersionReleaseRequests",
                 data={
                     "data": {
@@ -947,18 +1114,9 @@ class VersionClient:
                     }
                 },
                 log_response=True,
-            )
-
-        except AppStoreConnectError as ex:
-            if (
-                max_attempts > 0
-                and ex.response.status_code >= 500
-                and ex.response.status_code < 600
-            ):
-                self.log.info(
-                    f"Submit failed due to server-side intermittent issue. Will sleep for 1 minute and try again, left attempt: {max_attempts - 1}."
-                )
-                time.sleep(60)
-                self.release(version_id=version_id, max_attempts=max_attempts - 1)
-            else:
-                raise  # Re-raise the caught exception
+            ),
+            max_retries=max_attempts,
+            log=self.log,
+            description="Release",
+            idempotent=False,
+        )
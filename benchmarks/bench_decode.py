@@ -0,0 +1,186 @@
+"""Benchmark decoding API pages into models.
+
+Compares `deserialize.deserialize` with the compiled decoders in
+`asconnect.decoding` on full pages of builds and customer reviews, then
+compares eager, lazy and raw decoding for a scan which only reads the
+identifier and one attribute of each build.
+
+Run with `python benchmarks/bench_decode.py`.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import sys
+import timeit
+from typing import Any, Callable
+
+import deserialize
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect.decoding import decode
+from asconnect.models import Build, CustomerReview
+
+# pylint: enable=wrong-import-position
+
+PAGE_SIZE = 200
+REPEATS = 5
+NUMBER = 20
+
+
+def _links(resource_type: str, identifier: str) -> dict[str, Any]:
+    """Build the links for a resource.
+
+    :param resource_type: The type of the resource
+    :param identifier: The ID of the resource
+
+    :returns: The links
+    """
+    return {"self": f"https://api.appstoreconnect.apple.com/v1/{resource_type}/{identifier}"}
+
+
+def _relationship(resource_type: str, identifier: str, name: str) -> dict[str, Any]:
+    """Build a relationship for a resource.
+
+    :param resource_type: The type of the resource
+    :param identifier: The ID of the resource
+    :param name: The name of the relationship
+
+    :returns: The relationship
+    """
+    base = f"https://api.appstoreconnect.apple.com/v1/{resource_type}/{identifier}"
+    return {
+        "links": {
+            "self": f"{base}/relationships/{name}",
+            "related": f"{base}/{name}",
+        }
+    }
+
+
+def build_page() -> list[dict[str, Any]]:
+    """Generate a page of builds.
+
+    :returns: The page data
+    """
+    page = []
+
+    for index in range(PAGE_SIZE):
+        identifier = f"build-{index}"
+        page.append(
+            {
+                "type": "builds",
+                "id": identifier,
+                "attributes": {
+                    "version": str(1000 + index),
+                    "uploadedDate": "2024-01-01T12:00:00-08:00",
+                    "expirationDate": "2024-04-01T12:00:00-08:00",
+                    "expired": False,
+                    "minOsVersion": "15.0",
+                    "iconAssetToken": {
+                        "templateUrl": "https://example.com/{w}x{h}bb.{f}",
+                        "width": 1024,
+                        "height": 1024,
+                    },
+                    "processingState": "VALID",
+                    "usesNonExemptEncryption": False,
+                },
+                "relationships": {
+                    name: _relationship("builds", identifier, name)
+                    for name in ("app", "preReleaseVersion", "betaBuildLocalizations", "icons")
+                },
+                "links": _links("builds", identifier),
+            }
+        )
+
+    return page
+
+
+def review_page() -> list[dict[str, Any]]:
+    """Generate a page of customer reviews.
+
+    :returns: The page data
+    """
+    page = []
+
+    for index in range(PAGE_SIZE):
+        identifier = f"review-{index}"
+        page.append(
+            {
+                "type": "customerReviews",
+                "id": identifier,
+                "attributes": {
+                    "rating": 1 + index % 5,
+                    "title": f"Review {index}",
+                    "body": "Works well, but could be better. " * 5,
+                    "reviewerNickname": f"reviewer{index}",
+                    "createdDate": "2024-01-01T12:00:00-08:00",
+                    "territory": "USA",
+                },
+                "relationships": {
+                    "response": _relationship("customerReviews", identifier, "response")
+                },
+                "links": _links("customerReviews", identifier),
+            }
+        )
+
+    return page
+
+
+def _time(function: Callable[[], Any]) -> float:
+    """Time a function.
+
+    :param function: The function to time
+
+    :returns: The best time per call in seconds
+    """
+    return min(timeit.repeat(function, repeat=REPEATS, number=NUMBER)) / NUMBER
+
+
+def main() -> None:
+    """Run the benchmark."""
+    # pylint: disable=cell-var-from-loop
+
+    cases = [
+        ("builds", list[Build], build_page()),
+        ("reviews", list[CustomerReview], review_page()),
+    ]
+
+    for name, data_type, page in cases:
+        # Sanity check that both paths agree before timing them
+        expected = deserialize.deserialize(data_type, page)
+        actual = decode(data_type, page)
+        assert [item.identifier for item in expected] == [item.identifier for item in actual]
+
+        reflective = _time(lambda: deserialize.deserialize(data_type, page))
+        compiled = _time(lambda: decode(data_type, page))
+
+        print(
+            f"{name}: deserialize {reflective / PAGE_SIZE * 1e6:.1f}us/item, "
+            f"compiled {compiled / PAGE_SIZE * 1e6:.1f}us/item, "
+            f"speed-up {reflective / compiled:.1f}x"
+        )
+
+    page = build_page()
+    scans = [
+        (
+            "eager",
+            lambda: [(b.identifier, b.attributes.version) for b in decode(list[Build], page)],
+        ),
+        (
+            "lazy",
+            lambda: [
+                (b.identifier, b.attributes.version) for b in decode(list[Build], page, lazy=True)
+            ],
+        ),
+        ("raw", lambda: [(b["id"], b["attributes"]["version"]) for b in page]),
+    ]
+
+    for name, scan in scans:
+        print(f"build scan ({name}): {_time(scan) / PAGE_SIZE * 1e6:.2f}us/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark the memory and repr cost of the models.
+
+Decodes pages of customer reviews and builds, then reports the memory held
+per decoded item (measured with `tracemalloc`) and the time taken to format
+a model in a log message.
+
+Run with `python benchmarks/bench_models.py`.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect.decoding import decode
+from asconnect.models import Build, CustomerReview
+from bench_decode import PAGE_SIZE, build_page, review_page
+
+# pylint: enable=wrong-import-position
+
+PAGES = 50
+REPEATS = 5
+NUMBER = 2000
+
+
+def _memory_per_item(data_type: Any, page: list[dict[str, Any]]) -> float:
+    """Measure the memory held by decoded items.
+
+    The JSON is shared between the pages and allocated before tracing
+    starts, so only the decoded models are counted.
+
+    :param data_type: The type of the page
+    :param page: The page data
+
+    :returns: The number of bytes held per decoded item
+    """
+    tracemalloc.start()
+    decoded = [decode(data_type, page) for _ in range(PAGES)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+    return current / (PAGES * PAGE_SIZE)
+
+
+def _repr_time(item: Any) -> float:
+    """Time formatting an item into a log message.
+
+    :param item: The item to format
+
+    :returns: The best time per call in seconds
+    """
+    return min(timeit.repeat(lambda: f"Checking {item}", repeat=REPEATS, number=NUMBER)) / NUMBER
+
+
+def main() -> None:
+    """Run the benchmark."""
+    cases = [
+        ("reviews", list[CustomerReview], review_page()),
+        ("builds", list[Build], build_page()),
+    ]
+
+    for name, data_type, page in cases:
+        memory = _memory_per_item(data_type, page)
+        repr_time = _repr_time(decode(data_type, page)[0])
+        print(f"{name}: {memory:.0f} bytes/item, repr {repr_time * 1e6:.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark listing builds through the client, offline.
+
+Replays a paged listing of builds from a cassette, so the whole path from
+the session through pagination and decoding is measured without Apple.
+With no latency this measures the client's own overhead per item; with the
+recorded latency it shows how much of it prefetching hides.
+
+Run with `python benchmarks/bench_replay.py [cassette.json] [url]` to replay
+a real recording (made with `asconnect.RecordingAdapter`) of the listing at
+`url`. Without arguments a synthetic cassette of builds is used.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect.httpclient import HttpClient
+from asconnect.models import Build
+from asconnect.transport import Latency, ReplayAdapter
+from bench_decode import build_page
+
+# pylint: enable=wrong-import-position
+
+PAGES = 20
+PAGE_LATENCY = 0.02
+REPEATS = 5
+URL = "https://api.appstoreconnect.apple.com/v1/builds?limit=200"
+
+
+def _write_cassette(path: str) -> None:
+    """Write a cassette of a paged listing of builds.
+
+    :param path: The path to write it to
+    """
+    interactions: list[dict[str, Any]] = []
+    url = URL
+
+    for page in range(PAGES):
+        next_url = f"{URL}&cursor={page + 1}" if page + 1 < PAGES else None
+        body = {"data": build_page(), "links": {"self": url, "next": next_url}}
+        interactions.append(
+            {
+                "request": {"method": "GET", "url": url},
+                "response": {
+                    "status_code": 200,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": json.dumps(body),
+                    "elapsed": PAGE_LATENCY,
+                },
+            }
+        )
+        url = next_url or url
+
+    with open(path, "w", encoding="utf-8") as cassette_file:
+        json.dump({"version": 1, "interactions": interactions}, cassette_file)
+
+
+def _key() -> str:
+    """Generate a key to sign the tokens with.
+
+    :returns: The PEM contents of the key
+    """
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("utf-8")
+
+
+def _list(
+    cassette: str, url: str, *, latency: Latency, prefetch: int, lazy: bool
+) -> tuple[float, int]:
+    """Time listing the builds.
+
+    :param cassette: The path of the cassette
+    :param url: The URL of the listing
+    :param latency: How long each replayed response takes
+    :param prefetch: The number of pages to fetch ahead
+    :param lazy: Whether to decode the builds lazily
+
+    :returns: The best time for the whole listing, and the number of builds
+    """
+    best = float("inf")
+    count = 0
+    key = _key()
+
+    for _ in range(REPEATS):
+        with HttpClient(
+            key_id="KEY",
+            key_contents=key,
+            issuer_id="ISSUER",
+            log=logging.getLogger("bench"),
+            transport=ReplayAdapter(cassette, latency=latency, seed=0),
+        ) as http_client:
+            start = time.perf_counter()
+            count = sum(
+                1
+                for _ in http_client.get(
+                    url=url, data_type=list[Build], prefetch=prefetch, lazy=lazy
+                )
+            )
+            best = min(best, time.perf_counter() - start)
+
+    return best, count
+
+
+def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as directory:
+        if len(sys.argv) > 2:
+            cassette, url = sys.argv[1], sys.argv[2]
+        else:
+            cassette, url = os.path.join(directory, "builds.json"), URL
+            _write_cassette(cassette)
+
+        cases = [
+            ("no latency, eager", Latency.NONE, 0, False),
+            ("no latency, lazy", Latency.NONE, 0, True),
+            ("recorded latency", Latency.RECORDED, 0, False),
+            ("recorded latency, prefetch 2", Latency.RECORDED, 2, False),
+            ("sampled latency, prefetch 2", Latency.SAMPLED, 2, False),
+        ]
+
+        for name, latency, prefetch, lazy in cases:
+            elapsed, count = _list(cassette, url, latency=latency, prefetch=prefetch, lazy=lazy)
+            print(
+                f"{name}: {elapsed * 1000:.1f}ms for {count} builds "
+                f"({elapsed / max(count, 1) * 1e6:.1f}us/item)"
+            )
+
+
+if __name__ == "__main__":
+    main()
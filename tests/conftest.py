@@ -1,15 +1,31 @@
 """Configuration for tests."""
 
+import datetime
 import json
+import logging
 import os
 import subprocess
 import sys
+from typing import Any, Callable, Iterator
 
 import _pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 import pytest
+import requests.adapters
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.abspath(__file__), "..", "..")))
 import asconnect  # pylint: disable=wrong-import-order
+from asconnect.stub_server import StubServer  # pylint: disable=wrong-import-order
+
+# The size of the parts the stub server splits uploads into, so small files have several
+STUB_UPLOAD_PART_SIZE = 1000
+
+# Creates a client for the stub server, passing any options on to it
+StubClientFactory = Callable[..., asconnect.Client]
+
+# The date a `FakeClock` starts at
+FAKE_CLOCK_START = datetime.datetime(2024, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
 
 
 def pytest_configure(config: _pytest.config.Config) -> None:  # type: ignore
@@ -57,15 +73,138 @@ def get_test_data() -> tuple[str, str, str]:
     return test_data["key_id"], test_data["key"], test_data["issuer_id"]
 
 
+def make_key() -> tuple[str, ec.EllipticCurvePublicKey]:
+    """Generate a key to sign tokens with, for replayed requests and stub servers.
+
+    :returns: The PEM contents of the private key and the public key
+    """
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    contents = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("utf-8")
+    return contents, private_key.public_key()
+
+
+class FakeClock:
+    """A clock which only moves when told to, or when slept on."""
+
+    now: float
+    sleeps: list[float]
+
+    def __init__(self) -> None:
+        """Create a new clock, at 0."""
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self) -> float:
+        """Get the current time.
+
+        :returns: The number of seconds since the clock started
+        """
+        return self.now
+
+    def date(self) -> datetime.datetime:
+        """Get the current time as a date.
+
+        :returns: The date `now` seconds after `FAKE_CLOCK_START`
+        """
+        return FAKE_CLOCK_START + datetime.timedelta(seconds=self.now)
+
+    def sleep(self, seconds: float) -> None:
+        """Move the clock forward.
+
+        :param seconds: The number of seconds to move forward by
+        """
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(name="fake_clock")
+def fixture_fake_clock() -> FakeClock:
+    """Get a clock which only moves when told to.
+
+    :returns: The clock
+    """
+    return FakeClock()
+
+
+@pytest.fixture(name="signing_key")
+def fixture_signing_key() -> tuple[str, ec.EllipticCurvePublicKey]:
+    """Generate a key to sign tokens with.
+
+    :returns: The PEM contents of the private key and the public key
+    """
+    return make_key()
+
+
+@pytest.fixture(name="stub_server")
+def fixture_stub_server() -> Iterator[StubServer]:
+    """Run a stand-in API server, which starts out empty.
+
+    Fill it with `stub_server.store.populate(...)`.
+
+    :returns: The running server
+    """
+    with StubServer(upload_part_size=STUB_UPLOAD_PART_SIZE) as server:
+        yield server
+
+
+@pytest.fixture(name="stub_client")
+def fixture_stub_client(stub_server: StubServer) -> StubClientFactory:
+    """Get a function which creates clients for the stub server.
+
+    :param stub_server: The server
+
+    :returns: A function which creates a client, passing any options on to it
+    """
+
+    def make_client(**kwargs: Any) -> asconnect.Client:
+        """Create a client for the stub server.
+
+        :param kwargs: Any other options for the client
+
+        :returns: The client
+        """
+        return asconnect.Client(
+            key_id="KEY",
+            key_contents=make_key()[0],
+            issuer_id="ISSUER",
+            log=logging.getLogger("test"),
+            base_url=stub_server.url,
+            **kwargs,
+        )
+
+    return make_client
+
+
 @pytest.fixture(scope="session")
-def client() -> asconnect.Client:
+def client() -> Iterator[asconnect.Client]:
     """Get the test client.
 
+    If `ASCONNECT_CASSETTE` is set to a path, the exchanges with the API are
+    replayed from that cassette, without needing credentials or the network.
+    Set `ASCONNECT_RECORD=1` as well to record the cassette from the live API.
+
     :returns: The test client
     """
-    key_id, key, issuer_id = get_test_data()
-
-    return asconnect.Client(key_id=key_id, key_contents=key, issuer_id=issuer_id)
+    cassette = os.environ.get("ASCONNECT_CASSETTE")
+    transport: requests.adapters.BaseAdapter | None = None
+
+    if cassette and not os.environ.get("ASCONNECT_RECORD"):
+        key_id, key, issuer_id = "REPLAY", make_key()[0], "REPLAY"
+        transport = asconnect.ReplayAdapter(cassette)
+    else:
+        key_id, key, issuer_id = get_test_data()
+
+        if cassette:
+            transport = asconnect.RecordingAdapter(cassette)
+
+    with asconnect.Client(
+        key_id=key_id, key_contents=key, issuer_id=issuer_id, transport=transport
+    ) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="session")
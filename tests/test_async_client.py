@@ -0,0 +1,259 @@
+"""Unit tests for the asynchronous client.
+
+The synchronous HTTP layer is mocked out, so these tests require no
+credentials and never touch Apple.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import asyncio
+import collections.abc
+import contextlib
+import inspect
+import itertools
+import os
+import sys
+import threading
+import typing
+from typing import Any, AsyncGenerator, Iterator, assert_type
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asconnect  # pylint: disable=wrong-import-position
+from asconnect.async_client import (  # pylint: disable=wrong-import-position
+    AsyncHttpClient,
+    AsyncSubClient,
+)
+from asconnect.httpclient import HttpClient  # pylint: disable=wrong-import-position
+from asconnect.models import App  # pylint: disable=wrong-import-position
+
+
+def _make_client(max_concurrency: int = 4) -> asconnect.AsyncClient:
+    """Build an async client with dummy credentials.
+
+    :param max_concurrency: The maximum number of requests in flight
+
+    :returns: The async client
+    """
+    return asconnect.AsyncClient(
+        key_id="KEY", key_contents="", issuer_id="ISSUER", max_concurrency=max_concurrency
+    )
+
+
+def test_get_follows_next_links() -> None:
+    """The async get should walk every page."""
+
+    client = _make_client()
+
+    pages = {
+        "https://api.example/v1/apps?limit=200": (
+            ["a", "b"],
+            "https://api.example/v1/apps?cursor=1",
+        ),
+        "https://api.example/v1/apps?cursor=1": (["c"], None),
+    }
+
+    def get_page(*, url: str, **_kwargs: Any) -> tuple[list[str], str | None]:
+        """Return the mocked page for a URL.
+
+        :returns: The page items and the next URL
+        """
+        return pages[url]
+
+    async def collect() -> list[str]:
+        """Collect all the items from the async get.
+
+        :returns: The items
+        """
+        async with client:
+            return [
+                item
+                async for item in client.http_client.get(
+                    data_type=list[str], url="https://api.example/v1/apps"
+                )
+            ]
+
+    with mock.patch.object(client.client.http_client, "get_page", side_effect=get_page):
+        items = asyncio.run(collect())
+
+    assert items == ["a", "b", "c"]
+
+
+def test_sub_client_listing_is_async_iterator() -> None:
+    """Generator methods on sub-clients should become async iterators."""
+
+    client = _make_client()
+    apps = [mock.MagicMock(spec=App, bundle_id=f"com.example.{index}") for index in range(250)]
+
+    async def collect() -> list[App]:
+        """Collect all the apps.
+
+        :returns: The apps
+        """
+        async with client:
+            listing = client.app.get_all()
+            assert_type(listing, AsyncGenerator[App, None])
+            assert_type(client.app.get_all(raw=True), AsyncGenerator[dict[str, Any], None])
+            return [app async for app in listing]
+
+    with mock.patch.object(client.client.http_client, "get", return_value=iter(apps)):
+        assert asyncio.run(collect()) == apps
+
+
+def test_sub_client_method_is_coroutine() -> None:
+    """Plain methods on sub-clients should become coroutines."""
+
+    client = _make_client()
+    app = mock.MagicMock(spec=App, bundle_id="com.example.app")
+
+    async def lookup() -> App | None:
+        """Look up the app.
+
+        :returns: The app
+        """
+        async with client:
+            return await client.app.get_from_bundle_id("com.example.app")
+
+    with mock.patch.object(client.client.http_client, "get", return_value=iter([app])):
+        assert asyncio.run(lookup()) is app
+
+
+def test_concurrency_is_bounded() -> None:
+    """No more than max_concurrency requests should run at once."""
+
+    client = _make_client(max_concurrency=3)
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+    release = threading.Event()
+
+    def patch(**_kwargs: Any) -> None:
+        """Track how many patches are running at once."""
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        release.wait(0.05)
+        with lock:
+            state["running"] -= 1
+
+    async def run_all() -> None:
+        """Fire off many patches at once."""
+        async with client:
+            await asyncio.gather(*[client.http_client.patch(data={}) for _ in range(20)])
+
+    with mock.patch.object(client.client.http_client, "patch", side_effect=patch):
+        asyncio.run(run_all())
+
+    assert state["peak"] == 3
+
+
+def test_sub_clients_declare_every_method() -> None:
+    """Each async sub-client should declare every public method of the client it wraps."""
+
+    client = _make_client()
+
+    for name, sub_client in vars(client).items():
+        if not isinstance(sub_client, AsyncSubClient):
+            continue
+
+        for method in dir(sub_client.client):
+            if method.startswith("_") or not callable(getattr(sub_client.client, method)):
+                continue
+
+            assert method in vars(type(sub_client)), f"{name}.{method} is not declared"
+
+
+def _async_return_type(annotation: Any) -> Any:
+    """Get what an async wrapper should return for a synchronous method.
+
+    :param annotation: The return annotation of the synchronous method
+
+    :returns: The return annotation the async wrapper should have
+    """
+    if typing.get_origin(annotation) is collections.abc.Iterator:
+        return AsyncGenerator[typing.get_args(annotation)[0], None]  # type: ignore[misc]
+
+    return annotation
+
+
+def test_sub_client_overloads_match() -> None:
+    """Overloads written out on the async sub-clients should match the methods they wrap."""
+
+    client = _make_client()
+    checked = 0
+
+    for sub_client in vars(client).values():
+        if not isinstance(sub_client, AsyncSubClient):
+            continue
+
+        for name, attribute in vars(type(sub_client)).items():
+            if not inspect.isfunction(attribute):
+                continue
+
+            overloads = typing.get_overloads(attribute)
+
+            if not overloads:
+                continue
+
+            expected = typing.get_overloads(getattr(type(sub_client.client), name))
+            assert len(overloads) == len(expected), name
+
+            for overload, sync_overload in zip(overloads, expected):
+                signature = inspect.signature(overload)
+                sync_signature = inspect.signature(sync_overload)
+                assert signature.parameters == sync_signature.parameters, name
+                assert signature.return_annotation == _async_return_type(
+                    sync_signature.return_annotation
+                ), name
+
+            checked += 1
+
+    assert checked > 0
+
+
+def test_get_takes_the_options_of_the_sync_get() -> None:
+    """The async get should take the same options as the sync one, as far as it can."""
+    async_parameters = inspect.signature(AsyncHttpClient.get).parameters
+    sync_parameters = inspect.signature(HttpClient.get).parameters
+
+    assert {
+        name: parameter
+        for name, parameter in sync_parameters.items()
+        if name != "prefetch"  # Pages are only fetched as they are needed
+    } == dict(async_parameters)
+
+
+def test_iteration_stopped_early_closes_the_generator() -> None:
+    """A generator which isn't consumed to the end should still be closed."""
+
+    client = _make_client()
+    closed = threading.Event()
+
+    def numbers() -> Iterator[int]:
+        """Count forever, recording when the generator is closed.
+
+        :returns: The numbers
+        """
+        try:
+            yield from itertools.count()
+        finally:
+            closed.set()
+
+    # Held here so that it isn't closed by being garbage collected
+    generator = numbers()
+
+    async def first() -> int | None:
+        """Take the first number.
+
+        :returns: The number
+        """
+        async with client:
+            async with contextlib.aclosing(client.http_client.iterate(generator)) as items:
+                async for item in items:
+                    return item
+
+        return None
+
+    assert asyncio.run(first()) == 0
+    assert closed.is_set()
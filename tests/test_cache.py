@@ -0,0 +1,294 @@
+"""Unit tests for the response cache."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from typing import Any
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect.cache import MemoryCache, ResponseCache, SqliteCache, canonical_url, write_types
+from asconnect.httpclient import HttpClient
+from tests.conftest import FakeClock
+
+# pylint: enable=wrong-import-position
+
+API = "https://api.appstoreconnect.apple.com/v1"
+
+
+@pytest.fixture(name="make_cache", params=["memory", "sqlite"])
+def fixture_make_cache(request: Any, tmp_path: Any) -> Any:
+    """Make caches of each kind.
+
+    :param request: The pytest request
+    :param tmp_path: A temporary directory
+
+    :returns: A function which makes a cache from a clock and any other options
+    """
+    caches: list[SqliteCache] = []
+
+    def make_cache(clock: FakeClock, **kwargs: Any) -> ResponseCache:
+        """Make a cache.
+
+        :param clock: The clock for the cache to use
+        :param kwargs: Any other options for the cache
+
+        :returns: The cache
+        """
+        if request.param == "memory":
+            return MemoryCache(clock=clock.time, **kwargs)
+
+        cache = SqliteCache(str(tmp_path / "cache.sqlite"), clock=clock.time, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make_cache
+
+    for cache in caches:
+        cache.close()
+
+
+def _resource(resource_type: str, identifier: str, **relationships: Any) -> dict[str, Any]:
+    """Build the JSON for a resource.
+
+    :param resource_type: The type of the resource
+    :param identifier: The ID of the resource
+    :param relationships: The resource linkage of each relationship
+
+    :returns: The JSON for the resource
+    """
+    return {
+        "type": resource_type,
+        "id": identifier,
+        "attributes": {"name": identifier},
+        "relationships": {name: {"data": data} for name, data in relationships.items()},
+    }
+
+
+def test_canonical_url() -> None:
+    """Equivalent URLs should share a cache entry."""
+    assert canonical_url(f"{API}/apps?limit=200&fields[apps]=name#top") == canonical_url(
+        "HTTPS://API.appstoreconnect.apple.com/v1/apps?fields[apps]=name&limit=200"
+    )
+
+
+def test_write_types() -> None:
+    """Writes should invalidate the types in the URL and the types they relate to."""
+    assert write_types(f"{API}/appStoreVersions/1/relationships/build") == {
+        "appStoreVersions",
+        "build",
+    }
+    assert write_types(
+        f"{API}/appScreenshots",
+        {"data": _resource("appScreenshots", "", appScreenshotSet={"type": "appScreenshotSets"})},
+    ) == {"appScreenshots", "appScreenshotSets"}
+
+
+def test_ttl_per_type(make_cache: Any) -> None:
+    """Responses should expire after the shortest TTL of the types they contain."""
+    clock = FakeClock()
+    cache = make_cache(clock, default_ttl=10, ttls={"apps": 100})
+
+    cache.put(f"{API}/apps", {"data": [_resource("apps", "1")]}, size=1)
+    cache.put(f"{API}/apps/1/builds", {"data": [_resource("builds", "2")]}, size=1)
+
+    clock.now = 50
+    assert cache.get(f"{API}/apps") is not None
+    assert cache.get(f"{API}/apps/1/builds") is None
+
+    clock.now = 100
+    assert cache.get(f"{API}/apps") is None
+
+
+def test_lru_eviction_by_size(make_cache: Any) -> None:
+    """The least recently used responses should be evicted to stay within the size limit."""
+    clock = FakeClock()
+    cache = make_cache(clock, max_bytes=100)
+
+    cache.put(f"{API}/apps/1", {"data": _resource("apps", "1")}, size=40)
+    clock.now += 1
+    cache.put(f"{API}/apps/2", {"data": _resource("apps", "2")}, size=40)
+    clock.now += 60
+    assert cache.get(f"{API}/apps/1") is not None
+    clock.now += 60
+
+    cache.put(f"{API}/apps/3", {"data": _resource("apps", "3")}, size=40)
+
+    assert len(cache) == 2
+    assert cache.size == 80
+    assert cache.get(f"{API}/apps/1") is not None
+    assert cache.get(f"{API}/apps/2") is None
+
+    cache.put(f"{API}/apps", {"data": []}, size=101)
+    assert cache.get(f"{API}/apps") is None
+
+
+def test_resources_are_indexed(make_cache: Any) -> None:
+    """Resources seen in a full listing should be served by type and ID."""
+    cache = make_cache(FakeClock())
+    app = _resource("apps", "1")
+
+    cache.put(f"{API}/apps?limit=200", {"data": [app]}, size=1)
+    cache.put(f"{API}/builds?fields[builds]=version", {"data": [_resource("builds", "2")]}, size=1)
+
+    assert cache.get(f"{API}/apps/1") == {"data": app}
+    assert cache.get(f"{API}/apps/1?include=builds") is None
+    assert cache.get(f"{API}/builds/2") is None
+
+    cache.invalidate(["apps"])
+    assert cache.get(f"{API}/apps/1") is None
+
+
+def test_reads_can_be_modified(make_cache: Any) -> None:
+    """Modifying a response which was cached or read from the cache shouldn't change the cache."""
+    cache = make_cache(FakeClock())
+    response = {"data": [_resource("apps", "1")]}
+
+    cache.put(f"{API}/apps", response, size=1)
+    response["data"].clear()
+    cache.get(f"{API}/apps")["data"][0]["attributes"] = {}
+    cache.get(f"{API}/apps/1")["data"]["attributes"] = {}
+
+    assert cache.get(f"{API}/apps") == {"data": [_resource("apps", "1")]}
+    assert cache.get(f"{API}/apps/1") == {"data": _resource("apps", "1")}
+
+
+def test_responses_are_scoped_to_credentials(make_cache: Any) -> None:
+    """Clients with different keys sharing a cache should never see each other's responses."""
+    cache = make_cache(FakeClock())
+    app = _resource("apps", "1")
+
+    cache.put(f"{API}/apps", {"data": [app]}, size=1, scope="ISSUER/ONE")
+
+    assert cache.get(f"{API}/apps", scope="ISSUER/ONE") == {"data": [app]}
+    assert cache.get(f"{API}/apps/1", scope="ISSUER/ONE") == {"data": app}
+    assert cache.get(f"{API}/apps", scope="ISSUER/TWO") is None
+    assert cache.get(f"{API}/apps/1", scope="OTHER/ONE") is None
+    assert cache.get(f"{API}/apps") is None
+
+
+@pytest.mark.parametrize("base_url", [API, "https://proxy.example/asc/v1"])
+def test_http_client_caches_reads_until_a_write(base_url: str) -> None:
+    """Repeated reads should be served from the cache until the client writes, whatever the base URL."""
+    http_client = HttpClient(
+        key_id="KEY",
+        key_contents="",
+        issuer_id="ISSUER",
+        log=logging.getLogger("test"),
+        cache=MemoryCache(),
+        base_url=base_url,
+    )
+    url = http_client.generate_url("betaGroups")
+    response = mock.MagicMock()
+    response.status_code = 200
+    response.ok = True
+    response.headers = {}
+    response.content = b"{}"
+    response.json.return_value = {"data": [_resource("betaGroups", "1")]}
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", return_value=response
+        ) as request_mock:
+            for _ in range(3):
+                assert http_client.get_page(data_type=list[dict], url=url, raw=True)
+            assert request_mock.call_count == 1
+
+            http_client.delete(endpoint="betaGroups/1")
+            http_client.get_page(data_type=list[dict], url=url, raw=True)
+
+    assert [call.args[0] for call in request_mock.call_args_list] == ["GET", "DELETE", "GET"]
+
+
+def test_sqlite_cache_is_shared_between_connections(tmp_path: Any) -> None:
+    """Separate connections (as in separate processes) should see each other's writes."""
+    path = str(tmp_path / "cache.sqlite")
+
+    def fill(index: int) -> None:
+        """Cache some responses through a connection of its own.
+
+        :param index: The index of the writer
+        """
+        with SqliteCache(path) as writer:
+            for item in range(20):
+                identifier = f"{index}-{item}"
+                writer.put(
+                    f"{API}/apps/{identifier}", {"data": _resource("apps", identifier)}, size=1
+                )
+
+    threads = [threading.Thread(target=fill, args=(index,)) for index in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    with SqliteCache(path) as reader, SqliteCache(path) as writer:
+        assert len(reader) == 80
+        assert reader.get(f"{API}/apps/3-19") == {"data": _resource("apps", "3-19")}
+
+        writer.invalidate_write(f"{API}/apps/3-19")
+        assert len(reader) == 0
+
+
+def test_sqlite_cache_from_an_older_version_is_reset(tmp_path: Any) -> None:
+    """A database with an older layout should be emptied rather than misread."""
+    path = str(tmp_path / "cache.sqlite")
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE resources (type TEXT, id TEXT, url TEXT)")
+        connection.execute("INSERT INTO resources VALUES ('apps', '1', 'url')")
+
+    with SqliteCache(path) as cache:
+        cache.put(f"{API}/apps", {"data": [_resource("apps", "1")]}, size=1, scope="ISSUER/ONE")
+        assert cache.get(f"{API}/apps/1", scope="ISSUER/ONE") == {"data": _resource("apps", "1")}
+
+
+def test_incomplete_caches_cannot_be_created() -> None:
+    """A cache missing part of the interface should fail when it is created, not when used."""
+
+    class Incomplete(ResponseCache):  # pylint: disable=abstract-method
+        """A cache which can't remove anything."""
+
+        def __len__(self) -> int:
+            """Get the number of cached responses.
+
+            :returns: Always 0
+            """
+            return 0
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()  # type: ignore[abstract]  # pylint: disable=abstract-class-instantiated
+
+
+def test_sqlite_reads_rarely_write(tmp_path: Any) -> None:
+    """Reads should only record when a response was used once the last record is old enough."""
+    clock = FakeClock()
+
+    with SqliteCache(str(tmp_path / "cache.sqlite"), clock=clock.time, touch_interval=60) as cache:
+        cache.put(f"{API}/apps", {"data": [_resource("apps", "1")]}, size=1)
+
+        # pylint: disable=protected-access
+        with mock.patch.object(cache, "_write", wraps=cache._write) as write_mock:
+            for _ in range(10):
+                clock.now += 1
+                assert cache.get(f"{API}/apps") is not None
+                assert cache.get(f"{API}/apps/1") is not None
+
+            assert write_mock.call_count == 0
+
+            clock.now += 60
+            assert cache.get(f"{API}/apps/1") is not None
+            assert cache.get(f"{API}/apps") is not None
+            assert write_mock.call_count == 1
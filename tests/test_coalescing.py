@@ -0,0 +1,190 @@
+"""Unit tests for coalescing identical requests."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import concurrent.futures
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect.coalescing import SingleFlight
+from asconnect.deadline import deadline_scope
+from asconnect.exceptions import DeadlineExceededError
+from asconnect.httpclient import HttpClient
+
+# pylint: enable=wrong-import-position
+
+CALLERS = 8
+
+
+def _call_together(function: Any) -> list[Any]:
+    """Call a function from several threads at once.
+
+    :param function: The function to call, given the index of the caller
+
+    :returns: What each call returned, or the exception it raised
+    """
+    barrier = threading.Barrier(CALLERS)
+
+    def call(index: int) -> Any:
+        """Call the function once every thread is ready.
+
+        :param index: The index of the caller
+
+        :returns: What the call returned, or the exception it raised
+        """
+        barrier.wait()
+        try:
+            return function(index)
+        except ValueError as ex:
+            return ex
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        return list(executor.map(call, range(CALLERS)))
+
+
+def test_concurrent_calls_share_one_result() -> None:
+    """Callers with the same key should share one call, and its errors."""
+    group = SingleFlight()
+    calls = []
+
+    def slow(key: str) -> Any:
+        """Record the call and wait for the others to join it.
+
+        :param key: The key of the call
+
+        :raises ValueError: If the key is "bad"
+
+        :returns: A new object
+        """
+        calls.append(key)
+        time.sleep(0.2)
+
+        if key == "bad":
+            raise ValueError(key)
+
+        return object()
+
+    results = _call_together(lambda index: group.call("same", lambda: slow("same")))
+    assert calls == ["same"]
+    assert all(result is results[0] for result in results)
+
+    errors = _call_together(lambda index: group.call("bad", lambda: slow("bad")))
+    assert calls == ["same", "bad"]
+    assert all(isinstance(error, ValueError) and error.args == ("bad",) for error in errors)
+
+    # Each waiter gets its own exception, chained from the one the call raised
+    assert len({id(error) for error in errors}) == CALLERS
+    originals = [error for error in errors if error.__cause__ is None]
+    assert len(originals) == 1
+    assert all(error.__cause__ is originals[0] for error in errors if error is not originals[0])
+
+    group.call("same", lambda: slow("same"))
+    assert calls == ["same", "bad", "same"]
+
+    _call_together(lambda index: group.call(index % 2, lambda: slow("split")))
+    assert calls.count("split") == 2
+
+
+def test_callers_with_time_left_retry_after_a_deadline() -> None:
+    """A call which ran out of the leader's time should be made again by those with time left."""
+    group = SingleFlight()
+    calls: list[str] = []
+    started = threading.Event()
+
+    def leader() -> Any:
+        """Run out of time, once the others have joined.
+
+        :raises DeadlineExceededError: Always
+        """
+        calls.append("leader")
+        started.set()
+        time.sleep(0.2)
+        raise DeadlineExceededError("during GET", 0.1)
+
+    def follower(budget: float | None) -> Any:
+        """Join the leader's call.
+
+        :param budget: The time the follower has
+
+        :returns: The result of the call
+        """
+        started.wait()
+
+        def call() -> str:
+            """Make the call again.
+
+            :returns: The result
+            """
+            calls.append("follower")
+            return "result"
+
+        with deadline_scope(budget):
+            return group.call("same", call)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        leading = executor.submit(group.call, "same", leader)
+        patient = executor.submit(follower, None)
+        hurried = executor.submit(follower, 0.1)
+
+        with pytest.raises(DeadlineExceededError):
+            leading.result()
+
+        assert patient.result() == "result"
+
+        with pytest.raises(DeadlineExceededError):
+            hurried.result()
+
+    assert calls == ["leader", "follower"]
+
+
+@pytest.mark.parametrize("coalesce_requests", [True, False])
+def test_http_client_coalesces_identical_pages(coalesce_requests: bool) -> None:
+    """Identical pages fetched at once should be sent once and decoded once."""
+    http_client = HttpClient(
+        key_id="KEY",
+        key_contents="",
+        issuer_id="ISSUER",
+        log=logging.getLogger("test"),
+        coalesce_requests=coalesce_requests,
+    )
+    response = mock.MagicMock()
+    response.status_code = 200
+    response.ok = True
+    response.headers = {}
+    response.json.return_value = {"data": [{"id": "1"}]}
+
+    def request(*_: Any, **__: Any) -> Any:
+        """Respond slowly, so that the requests overlap.
+
+        :returns: The response
+        """
+        time.sleep(0.2)
+        return response
+
+    url = "https://api.appstoreconnect.apple.com/v1/apps?limit=200"
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", side_effect=request
+        ) as request_mock:
+            pages = _call_together(
+                lambda index: http_client.get_page(data_type=list[dict], url=url, raw=True)
+            )
+
+    if coalesce_requests:
+        assert request_mock.call_count == 1
+        assert all(page[0] is pages[0][0] for page in pages)
+    else:
+        assert request_mock.call_count == CALLERS
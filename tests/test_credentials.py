@@ -0,0 +1,221 @@
+"""Unit tests for the credentials."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable
+from unittest import mock
+
+from cryptography.hazmat.primitives import serialization
+import jwt
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect import credentials as credentials_module
+from asconnect.credentials import ApiKey, CredentialPool, Credentials
+from asconnect.httpclient import HttpClient
+from tests.conftest import FakeClock, make_key
+
+# pylint: enable=wrong-import-position
+
+
+def _make_credentials(clock: FakeClock) -> Credentials:
+    """Build credentials for a new key.
+
+    :param clock: The clock to use
+
+    :returns: The credentials
+    """
+    contents, _ = make_key()
+    return Credentials(
+        key_id="KEY",
+        key_contents=contents,
+        issuer_id="ISSUER",
+        log=logging.getLogger("test"),
+        clock=clock.date,
+    )
+
+
+def _wait_for(condition: Callable[[], bool]) -> None:
+    """Wait for a background thread to do something.
+
+    :param condition: Returns True once it has been done
+    """
+    deadline = time.monotonic() + 5
+
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_token_is_signed_with_the_key() -> None:
+    """The token should verify with the public key and carry the expected claims."""
+    contents, public_key = make_key()
+    credentials = Credentials(
+        key_id="KEY", key_contents=contents, issuer_id="ISSUER", log=logging.getLogger("test")
+    )
+
+    token = credentials.token()
+    claims = jwt.decode(token, public_key, algorithms=["ES256"], audience="appstoreconnect-v1")
+
+    assert claims["iss"] == "ISSUER"
+    assert jwt.get_unverified_header(token)["kid"] == "KEY"
+    assert claims["exp"] - claims["iat"] == credentials_module.NEW_TOKEN_AGE_IN_MINUTES * 60
+    assert credentials.token() == token
+
+
+def test_key_is_parsed_once() -> None:
+    """The key should only be parsed again once it changes."""
+    credentials = _make_credentials(FakeClock())
+
+    with mock.patch.object(
+        credentials_module.serialization,
+        "load_pem_private_key",
+        wraps=serialization.load_pem_private_key,
+    ) as load_mock:
+        credentials.token()
+        credentials.invalidate_token()
+        credentials.token()
+        assert load_mock.call_count == 1
+
+        credentials.key_contents, _ = make_key()
+        credentials.token()
+        assert load_mock.call_count == 2
+
+    credentials.key_contents = "not a key"
+
+    with pytest.raises(ValueError):
+        credentials.token()
+
+
+def test_concurrent_requests_sign_once() -> None:
+    """Threads which all need a token at once should share a single signing."""
+    credentials = _make_credentials(FakeClock())
+    barrier = threading.Barrier(8)
+    tokens = []
+
+    def get_token() -> None:
+        """Get a token once every thread is ready."""
+        barrier.wait()
+        tokens.append(credentials.token())
+
+    with mock.patch.object(credentials_module.jwt, "encode", wraps=jwt.encode) as encode_mock:
+        threads = [threading.Thread(target=get_token) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+    assert encode_mock.call_count == 1
+    assert len(set(tokens)) == 1
+
+
+def test_token_is_refreshed_ahead_of_expiry() -> None:
+    """An old token should still be returned while a new one is signed in the background."""
+    clock = FakeClock()
+    credentials = _make_credentials(clock)
+    first = credentials.token()
+
+    clock.now = 8 * 60
+    assert credentials.token() == first
+
+    _wait_for(lambda: credentials.token() != first)
+
+    clock.now = 11 * 60
+    assert credentials.token() != first
+
+
+def _make_pool(remaining: dict[str, int | None], count: int = 3) -> CredentialPool:
+    """Build a pool of keys with no key contents.
+
+    :param remaining: The remaining quota of each key ID
+    :param count: The number of keys
+
+    :returns: The pool
+    """
+    log = logging.getLogger("test")
+    return CredentialPool(
+        [Credentials(key_id=f"KEY{index}", key_contents="", log=log) for index in range(count)],
+        remaining=remaining.get,
+        log=log,
+    )
+
+
+def test_pool_prefers_the_most_remaining_quota() -> None:
+    """Requests should go to the key with the most quota left, unknown quota first."""
+    remaining: dict[str, int | None] = {"KEY0": 10, "KEY1": 500, "KEY2": 20}
+    pool = _make_pool(remaining)
+
+    assert pool.choose().key_id == "KEY1"
+
+    remaining["KEY2"] = None
+    assert pool.choose().key_id == "KEY2"
+
+    remaining.update({"KEY0": 5, "KEY1": 5, "KEY2": 5})
+    assert {pool.choose().key_id for _ in range(3)} == {"KEY0", "KEY1", "KEY2"}
+
+
+def test_pool_fails_over_from_rejected_keys() -> None:
+    """Keys which are rejected should be skipped until every key has been."""
+    pool = _make_pool({}, count=2)
+    first, second = pool.credentials
+
+    first.mark_verified()
+    assert pool.report_unauthorized(first)
+    assert not first.disabled
+
+    assert pool.report_unauthorized(first)
+    assert first.disabled
+    assert all(pool.choose() is second for _ in range(4))
+
+    assert not pool.report_unauthorized(second)
+    assert {pool.choose().key_id for _ in range(2)} == {"KEY0", "KEY1"}
+
+    first.key_contents = "new contents"
+    assert not first.disabled
+
+
+def test_http_client_retries_401_with_another_key() -> None:
+    """A request rejected for one key should be sent again with the next."""
+    http_client = HttpClient(
+        key_id="KEY0",
+        key_contents="",
+        issuer_id="ISSUER",
+        log=logging.getLogger("test"),
+        additional_keys=[ApiKey("KEY1", "", "ISSUER")],
+    )
+
+    responses = []
+
+    for status_code in (401, 200):
+        response = mock.MagicMock()
+        response.status_code = status_code
+        response.ok = status_code == 200
+        response.headers = {}
+        response.json.return_value = {"data": []}
+        responses.append(response)
+
+    with mock.patch.object(
+        http_client, "generate_token", side_effect=lambda credentials: credentials.key_id
+    ):
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", side_effect=responses
+        ) as request_mock:
+            assert not list(http_client.get(data_type=list[str], endpoint="apps"))
+
+    keys = {call.kwargs["headers"]["Authorization"] for call in request_mock.call_args_list}
+    assert keys == {"Bearer KEY0", "Bearer KEY1"}
+    assert [credentials.disabled for credentials in http_client.credential_pool.credentials] == [
+        True,
+        False,
+    ]
@@ -0,0 +1,164 @@
+"""Unit tests for timeouts and deadlines."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import sys
+import threading
+import time
+from typing import Iterator
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+import asconnect
+from asconnect.coalescing import SingleFlight
+from asconnect.deadline import current_deadline, deadline_scope, request_timeout
+from asconnect.exceptions import DeadlineExceededError
+from asconnect.stub_server import StubServer
+from tests.conftest import FakeClock, StubClientFactory
+
+# pylint: enable=wrong-import-position
+
+
+@pytest.fixture(name="client")
+def fixture_client(
+    stub_server: StubServer, stub_client: StubClientFactory
+) -> Iterator[asconnect.Client]:
+    """Create a client for a stub server with an app, which waits a while between retries.
+
+    :param stub_server: The server
+    :param stub_client: Creates clients for the server
+
+    :returns: The client
+    """
+    stub_server.store.populate(apps=1, builds=1)
+
+    with stub_client(retry_policy=asconnect.RetryPolicy(base_delay=5, jitter=0)) as client:
+        yield client
+
+
+def test_nested_deadlines_only_shorten() -> None:
+    """An inner budget should apply only if it ends before the outer one."""
+    assert current_deadline() is None
+    assert request_timeout(10, 60) == (10, 60)
+
+    with deadline_scope(5) as outer:
+        assert outer is not None
+
+        with deadline_scope(60) as inner:
+            assert inner is outer
+
+        with deadline_scope(None) as inner:
+            assert inner is outer
+
+        with deadline_scope(1) as inner:
+            assert inner is not None and inner is not outer
+            connect_timeout, read_timeout = request_timeout(10, None)
+            assert connect_timeout is not None and connect_timeout <= 1
+            assert read_timeout is not None and read_timeout <= 1
+
+        assert current_deadline() is outer
+
+    assert current_deadline() is None
+
+
+def test_nothing_is_sent_after_the_deadline(
+    fake_clock: FakeClock, stub_client: StubClientFactory
+) -> None:
+    """A deadline which passes after it was last checked should still fail clearly."""
+    with deadline_scope(5, clock=fake_clock.time):
+        assert request_timeout(10, 60) == (5, 5)
+
+        fake_clock.now = 5
+
+        with pytest.raises(DeadlineExceededError):
+            request_timeout(10, 60)
+
+    with stub_client() as client:
+
+        def token(*_: object) -> str:
+            """Run out the deadline while the token is being made.
+
+            :returns: A token
+            """
+            fake_clock.now += 10
+            return "token"
+
+        with mock.patch.object(client.http_client, "generate_token", side_effect=token):
+            # pylint: disable=protected-access
+            with mock.patch.object(client.http_client._session, "request") as request_mock:
+                with deadline_scope(5, clock=fake_clock.time):
+                    with pytest.raises(DeadlineExceededError, match="before GET"):
+                        client.http_client.get_page(
+                            data_type=list[dict], url=client.http_client.generate_url("apps")
+                        )
+
+    request_mock.assert_not_called()
+
+
+def test_slow_response_exceeds_deadline(client: asconnect.Client, stub_server: StubServer) -> None:
+    """A response which would arrive after the deadline should fail when the deadline passes."""
+    stub_server.latency = 2
+    start = time.monotonic()
+
+    with pytest.raises(DeadlineExceededError) as error:
+        with deadline_scope(0.3):
+            list(client.app.get_all())
+
+    assert time.monotonic() - start < 1.5
+    assert error.value.budget == 0.3
+    assert "GET" in str(error.value)
+
+
+def test_retry_which_would_overrun_fails_fast(
+    client: asconnect.Client, stub_server: StubServer
+) -> None:
+    """A retry which has to wait past the deadline should fail without waiting."""
+    stub_server.fail_next(503)
+
+    with mock.patch("asconnect.retry.time.sleep") as sleep_mock:
+        with pytest.raises(DeadlineExceededError, match="retry"):
+            with deadline_scope(2):
+                list(client.app.get_all())
+
+    sleep_mock.assert_not_called()
+
+
+def test_operations_take_a_deadline(client: asconnect.Client) -> None:
+    """High level operations should give up once their budget is spent."""
+    with mock.patch.object(client.build, "get_from_build_number", return_value=None):
+        start = time.monotonic()
+
+        with pytest.raises(DeadlineExceededError, match="to appear"):
+            client.build.wait_for_build_to_process("com.example.app0", "99", 30, deadline=5)
+
+        assert time.monotonic() - start < 1
+
+
+def test_waiting_for_a_shared_call_is_bounded() -> None:
+    """Waiting for an identical call in flight should stop at the deadline."""
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow() -> None:
+        """Block until released."""
+        started.set()
+        release.wait(5)
+
+    leader = threading.Thread(target=group.call, args=("key", slow))
+    leader.start()
+    started.wait(5)
+
+    try:
+        with pytest.raises(DeadlineExceededError, match="identical request"):
+            with deadline_scope(0.1):
+                group.call("key", slow)
+    finally:
+        release.set()
+        leader.join()
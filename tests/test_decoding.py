@@ -0,0 +1,292 @@
+"""Unit tests for the compiled decoders."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import datetime
+import enum
+import os
+import sys
+import threading
+import time
+from typing import Any, ClassVar
+from unittest import mock
+
+import deserialize
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect import decoding
+from asconnect.decoding import compile_decoder, decode
+from asconnect.models import App, CustomerReview
+from asconnect.models.apps import ContentRightsDeclaration
+from asconnect.models.review_submissions import ReviewSubmission, ReviewSubmissionState
+
+# pylint: enable=wrong-import-position
+
+
+class _Node:
+    """A model which refers to itself, and which no other test decodes."""
+
+    name: str
+    children: list["_Node"]
+
+
+class _Tagged:
+    """A model with a class variable, which only `deserialize` can decode."""
+
+    kind: ClassVar[str] = "tagged"
+    name: str
+
+
+def _as_plain(value: Any) -> Any:
+    """Convert a decoded value into plain data so that two decodings can be compared.
+
+    :param value: The decoded value
+
+    :returns: The plain data
+    """
+    if isinstance(value, list):
+        return [_as_plain(item) for item in value]
+
+    if isinstance(value, dict):
+        return {key: _as_plain(item) for key, item in value.items()}
+
+    if isinstance(value, enum.Enum):
+        return value
+
+    slots = [name for base in type(value).__mro__ for name in getattr(base, "__slots__", ())]
+
+    if slots:
+        return {name: _as_plain(getattr(value, name, None)) for name in slots}
+
+    return value
+
+
+def _is_decoded(instance: Any, name: str) -> bool:
+    """Check if a field of a lazy model has been decoded, without decoding it.
+
+    :param instance: The model instance
+    :param name: The name of the field
+
+    :returns: True if the field has been decoded, False otherwise
+    """
+    try:
+        object.__getattribute__(instance, name)
+    except AttributeError:
+        return False
+    return True
+
+
+def _app(identifier: str, **attributes: Any) -> dict[str, Any]:
+    """Build the JSON for an app.
+
+    :param identifier: The app ID
+    :param attributes: Attributes to add or override
+
+    :returns: The JSON for the app
+    """
+    return {
+        "type": "apps",
+        "id": identifier,
+        "attributes": {
+            "bundleId": f"com.example.{identifier}",
+            "name": f"App {identifier}",
+            "primaryLocale": "en-US",
+            "sku": identifier.upper(),
+            "contentRightsDeclaration": "USES_THIRD_PARTY_CONTENT",
+            "isOrEverWasMadeForKids": False,
+            **attributes,
+        },
+        "relationships": {
+            "builds": {
+                "links": {
+                    "self": f"https://api.example/v1/apps/{identifier}/relationships/builds",
+                    "related": f"https://api.example/v1/apps/{identifier}/builds",
+                }
+            }
+        },
+        "links": {"self": f"https://api.example/v1/apps/{identifier}"},
+    }
+
+
+def test_matches_deserialize_for_a_page() -> None:
+    """Test that a page decodes exactly as deserialize would decode it."""
+    page = [_app("one"), _app("two", contentRightsDeclaration=None)]
+
+    apps = decode(list[App], page)
+
+    assert _as_plain(apps) == _as_plain(deserialize.deserialize(list[App], page))
+    assert apps[0].attributes.content_rights_declaration == (
+        ContentRightsDeclaration.USES_THIRD_PARTY_CONTENT
+    )
+    assert apps[1].attributes.content_rights_declaration is None
+
+
+def test_missing_optional_field_is_none() -> None:
+    """Test that missing optional fields are set to None."""
+    app = decode(App, _app("one"))
+
+    assert app.attributes.available_in_new_territories is None
+    assert app.attributes.subscription_status_url is None
+
+
+def test_parser_and_auto_snake() -> None:
+    """Test that parsers run on the camel cased keys of auto_snake classes."""
+    data = {
+        "type": "customerReviews",
+        "id": "review-1",
+        "attributes": {
+            "body": "Great",
+            "createdDate": "2024-01-01T12:00:00-08:00",
+            "rating": 5,
+            "reviewerNickname": "someone",
+            "title": "Great app",
+            "territory": "USA",
+        },
+        "relationships": None,
+        "links": {"self": "https://api.example/v1/customerReviews/review-1"},
+    }
+
+    review = decode(CustomerReview, data)
+
+    assert isinstance(review.attributes.created_date, datetime.datetime)
+    assert review.attributes.reviewer_nickname == "someone"
+    assert _as_plain(review) == _as_plain(deserialize.deserialize(CustomerReview, data))
+
+
+def test_errors_match_deserialize() -> None:
+    """Test that invalid data raises the same exception type as deserialize."""
+    data = _app("one")
+    del data["attributes"]["sku"]
+
+    with pytest.raises(deserialize.DeserializeException):
+        decode(App, data)
+
+    attributes = {"platform": "IOS", "state": "NOT_A_STATE"}
+    submission = {
+        "type": "reviewSubmissions",
+        "id": "submission-1",
+        "attributes": attributes,
+        "relationships": None,
+        "links": {"self": "https://api.example/v1/reviewSubmissions/submission-1"},
+    }
+
+    with pytest.raises(deserialize.DeserializeException):
+        decode(ReviewSubmission, submission)
+
+    attributes["state"] = "COMPLETING"
+    assert decode(ReviewSubmission, submission).attributes.state == ReviewSubmissionState.COMPLETING
+
+
+def test_decoders_are_cached() -> None:
+    """Test that a decoder is only compiled once per type."""
+    assert compile_decoder(list[App]) is compile_decoder(list[App])
+    assert compile_decoder(App) is compile_decoder(App)
+
+
+def test_uncompilable_types_fall_back_to_deserialize() -> None:
+    """Test that the fallback is cached, and that partial decoding is refused rather than dropped."""
+    compile_type = decoding._compile  # pylint: disable=protected-access
+
+    with mock.patch.object(decoding, "_compile", wraps=compile_type) as compile_mock:
+        assert decode(_Tagged, {"name": "one"}).name == "one"
+        assert decode(_Tagged, {"name": "two"}).name == "two"
+
+    assert compile_mock.call_count == 1
+    assert compile_decoder(_Tagged) is compile_decoder(_Tagged)
+
+    with pytest.raises(ValueError, match="sparse fieldset"):
+        decode(_Tagged, {}, partial=True)
+
+
+def test_lazy_models_decode_on_access() -> None:
+    """Test that lazy models only decode (and validate) each field when it is accessed."""
+    data = _app("one")
+    del data["attributes"]["sku"]
+
+    app = decode(App, data, lazy=True)
+
+    assert isinstance(app, App)
+    assert not any(
+        _is_decoded(app, name) for name in ("identifier", "attributes", "relationships", "links")
+    )
+
+    assert app.bundle_id == "com.example.one"
+    assert app.relationships is not None
+    assert app.relationships["builds"].links.related == "https://api.example/v1/apps/one/builds"
+    assert not _is_decoded(app, "links")
+
+    with pytest.raises(deserialize.DeserializeException):
+        _ = app.attributes.sku
+
+    eager = decode(App, _app("two"))
+    lazy = decode(App, _app("two"), lazy=True)
+    assert lazy.attributes.name == eager.attributes.name
+    assert lazy.attributes.content_rights_declaration == eager.attributes.content_rights_declaration
+
+
+def test_models_are_slotted_with_a_short_repr() -> None:
+    """Test that models don't carry a dictionary and have a cheap repr."""
+    app = decode(App, _app("one"))
+
+    assert not hasattr(app, "__dict__")
+    assert not hasattr(app.attributes, "__dict__")
+    assert repr(app) == "App(identifier='one')"
+    assert repr(app.attributes).startswith(
+        "AppAttributes(bundle_id='com.example.one', name='App one', primary_locale='en-US'"
+    )
+
+
+def test_partial_models_allow_missing_fields() -> None:
+    """Test that fields left out of a sparse fieldset are set to None."""
+    data = {
+        "type": "apps",
+        "id": "one",
+        "attributes": {"bundleId": "com.example.one"},
+        "links": {"self": "https://api.example/v1/apps/one"},
+    }
+
+    with pytest.raises(deserialize.DeserializeException):
+        decode(App, data)
+
+    app = decode(App, data, partial=True)
+
+    assert app.bundle_id == "com.example.one"
+    assert app.attributes.sku is None
+    assert app.attributes.content_rights_declaration is None
+    assert app.relationships is None
+
+
+def test_types_being_compiled_are_not_shared() -> None:
+    """Test that a thread decoding a type another thread is compiling waits for it."""
+    data = {"name": "root", "children": [{"name": "leaf", "children": []}]}
+    started = threading.Event()
+    compile_type = decoding._compile  # pylint: disable=protected-access
+
+    def slow_compile(data_type: Any, mode: Any) -> Any:
+        """Compile a type, slowly.
+
+        :param data_type: The type to compile
+        :param mode: How to decode models
+
+        :returns: The decoder
+        """
+        if data_type is _Node:
+            started.set()
+            time.sleep(0.2)
+
+        return compile_type(data_type, mode)
+
+    results: list[Any] = []
+
+    with mock.patch.object(decoding, "_compile", side_effect=slow_compile):
+        first = threading.Thread(target=lambda: results.append(decode(_Node, data)))
+        first.start()
+        assert started.wait(5)
+        results.append(decode(_Node, data))
+        first.join()
+
+    assert [[child.name for child in node.children] for node in results] == [["leaf"], ["leaf"]]
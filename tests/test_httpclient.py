@@ -0,0 +1,422 @@
+"""Unit tests for the HTTP client.
+
+These tests exercise `HttpClient` directly and never touch Apple, so they
+require no credentials.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import logging
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asconnect  # pylint: disable=wrong-import-position
+from asconnect.exceptions import AppStoreConnectError  # pylint: disable=wrong-import-position
+from asconnect.httpclient import HttpClient  # pylint: disable=wrong-import-position
+from asconnect.retry import RetryPolicy  # pylint: disable=wrong-import-position
+
+
+def _make_http_client(**kwargs) -> HttpClient:  # type: ignore[no-untyped-def]
+    """Build an HttpClient with dummy credentials.
+
+    :returns: The HTTP client
+    """
+    return HttpClient(
+        key_id="KEY",
+        key_contents="",
+        issuer_id="ISSUER",
+        log=logging.getLogger("test"),
+        **kwargs,
+    )
+
+
+def test_session_pool_is_configured() -> None:
+    """The pool settings should be applied to the session adapters."""
+    http_client = _make_http_client(pool_connections=3, pool_maxsize=7, connection_retries=2)
+
+    # pylint: disable=protected-access
+    adapter = http_client._session.get_adapter("https://api.appstoreconnect.apple.com/v1/apps")
+    assert adapter._pool_connections == 3  # type: ignore[attr-defined]
+    assert adapter._pool_maxsize == 7  # type: ignore[attr-defined]
+    assert adapter.max_retries.connect == 2  # type: ignore[attr-defined]
+    assert adapter.max_retries.read == 0  # type: ignore[attr-defined]
+    assert http_client._session.headers["Connection"] == "keep-alive"
+
+
+def test_keep_alive_can_be_disabled() -> None:
+    """Disabling keep-alive should ask the server to close each connection."""
+    http_client = _make_http_client(keep_alive=False)
+
+    # pylint: disable=protected-access
+    assert http_client._session.headers["Connection"] == "close"
+
+
+def test_client_shares_one_http_client() -> None:
+    """Every sub-client should share the same pooled HTTP client."""
+    client = asconnect.Client(key_id="KEY", key_contents="", issuer_id="ISSUER")
+
+    sub_clients: list = [
+        client.app,
+        client.app_info,
+        client.beta_review,
+        client.build,
+        client.reviews,
+        client.screenshots,
+        client.users,
+        client.version,
+    ]
+
+    for sub_client in sub_clients:
+        assert sub_client.http_client is client.http_client
+
+
+def test_context_manager_closes_session() -> None:
+    """Leaving the context manager should close the pooled connections."""
+    client = asconnect.Client(key_id="KEY", key_contents="", issuer_id="ISSUER")
+
+    # pylint: disable=protected-access
+    with mock.patch.object(client.http_client._session, "close") as close_mock:
+        with client:
+            close_mock.assert_not_called()
+
+    close_mock.assert_called_once()
+
+
+def _make_response(status_code: int, headers: dict[str, str] | None = None) -> mock.MagicMock:
+    """Build a mocked response.
+
+    :param status_code: The HTTP status code
+    :param headers: The response headers
+
+    :returns: The mocked response
+    """
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.ok = 200 <= status_code < 300
+    response.headers = headers or {}
+    response.json.return_value = {"data": None}
+    return response
+
+
+def test_rate_limit_header_updates_budget() -> None:
+    """Every API response should feed the rate limiter."""
+    http_client = _make_http_client()
+
+    response = _make_response(200, {"X-Rate-Limit": "user-hour-lim:3600;user-hour-rem:42;"})
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(http_client._session, "request", return_value=response):
+            assert not list(http_client.get(data_type=list[str], endpoint="apps"))
+
+    assert http_client.rate_limit_remaining == 42
+
+
+def test_429_is_retried_after_retry_after() -> None:
+    """A 429 should be sent again once the Retry-After period has passed."""
+    http_client = _make_http_client()
+
+    responses = [
+        _make_response(429, {"Retry-After": "7"}),
+        _make_response(200, {"X-Rate-Limit": "user-hour-lim:3600;user-hour-rem:10;"}),
+    ]
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(http_client.retry_policy, "_sleep") as sleep_mock:
+            with mock.patch.object(http_client.rate_limiter, "_sleep"):
+                with mock.patch.object(
+                    http_client._session, "request", side_effect=responses
+                ) as request_mock:
+                    assert http_client.post(endpoint="apps", data={}) is None
+
+    assert request_mock.call_count == 2
+    sleep_mock.assert_called_once()
+    assert sleep_mock.call_args.args[0] >= 7.0
+
+
+def test_server_errors_are_retried_for_get() -> None:
+    """A 5xx on a GET should be retried with backoff."""
+    http_client = _make_http_client(retry_policy=RetryPolicy(max_attempts=3, jitter=0))
+
+    responses = [_make_response(503), _make_response(502), _make_response(200)]
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(http_client.retry_policy, "_sleep") as sleep_mock:
+            with mock.patch.object(
+                http_client._session, "request", side_effect=responses
+            ) as request_mock:
+                assert not list(http_client.get(data_type=list[str], endpoint="apps"))
+
+    assert request_mock.call_count == 3
+    assert [call.args[0] for call in sleep_mock.call_args_list] == [1.0, 2.0]
+
+
+def test_server_errors_are_not_retried_for_post() -> None:
+    """A 5xx on a POST may have created something, so it should not be retried."""
+    http_client = _make_http_client()
+
+    response = _make_response(500)
+    response.json.return_value = {"errors": [{"status": "500", "code": "X"}]}
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", return_value=response
+        ) as request_mock:
+            with pytest.raises(AppStoreConnectError):
+                http_client.post(endpoint="apps", data={})
+
+    assert request_mock.call_count == 1
+
+
+def test_stale_token_is_replaced_on_401() -> None:
+    """A 401 with known good credentials should be retried with a new token."""
+    http_client = _make_http_client()
+    http_client.credentials.verified = True
+
+    responses = [_make_response(401), _make_response(200)]
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(http_client.retry_policy, "_sleep"):
+            with mock.patch.object(
+                http_client._session, "request", side_effect=responses
+            ) as request_mock:
+                assert not list(http_client.get(data_type=list[str], endpoint="apps"))
+
+    assert request_mock.call_count == 2
+
+
+def test_uploads_do_not_count_towards_rate_limit() -> None:
+    """Chunk uploads go to pre-signed URLs, so shouldn't touch the limiter."""
+    http_client = _make_http_client()
+
+    with mock.patch.object(http_client.rate_limiter, "acquire") as acquire_mock:
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", return_value=_make_response(200)
+        ) as request_mock:
+            http_client.put_chunk(
+                url="https://upload.example/chunk",
+                additional_headers={},
+                data=b"1234",
+                use_auth_header=False,
+            )
+
+    acquire_mock.assert_not_called()
+    assert "Authorization" not in request_mock.call_args.kwargs["headers"]
+
+
+def test_listings_request_the_largest_page_by_default() -> None:
+    """A listing should ask for full pages, but a single resource should not be paged."""
+    http_client = _make_http_client()
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", return_value=_make_response(200)
+        ) as request_mock:
+            list(http_client.get(data_type=list[str], endpoint="apps"))
+            list(http_client.get(data_type=list[str], endpoint="apps?limit=5", page_size=50))
+            list(http_client.get(data_type=str, endpoint="apps/123"))
+
+    urls = [call.args[1] for call in request_mock.call_args_list]
+    assert urls == [
+        "https://api.appstoreconnect.apple.com/v1/apps?limit=200",
+        "https://api.appstoreconnect.apple.com/v1/apps?limit=5",
+        "https://api.appstoreconnect.apple.com/v1/apps/123",
+    ]
+
+
+def test_page_size_is_validated() -> None:
+    """A page size the endpoint won't accept should fail before any request."""
+    http_client = _make_http_client()
+
+    with pytest.raises(ValueError):
+        list(http_client.get(data_type=list[str], endpoint="apps", page_size=201))
+
+    with pytest.raises(ValueError):
+        list(http_client.get(data_type=list[str], endpoint="apps", page_size=0))
+
+    with pytest.raises(ValueError):
+        list(http_client.get(data_type=list[str], endpoint="apps", page_size=100, max_page_size=50))
+
+
+def test_raw_and_lazy_listings() -> None:
+    """Raw listings should yield the JSON as is, and lazy ones should decode on access."""
+    http_client = _make_http_client()
+    response = _make_response(200)
+    response.json.return_value = {
+        "data": [
+            {
+                "type": "users",
+                "id": "user-1",
+                "attributes": {"username": "someone@example.com"},
+                "links": {"self": "https://api.example/v1/users/user-1"},
+            }
+        ]
+    }
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(http_client._session, "request", return_value=response):
+            raw_users = list(
+                http_client.get(data_type=list[asconnect.models.User], endpoint="users", raw=True)
+            )
+            lazy_users = list(
+                http_client.get(data_type=list[asconnect.models.User], endpoint="users", lazy=True)
+            )
+
+    assert raw_users == response.json.return_value["data"]
+
+    assert isinstance(lazy_users[0], asconnect.models.User)
+    assert lazy_users[0].identifier == "user-1"
+    assert lazy_users[0].attributes.username == "someone@example.com"
+
+    with pytest.raises(ValueError):
+        list(http_client.get(data_type=list[str], endpoint="users", raw=True, lazy=True))
+
+
+def test_sparse_fieldsets() -> None:
+    """Requested fields should be sent to the API, and the fields left out should be None."""
+    http_client = _make_http_client()
+    response = _make_response(200)
+    response.json.return_value = {
+        "data": [
+            {
+                "type": "builds",
+                "id": "build-1",
+                "attributes": {"version": "42", "processingState": "VALID"},
+                "links": {"self": "https://api.example/v1/builds/build-1"},
+            }
+        ]
+    }
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", return_value=response
+        ) as request_mock:
+            builds = list(
+                http_client.get(
+                    data_type=list[asconnect.models.Build],
+                    endpoint="builds",
+                    fields={"builds": ["version", "processingState"]},
+                )
+            )
+
+    assert request_mock.call_args.args[1] == (
+        "https://api.appstoreconnect.apple.com/v1/builds"
+        "?fields[builds]=version%2CprocessingState&limit=200"
+    )
+    assert builds[0].attributes.version == "42"
+    assert builds[0].attributes.uploaded_date is None
+
+    with pytest.raises(ValueError):
+        list(http_client.get(data_type=list[str], endpoint="builds", fields={"builds": []}))
+
+
+def _build_with_app(identifier: str, app_id: str) -> dict:
+    """Build the JSON for a build with an app relationship.
+
+    :param identifier: The build ID
+    :param app_id: The ID of the app the build belongs to
+
+    :returns: The JSON for the build
+    """
+    return {
+        "type": "builds",
+        "id": identifier,
+        "attributes": {
+            "version": identifier,
+            "uploadedDate": "2024-01-01T12:00:00-08:00",
+            "expirationDate": "2024-04-01T12:00:00-08:00",
+            "expired": False,
+            "minOsVersion": "15.0",
+            "iconAssetToken": None,
+            "processingState": "VALID",
+            "usesNonExemptEncryption": False,
+        },
+        "relationships": {
+            "app": {
+                "links": {"related": f"https://api.example/v1/builds/{identifier}/app"},
+                "data": {"type": "apps", "id": app_id},
+            }
+        },
+        "links": {"self": f"https://api.example/v1/builds/{identifier}"},
+    }
+
+
+def test_included_resources_are_shared() -> None:
+    """Included resources should be resolved without another request, once per response."""
+    http_client = _make_http_client()
+    response = _make_response(200)
+    response.json.return_value = {
+        "data": [_build_with_app("build-1", "app-1"), _build_with_app("build-2", "app-1")],
+        "included": [
+            {
+                "type": "apps",
+                "id": "app-1",
+                "attributes": {
+                    "bundleId": "com.example.one",
+                    "name": "One",
+                    "primaryLocale": "en-US",
+                    "sku": "ONE",
+                    "contentRightsDeclaration": None,
+                    "isOrEverWasMadeForKids": False,
+                },
+                "links": {"self": "https://api.example/v1/apps/app-1"},
+            }
+        ],
+    }
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", return_value=response
+        ) as request_mock:
+            builds = list(
+                http_client.get(
+                    data_type=list[asconnect.models.Build], endpoint="builds", include=["app"]
+                )
+            )
+            apps = [
+                http_client.get_related(
+                    resource=build, relationship="app", data_type=asconnect.models.App
+                )
+                for build in builds
+            ]
+
+    assert request_mock.call_count == 1
+    assert request_mock.call_args.args[1] == (
+        "https://api.appstoreconnect.apple.com/v1/builds?include=app&limit=200"
+    )
+    assert apps[0].bundle_id == "com.example.one"
+    assert apps[0] is apps[1]
+
+
+def test_related_link_is_followed_without_include() -> None:
+    """Without included resources, the related link should be fetched."""
+    http_client = _make_http_client()
+    build = asconnect.decoding.decode(asconnect.models.Build, _build_with_app("build-1", "app-1"))
+
+    with mock.patch.object(http_client, "get", return_value=iter(["app"])) as get_mock:
+        app = http_client.get_related(
+            resource=build, relationship="app", data_type=asconnect.models.App
+        )
+
+    assert app == "app"
+    assert get_mock.call_args.kwargs["url"] == "https://api.example/v1/builds/build-1/app"
+
+    with pytest.raises(ValueError):
+        http_client.get_related(
+            resource=build, relationship="preReleaseVersion", data_type=asconnect.models.App
+        )
@@ -0,0 +1,207 @@
+"""Unit tests for the request metrics."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import datetime
+import http.server
+import logging
+import os
+import sys
+import threading
+from typing import Any
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect.httpclient import HttpClient
+from asconnect.metrics import MetricsAggregator, RequestEvent, endpoint_template
+
+# pylint: enable=wrong-import-position
+
+API = "https://api.appstoreconnect.apple.com/v1"
+
+
+def _http_client() -> HttpClient:
+    """Create a client which doesn't need a real key.
+
+    :returns: The client
+    """
+    return HttpClient(
+        key_id="KEY", key_contents="", issuer_id="ISSUER", log=logging.getLogger("test")
+    )
+
+
+def _response(body: bytes, json_data: Any) -> mock.MagicMock:
+    """Create a mock of a successful response.
+
+    :param body: The raw body of the response
+    :param json_data: The decoded body of the response
+
+    :returns: The mock response
+    """
+    response = mock.MagicMock()
+    response.status_code = 200
+    response.ok = True
+    response.headers = {"X-Rate-Limit": "user-hour-lim:3600;user-hour-rem:3000;"}
+    response.content = body
+    response.elapsed = datetime.timedelta(milliseconds=5)
+    response.request.body = None
+    response.json.return_value = json_data
+    return response
+
+
+def _event(endpoint: str, total_time: float, status_code: int | None = 200) -> RequestEvent:
+    """Create the event for a finished request.
+
+    :param endpoint: The path of the endpoint
+    :param total_time: How long the request took
+    :param status_code: The status code of the response
+
+    :returns: The event
+    """
+    event = RequestEvent(method="GET", url=f"{API}/{endpoint}")
+    event.total_time = total_time
+    event.status_code = status_code
+    return event
+
+
+def test_endpoint_template() -> None:
+    """IDs should be replaced so that requests to the same endpoint are grouped."""
+    assert endpoint_template(f"{API}/apps") == "apps"
+    assert endpoint_template(f"{API}/apps/123/builds?limit=200") == "apps/{id}/builds"
+    assert (
+        endpoint_template(f"{API}/appStoreVersions/1/relationships/build")
+        == "appStoreVersions/{id}/relationships/build"
+    )
+    assert endpoint_template("https://store-035.blobstore.apple.com/a/b?c=d") == (
+        "store-035.blobstore.apple.com"
+    )
+
+    # Under another base URL, its whole path is left out
+    assert endpoint_template("https://proxy.example/asc/v1/apps/123/builds", "/asc/v1/") == (
+        "apps/{id}/builds"
+    )
+
+
+def test_aggregator_percentiles() -> None:
+    """The aggregator should report the percentiles of each endpoint, slowest first."""
+    aggregator = MetricsAggregator()
+
+    for index in range(1, 101):
+        aggregator(_event(f"apps/{index}", index / 1000))
+        aggregator(_event("builds", 1.0, status_code=None if index % 10 == 0 else 200))
+
+    cached = _event("builds", 60.0)
+    cached.cached = True
+    aggregator(cached)
+
+    builds, apps = aggregator.summary()
+
+    assert (builds.endpoint, builds.count, builds.errors, builds.p99) == ("builds", 100, 10, 1.0)
+    assert (apps.endpoint, apps.count, apps.errors) == ("apps/{id}", 100, 0)
+    assert (apps.p50, apps.p95, apps.p99) == (0.05, 0.095, 0.099)
+    assert aggregator.report().splitlines()[0].startswith("GET builds: 100 requests, 10 errors")
+
+    aggregator.reset()
+    assert not aggregator.summary()
+
+
+def test_observer_gets_an_event_per_page() -> None:
+    """Each page of a listing should produce an event with its page number and decode time."""
+    events: list[RequestEvent] = []
+    http_client = _http_client()
+    http_client.add_observer(events.append)
+
+    responses = [
+        _response(b"x" * 10, {"data": [{"id": "1"}], "links": {"next": f"{API}/apps?cursor=1"}}),
+        _response(b"x" * 20, {"data": [{"id": "2"}], "links": {}}),
+    ]
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(http_client._session, "request", side_effect=responses):
+            items = list(http_client.get(url=f"{API}/apps", data_type=list[dict], raw=True))
+
+    assert items == [{"id": "1"}, {"id": "2"}]
+    assert [(event.page, event.bytes_received) for event in events] == [(1, 10), (2, 20)]
+
+    for event in events:
+        assert (event.method, event.endpoint, event.status_code) == ("GET", "apps", 200)
+        assert (event.attempts, event.retries, event.rate_limit_remaining) == (1, 0, 3000)
+        assert event.decode_time is not None and event.decode_time >= 0
+        assert event.ttfb == 0.005
+        assert event.total_time >= event.download_time >= 0
+
+
+def test_failing_observer_is_ignored() -> None:
+    """An observer which raises shouldn't break the request, or stop the other observers."""
+    events: list[RequestEvent] = []
+    broken = mock.Mock(side_effect=RuntimeError("broken"))
+    http_client = _http_client()
+    http_client.add_observer(broken)
+    http_client.add_observer(events.append)
+
+    with mock.patch.object(http_client, "generate_token", return_value="token"):
+        # pylint: disable=protected-access
+        with mock.patch.object(
+            http_client._session, "request", return_value=_response(b"{}", {"data": {}})
+        ):
+            http_client.delete(endpoint="betaGroups/1")
+
+            http_client.remove_observer(broken)
+            http_client.delete(endpoint="betaGroups/2")
+
+    assert broken.call_count == 1
+    assert [(event.method, event.endpoint) for event in events] == [
+        ("DELETE", "betaGroups/{id}"),
+        ("DELETE", "betaGroups/{id}"),
+    ]
+
+
+def test_connect_time_is_measured() -> None:
+    """New connections should have their connect time recorded, and reused ones shouldn't."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        """Responds to every request with an empty JSON object."""
+
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_: Any) -> None:  # pylint: disable=arguments-differ
+            """Don't log the requests."""
+
+        def do_GET(self) -> None:  # pylint: disable=invalid-name
+            """Respond with an empty JSON object."""
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    events: list[RequestEvent] = []
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    try:
+        with HttpClient(
+            key_id="KEY",
+            key_contents="",
+            issuer_id="ISSUER",
+            log=logging.getLogger("test"),
+            observers=[events.append],
+        ) as http_client:
+            for _ in range(2):
+                # pylint: disable=protected-access
+                http_client._request("GET", url, use_auth_header=False, rate_limited=False)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [(event.endpoint, event.bytes_received) for event in events] == [
+        (f"127.0.0.1:{server.server_address[1]}", 2)
+    ] * 2
+    assert events[0].connect_time > 0
+    assert events[1].connect_time == 0
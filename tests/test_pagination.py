@@ -0,0 +1,134 @@
+"""Unit tests for the pagination helpers."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import contextvars
+import os
+import sys
+import threading
+from typing import Any
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from asconnect.pagination import (  # pylint: disable=wrong-import-position
+    iterate_pages,
+    prefetch_pages,
+)
+
+PAGE_COUNT = 5
+
+_REQUEST_SCOPE: contextvars.ContextVar[str] = contextvars.ContextVar("scope", default="none")
+
+
+class FakeListing:
+    """A listing of numbered pages which records what was fetched."""
+
+    fetched: list[str]
+    scopes: list[str]
+    fail_at: int | None
+
+    def __init__(self, fail_at: int | None = None) -> None:
+        """Create a new listing.
+
+        :param fail_at: The page to fail on (if any)
+        """
+        self.fetched = []
+        self.scopes = []
+        self.fail_at = fail_at
+
+    def fetch(self, url: str) -> tuple[list[Any], str | None]:
+        """Fetch a page.
+
+        :param url: The URL of the page
+
+        :raises RuntimeError: If this is the page to fail on
+
+        :returns: The items on the page and the next URL
+        """
+        page = int(url.rsplit("=", 1)[1])
+        self.fetched.append(url)
+        self.scopes.append(_REQUEST_SCOPE.get())
+
+        if page == self.fail_at:
+            raise RuntimeError(f"page {page} failed")
+
+        next_url = f"https://api.example/v1/apps?page={page + 1}" if page + 1 < PAGE_COUNT else None
+        return [page * 10, page * 10 + 1], next_url
+
+
+def test_prefetch_yields_the_same_pages_in_order() -> None:
+    """Prefetching should not change what is returned."""
+    url = "https://api.example/v1/apps?page=0"
+
+    expected = list(iterate_pages(FakeListing().fetch, url))
+    actual = list(prefetch_pages(FakeListing().fetch, url, depth=2))
+
+    assert actual == expected
+    assert len(actual) == PAGE_COUNT
+
+
+def test_prefetch_fetches_ahead_of_the_consumer() -> None:
+    """The next page should be fetched while the current one is being processed."""
+    listing = FakeListing()
+    second_page_fetched = threading.Event()
+    fetch = listing.fetch
+
+    def fetch_and_signal(url: str) -> tuple[list[Any], str | None]:
+        """Signal once the second page has been fetched.
+
+        :param url: The URL of the page
+
+        :returns: The page
+        """
+        result = fetch(url)
+        if url.endswith("page=1"):
+            second_page_fetched.set()
+        return result
+
+    pages = prefetch_pages(fetch_and_signal, "https://api.example/v1/apps?page=0", depth=1)
+
+    assert next(pages) == [0, 1]
+    # The consumer hasn't asked for page 1 yet, but it is already on its way
+    assert second_page_fetched.wait(timeout=5)
+    pages.close()
+
+
+def test_prefetch_raises_errors_after_earlier_pages() -> None:
+    """A failure should surface once the pages before it are consumed."""
+    pages = prefetch_pages(
+        FakeListing(fail_at=2).fetch, "https://api.example/v1/apps?page=0", depth=3
+    )
+
+    assert next(pages) == [0, 1]
+    assert next(pages) == [10, 11]
+
+    with pytest.raises(RuntimeError):
+        next(pages)
+
+
+def test_prefetch_stops_when_the_consumer_stops() -> None:
+    """Closing the iterator early should stop the worker fetching."""
+    listing = FakeListing()
+    pages = prefetch_pages(listing.fetch, "https://api.example/v1/apps?page=0", depth=1)
+
+    assert next(pages) == [0, 1]
+    pages.close()
+
+    # At most the buffered page and the one blocked on the full buffer
+    assert len(listing.fetched) <= 3
+
+
+def test_prefetch_runs_in_the_callers_context() -> None:
+    """Context variables set by the caller should be visible to the worker."""
+    listing = FakeListing()
+    token = _REQUEST_SCOPE.set("caller")
+
+    try:
+        list(prefetch_pages(listing.fetch, "https://api.example/v1/apps?page=0", depth=2))
+    finally:
+        _REQUEST_SCOPE.reset(token)
+
+    assert set(listing.scopes) == {"caller"}
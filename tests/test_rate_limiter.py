@@ -0,0 +1,89 @@
+"""Unit tests for the rate limiter."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect.rate_limiter import RateLimiter, parse_rate_limit_header, parse_retry_after
+from tests.conftest import FakeClock
+
+# pylint: enable=wrong-import-position
+
+
+def _make_limiter() -> tuple[RateLimiter, FakeClock]:
+    """Build a rate limiter driven by a fake clock.
+
+    :returns: The rate limiter and its clock
+    """
+    clock = FakeClock()
+    return RateLimiter(clock=clock.time, sleep=clock.sleep), clock
+
+
+def test_parse_rate_limit_header() -> None:
+    """The header should be parsed into the limit and remaining budget."""
+    assert parse_rate_limit_header("user-hour-lim:3600;user-hour-rem:3599;") == (3600, 3599)
+    assert parse_rate_limit_header("user-hour-rem:10;user-hour-lim:20") == (20, 10)
+    assert parse_rate_limit_header("something-else:1") is None
+    assert parse_rate_limit_header(None) is None
+
+
+def test_parse_retry_after() -> None:
+    """Both forms of Retry-After should be understood."""
+    assert parse_retry_after("30") == 30.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_unknown_key_is_not_delayed() -> None:
+    """Keys which haven't seen a response yet shouldn't be delayed."""
+    limiter, clock = _make_limiter()
+
+    for _ in range(100):
+        assert limiter.acquire("key") == 0.0
+
+    assert not clock.sleeps
+    assert limiter.remaining("key") is None
+
+
+def test_requests_are_paced_once_budget_is_spent() -> None:
+    """Once the budget is gone, requests should be spaced at the refill rate."""
+    limiter, clock = _make_limiter()
+    limiter.update("key", "user-hour-lim:3600;user-hour-rem:2;")
+
+    assert limiter.remaining("key") == 2
+    assert limiter.acquire("key") == 0.0
+    assert limiter.acquire("key") == 0.0
+    assert not clock.sleeps
+
+    # 3600 per hour is one per second
+    for _ in range(3):
+        assert limiter.acquire("key") == 1.0
+
+    assert clock.sleeps == [1.0, 1.0, 1.0]
+
+
+def test_server_budget_is_authoritative() -> None:
+    """A lower remaining count from the server should override our estimate."""
+    limiter, _ = _make_limiter()
+    limiter.update("key", "user-hour-lim:3600;user-hour-rem:3000;")
+    limiter.update("key", "user-hour-lim:3600;user-hour-rem:5;")
+
+    assert limiter.remaining("key") == 5
+
+
+def test_block_honours_retry_after() -> None:
+    """Blocking a key should hold off its next request."""
+    limiter, clock = _make_limiter()
+    limiter.update("key", "user-hour-lim:3600;user-hour-rem:100;")
+
+    limiter.block("key", 30.0)
+
+    assert limiter.acquire("key") == 30.0
+    assert clock.sleeps == [30.0]
+    assert limiter.acquire("other") == 0.0
@@ -0,0 +1,154 @@
+"""Unit tests for the retry policy."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import logging
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from asconnect.exceptions import AppStoreConnectError  # pylint: disable=wrong-import-position
+from asconnect.retry import RetryPolicy  # pylint: disable=wrong-import-position
+from asconnect.version_client import VersionClient  # pylint: disable=wrong-import-position
+
+
+def _api_error(status_code: int) -> AppStoreConnectError:
+    """Build an AppStoreConnectError carrying the given HTTP status.
+
+    :param status_code: The HTTP status code the error should report
+
+    :returns: An AppStoreConnectError wrapping a mocked response
+    """
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.json.return_value = {"errors": [{"status": str(status_code), "code": "X"}]}
+    return AppStoreConnectError(response)
+
+
+def test_retryable_statuses() -> None:
+    """Status classes should be retried, but only 429 for non-idempotent requests."""
+    policy = RetryPolicy()
+
+    assert policy.is_retryable(503, idempotent=True)
+    assert policy.is_retryable(408, idempotent=True)
+    assert policy.is_retryable(429, idempotent=False)
+    assert not policy.is_retryable(503, idempotent=False)
+    assert not policy.is_retryable(404, idempotent=True)
+
+
+def test_delay_grows_exponentially_up_to_the_cap() -> None:
+    """Delays should double each attempt and stop at the maximum."""
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+
+    assert [policy.compute_delay(attempt) for attempt in range(1, 5)] == [1, 2, 4, 5]
+
+
+def test_jitter_is_bounded() -> None:
+    """Jitter should only ever add up to the configured amount."""
+    policy = RetryPolicy(base_delay=1, max_delay=60, jitter=0.5)
+
+    for _ in range(100):
+        assert 2.0 <= policy.compute_delay(2) <= 2.5
+
+
+def test_retry_after_takes_precedence_when_longer() -> None:
+    """The server's Retry-After should win over a shorter backoff."""
+    policy = RetryPolicy(base_delay=1, jitter=0)
+
+    assert policy.compute_delay(1, retry_after=30) == 30
+    assert policy.compute_delay(3, retry_after=0.5) == 4
+
+
+def test_call_retries_retryable_errors() -> None:
+    """An operation should be retried until it succeeds."""
+    sleep_mock = mock.MagicMock()
+    policy = RetryPolicy(jitter=0, sleep=sleep_mock)
+    operation = mock.MagicMock(side_effect=[_api_error(500), _api_error(503), "done"])
+
+    result = policy.call(
+        operation, max_retries=3, log=logging.getLogger("test"), description="Test"
+    )
+
+    assert result == "done"
+    assert operation.call_count == 3
+    assert [call.args[0] for call in sleep_mock.call_args_list] == [1.0, 2.0]
+
+
+def test_call_does_not_retry_client_errors() -> None:
+    """A 4xx is a problem with the request, so it should not be retried."""
+    sleep_mock = mock.MagicMock()
+    policy = RetryPolicy(sleep=sleep_mock)
+    operation = mock.MagicMock(side_effect=_api_error(409))
+
+    with pytest.raises(AppStoreConnectError):
+        policy.call(operation, max_retries=3, log=logging.getLogger("test"), description="Test")
+
+    assert operation.call_count == 1
+    sleep_mock.assert_not_called()
+
+
+def test_requests_are_sent_once_in_retried_operations() -> None:
+    """Requests made by an operation shouldn't be retried on top of the operation itself."""
+    sleep_mock = mock.MagicMock()
+    policy = RetryPolicy(jitter=0, sleep=sleep_mock)
+    response = mock.MagicMock(status_code=503)
+    send = mock.MagicMock(return_value=response)
+
+    def operation() -> None:
+        """Send a request which always fails.
+
+        :raises AppStoreConnectError: Always
+        """
+        policy.send(
+            send,
+            should_retry=lambda response: policy.is_retryable(
+                response.status_code, idempotent=True
+            ),
+            idempotent=True,
+        )
+        raise _api_error(503)
+
+    with pytest.raises(AppStoreConnectError):
+        policy.call(operation, max_retries=2, log=logging.getLogger("test"), description="Test")
+
+    assert send.call_count == 3
+    assert sleep_mock.call_count == 2
+
+    # Outside of an operation, the request is retried on its own again
+    policy.send(send, should_retry=lambda response: True, idempotent=True)
+    assert send.call_count == 3 + policy.max_attempts
+
+
+def test_unsafe_operations_only_retry_unprocessed() -> None:
+    """An operation which isn't safe to repeat should only be retried if it wasn't acted on."""
+    policy = RetryPolicy(sleep=mock.MagicMock())
+    log = logging.getLogger("test")
+
+    operation = mock.MagicMock(side_effect=_api_error(503))
+
+    with pytest.raises(AppStoreConnectError):
+        policy.call(operation, max_retries=3, log=log, description="Test", idempotent=False)
+
+    assert operation.call_count == 1
+
+    operation = mock.MagicMock(side_effect=[_api_error(429), "done"])
+    assert policy.call(operation, max_retries=3, log=log, description="Test", idempotent=False)
+    assert operation.call_count == 2
+
+
+def test_release_is_not_sent_again_after_a_server_error() -> None:
+    """A release which may have happened shouldn't be requested again."""
+    http_client = mock.MagicMock()
+    http_client.retry_policy = RetryPolicy(sleep=mock.MagicMock())
+    http_client.post.side_effect = _api_error(503)
+    client = VersionClient(http_client=http_client, log=logging.getLogger("test"))
+
+    with pytest.raises(AppStoreConnectError):
+        client.release(version_id="version")
+
+    http_client.post.assert_called_once()
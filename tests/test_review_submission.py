@@ -34,6 +34,7 @@ from asconnect.models import (  # pylint: disable=wrong-import-position
     ReviewSubmissionItem,
     ReviewSubmissionState,
 )
+from asconnect.retry import RetryPolicy  # pylint: disable=wrong-import-position
 
 
 APP_ID = "app-123"
@@ -139,6 +140,7 @@ def _make_version_client(
     :returns: A tuple of the client and its mocked http_client
     """
     http_client = mock.MagicMock()
+    http_client.retry_policy = RetryPolicy()
     http_client.generate_url.side_effect = (
         lambda endpoint: f"https://api.example/v1/{endpoint}"
     )
@@ -485,6 +487,7 @@ def test_submit_handles_create_conflict_by_reusing() -> None:
     winner = _make_submission("READY_FOR_REVIEW")
 
     http_client = mock.MagicMock()
+    http_client.retry_policy = RetryPolicy()
     http_client.generate_url.side_effect = (
         lambda endpoint: f"https://api.example/v1/{endpoint}"
     )
@@ -537,6 +540,7 @@ def test_submit_reuses_partial_submission_across_retry() -> None:
     created = _make_submission("READY_FOR_REVIEW")
 
     http_client = mock.MagicMock()
+    http_client.retry_policy = RetryPolicy()
     http_client.generate_url.side_effect = (
         lambda endpoint: f"https://api.example/v1/{endpoint}"
     )
@@ -574,7 +578,7 @@ def test_submit_reuses_partial_submission_across_retry() -> None:
 
     client = VersionClient(http_client=http_client, log=logging.getLogger("test"))
 
-    with mock.patch("asconnect.version_client.time.sleep") as sleep_mock:
+    with mock.patch("asconnect.retry.time.sleep") as sleep_mock:
         result = client.submit_for_review(
             app_id=APP_ID, version_id=VERSION_ID, platform=Platform.IOS
         )
@@ -596,7 +600,7 @@ def test_submit_exhausts_retries_on_persistent_5xx() -> None:
     )
     http_client.patch.side_effect = _server_error(503)
 
-    with mock.patch("asconnect.version_client.time.sleep") as sleep_mock:
+    with mock.patch("asconnect.retry.time.sleep") as sleep_mock:
         with pytest.raises(AppStoreConnectError):
             client.submit_for_review(
                 app_id=APP_ID,
@@ -617,7 +621,7 @@ def test_submit_max_attempts_zero_raises_immediately() -> None:
     )
     http_client.patch.side_effect = _server_error(503)
 
-    with mock.patch("asconnect.version_client.time.sleep") as sleep_mock:
+    with mock.patch("asconnect.retry.time.sleep") as sleep_mock:
         with pytest.raises(AppStoreConnectError):
             client.submit_for_review(
                 app_id=APP_ID,
@@ -0,0 +1,144 @@
+"""Tests for the stand-in App Store Connect server, driven through the client."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import sys
+from typing import Any, assert_type
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+import asconnect
+from asconnect.models import (
+    AppMediaAssetStateState,
+    AppStoreVersionState,
+    Platform,
+    ReviewSubmissionState,
+    ScreenshotDisplayType,
+)
+from asconnect.rate_limiter import RateLimiter
+from asconnect.stub_server import StubServer
+from tests.conftest import StubClientFactory
+
+# pylint: enable=wrong-import-position
+
+
+# Retry without waiting
+RETRY_POLICY = asconnect.RetryPolicy(base_delay=0, jitter=0)
+
+
+@pytest.fixture(name="server")
+def fixture_server(stub_server: StubServer) -> StubServer:
+    """Add an app with builds and reviews to the stub server.
+
+    :param stub_server: The server
+
+    :returns: The server
+    """
+    stub_server.store.populate(apps=1, builds=450, reviews=30)
+    return stub_server
+
+
+def test_listings_are_paged_and_filtered(
+    server: StubServer, stub_client: StubClientFactory
+) -> None:
+    """Listings should be split into pages and filtered like the API does."""
+    with stub_client(retry_policy=RETRY_POLICY) as client:
+        app = client.app.get_from_bundle_id("com.example.app0")
+        assert app is not None
+
+        builds = list(client.build.get_builds(app_id=app.identifier))
+        assert len(builds) == 450
+        assert server.requests[("GET", "builds")] == 3
+
+        build = client.build.get_from_build_number(bundle_id=app.bundle_id, build_number="7")
+        assert build is not None and build.attributes.version == "7"
+
+        assert len(list(client.reviews.get_reviews(app_id=app.identifier))) == 30
+
+
+@pytest.mark.usefixtures("server")
+def test_raw_listings_are_dictionaries(stub_client: StubClientFactory) -> None:
+    """Raw listings should yield, and be typed as yielding, the JSON dictionaries."""
+    with stub_client(retry_policy=RETRY_POLICY) as client:
+        apps = list(client.app.get_all(raw=True))
+        assert_type(apps, list[dict[str, Any]])
+        assert apps[0]["attributes"]["bundleId"] == "com.example.app0"
+
+        builds = list(client.build.get_builds(app_id=apps[0]["id"], raw=True))
+        assert_type(builds, list[dict[str, Any]])
+        assert len(builds) == 450
+
+        assert_type(list(client.app.get_all()), list[asconnect.models.App])
+
+
+def test_screenshot_upload_and_review_submission(
+    server: StubServer, stub_client: StubClientFactory
+) -> None:
+    """Screenshots should go through their upload operations, and submissions through review."""
+    with stub_client(retry_policy=RETRY_POLICY) as client:
+        app = client.app.get_from_bundle_id("com.example.app0")
+        assert app is not None
+        version = client.version.get_version(app_id=app.identifier, version_string="1.0")
+        assert version is not None
+        localization = next(client.version.get_localizations(version_id=version.identifier))
+
+        screenshot_set = client.screenshots.create_set(
+            localization_id=localization.identifier,
+            display_type=ScreenshotDisplayType.APP_IPHONE_65,
+        )
+
+        path = os.path.join(os.path.dirname(__file__), "..", "README.md")
+        screenshot = client.screenshots.upload_screenshot(
+            file_path=path, screenshot_set_id=screenshot_set.identifier
+        )
+
+        assert screenshot.attributes.asset_delivery_state.state == AppMediaAssetStateState.COMPLETE
+        assert server.requests[("PUT", server.url.split("/")[2])] == -(
+            -os.path.getsize(path) // 1000
+        )
+
+        submission = client.version.submit_for_review(
+            app_id=app.identifier, version_id=version.identifier, platform=Platform.IOS
+        )
+
+        assert submission.attributes.state == ReviewSubmissionState.WAITING_FOR_REVIEW
+        version = client.version.get(version_id=version.identifier)
+        assert version is not None
+        assert version.attributes.app_store_state == AppStoreVersionState.WAITING_FOR_REVIEW
+
+
+def test_injected_errors_and_rate_limit(server: StubServer, stub_client: StubClientFactory) -> None:
+    """Injected errors should be retried, and keys over their limit told to wait."""
+    server.rate_limit = 1
+    server.rate_limit_window = 1.0
+    events: list[asconnect.RequestEvent] = []
+
+    # Pace the client over the same window as the server
+    with stub_client(
+        retry_policy=RETRY_POLICY, observers=[events.append], rate_limiter=RateLimiter(window=1.0)
+    ) as client:
+        server.fail_next(503, count=2)
+        assert len(list(client.app.get_all())) == 1
+        assert server.requests[("GET", "apps")] == 3
+
+        # The key has used its one request, so the client waits for the next window
+        assert len(list(client.app.get_all())) == 1
+        assert server.requests[("GET", "apps")] == 4
+
+    # A client which doesn't know the key is out of requests is told to wait instead
+    with stub_client(
+        retry_policy=RETRY_POLICY, observers=[events.append], rate_limiter=RateLimiter(window=1.0)
+    ) as client:
+        assert len(list(client.app.get_all())) == 1
+        assert server.requests[("GET", "apps")] == 6
+
+    assert [(event.attempts, event.status_code) for event in events] == [
+        (3, 200),
+        (1, 200),
+        (2, 200),
+    ]
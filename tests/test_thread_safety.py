@@ -0,0 +1,228 @@
+"""Stress tests for sharing one client between threads.
+
+These run against a stub server on localhost, so they require no credentials.
+"""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import concurrent.futures
+import http.server
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Iterator
+import urllib.parse
+
+from cryptography.hazmat.primitives.asymmetric import ec
+import jwt
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+import asconnect
+from asconnect.models import User
+
+# pylint: enable=wrong-import-position
+
+PAGES = 3
+PAGE_SIZE = 5
+THREADS = 16
+OPERATIONS = 200
+
+
+def _user(identifier: str, first_name: str = "First") -> dict[str, Any]:
+    """Build the JSON for a user.
+
+    :param identifier: The user ID
+    :param first_name: The first name of the user
+
+    :returns: The JSON for the user
+    """
+    return {
+        "type": "users",
+        "id": identifier,
+        "attributes": {
+            "firstName": first_name,
+            "lastName": "Last",
+            "roles": ["DEVELOPER"],
+            "provisioningAllowed": False,
+            "allAppsVisible": True,
+            "username": f"{identifier}@example.com",
+        },
+        "links": {"self": f"https://api.example/v1/users/{identifier}"},
+    }
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """A stub of the API which serves a paged listing of users and accepts updates to them."""
+
+    daemon_threads = True
+
+    public_key: ec.EllipticCurvePublicKey
+    tokens: set[str]
+    updates: list[tuple[str, str]]
+    lock: threading.Lock
+
+    def __init__(self, public_key: ec.EllipticCurvePublicKey) -> None:
+        """Start listening on a free port.
+
+        :param public_key: The key to verify tokens with
+        """
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.public_key = public_key
+        self.tokens = set()
+        self.updates = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the server.
+
+        :returns: The base URL
+        """
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Handles the requests to the stub server."""
+
+    protocol_version = "HTTP/1.1"
+    server: StubServer
+
+    def log_message(self, *_: Any) -> None:  # pylint: disable=arguments-differ
+        """Don't log the requests."""
+
+    def _authorized(self) -> bool:
+        """Check the token the request was sent with, and respond with a 401 if it is bad.
+
+        :returns: True if the token is good, False otherwise
+        """
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+
+        try:
+            jwt.decode(
+                token, self.server.public_key, algorithms=["ES256"], audience="appstoreconnect-v1"
+            )
+        except jwt.InvalidTokenError:
+            self._respond(401, {"errors": [{"status": "401"}]})
+            return False
+
+        with self.server.lock:
+            self.server.tokens.add(token)
+
+        return True
+
+    def _respond(self, status: int, body: Any) -> None:
+        """Send a JSON response.
+
+        :param status: The status code
+        :param body: The JSON to send
+        """
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve a page of users."""
+        if not self._authorized():
+            return
+
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        page = int(query.get("page", ["0"])[0])
+        users = [_user(f"user-{page}-{index}") for index in range(PAGE_SIZE)]
+        links = {}
+
+        if page + 1 < PAGES:
+            links["next"] = f"{self.server.url}/users?page={page + 1}"
+
+        self._respond(200, {"data": users, "links": links})
+
+    def do_PATCH(self) -> None:  # pylint: disable=invalid-name
+        """Update a user."""
+        if not self._authorized():
+            return
+
+        length = int(self.headers["Content-Length"])
+        data = json.loads(self.rfile.read(length))["data"]
+        first_name = data["attributes"]["firstName"]
+
+        with self.server.lock:
+            self.server.updates.append((data["id"], first_name))
+
+        self._respond(200, {"data": _user(data["id"], first_name)})
+
+
+@pytest.fixture(name="server")
+def fixture_server(signing_key: tuple[str, ec.EllipticCurvePublicKey]) -> Iterator[StubServer]:
+    """Run a stub server.
+
+    :param signing_key: The key the server accepts
+
+    :returns: The running server
+    """
+    server = StubServer(signing_key[1])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_one_client_shared_between_threads(
+    signing_key: tuple[str, ec.EllipticCurvePublicKey], server: StubServer
+) -> None:
+    """Many threads listing and updating through one client should all succeed."""
+    client = asconnect.Client(
+        key_id="KEY",
+        key_contents=signing_key[0],
+        issuer_id="ISSUER",
+        log=logging.getLogger("test"),
+        pool_maxsize=THREADS,
+    )
+
+    def operation(index: int) -> Any:
+        """List the users, or update one of them.
+
+        :param index: The index of the operation
+
+        :returns: The result of the operation
+        """
+        if index % 2:
+            return client.http_client.patch(
+                url=f"{server.url}/users/user-{index}",
+                data={"data": {"id": f"user-{index}", "attributes": {"firstName": str(index)}}},
+                data_type=User,
+            )
+
+        return list(
+            client.http_client.get(
+                url=f"{server.url}/users", data_type=list[User], lazy=index % 4 == 0
+            )
+        )
+
+    with client, concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(operation, range(OPERATIONS)))
+
+    for index, result in enumerate(results):
+        if index % 2:
+            assert result.identifier == f"user-{index}"
+            assert result.attributes.first_name == str(index)
+        else:
+            assert len(result) == PAGES * PAGE_SIZE
+            assert result[-1].attributes.username == f"user-{PAGES - 1}-{PAGE_SIZE - 1}@example.com"
+
+    assert sorted(server.updates) == sorted(
+        (f"user-{index}", str(index)) for index in range(1, OPERATIONS, 2)
+    )
+
+    # Every request shared the one token, which was only signed once
+    assert len(server.tokens) == 1
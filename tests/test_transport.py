@@ -0,0 +1,233 @@
+"""Unit tests for recording and replaying the exchanges with the API."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import http.server
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Iterator
+
+import pytest
+import requests
+import requests.adapters
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+from asconnect.exceptions import UnrecordedRequestError
+from asconnect.httpclient import HttpClient
+from asconnect.transport import Latency, RecordingAdapter, ReplayAdapter
+
+# pylint: enable=wrong-import-position
+
+API = "https://api.example/v1"
+
+
+class CountingHandler(http.server.BaseHTTPRequestHandler):
+    """Responds to each request with how many requests there have been so far."""
+
+    protocol_version = "HTTP/1.1"
+    count = 0
+
+    def log_message(self, *_: Any) -> None:  # pylint: disable=arguments-differ
+        """Don't log the requests."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Respond with the count."""
+        CountingHandler.count += 1
+        content = json.dumps({"data": {"path": self.path, "count": CountingHandler.count}})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content.encode("utf-8"))
+
+
+@pytest.fixture(name="server_url")
+def fixture_server_url() -> Iterator[str]:
+    """Run a server which counts its requests.
+
+    :returns: The base URL of the server
+    """
+    CountingHandler.count = 0
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+
+
+def _http_client(transport: Any) -> HttpClient:
+    """Create a client which sends its requests through a transport.
+
+    :param transport: The transport
+
+    :returns: The client
+    """
+    return HttpClient(
+        key_id="KEY",
+        key_contents="",
+        issuer_id="ISSUER",
+        log=logging.getLogger("test"),
+        transport=transport,
+    )
+
+
+def _get(http_client: HttpClient, url: str) -> Any:
+    """Fetch a URL without authenticating.
+
+    :param http_client: The client to fetch it with
+    :param url: The URL
+
+    :returns: The data in the response
+    """
+    # pylint: disable=protected-access
+    response = http_client._request("GET", url, use_auth_header=False, rate_limited=False)
+    return response.json()["data"]
+
+
+def test_record_and_replay(server_url: str, tmp_path: Any) -> None:
+    """Replaying should answer each request as it was answered when recorded."""
+    cassette = str(tmp_path / "cassette.json")
+    urls = [f"{server_url}/v1/apps?a=1&b=2", f"{server_url}/v1/apps/1", f"{server_url}/v1/apps/1"]
+
+    with _http_client(RecordingAdapter(cassette)) as http_client:
+        recorded = [_get(http_client, url) for url in urls]
+
+    with open(cassette, "r", encoding="utf-8") as cassette_file:
+        assert "Authorization" not in cassette_file.read()
+
+    with _http_client(ReplayAdapter(cassette, repeat=False)) as http_client:
+        # The query parameters can come in any order, and repeated requests get their responses in turn
+        assert _get(http_client, f"{server_url}/v1/apps?b=2&a=1") == recorded[0]
+        assert _get(http_client, urls[1]) == recorded[1]
+        assert _get(http_client, urls[2]) == recorded[2]
+
+        with pytest.raises(UnrecordedRequestError):
+            _get(http_client, urls[2])
+
+        with pytest.raises(UnrecordedRequestError):
+            _get(http_client, f"{server_url}/v1/builds")
+
+    assert CountingHandler.count == 3
+
+    with _http_client(ReplayAdapter(cassette)) as http_client:
+        assert [_get(http_client, urls[1]) for _ in range(3)] == [
+            recorded[1],
+            recorded[2],
+            recorded[1],
+        ]
+
+
+class CannedAdapter(requests.adapters.BaseAdapter):
+    """Answers every request with the same body, and counts how often it is closed."""
+
+    def __init__(self, body: dict[str, Any]) -> None:
+        """Create a new adapter.
+
+        :param body: The body to answer with
+        """
+        super().__init__()
+        self.body = json.dumps(body).encode("utf-8")
+        self.closed = 0
+
+    def send(self, request: requests.PreparedRequest, *_: Any, **__: Any) -> requests.Response:
+        """Answer a request.
+
+        :param request: The request
+
+        :returns: The canned response
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body  # pylint: disable=protected-access
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        """Count the close."""
+        self.closed += 1
+
+
+def test_recorded_uploads_are_unsigned(tmp_path: Any) -> None:
+    """Cassettes shouldn't hold upload signatures, and should be written once when closed."""
+    cassette = str(tmp_path / "cassette.json")
+    signed = "https://upload.example/part/0?X-Amz-Signature=secret"
+    unsigned = "https://upload.example/part/0"
+    adapter = CannedAdapter(
+        {"data": {"attributes": {"uploadOperations": [{"method": "PUT", "url": signed}]}}}
+    )
+    recorder = RecordingAdapter(cassette, adapter)
+
+    with _http_client(recorder) as http_client:
+        # pylint: disable=protected-access
+        reservation = http_client._request(
+            "POST", f"{API}/appScreenshots", use_auth_header=False, rate_limited=False
+        )
+        assert reservation.json()["data"]["attributes"]["uploadOperations"][0]["url"] == signed
+        http_client._request("PUT", signed, use_auth_header=False, rate_limited=False)
+
+    assert adapter.closed == 1
+
+    with open(cassette, "r", encoding="utf-8") as cassette_file:
+        contents = cassette_file.read()
+
+    assert "secret" not in contents
+    assert [
+        interaction["request"]["url"] for interaction in json.loads(contents)["interactions"]
+    ] == [
+        f"{API}/appScreenshots",
+        unsigned,
+    ]
+
+    with _http_client(ReplayAdapter(cassette)) as http_client:
+        # pylint: disable=protected-access
+        reservation = http_client._request(
+            "POST", f"{API}/appScreenshots", use_auth_header=False, rate_limited=False
+        )
+        url = reservation.json()["data"]["attributes"]["uploadOperations"][0]["url"]
+        assert url == unsigned
+        http_client._request("PUT", url, use_auth_header=False, rate_limited=False)
+
+
+def test_replay_latency(tmp_path: Any) -> None:
+    """Responses should take as long as recorded, or as long as a sample of the endpoint."""
+    cassette = str(tmp_path / "cassette.json")
+    interactions = [
+        {
+            "request": {"method": "GET", "url": f"{API}/apps/{index}"},
+            "response": {"status_code": 200, "headers": {}, "body": "{}", "elapsed": elapsed},
+        }
+        for index, elapsed in enumerate([0.01, 0.02, 0.03])
+    ]
+
+    with open(cassette, "w", encoding="utf-8") as cassette_file:
+        json.dump({"version": 1, "interactions": interactions}, cassette_file)
+
+    def elapsed(adapter: ReplayAdapter, url: str) -> float:
+        """Replay a request.
+
+        :param adapter: The adapter to replay it with
+        :param url: The URL of the request
+
+        :returns: How long the response took
+        """
+        return adapter.send(requests.Request("GET", url).prepare()).elapsed.total_seconds()
+
+    assert elapsed(ReplayAdapter(cassette, latency=Latency.RECORDED), f"{API}/apps/1") == 0.02
+    assert elapsed(ReplayAdapter(cassette), f"{API}/apps/1") == 0
+
+    sampled = [
+        [elapsed(adapter, f"{API}/apps/0") for _ in range(5)]
+        for adapter in [ReplayAdapter(cassette, latency=Latency.SAMPLED, seed=1) for _ in range(2)]
+    ]
+
+    assert sampled[0] == sampled[1]
+    assert set(sampled[0]) <= {0.01, 0.02, 0.03}
@@ -0,0 +1,291 @@
+"""Unit tests for uploading and hashing screenshots."""
+
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import hashlib
+import os
+import sys
+import time
+from typing import Any
+from unittest import mock
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+import asconnect
+from asconnect.decoding import decode
+from asconnect.exceptions import UploadError
+from asconnect.models import AppMediaAssetStateState, ScreenshotDisplayType, UploadOperation
+from asconnect.stub_server import StubServer
+from asconnect.utilities import HASH_BLOCK_SIZE, map_file, md5_file, md5_files
+from tests.conftest import STUB_UPLOAD_PART_SIZE, StubClientFactory
+
+# pylint: enable=wrong-import-position
+
+PART_SIZE = STUB_UPLOAD_PART_SIZE
+PARTS = 8
+
+
+@pytest.fixture(name="server")
+def fixture_server(stub_server: StubServer) -> StubServer:
+    """Add an app to the stub server.
+
+    :param stub_server: The server
+
+    :returns: The server
+    """
+    stub_server.store.populate(apps=1)
+    return stub_server
+
+
+def _localization_id(client: asconnect.Client) -> str:
+    """Get the localization of the app's version to add screenshots to.
+
+    :param client: The client to get it with
+
+    :returns: The ID of the localization
+    """
+    app = client.app.get_from_bundle_id("com.example.app0")
+    assert app is not None
+    version = client.version.get_version(app_id=app.identifier, version_string="1.0")
+    assert version is not None
+
+    return next(client.version.get_localizations(version_id=version.identifier)).identifier
+
+
+def _changes(server: StubServer) -> int:
+    """Count the requests which changed anything.
+
+    :param server: The server the requests were sent to
+
+    :returns: The number of requests
+    """
+    return sum(count for (method, _), count in server.requests.items() if method != "GET")
+
+
+def _screenshot_set(client: asconnect.Client) -> str:
+    """Create a screenshot set to upload to.
+
+    :param client: The client to create it with
+
+    :returns: The ID of the set
+    """
+    return client.screenshots.create_set(
+        localization_id=_localization_id(client),
+        display_type=ScreenshotDisplayType.APP_IPAD_PRO_3GEN_129,
+    ).identifier
+
+
+@pytest.fixture(name="file_path")
+def fixture_file_path(tmp_path: Any) -> str:
+    """Write a file which is split into several parts.
+
+    :returns: The path of the file
+    """
+    path = str(tmp_path / "screenshot.png")
+
+    with open(path, "wb") as screenshot:
+        screenshot.write(os.urandom(PART_SIZE * PARTS - 1))
+
+    return path
+
+
+def test_parts_are_uploaded_in_parallel(
+    server: StubServer, file_path: str, stub_client: StubClientFactory
+) -> None:
+    """The parts should be sent at the same time, and reassemble to the same file."""
+    server.latency = 0.2
+
+    with stub_client() as client:
+        screenshot_set_id = _screenshot_set(client)
+
+        start = time.monotonic()
+        screenshot = client.screenshots.upload_screenshot(
+            file_path=file_path, screenshot_set_id=screenshot_set_id, upload_workers=PARTS
+        )
+        elapsed = time.monotonic() - start
+
+    # The checksum only matches if every part arrived intact
+    assert screenshot.attributes.asset_delivery_state.state == AppMediaAssetStateState.COMPLETE
+    assert server.requests[("PUT", server.url.split("/")[2])] == PARTS
+
+    # One at a time would take at least 0.2s per part, on top of the API requests
+    assert elapsed < PARTS * server.latency
+
+
+def test_failed_parts_are_retried_and_reported(
+    server: StubServer, file_path: str, stub_client: StubClientFactory
+) -> None:
+    """A part should be retried on its own, and reported if it fails for good."""
+    retry_policy = asconnect.RetryPolicy(base_delay=0, jitter=0)
+
+    with stub_client(retry_policy=retry_policy) as client:
+        screenshot_set_id = _screenshot_set(client)
+
+        server.fail_next(503, method="PUT")
+        screenshot = client.screenshots.upload_screenshot(
+            file_path=file_path, screenshot_set_id=screenshot_set_id
+        )
+
+        assert screenshot.attributes.asset_delivery_state.state == AppMediaAssetStateState.COMPLETE
+        assert server.requests[("PUT", server.url.split("/")[2])] == PARTS + 1
+
+    retry_policy = asconnect.RetryPolicy(max_attempts=1)
+
+    with stub_client(retry_policy=retry_policy) as client:
+        server.fail_next(503, method="PUT")
+
+        with pytest.raises(UploadError) as error:
+            client.screenshots.upload_screenshot(
+                file_path=file_path, screenshot_set_id=screenshot_set_id, upload_workers=1
+            )
+
+        assert [offset for offset, _ in error.value.failures] == [0]
+        assert "503" in str(error.value)
+
+
+def test_parts_are_views_of_their_ranges(
+    server: StubServer, file_path: str, stub_client: StubClientFactory
+) -> None:
+    """Each part should be sent as a view of its range, whatever order the operations come in."""
+    with open(file_path, "rb") as screenshot:
+        contents = screenshot.read()
+
+    ranges = [(5000, 1500), (0, 1000), (2000, 3000)]
+    operations = [
+        decode(
+            UploadOperation,
+            {
+                "method": "PUT",
+                "url": f"{server.url}/{offset}",
+                "offset": offset,
+                "length": length,
+                "requestHeaders": [],
+            },
+        )
+        for offset, length in ranges
+    ]
+    sent: dict[str, bytes] = {}
+
+    def put_chunk(*, url: str, data: Any, **_: Any) -> requests.Response:
+        """Record the part.
+
+        :returns: A successful response
+        """
+        assert isinstance(data, memoryview)
+        sent[url] = data.tobytes()
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    with stub_client() as client:
+        with mock.patch.object(client.http_client, "put_chunk", side_effect=put_chunk):
+            # pylint: disable=protected-access
+            client.screenshots._upload_screenshot_contents(
+                file_path=file_path, upload_operations=operations, use_auth_header=True
+            )
+
+    assert sent == {
+        f"{server.url}/{offset}": contents[offset : offset + length] for offset, length in ranges
+    }
+
+
+def test_files_are_hashed_in_blocks_and_batches(tmp_path: Any) -> None:
+    """Hashes should match however the files are read, including empty ones."""
+    paths = [str(tmp_path / f"{size}.png") for size in [0, 10, HASH_BLOCK_SIZE * 2 + 7]]
+    contents = {}
+
+    for path in paths:
+        contents[path] = os.urandom(int(os.path.basename(path).split(".")[0]))
+
+        with open(path, "wb") as screenshot:
+            screenshot.write(contents[path])
+
+    expected = {path: hashlib.md5(data).hexdigest() for path, data in contents.items()}
+
+    assert {path: md5_file(path) for path in paths} == expected
+    assert md5_files(paths + paths[:1], max_workers=2) == expected
+    assert md5_files(paths, max_workers=2, processes=True) == expected
+
+    with map_file(paths[0]) as mapped:
+        assert mapped == b""
+
+
+@pytest.mark.usefixtures("server")
+def test_known_checksum_is_not_recomputed(file_path: str, stub_client: StubClientFactory) -> None:
+    """A checksum passed in should be sent as it is, rather than worked out again."""
+    with stub_client() as client:
+        screenshot_set_id = _screenshot_set(client)
+
+        screenshot = client.screenshots.upload_screenshot(
+            file_path=file_path, screenshot_set_id=screenshot_set_id, checksum="0" * 32
+        )
+
+    # The server checks the checksum it was sent, which would match if it had been worked out
+    assert screenshot.attributes.asset_delivery_state.state == AppMediaAssetStateState.FAILED
+
+
+def test_sync_only_changes_what_differs(
+    server: StubServer, tmp_path: Any, stub_client: StubClientFactory
+) -> None:
+    """A sync should only change what differs, and a repeat should change nothing."""
+    paths = [str(tmp_path / f"{index}.png") for index in range(4)]
+
+    for index, path in enumerate(paths):
+        with open(path, "wb") as screenshot:
+            screenshot.write(os.urandom(PART_SIZE + index))
+
+    ipad = ScreenshotDisplayType.APP_IPAD_PRO_3GEN_129
+    iphone = ScreenshotDisplayType.APP_IPHONE_65
+
+    with stub_client() as client:
+        localization_id = _localization_id(client)
+
+        # Processes can't be started from scripts without a __main__ guard, so aren't used
+        with mock.patch("concurrent.futures.ProcessPoolExecutor", side_effect=AssertionError):
+            synced = client.screenshots.sync_localization(
+                localization_id=localization_id, screenshots={ipad: paths[:3], iphone: paths[3:]}
+            )
+
+        assert [s.attributes.file_name for s in synced[ipad]] == ["0.png", "1.png", "2.png"]
+
+        before = _changes(server)
+        assert [
+            s.identifier
+            for s in client.screenshots.sync_localization(
+                localization_id=localization_id, screenshots={ipad: paths[:3], iphone: paths[3:]}
+            )[ipad]
+        ] == [s.identifier for s in synced[ipad]]
+        assert _changes(server) == before
+
+        # Change a file, move the others around it, and drop the other display type
+        with open(paths[1], "wb") as screenshot:
+            screenshot.write(os.urandom(PART_SIZE))
+
+        changed = client.screenshots.sync_localization(
+            localization_id=localization_id,
+            screenshots={ipad: [paths[2], paths[1], paths[0]]},
+            delete_unmatched_sets=True,
+        )
+
+        assert changed[ipad][0].identifier == synced[ipad][2].identifier
+        assert changed[ipad][1].identifier not in {s.identifier for s in synced[ipad]}
+        assert changed[ipad][2].identifier == synced[ipad][0].identifier
+
+        # The changed file, and the screenshot in the dropped set
+        assert server.requests[("DELETE", "appScreenshots/{id}")] == 2
+        assert server.requests[("DELETE", "appScreenshotSets/{id}")] == 1
+        assert (
+            server.requests[("PATCH", "appScreenshotSets/{id}/relationships/appScreenshots")] == 1
+        )
+
+        sets = list(client.screenshots.get_sets(localization_id=localization_id))
+        assert [s.attributes.screenshot_display_type for s in sets] == [ipad]
+        assert [
+            s.identifier
+            for s in client.screenshots.get_screenshots(screenshot_set_id=sets[0].identifier)
+        ] == [s.identifier for s in changed[ipad]]